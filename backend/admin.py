@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import UserData, Payment, Orders, Searches, Products, Wishlist, Scraper, Tag, Vendor,ShyfterEmployee,ShyfterEmployeeClocking,ShyfterEmployeeShift
+from .models import UserData, Payment, Orders, Searches, Products, Wishlist, Scraper, Tag, Vendor,ShyfterEmployee,ShyfterEmployeeClocking,ShyfterEmployeeShift,Location
 
 # Register your models here.
 admin.site.register(UserData)
@@ -110,3 +110,10 @@ admin.site.register(ShyfterEmployeeShift,AdminShyfterEmployeeShift)
 admin.site.register(ShyfterEmployeeClocking,AdminShyfterEmployeeClocking)
 admin.site.register(ShyfterEmployee,AdminShyfterEmployee)
 admin.site.register(Products, AdminProducts)
+
+
+class AdminLocation(admin.ModelAdmin):
+    list_display=("account","name","region","is_default")
+    search_fields=("account","name")
+
+admin.site.register(Location,AdminLocation)
@@ -0,0 +1,268 @@
+import math
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.services import monthly_stats_builder, monthly_stats_columnar, monthly_stats_sql
+from backend.services.service_times import SERVICE_HISTOGRAM_EDGES
+from backend.services.yoy_sql import (
+    ALIGNMENTS,
+    DEFAULT_ALIGNMENT,
+    DEFAULT_GRANULARITY,
+    GRANULARITIES,
+    bucket_bounds,
+    iter_buckets,
+    previous_day,
+)
+
+# Report → (builder, fetcher of its raw rows)
+REPORT_BUILDERS = {
+    "sales_location": (monthly_stats_builder.build_monthly_stats_response, monthly_stats_sql.fetch_monthly_stats_raw),
+    "sales_orderType": (monthly_stats_builder.build_orderType_stats_response, monthly_stats_sql.fetch_sales_orderType_raw),
+    "sales_productItem": (monthly_stats_builder.build_product_item_stats_response, monthly_stats_sql.fetch_sales_productItem_raw),
+    "sales_productCategory": (monthly_stats_builder.build_product_category_stats_reponse, monthly_stats_sql.fetch_sales_productCategory_raw),
+    "labour_area": (monthly_stats_builder.build_labourArea_stats, monthly_stats_sql.fetch_labour_area_raw),
+    "labour_role": (monthly_stats_builder.build_labourRole_stats, monthly_stats_sql.fetch_labour_role_raw),
+    "labour_hour": (monthly_stats_builder.build_labourHour_stats, monthly_stats_sql.fetch_labour_hour_raw),
+    "operation_dayOfWeek": (monthly_stats_builder.build_operation_dayOfWeek_stats, monthly_stats_sql.fetch_operation_dayOfWeek_raw),
+    "operation_hour": (monthly_stats_builder.build_operation_hour_stats, monthly_stats_sql.fetch_operations_hour_raw),
+    "operation_partOfDay": (monthly_stats_builder.build_operations_partOfDay_stats, monthly_stats_sql.fetch_operations_partOfDay_raw),
+}
+
+DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+SALES_COLUMNS = [
+    "totalorder_current", "totalorder_previous",
+    "totalcustomer_current", "totalcustomer_previous",
+    "total_guest_count_current", "total_guest_count_previous",
+    "totalpayment_current", "totalpayment_previous",
+    "avgdelivery_minutes_current", "avgdelivery_minutes_previous",
+]
+OPERATION_COLUMNS = [*SALES_COLUMNS, "delivery_histogram_current", "delivery_histogram_previous"]
+LABOUR_COLUMNS = [
+    "total_current_employee", "total_previous_employee",
+    "total_current_duration_costing", "total_previous_duration_costing",
+    "total_current_work_duration", "total_previous_work_duration",
+]
+LABOUR_HOUR_COLUMNS = [
+    "total_shift_duration", "total_work_duration", "total_shift_cost", "total_hourly_cost",
+    "avg_total_shift_duration", "avg_total_work_duration", "avg_total_shift_cost",
+    "forecast_total_shift_duration", "forecast_total_work_duration", "forecast_total_shift_cost",
+]
+
+
+def _synthetic_rows(
+    report, count, start_date, days, rng, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY
+):
+    """
+    `count` raw rows shaped like the report query's (same columns and value
+    types), spread over the buckets of `days` days from `start_date`.
+    """
+    money = [Decimal(cents).scaleb(-2) for cents in range(0, 250000, 37)]
+    counts = [Decimal(n).quantize(Decimal("0.01")) for n in range(40)]
+    minutes = [Decimal(n).scaleb(-2) for n in range(0, 6000, 7)]
+    integers = list(range(40))
+    histograms = [None] + [
+        [rng.choice((0, 0, 0, 1, 2, 5)) for _ in SERVICE_HISTOGRAM_EDGES] for _ in range(50)
+    ]
+    day_list = list(iter_buckets(start_date, start_date + timedelta(days=days - 1), granularity))
+
+    def sales_values():
+        return [
+            rng.choice(counts), rng.choice(counts),
+            rng.choice(counts), rng.choice(counts),
+            rng.choice(counts), rng.choice(counts),
+            rng.choice(money), rng.choice(money),
+            rng.choice(minutes), rng.choice(minutes),
+        ]
+
+    def operation_values():
+        return [*sales_values(), rng.choice(histograms), rng.choice(histograms)]
+
+    def report_day():
+        day = rng.choice(day_list)
+        return [f"{day:%d/%m/%Y}", f"{previous_day(day, alignment, granularity):%d/%m/%Y}"]
+
+    groups = max(1, count // len(day_list))
+    if report in ("sales_location", "sales_orderType", "labour_area", "labour_role"):
+        key, names = {
+            "sales_location": ("location", ["Aalst", "Berlare", "Dendermonde"]),
+            "sales_orderType": ("channel", ["takeaway", "shopify", "deliverect", "takeaway.com"]),
+            "labour_area": ("location", ["Tipzakske", "Frietbooster", "Frietchalet"]),
+            "labour_role": ("role", ["hr", "admin", "employee"]),
+        }[report]
+        if report.startswith("labour"):
+            columns = (key, "current_day", "previous_day", *LABOUR_COLUMNS)
+            make = lambda: [rng.choice(names), *report_day(), *(rng.choice(money) for _ in LABOUR_COLUMNS)]
+        else:
+            columns = (key, "current_day", "previous_day", *SALES_COLUMNS)
+            make = lambda: [rng.choice(names), *report_day(), *sales_values()]
+    elif report == "sales_productItem":
+        columns = ("product_name", "current_day", "previous_day", *SALES_COLUMNS)
+        make = lambda: [f"Product {rng.randrange(groups)}", *report_day(), *sales_values()]
+    elif report == "sales_productCategory":
+        columns = ("product_category_id", "product_category_name", "current_day", "previous_day", *SALES_COLUMNS)
+
+        def make():
+            category = rng.randrange(groups)
+            return [category, f"Group {category}", *report_day(), *sales_values()]
+    elif report == "operation_partOfDay":
+        columns = ("current_day", "previous_day", "part_of_day", *OPERATION_COLUMNS)
+        make = lambda: [*report_day(), rng.choice(monthly_stats_builder.PARTS_OF_DAY), *operation_values()]
+    elif report == "operation_dayOfWeek":
+        columns = ("location", "current_day", "previous_day", "day_name", *OPERATION_COLUMNS)
+
+        def make():
+            day = rng.choice(day_list)
+            return [
+                rng.choice(["Aalst", "Berlare", "Dendermonde"]),
+                day, previous_day(day, alignment), DAY_NAMES[day.weekday()],
+                *operation_values(),
+            ]
+    elif report == "operation_hour":
+        columns = ("day_name", "hour_of_day", "hour_label", *OPERATION_COLUMNS)
+
+        def make():
+            hour = rng.randrange(24)
+            return [rng.choice(DAY_NAMES), hour, f"{hour:02d}:00", *operation_values()]
+    else:
+        columns = ("day_name", "hour_of_day", *LABOUR_HOUR_COLUMNS)
+        make = lambda: [
+            rng.choice(DAY_NAMES), rng.randrange(24),
+            rng.choice(integers), rng.choice(integers),
+            *(rng.choice(money) for _ in LABOUR_HOUR_COLUMNS[2:]),
+        ]
+
+    row_type = monthly_stats_sql._row_type(columns)
+    return [row_type._make(make()) for _ in range(count)]
+
+
+def _differences(expected, actual, tolerance, path="$", found=None, limit=20):
+    """
+    Where two responses differ once rendered to JSON (Decimal → float): keys
+    and their order, list lengths, value types and values; numbers may differ
+    by `tolerance`.
+
+    Returns:
+        tuple: (number of differences, first `limit` of them as strings)
+    """
+    found = found if found is not None else [0, []]
+
+    def report(message):
+        found[0] += 1
+        if len(found[1]) < limit:
+            found[1].append(f"{path}: {message}")
+
+    if isinstance(expected, Decimal):
+        expected = float(expected)
+    if isinstance(actual, Decimal):
+        actual = float(actual)
+
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        if list(expected) != list(actual):
+            report(f"keys {list(expected)} != {list(actual)}")
+        for key in expected.keys() & actual.keys():
+            _differences(expected[key], actual[key], tolerance, f"{path}.{key}", found, limit)
+    elif isinstance(expected, list) and isinstance(actual, list):
+        if len(expected) != len(actual):
+            report(f"{len(expected)} rows != {len(actual)} rows")
+        for i, (left, right) in enumerate(zip(expected, actual)):
+            _differences(left, right, tolerance, f"{path}[{i}]", found, limit)
+    elif type(expected) in (int, float) and type(actual) in (int, float):
+        if type(expected) is not type(actual):
+            report(f"{expected!r} ({type(expected).__name__}) != {actual!r} ({type(actual).__name__})")
+        elif not math.isclose(expected, actual, rel_tol=1e-9, abs_tol=tolerance):
+            report(f"{expected!r} != {actual!r}")
+    elif type(expected) is not type(actual) or expected != actual:
+        report(f"{expected!r} != {actual!r}")
+    return found
+
+
+def _timed(build, rows, start_date, end_date, repeat, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
+    best, response = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = build(rows, start_date, end_date, alignment=alignment, granularity=granularity)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000, response
+
+
+class Command(BaseCommand):
+    help = (
+        "Checks the columnar (NumPy) report builders build the same responses as the "
+        "row-by-row ones and times both, on synthetic rows (default 1M per report) "
+        "or on the report queries' rows for a period (--from-db)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--report", action="append", choices=sorted(REPORT_BUILDERS), help="Only this report (repeatable)")
+        parser.add_argument("--rows", type=int, default=1_000_000, help="Synthetic rows per report")
+        parser.add_argument("--days", type=int, default=365, help="Days the synthetic rows are spread over")
+        parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic rows")
+        parser.add_argument("--from-db", action="store_true", help="Use the report queries' rows instead of synthetic ones")
+        parser.add_argument("--start", type=date.fromisoformat, help="First report day (default: --days before --end)")
+        parser.add_argument("--end", type=date.fromisoformat, help="Last report day (default: today)")
+        parser.add_argument("--repeat", type=int, default=1, help="Timed runs per builder; the fastest is reported")
+        parser.add_argument("--tolerance", type=float, default=1e-6, help="Largest accepted difference of a number")
+        parser.add_argument("--alignment", choices=ALIGNMENTS, default=DEFAULT_ALIGNMENT, help="YoY alignment of the rows")
+        parser.add_argument("--granularity", choices=list(GRANULARITIES), default=DEFAULT_GRANULARITY, help="Report granularity of the rows")
+
+    def handle(self, *args, **options):
+        if not monthly_stats_columnar.columnar_available():
+            raise CommandError("NumPy is not installed; the columnar builders are unavailable")
+
+        end_date = options["end"] or date.today()
+        start_date = options["start"] or end_date - timedelta(days=options["days"] - 1)
+        alignment, granularity = options["alignment"], options["granularity"]
+        start_date, end_date = bucket_bounds(start_date, end_date, granularity)
+        days = (end_date - start_date).days + 1
+        reports = options["report"] or [
+            report for report in REPORT_BUILDERS
+            if granularity in monthly_stats_sql.YOY_REPORTS[report].granularities
+        ]
+        rng = random.Random(options["seed"])
+
+        failed = []
+        summary = []
+        for report in reports:
+            builder, fetch = REPORT_BUILDERS[report]
+            started = time.perf_counter()
+            if options["from_db"]:
+                rows = list(fetch(start_date, end_date, alignment, granularity))
+            else:
+                rows = _synthetic_rows(report, options["rows"], start_date, days, rng, alignment, granularity)
+            self.stdout.write(f"\n{report}: {len(rows)} rows ({time.perf_counter() - started:.1f}s to load)")
+
+            rowwise_ms, expected = _timed(
+                builder.rowwise, rows, start_date, end_date, options["repeat"], alignment, granularity
+            )
+            columnar_ms, actual = _timed(
+                getattr(monthly_stats_columnar, builder.__name__), rows, start_date, end_date, options["repeat"],
+                alignment, granularity,
+            )
+            count, differences = _differences(expected, actual, options["tolerance"])
+            del expected, actual
+
+            speedup = rowwise_ms / columnar_ms if columnar_ms else 0
+            self.stdout.write(f"    row-by-row {rowwise_ms:>10.1f} ms")
+            self.stdout.write(f"    columnar   {columnar_ms:>10.1f} ms  x{speedup:.2f}")
+            if count:
+                failed.append(report)
+                self.stdout.write(self.style.ERROR(f"    {count} differences"))
+                for difference in differences:
+                    self.stdout.write(f"        {difference}")
+            else:
+                self.stdout.write(self.style.SUCCESS("    same response"))
+            summary.append((report, len(rows), rowwise_ms, columnar_ms, speedup))
+
+        self.stdout.write(self.style.MIGRATE_HEADING("\nSummary"))
+        for report, rows, rowwise_ms, columnar_ms, speedup in summary:
+            self.stdout.write(f"{report:<24} {rows:>9} rows {rowwise_ms:>10.1f} ms → {columnar_ms:>10.1f} ms  x{speedup:.2f}")
+
+        if failed:
+            raise CommandError(f"Columnar builders differ for: {', '.join(failed)}")
+        self.stdout.write(self.style.SUCCESS("Columnar builders match the row-by-row builders"))
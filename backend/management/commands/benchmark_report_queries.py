@@ -0,0 +1,129 @@
+import statistics
+import time
+from datetime import date, timedelta
+from functools import partial
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from backend.services import monthly_stats_sql
+from backend.services.yoy_sql import DEFAULT_GRANULARITY, GRANULARITIES
+
+REPORT_QUERIES = {
+    "sales_location": monthly_stats_sql.fetch_monthly_stats_raw,
+    "sales_orderType": monthly_stats_sql.fetch_sales_orderType_raw,
+    "sales_productItem": monthly_stats_sql.fetch_sales_productItem_raw,
+    "sales_productCategory": monthly_stats_sql.fetch_sales_productCategory_raw,
+    "labour_area": monthly_stats_sql.fetch_labour_area_raw,
+    "labour_role": monthly_stats_sql.fetch_labour_role_raw,
+    "labour_hour": monthly_stats_sql.fetch_labour_hour_raw,
+    "operation_dayOfWeek": monthly_stats_sql.fetch_operation_dayOfWeek_raw,
+    "operation_hour": monthly_stats_sql.fetch_operations_hour_raw,
+    "operation_partOfDay": monthly_stats_sql.fetch_operations_partOfDay_raw,
+}
+
+# Indexes added for the report query shapes (lightspeed_integration 0014, backend 0008)
+REPORT_INDEXES = [
+    "lightspeed_orders_day_loc_idx",
+    "lightspeed_orders_created_brin",
+    "lightspeed_rcpt_created_brin",
+    "shyfter_clocking_day_loc_idx",
+    "shyfter_shift_id_cost_idx",
+]
+
+
+def _capture_query(fetch, start_date, end_date):
+    """Run a report fetcher once; return its SQL, params and row count."""
+    captured = []
+
+    def capture(execute, sql, params, many, context):
+        captured.append((sql, params))
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(capture):
+        rows = sum(1 for _ in fetch(start_date, end_date))
+    sql, params = captured[-1]
+    return sql, params, rows
+
+
+def _explain(sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN (ANALYZE, BUFFERS) " + sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _timed_runs(fetch, start_date, end_date, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in fetch(start_date, end_date):
+            pass
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+class Command(BaseCommand):
+    help = (
+        "Times the report queries and prints their EXPLAIN ANALYZE plans. "
+        "With --compare the queries are first run with the report indexes dropped "
+        "inside a rolled-back transaction (takes exclusive locks: staging only)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", type=date.fromisoformat, help="First report day (default: 30 days before --end)")
+        parser.add_argument("--end", type=date.fromisoformat, help="Last report day (default: today)")
+        parser.add_argument("--report", action="append", choices=sorted(REPORT_QUERIES), help="Only this report (repeatable)")
+        parser.add_argument("--repeat", type=int, default=3, help="Timed runs per query; the median is reported")
+        parser.add_argument("--plans", action="store_true", help="Print the full plans instead of their summary")
+        parser.add_argument("--compare", action="store_true", help="Also run without the report indexes")
+        parser.add_argument("--granularity", choices=list(GRANULARITIES), default=DEFAULT_GRANULARITY, help="Report granularity")
+
+    def handle(self, *args, **options):
+        end_date = options["end"] or date.today()
+        start_date = options["start"] or end_date - timedelta(days=29)
+        reports = options["report"] or [
+            report for report in REPORT_QUERIES
+            if options["granularity"] in monthly_stats_sql.YOY_REPORTS[report].granularities
+        ]
+
+        before = None
+        if options["compare"]:
+            self.stdout.write(self.style.MIGRATE_HEADING("Without report indexes"))
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    for name in REPORT_INDEXES:
+                        cursor.execute(f'DROP INDEX IF EXISTS "{name}"')
+                before = self._run(reports, start_date, end_date, options)
+                transaction.set_rollback(True)
+
+        self.stdout.write(self.style.MIGRATE_HEADING("With report indexes"))
+        after = self._run(reports, start_date, end_date, options)
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\nSummary {start_date} → {end_date} (median of {options['repeat']} runs)"))
+        for report in reports:
+            line = f"{report:<24} {after[report]:>10.1f} ms"
+            if before is not None:
+                speedup = before[report] / after[report] if after[report] else 0
+                line = f"{report:<24} {before[report]:>10.1f} ms → {after[report]:>10.1f} ms  x{speedup:.2f}"
+            self.stdout.write(line)
+
+    def _run(self, reports, start_date, end_date, options):
+        timings = {}
+        for report in reports:
+            fetch = partial(REPORT_QUERIES[report], granularity=options["granularity"])
+            sql, params, rows = _capture_query(fetch, start_date, end_date)
+            timings[report] = _timed_runs(fetch, start_date, end_date, options["repeat"])
+            plan = _explain(sql, params)
+
+            self.stdout.write(f"\n{report}: {rows} rows, {timings[report]:.1f} ms")
+            if options["plans"]:
+                lines = plan
+            else:
+                # Root node, every scan node and the planning/execution totals
+                lines = [plan[0]] + [
+                    line for line in plan[1:]
+                    if "Scan" in line or line.startswith(("Planning Time", "Execution Time"))
+                ]
+            for line in lines:
+                self.stdout.write(f"    {line}")
+        return timings
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from backend.services.labour_facts import refresh_labour_facts
+from backend.services.report_cache import invalidate_reports
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the labour_fact table from stored Shyfter clockings, shifts and employees"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clocking", action="append", help="Only this clocking id (repeatable, default: all)")
+        parser.add_argument("--shift", action="append", help="Only the clockings of this shift id (repeatable)")
+        parser.add_argument("--employee", action="append", help="Only the clockings of this employee's shifts (repeatable)")
+
+    def handle(self, *args, **options):
+        written = refresh_labour_facts(
+            clocking_ids=options["clocking"],
+            shift_ids=options["shift"],
+            employee_ids=options["employee"],
+        )
+        invalidate_reports("clockings")
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} labour fact rows"))
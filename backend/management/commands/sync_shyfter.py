@@ -0,0 +1,40 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from backend.services.report_cache import invalidate_reports
+from backend.services.shyfter_ingest import ingest_shyfter
+
+
+class Command(BaseCommand):
+    help = "Syncs Shyfter clockings and/or shifts for a location with the concurrent ingest engine"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--location", default="Frietchalet", help="Shyfter account (default: Frietchalet)")
+        parser.add_argument("--kind", action="append", choices=["clockings", "shifts"], help="What to sync (repeatable, default: both)")
+        parser.add_argument("--start", type=date.fromisoformat, default=date(2021, 11, 1), help="First day (YYYY-MM-DD)")
+        parser.add_argument("--end", type=date.fromisoformat, help="Last day for shifts (YYYY-MM-DD, default: today)")
+        parser.add_argument("--employee", action="append", help="Only this employee id (repeatable)")
+        parser.add_argument("--concurrency", type=int, help="Page chains fetched at once")
+
+    def handle(self, *args, **options):
+        for kind in options["kind"] or ["clockings", "shifts"]:
+            result = ingest_shyfter(
+                kind,
+                options["location"],
+                options["start"],
+                options["end"],
+                employee_ids=options["employee"],
+                concurrency=options["concurrency"],
+            )
+            if result["first_day"]:
+                invalidate_reports("clockings", options["location"], result["first_day"], result["last_day"])
+
+            self.stdout.write(
+                f"{kind}: employees={result['employees_processed']} requests={result['requests']} "
+                f"fetched={result['total_fetched']} inserted={result['inserted']} updated={result['updated']} "
+                f"skipped={result['skipped']} in {result['duration']:.2f}s"
+            )
+            if result["failed_requests"]:
+                self.stdout.write(self.style.WARNING(f"  {result['failed_requests']} page requests failed"))
+        self.stdout.write(self.style.SUCCESS("Shyfter sync finished"))
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.13 on 2026-10-18 14:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0006_shyfteremployeeshift'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportCacheInvalidation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(help_text='orders, receipts, clockings or products', max_length=32)),
+                ('location', models.CharField(blank=True, help_text='Affected location (empty = all)', max_length=100, null=True)),
+                ('start_day', models.DateField(blank=True, help_text='First affected day (empty = unbounded)', null=True)),
+                ('end_day', models.DateField(blank=True, help_text='Last affected day (empty = unbounded)', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'report_cache_invalidation',
+                'indexes': [models.Index(fields=['created_at'], name='report_cach_created_92ed68_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.13 on 2026-10-18 14:42
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without locking writes on the live tables
+    atomic = False
+
+    dependencies = [
+        ('backend', '0007_reportcacheinvalidation'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='shyfteremployeeclocking',
+            index=models.Index(fields=['work_date', 'location'], include=('duration_minutes', 'cost', 'shift_id', 'employee', 'start', 'end'), name='shyfter_clocking_day_loc_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='shyfteremployeeshift',
+            index=models.Index(fields=['id'], include=('employee', 'cost', 'duration_minutes'), name='shyfter_shift_id_cost_idx'),
+        ),
+    ]
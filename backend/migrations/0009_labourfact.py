@@ -0,0 +1,70 @@
+# Generated by Django 4.2.13 on 2026-10-18 15:12
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+POPULATE_LABOUR_FACT_SQL = """
+    INSERT INTO labour_fact (
+        clocking_id, employee_id, shift_id, location, role, work_date,
+        work_minutes, shift_minutes, cost, hours, refreshed_at
+    )
+    SELECT
+        c.id,
+        c.employee_id,
+        s.id,
+        c.location,
+        e.type,
+        c.work_date,
+        c.duration_minutes,
+        s.duration_minutes,
+        CASE WHEN c.cost = 0 THEN (s.cost * c.duration_minutes) / NULLIF(s.duration_minutes, 0) ELSE c.cost END,
+        ARRAY(
+            SELECT EXTRACT(HOUR FROM slice)::smallint
+            FROM generate_series(
+                date_trunc('hour', GREATEST(c.start, c.work_date::timestamptz)),
+                LEAST(c."end", (c.work_date + 1)::timestamptz) - INTERVAL '1 microsecond',
+                INTERVAL '1 hour'
+            ) slice
+            ORDER BY slice
+        ),
+        NOW()
+    FROM shyfter_employee_clocking c
+    LEFT JOIN shyfter_employee_shift s
+      ON s.id = c.shift_id
+     AND s.employee_id = c.employee_id
+    LEFT JOIN shyfter_employee e
+      ON e.id = s.employee_id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0008_report_covering_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LabourFact',
+            fields=[
+                ('clocking_id', models.CharField(help_text='Shyfter clocking ID', max_length=255, primary_key=True, serialize=False)),
+                ('employee_id', models.CharField(help_text='Clocking employee ID', max_length=255)),
+                ('shift_id', models.CharField(blank=True, help_text='Stored shift of the clocking (empty = none)', max_length=255, null=True)),
+                ('location', models.CharField(help_text='Clocking location', max_length=100)),
+                ('role', models.CharField(blank=True, help_text="Type of the shift's employee", max_length=100, null=True)),
+                ('work_date', models.DateField(help_text='Work day of the clocking')),
+                ('work_minutes', models.IntegerField(default=0, help_text='Clocked minutes')),
+                ('shift_minutes', models.IntegerField(blank=True, help_text='Minutes of the shift', null=True)),
+                ('cost', models.DecimalField(blank=True, decimal_places=6, help_text='Clocked cost, else the prorated shift cost', max_digits=18, null=True)),
+                ('hours', django.contrib.postgres.fields.ArrayField(base_field=models.SmallIntegerField(), blank=True, default=list, help_text='Hours of the work day the clocking overlaps', size=None)),
+                ('refreshed_at', models.DateTimeField(auto_now=True, help_text='When this row was last rebuilt')),
+            ],
+            options={
+                'db_table': 'labour_fact',
+                'ordering': ['work_date', 'location'],
+                'indexes': [models.Index(fields=['work_date'], include=('location', 'role', 'shift_id', 'work_minutes', 'shift_minutes', 'cost', 'hours'), name='labour_fact_day_idx')],
+            },
+        ),
+        migrations.RunSQL(POPULATE_LABOUR_FACT_SQL, migrations.RunSQL.noop),
+    ]
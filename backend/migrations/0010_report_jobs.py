@@ -0,0 +1,61 @@
+# Generated by Django 4.2.13 on 2026-10-18 15:14
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+import django.db.models.deletion
+import rest_framework.utils.encoders
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0009_labourfact'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportJobResult',
+            fields=[
+                ('key', models.CharField(help_text='Hash of the report request', max_length=64, primary_key=True, serialize=False)),
+                ('data', models.JSONField(encoder=rest_framework.utils.encoders.JSONEncoder, help_text='Response data')),
+                ('sources', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=32), default=list, help_text='Sources of its reports (orders, clockings, ...)', size=None)),
+                ('location', models.CharField(blank=True, help_text='Location filter (empty = all)', max_length=100, null=True)),
+                ('first_day', models.DateField(help_text='First day read (previous-year window included)')),
+                ('last_day', models.DateField(help_text='Last day read')),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('expires_at', models.DateTimeField(help_text='When the result must be recomputed')),
+            ],
+            options={
+                'db_table': 'report_job_result',
+                'indexes': [models.Index(fields=['expires_at'], name='report_job__expires_ee6ce8_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReportJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('key', models.CharField(help_text='Hash of the report request', max_length=64)),
+                ('reports', models.JSONField(default=list, help_text='Report endpoint names')),
+                ('bundle', models.BooleanField(default=False, help_text='Requested through the bundle endpoint')),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('filters', models.JSONField(blank=True, default=dict, help_text='Remaining query params')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('result', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='backend.reportjobresult')),
+            ],
+            options={
+                'db_table': 'report_job',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='report_job_status_208b4f_idx'), models.Index(fields=['key', 'status'], name='report_job_key_0fa4e9_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='reportjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['queued', 'running'])), fields=('key',), name='report_job_active_key_uniq'),
+        ),
+    ]
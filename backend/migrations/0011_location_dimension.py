@@ -0,0 +1,46 @@
+# Generated by Django 4.2.13 on 2026-10-18 15:17
+
+from django.db import migrations, models
+
+
+# Accounts and locations known so far (formerly hard-coded in the mappers and
+# the sales location builder), then any other Shyfter account already synced
+POPULATE_LOCATIONS_SQL = """
+    INSERT INTO dim_location (account, name, region, is_default, created_at, updated_at)
+    VALUES
+        ('Tipzakske', 'Aalst', 'south', FALSE, NOW(), NOW()),
+        ('Frietbooster', 'Berlare', 'east', FALSE, NOW(), NOW()),
+        ('Frietchalet', 'Dendermonde', 'west', TRUE, NOW(), NOW());
+
+    INSERT INTO dim_location (account, is_default, created_at, updated_at)
+    SELECT DISTINCT c.location, FALSE, NOW(), NOW()
+    FROM shyfter_employee_clocking c
+    WHERE NOT EXISTS (SELECT 1 FROM dim_location l WHERE l.account = c.location);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0010_report_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Location',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('account', models.CharField(blank=True, help_text='Integration account name (request location)', max_length=100, null=True, unique=True)),
+                ('name', models.CharField(blank=True, help_text='Location value stored on orders and products', max_length=100, null=True, unique=True)),
+                ('region', models.CharField(blank=True, help_text='Dashboard region of the sales reports (south, east, west)', max_length=50, null=True)),
+                ('is_default', models.BooleanField(default=False, help_text='Used for unknown accounts')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'dim_location',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.RunSQL(POPULATE_LOCATIONS_SQL, migrations.RunSQL.noop),
+    ]
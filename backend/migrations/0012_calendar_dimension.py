@@ -0,0 +1,94 @@
+# Generated by Django 4.2.13 on 2026-10-18 15:21
+
+from django.db import migrations, models
+
+
+# Days 1999-2099: reports up to 2099 and the previous-year days of reports
+# from 2000 on
+POPULATE_CALENDAR_DAY_SQL = """
+    INSERT INTO calendar_day (
+        day, day_name, iso_weekday, iso_year, iso_week, week_start, year,
+        quarter, month, month_start, quarter_start, is_leap_day,
+        same_date_last_year, same_weekday_last_year
+    )
+    SELECT
+        c.day,
+        TO_CHAR(c.day, 'FMDay'),
+        EXTRACT(ISODOW FROM c.day),
+        EXTRACT(ISOYEAR FROM c.day),
+        EXTRACT(WEEK FROM c.day),
+        date_trunc('week', c.day)::date,
+        EXTRACT(YEAR FROM c.day),
+        EXTRACT(QUARTER FROM c.day),
+        EXTRACT(MONTH FROM c.day),
+        date_trunc('month', c.day)::date,
+        date_trunc('quarter', c.day)::date,
+        EXTRACT(MONTH FROM c.day) = 2 AND EXTRACT(DAY FROM c.day) = 29,
+        (c.day - INTERVAL '1 year')::date,
+        c.day - 364
+    FROM (
+        SELECT d::date AS day
+        FROM generate_series('1999-01-01'::date, '2099-12-31'::date, INTERVAL '1 day') d
+    ) c
+"""
+
+POPULATE_CALENDAR_HOUR_SQL = """
+    INSERT INTO calendar_hour (hour_of_day, hour_label, part_of_day)
+    SELECT
+        h,
+        to_char(make_interval(hours => h), 'HH24:MI'),
+        CASE
+            WHEN h BETWEEN 6 AND 11 THEN 'breakfast'
+            WHEN h BETWEEN 12 AND 16 THEN 'lunch'
+            WHEN h BETWEEN 17 AND 22 THEN 'dinner'
+            ELSE 'late_night'
+        END
+    FROM generate_series(0, 23) h
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0011_location_dimension'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarDay',
+            fields=[
+                ('day', models.DateField(primary_key=True, serialize=False)),
+                ('day_name', models.CharField(help_text='Weekday name, e.g. Monday', max_length=9)),
+                ('iso_weekday', models.SmallIntegerField(help_text='1 (Monday) to 7 (Sunday)')),
+                ('iso_year', models.SmallIntegerField()),
+                ('iso_week', models.SmallIntegerField()),
+                ('week_start', models.DateField(help_text='Monday of the ISO week')),
+                ('year', models.SmallIntegerField()),
+                ('quarter', models.SmallIntegerField()),
+                ('month', models.SmallIntegerField()),
+                ('month_start', models.DateField()),
+                ('quarter_start', models.DateField()),
+                ('is_leap_day', models.BooleanField(default=False)),
+                ('same_date_last_year', models.DateField(help_text='Same date one year earlier (29 Feb: 28 Feb)')),
+                ('same_weekday_last_year', models.DateField(help_text='Same weekday 52 weeks earlier')),
+            ],
+            options={
+                'db_table': 'calendar_day',
+                'ordering': ['day'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CalendarHour',
+            fields=[
+                ('hour_of_day', models.SmallIntegerField(primary_key=True, serialize=False)),
+                ('hour_label', models.CharField(help_text='e.g. 13:00', max_length=5)),
+                ('part_of_day', models.CharField(help_text='breakfast, lunch, dinner or late_night', max_length=20)),
+            ],
+            options={
+                'db_table': 'calendar_hour',
+                'ordering': ['hour_of_day'],
+            },
+        ),
+        migrations.RunSQL(POPULATE_CALENDAR_DAY_SQL, migrations.RunSQL.noop),
+        migrations.RunSQL(POPULATE_CALENDAR_HOUR_SQL, migrations.RunSQL.noop),
+    ]
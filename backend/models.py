@@ -1,4 +1,8 @@
+import uuid
+
+from django.contrib.postgres.fields import ArrayField
 from django.db import models
+from rest_framework.utils.encoders import JSONEncoder
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 
 import logging
@@ -406,6 +410,12 @@ class ShyfterEmployeeClocking(models.Model):
         indexes = [
             models.Index(fields=["employee", "work_date"]),
             models.Index(fields=["location"]),
+            # Labour reports: work_date range per location, duration/cost read from the index
+            models.Index(
+                fields=["work_date", "location"],
+                include=["duration_minutes", "cost", "shift_id", "employee", "start", "end"],
+                name="shyfter_clocking_day_loc_idx",
+            ),
         ]
 
     def __str__(self):
@@ -468,12 +478,63 @@ class ShyfterEmployeeShift(models.Model):
         indexes = [
             models.Index(fields=["employee", "work_date"]),
             models.Index(fields=["location"]),
+            # Clocking -> shift join of the labour reports reads only these columns
+            models.Index(
+                fields=["id"],
+                include=["employee", "cost", "duration_minutes"],
+                name="shyfter_shift_id_cost_idx",
+            ),
         ]
 
     def __str__(self):
         return f"{self.employee_id} | {self.work_date}"
 
 
+class LabourFact(models.Model):
+    """
+    One row per Shyfter clocking with everything the labour reports read,
+    already resolved: its cost (its share of the shift cost when it has none
+    of its own), minutes, role, location and the hours of the day it covers.
+    Rebuilt by backend.services.labour_facts whenever clockings, shifts or
+    employees are upserted, so the reports never join shifts and employees
+    or recompute costs per request.
+    """
+    # 🔑 Source clocking (plain ids, not FKs, so facts can be rebuilt independently)
+    clocking_id = models.CharField(max_length=255, primary_key=True, help_text="Shyfter clocking ID")
+    employee_id = models.CharField(max_length=255, help_text="Clocking employee ID")
+    shift_id = models.CharField(max_length=255, null=True, blank=True, help_text="Stored shift of the clocking (empty = none)")
+
+    # 📍 Dimensions
+    location = models.CharField(max_length=100, help_text="Clocking location")
+    role = models.CharField(max_length=100, null=True, blank=True, help_text="Type of the shift's employee")
+    work_date = models.DateField(help_text="Work day of the clocking")
+
+    # 💰 Measures
+    work_minutes = models.IntegerField(default=0, help_text="Clocked minutes")
+    shift_minutes = models.IntegerField(null=True, blank=True, help_text="Minutes of the shift")
+    cost = models.DecimalField(max_digits=18, decimal_places=6, null=True, blank=True, help_text="Clocked cost, else the prorated shift cost")
+
+    # ⏱ Hour slices
+    hours = ArrayField(models.SmallIntegerField(), default=list, blank=True, help_text="Hours of the work day the clocking overlaps")
+
+    refreshed_at = models.DateTimeField(auto_now=True, help_text="When this row was last rebuilt")
+
+    class Meta:
+        db_table = "labour_fact"
+        ordering = ["work_date", "location"]
+        indexes = [
+            # Labour reports: work_date range, every measure read from the index
+            models.Index(
+                fields=["work_date"],
+                include=["location", "role", "shift_id", "work_minutes", "shift_minutes", "cost", "hours"],
+                name="labour_fact_day_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.clocking_id} | {self.work_date}"
+
+
 
 
 class Wishlist(models.Model):
@@ -512,3 +573,181 @@ class XMLFile(models.Model):
 
     def __str__(self):
         return self.filename
+
+
+class Location(models.Model):
+    """
+    Location dimension: the account name the integrations are called with
+    (Shyfter/Lightspeed/Shopify, e.g. "Frietchalet"), the location value
+    stored on orders and products (e.g. "Dendermonde") and its dashboard
+    region. Reports densify against it instead of scanning fact tables for
+    distinct locations; the syncs add locations they have not seen yet.
+    """
+    account = models.CharField(max_length=100, unique=True, null=True, blank=True, help_text="Integration account name (request location)")
+    name = models.CharField(max_length=100, unique=True, null=True, blank=True, help_text="Location value stored on orders and products")
+    region = models.CharField(max_length=50, null=True, blank=True, help_text="Dashboard region of the sales reports (south, east, west)")
+    is_default = models.BooleanField(default=False, help_text="Used for unknown accounts")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "dim_location"
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"{self.account or '-'} | {self.name or '-'} | {self.region or '-'}"
+
+
+class CalendarDay(models.Model):
+    """
+    Calendar dimension: one row per day with its weekday, ISO week, month and
+    quarter, and the previous-year day it is compared with under each YoY
+    alignment (see backend.services.yoy_sql): the same date (29 Feb compares
+    with 28 Feb) or the same weekday 52 weeks earlier. The report queries read
+    their days here instead of generating a calendar per request.
+    """
+    day = models.DateField(primary_key=True)
+    day_name = models.CharField(max_length=9, help_text="Weekday name, e.g. Monday")
+    iso_weekday = models.SmallIntegerField(help_text="1 (Monday) to 7 (Sunday)")
+    iso_year = models.SmallIntegerField()
+    iso_week = models.SmallIntegerField()
+    week_start = models.DateField(help_text="Monday of the ISO week")
+    year = models.SmallIntegerField()
+    quarter = models.SmallIntegerField()
+    month = models.SmallIntegerField()
+    month_start = models.DateField()
+    quarter_start = models.DateField()
+    is_leap_day = models.BooleanField(default=False)
+    same_date_last_year = models.DateField(help_text="Same date one year earlier (29 Feb: 28 Feb)")
+    same_weekday_last_year = models.DateField(help_text="Same weekday 52 weeks earlier")
+
+    class Meta:
+        db_table = "calendar_day"
+        ordering = ["day"]
+
+    def __str__(self):
+        return f"{self.day} ({self.day_name})"
+
+
+class CalendarHour(models.Model):
+    """Hour-of-day dimension (24 rows): label and part of the day of each hour."""
+    hour_of_day = models.SmallIntegerField(primary_key=True)
+    hour_label = models.CharField(max_length=5, help_text="e.g. 13:00")
+    part_of_day = models.CharField(max_length=20, help_text="breakfast, lunch, dinner or late_night")
+
+    class Meta:
+        db_table = "calendar_hour"
+        ordering = ["hour_of_day"]
+
+    def __str__(self):
+        return f"{self.hour_label} ({self.part_of_day})"
+
+
+class ReportCacheInvalidation(models.Model):
+    """
+    Log of report cache invalidations written by the sync paths.
+    Each web worker replays rows newer than the last one it has seen so an
+    order/clocking sync in one process evicts cached reports in all of them.
+    """
+    source = models.CharField(max_length=32, help_text="orders, receipts, clockings or products")
+    location = models.CharField(max_length=100, null=True, blank=True, help_text="Affected location (empty = all)")
+    start_day = models.DateField(null=True, blank=True, help_text="First affected day (empty = unbounded)")
+    end_day = models.DateField(null=True, blank=True, help_text="Last affected day (empty = unbounded)")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "report_cache_invalidation"
+        indexes = [
+            models.Index(fields=["created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.source} | {self.location or 'all'} | {self.start_day} → {self.end_day}"
+
+
+class ReportJobResult(models.Model):
+    """
+    Finished response of a queued report request, shared by every job with
+    the same request key. Dropped when it expires or when a sync invalidates
+    the data it was built from (see backend.services.report_jobs).
+    """
+    key = models.CharField(max_length=64, primary_key=True, help_text="Hash of the report request")
+    # Rendered like the synchronous response (Decimal → number)
+    data = models.JSONField(encoder=JSONEncoder, help_text="Response data")
+
+    # What the response was built from, for invalidation
+    sources = ArrayField(models.CharField(max_length=32), default=list, help_text="Sources of its reports (orders, clockings, ...)")
+    location = models.CharField(max_length=100, null=True, blank=True, help_text="Location filter (empty = all)")
+    first_day = models.DateField(help_text="First day read (previous-year window included)")
+    last_day = models.DateField(help_text="Last day read")
+
+    computed_at = models.DateTimeField(auto_now=True)
+    expires_at = models.DateTimeField(help_text="When the result must be recomputed")
+
+    class Meta:
+        db_table = "report_job_result"
+        indexes = [
+            models.Index(fields=["expires_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.key} | {self.first_day} → {self.last_day}"
+
+
+class ReportJob(models.Model):
+    """
+    One asynchronous /reports/lightspeed/* request. Identical requests
+    (same key) share a queued or running job; local worker threads claim
+    queued jobs from this table and store the response in ReportJobResult.
+    """
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+    ACTIVE_STATUSES = [STATUS_QUEUED, STATUS_RUNNING]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    key = models.CharField(max_length=64, help_text="Hash of the report request")
+
+    # Request
+    reports = models.JSONField(default=list, help_text="Report endpoint names")
+    bundle = models.BooleanField(default=False, help_text="Requested through the bundle endpoint")
+    start_date = models.DateField()
+    end_date = models.DateField()
+    filters = models.JSONField(default=dict, blank=True, help_text="Remaining query params")
+
+    # Progress
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    error = models.TextField(null=True, blank=True)
+    result = models.ForeignKey(ReportJobResult, null=True, blank=True, on_delete=models.SET_NULL, related_name="jobs")
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "report_job"
+        ordering = ["-created_at"]
+        constraints = [
+            # At most one computation per request at a time
+            models.UniqueConstraint(
+                fields=["key"],
+                condition=models.Q(status__in=["queued", "running"]),
+                name="report_job_active_key_uniq",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+            models.Index(fields=["key", "status"]),
+        ]
+
+    def __str__(self):
+        return f"{self.id} | {', '.join(self.reports)} | {self.status}"
@@ -0,0 +1,94 @@
+import logging
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT ... ON CONFLICT statement
+BULK_UPSERT_BATCH_SIZE = 500
+
+
+class BulkUpserter:
+    """
+    Buffered insert-or-update writer for one model.
+
+    Rows are buffered per primary key (the last version of a row wins) and
+    flushed every `batch_size` rows as one
+    bulk_create(update_conflicts=True, unique_fields=["id"]) statement. Each
+    flush runs in a single transaction together with a lookup of the ids that
+    already existed, so inserted and updated rows can be counted separately.
+
+    Replaces a per-row update_or_create (SELECT + INSERT/UPDATE, one autocommit
+    transaction each) with two round-trips per batch.
+
+    Usage:
+        with BulkUpserter(ShyfterEmployeeClocking) as upserter:
+            for c in clockings:
+                upserter.add(str(c["id"]), _map_clocking_to_model_fields(c, employee, location))
+        upserter.inserted, upserter.updated
+    """
+
+    def __init__(self, model, batch_size=BULK_UPSERT_BATCH_SIZE, update_fields=None):
+        self.model = model
+        self.batch_size = batch_size
+        # created_at keeps the value of the first insert
+        self.update_fields = update_fields or [
+            field.name for field in model._meta.concrete_fields
+            if not field.primary_key and field.name != "created_at"
+        ]
+        self.inserted = 0
+        self.updated = 0
+        self.batches = 0
+        self._pending = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Don't write a half-mapped buffer when the caller failed
+        if exc_type is None:
+            self.flush()
+        return False
+
+    @property
+    def saved(self):
+        return self.inserted + self.updated
+
+    def add(self, pk, fields):
+        """Buffer one row (model field values without the primary key); flushes when the batch is full."""
+        self._pending[pk] = self.model(pk=pk, **fields)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the buffered rows.
+
+        Returns:
+            tuple: (inserted, updated) for this flush
+        """
+        if not self._pending:
+            return 0, 0
+
+        objs = list(self._pending.values())
+        self._pending = {}
+        ids = [obj.pk for obj in objs]
+
+        with transaction.atomic():
+            existing = set(
+                self.model.objects.filter(pk__in=ids).values_list("pk", flat=True)
+            )
+            self.model.objects.bulk_create(
+                objs,
+                update_conflicts=True,
+                unique_fields=[self.model._meta.pk.name],
+                update_fields=self.update_fields,
+            )
+
+        updated = len(existing)
+        inserted = len(objs) - updated
+        self.inserted += inserted
+        self.updated += updated
+        self.batches += 1
+        logger.debug("Upserted %s %s rows (%s new, %s updated)", len(objs), self.model.__name__, inserted, updated)
+        return inserted, updated
@@ -0,0 +1,116 @@
+import logging
+import threading
+import time
+
+from django.db import connection
+
+from backend.models import Location
+
+logger = logging.getLogger(__name__)
+
+# Seconds a process keeps the location dimension before reading it again
+LOCATION_CACHE_TTL = 300
+
+# Location value used when the dimension has no default row
+DEFAULT_LOCATION = "Dendermonde"
+
+_cache = {"locations": None, "expires_at": 0.0}
+_cache_lock = threading.Lock()
+
+
+def locations():
+    """
+    Rows of the location dimension (backend.models.Location), ordered by id.
+    Cached per process for LOCATION_CACHE_TTL seconds; writes through
+    add_locations() drop the cache at once.
+    """
+    with _cache_lock:
+        if _cache["locations"] is None or _cache["expires_at"] <= time.monotonic():
+            _cache["locations"] = list(Location.objects.order_by("id"))
+            _cache["expires_at"] = time.monotonic() + LOCATION_CACHE_TTL
+        return _cache["locations"]
+
+
+def clear_location_cache():
+    with _cache_lock:
+        _cache["locations"] = None
+
+
+def map_location_to_value(location):
+    """
+    Map an account name (the location request parameter) to the location
+    value stored on orders and products, e.g. Frietchalet → Dendermonde.
+    Unknown accounts map to the default location.
+
+    Args:
+        location: Location string from request
+
+    Returns:
+        str: Mapped location value
+    """
+    default = DEFAULT_LOCATION
+    for row in locations():
+        if row.account == location and row.name:
+            return row.name
+        if row.is_default and row.name:
+            default = row.name
+    return default
+
+
+def location_regions():
+    """
+    (region, lower-cased location value) of every location with a region, in
+    dimension order: the per-region detail of the sales location reports.
+    """
+    return [(row.region, row.name.lower()) for row in locations() if row.region and row.name]
+
+
+def account_regions():
+    """
+    (region, lower-cased account name) of every location with a region, in
+    dimension order: the per-region detail of the labour area reports, which
+    group Shyfter clockings by account.
+    """
+    return [(row.region, row.account.lower()) for row in locations() if row.region and row.account]
+
+
+def add_locations(names=(), accounts=()):
+    """
+    Add location values (from stored orders) and account names (from
+    Shyfter clockings) the location dimension doesn't have yet.
+
+    Args:
+        names: Location values stored on orders/products
+        accounts: Integration account names
+
+    Returns:
+        int: Number of locations added
+    """
+    # Known values (per the cached dimension) cost no query
+    known = locations()
+    names = sorted({name for name in names if name} - {row.name for row in known})
+    accounts = sorted({account for account in accounts if account} - {row.account for row in known})
+    if not names and not accounts:
+        return 0
+
+    added = 0
+    with connection.cursor() as cursor:
+        for column, values in (("name", names), ("account", accounts)):
+            if not values:
+                continue
+            cursor.execute(
+                f"""
+                INSERT INTO dim_location ({column}, is_default, created_at, updated_at)
+                SELECT value, FALSE, NOW(), NOW()
+                FROM unnest(%s::text[]) AS value
+                WHERE NOT EXISTS (SELECT 1 FROM dim_location l WHERE l.{column} = value)
+                ON CONFLICT DO NOTHING
+                """,
+                [values],
+            )
+            added += cursor.rowcount
+
+    if added:
+        clear_location_cache()
+        logger.info("Location dimension: %s new locations", added)
+    return added
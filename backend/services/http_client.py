@@ -0,0 +1,258 @@
+import logging
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from backend.services.rate_limiter import get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+
+# Per-API defaults; override any key through settings.HTTP_CLIENTS[<api>]
+_DEFAULTS = {
+    "RATE_LIMIT_PER_SECOND": 5,
+    "RATE_LIMIT_BURST": 5,
+    "MAX_RETRIES": 5,
+    "BACKOFF_FACTOR": 1.5,
+    # Never wait longer than this for a single retry, whatever Retry-After says
+    "MAX_BACKOFF": 60,
+    "TIMEOUT": 30,
+    "POOL_MAXSIZE": 10,
+}
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+# Path segments that are ids rather than endpoint names (numbers, uuids, hashes)
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-fA-F-]{16,})$")
+
+
+def _config(api, name):
+    return getattr(settings, "HTTP_CLIENTS", {}).get(api, {}).get(name, _DEFAULTS[name])
+
+
+def _endpoint_label(url):
+    """Collapse ids in the path so /employees/123/shifts and /employees/456/shifts share counters."""
+    path = urlsplit(url).path
+    return "/".join("{id}" if _ID_SEGMENT.match(part) else part for part in path.split("/")) or "/"
+
+
+def _retry_after_seconds(response):
+    """Seconds the server asked us to wait (Retry-After as seconds or HTTP date), else None."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _EndpointStats:
+    __slots__ = ("calls", "errors", "retries", "total_ms", "max_ms", "last_status")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_status = None
+
+    def as_dict(self):
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "avg_ms": round(self.total_ms / self.calls, 1) if self.calls else 0,
+            "max_ms": round(self.max_ms, 1),
+            "last_status": self.last_status,
+        }
+
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _record(api, endpoint, elapsed_ms, status_code=None, error=False, retried=False):
+    with _stats_lock:
+        stats = _stats.get((api, endpoint))
+        if stats is None:
+            stats = _stats[(api, endpoint)] = _EndpointStats()
+        stats.calls += 1
+        stats.total_ms += elapsed_ms
+        stats.max_ms = max(stats.max_ms, elapsed_ms)
+        stats.last_status = status_code
+        if error:
+            stats.errors += 1
+        if retried:
+            stats.retries += 1
+
+
+def http_stats(api=None):
+    """
+    Latency counters per upstream endpoint since process start.
+
+    Returns:
+        dict: {api: {endpoint: {calls, errors, retries, avg_ms, max_ms, last_status}}}
+    """
+    with _stats_lock:
+        items = [(key, stats.as_dict()) for key, stats in _stats.items()]
+
+    result = {}
+    for (stats_api, endpoint), stats in sorted(items):
+        if api and stats_api != api:
+            continue
+        result.setdefault(stats_api, {})[endpoint] = stats
+    return result
+
+
+def reset_http_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+class ApiClient:
+    """
+    HTTP client shared by every call to one upstream API (Lightspeed, Shopify,
+    Shyfter, Shipday).
+
+    - One pooled keep-alive requests.Session per host, reused across threads
+    - A token bucket per API (or per API + limiter_key, e.g. per Lightspeed
+      location token) taken before every attempt
+    - Retries on 429/5xx and connection errors with exponential backoff; a
+      Retry-After header wins over the backoff and, on 429, drains the bucket
+      so every thread sharing the quota pauses, not just the one that got it
+    - Latency, error and retry counters per endpoint (see http_stats())
+
+    Non-retryable responses (including 4xx) are returned as-is; callers keep
+    their own raise_for_status()/status handling.
+    """
+
+    def __init__(self, api):
+        self.api = api
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------------------- sessions
+
+    def session_for(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                pool_size = _config(self.api, "POOL_MAXSIZE")
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[host] = session
+        return session
+
+    def limiter(self, limiter_key=None):
+        name = f"{self.api}:{limiter_key}" if limiter_key else self.api
+        return get_rate_limiter(
+            name,
+            rate=_config(self.api, "RATE_LIMIT_PER_SECOND"),
+            capacity=_config(self.api, "RATE_LIMIT_BURST"),
+        )
+
+    # --------------------------------------------------------------- requests
+
+    def request(self, method, url, limiter_key=None, endpoint=None, **kwargs):
+        """
+        Rate-limited request with retry/backoff.
+
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            limiter_key: Narrows the token bucket (e.g. Lightspeed location);
+                         None shares one bucket for the whole API
+            endpoint: Counter label (default: URL path with ids collapsed)
+            **kwargs: Passed to requests (headers, params, data, json, timeout, ...)
+
+        Returns:
+            requests.Response: Final response
+
+        Raises:
+            requests.exceptions.RequestException: Connection error after the last retry
+        """
+        method = method.upper()
+        endpoint = endpoint or _endpoint_label(url)
+        kwargs.setdefault("timeout", _config(self.api, "TIMEOUT"))
+        max_retries = _config(self.api, "MAX_RETRIES")
+        backoff = _config(self.api, "BACKOFF_FACTOR")
+        max_backoff = _config(self.api, "MAX_BACKOFF")
+
+        session = self.session_for(url)
+        limiter = self.limiter(limiter_key)
+
+        for attempt in range(max_retries + 1):
+            limiter.acquire()
+            started = time.monotonic()
+            try:
+                response = session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as exc:
+                elapsed_ms = (time.monotonic() - started) * 1000
+                retry = attempt < max_retries and method in IDEMPOTENT_METHODS
+                _record(self.api, endpoint, elapsed_ms, error=True, retried=retry)
+                if not retry:
+                    raise
+                wait = min(max_backoff, backoff * 2 ** attempt)
+                logger.warning("%s %s %s failed (%s); retrying in %.1fs", self.api, method, endpoint, exc, wait)
+                time.sleep(wait)
+                continue
+
+            elapsed_ms = (time.monotonic() - started) * 1000
+            status_code = response.status_code
+            retry = (
+                status_code in RETRY_STATUSES
+                and attempt < max_retries
+                and (status_code == 429 or method in IDEMPOTENT_METHODS)
+            )
+            _record(self.api, endpoint, elapsed_ms, status_code, error=status_code >= 400, retried=retry)
+            if not retry:
+                return response
+
+            retry_after = _retry_after_seconds(response)
+            wait = min(max_backoff, retry_after if retry_after is not None else backoff * 2 ** attempt)
+            logger.warning(
+                "%s %s %s returned %s; retrying in %.1fs (attempt %s/%s)",
+                self.api, method, endpoint, status_code, wait, attempt + 1, max_retries,
+            )
+            if status_code == 429:
+                # The next acquire() blocks until the quota is back, here and in every other thread
+                limiter.drain(wait)
+            else:
+                time.sleep(wait)
+
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_http_client(api):
+    """Return the process-wide ApiClient for `api`, creating it on first use."""
+    with _clients_lock:
+        client = _clients.get(api)
+        if client is None:
+            client = _clients[api] = ApiClient(api)
+        return client
@@ -0,0 +1,111 @@
+import logging
+
+from django.db import connection, transaction
+
+from backend.services.yoy_sql import hour_slices
+
+logger = logging.getLogger(__name__)
+
+
+# Clocked cost; clockings without one get their share of the shift cost
+CLOCKING_COST = "CASE WHEN c.cost = 0 THEN (s.cost * c.duration_minutes) / NULLIF(s.duration_minutes, 0) ELSE c.cost END"
+
+# Hours of its work day a clocking overlaps, none while it has no end
+CLOCKING_HOURS = f"""ARRAY(
+            SELECT h.hour_of_day::smallint
+            FROM {hour_slices("c.start", 'c."end"', "c.work_date")}
+            ORDER BY h.hour_start
+        )"""
+
+# One row per clocking; the shift and its employee are resolved once here so
+# the labour reports read labour_fact alone. Only a shift of the clocking's own
+# employee counts: a clocking linked to another employee's shift gets no shift
+# (no prorated cost, no role).
+LABOUR_FACT_INSERT_SQL = f"""
+    INSERT INTO labour_fact (
+        clocking_id,
+        employee_id,
+        shift_id,
+        location,
+        role,
+        work_date,
+        work_minutes,
+        shift_minutes,
+        cost,
+        hours,
+        refreshed_at
+    )
+    SELECT
+        c.id,
+        c.employee_id,
+        s.id,
+        c.location,
+        e.type,
+        c.work_date,
+        c.duration_minutes,
+        s.duration_minutes,
+        {CLOCKING_COST},
+        {CLOCKING_HOURS},
+        NOW()
+    FROM shyfter_employee_clocking c
+    LEFT JOIN shyfter_employee_shift s
+      ON s.id = c.shift_id
+     AND s.employee_id = c.employee_id
+    LEFT JOIN shyfter_employee e
+      ON e.id = s.employee_id
+    WHERE TRUE
+      {{filters}}
+    ON CONFLICT (clocking_id) DO UPDATE SET
+        employee_id = EXCLUDED.employee_id,
+        shift_id = EXCLUDED.shift_id,
+        location = EXCLUDED.location,
+        role = EXCLUDED.role,
+        work_date = EXCLUDED.work_date,
+        work_minutes = EXCLUDED.work_minutes,
+        shift_minutes = EXCLUDED.shift_minutes,
+        cost = EXCLUDED.cost,
+        hours = EXCLUDED.hours,
+        refreshed_at = EXCLUDED.refreshed_at
+"""
+
+
+def refresh_labour_facts(clocking_ids=None, shift_ids=None, employee_ids=None):
+    """
+    Rebuild the labour_fact rows of the clockings an upsert touched.
+
+    A clocking is touched when it was upserted itself, when its shift was
+    (shift cost and minutes), or when the employee of its shift was (role).
+    Without any ids every clocking is rebuilt and facts of clockings that no
+    longer exist are dropped.
+
+    Args:
+        clocking_ids: Upserted Shyfter clocking IDs
+        shift_ids: Upserted Shyfter shift IDs
+        employee_ids: Upserted Shyfter employee IDs
+
+    Returns:
+        int: Number of fact rows written
+    """
+    filters, params = [], []
+    if clocking_ids is not None:
+        filters.append("c.id = ANY(%s)")
+        params.append(list(clocking_ids))
+    if shift_ids is not None:
+        filters.append("c.shift_id = ANY(%s)")
+        params.append(list(shift_ids))
+    if employee_ids is not None:
+        filters.append("s.employee_id = ANY(%s)")
+        params.append(list(employee_ids))
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            if not filters:
+                cursor.execute("DELETE FROM labour_fact")
+            cursor.execute(
+                LABOUR_FACT_INSERT_SQL.format(filters=f"AND ({' OR '.join(filters)})" if filters else ""),
+                params,
+            )
+            written = cursor.rowcount
+
+    logger.debug("Labour facts refreshed (%s rows)", written)
+    return written
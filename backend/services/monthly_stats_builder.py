@@ -1,5 +1,30 @@
 from collections import defaultdict
-from datetime import datetime,date,timedelta
+from datetime import datetime,date
+from functools import wraps
+
+from backend.services.dimensions import account_regions, location_regions
+from backend.services.service_times import SERVICE_PERCENTILE_FIELDS, ServiceHistograms, service_percentiles
+from backend.services.yoy_sql import DEFAULT_ALIGNMENT, DEFAULT_GRANULARITY, iter_buckets, previous_day, previous_period
+
+
+def columnar(builder):
+    """
+    Let a report builder hand over to its twin in monthly_stats_columnar
+    (same name, same response) when settings.REPORT_COLUMNAR_BUILDERS is on
+    and NumPy is installed. The row-by-row version stays available as
+    builder.rowwise.
+    """
+    @wraps(builder)
+    def build(*args, **kwargs):
+        from backend.services import monthly_stats_columnar
+
+        if monthly_stats_columnar.use_columnar_builders():
+            return getattr(monthly_stats_columnar, builder.__name__)(*args, **kwargs)
+        return builder(*args, **kwargs)
+
+    build.rowwise = builder
+    return build
+
 
 def normalize_row(row, group_by="location"):
     data = {
@@ -103,7 +128,7 @@ def normalized_labour_hourly_row(row, group_by="day_name"):
 
     return data
 
-def labour_area_build_overall(detail):
+def labour_area_build_overall(detail, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
     by_day = defaultdict(lambda: {
         "actual_base_cost": 0,
         "actual_base_cost_ly": 0,
@@ -158,9 +183,7 @@ def labour_area_build_overall(detail):
     for day, d in sorted(by_day.items()):
         output.append({
             "period": day,
-            "period_ly": datetime.fromisoformat(day)
-                .replace(year=datetime.fromisoformat(day).year - 1)
-                .date().isoformat(),
+            "period_ly": previous_day(date.fromisoformat(day), alignment, granularity).isoformat(),
 
             # 💰 Actual
             "actual_base_cost": round(d["actual_base_cost"], 2),
@@ -353,7 +376,7 @@ def labour_hourly_build_overall_by_day(detail):
 
     return output
 
-def build_overall(detail):
+def build_overall(detail, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
     by_day = defaultdict(lambda: {
         "total": 0,
         "total_ly": 0,
@@ -381,9 +404,7 @@ def build_overall(detail):
     for day, d in sorted(by_day.items()):
         output.append({
             "period": day,
-            "period_ly": datetime.fromisoformat(day)
-                .replace(year=datetime.fromisoformat(day).year - 1)
-                .date().isoformat(),
+            "period_ly": previous_day(date.fromisoformat(day), alignment, granularity).isoformat(),
 
             "total": round(d["total"], 3),
             "total_ly": round(d["total_ly"], 3),
@@ -447,59 +468,112 @@ def normalize_product_item_row(row):
     }
 
 
-def build_product_item_stats_response(raw_data, start_date, end_date):
-    """Build stats response for product items - similar to build_monthly_stats_response but grouped by product"""
+def compare_period(start_date, end_date, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
+    """compare_period of a response: the previous-year days start_date..end_date are compared with."""
+    first, last = previous_period(start_date, end_date, alignment, granularity)
+    return {"from": first.isoformat(), "to": last.isoformat()}
+
+
+def _empty_stats_row(day, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
+    """Zero-valued stats row for a day (or bucket) without any sales in either period."""
+    return {
+        "period": day.isoformat(),
+        "period_ly": previous_day(day, alignment, granularity).isoformat(),
+        "total": 0,
+        "total_ly": 0,
+        "count": 0,
+        "count_ly": 0,
+        "guest_count": 0,
+        "guest_count_ly": 0,
+        "time_to_serve": 0,
+        "time_to_serve_ly": 0,
+        "void_count": 0,
+        "void_count_ly": 0,
+        "void_total": 0,
+        "void_total_ly": 0,
+        "guest_total": 0,
+        "guest_total_ly": 0,
+        "budget": 0,
+        "budget_ly": 0,
+    }
+
+
+def iter_dense_product_item_rows(
+    product_name, rows, start_date, end_date, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY
+):
+    """
+    Yield one row per day (or bucket) of the period for a product, filling
+    the days the sparse SQL result did not return with zero rows.
+    """
+    by_period = {row["period"]: row for row in rows}
+    for day in iter_buckets(start_date, end_date, granularity):
+        row = by_period.get(day.isoformat())
+        if row is None:
+            row = {"product_name": product_name, "location": "", **_empty_stats_row(day, alignment, granularity)}
+        yield row
+
+
+@columnar
+def build_product_item_stats_response(raw_data, start_date, end_date, product_names=None, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
+    """
+    Build stats response for product items - similar to build_monthly_stats_response but grouped by product.
+
+    Args:
+        raw_data: Sparse rows from fetch_sales_productItem_raw (only non-zero product/day cells)
+        start_date: First day of the period
+        end_date: Last day of the period
+        product_names: Every product to report on; products without sales get zero rows.
+                       Defaults to the products present in raw_data.
+        alignment: YoY alignment the rows were fetched with (yoy_sql.ALIGNMENTS)
+        granularity: Granularity the rows were fetched at (yoy_sql.GRANULARITIES)
+
+    Returns:
+        dict: overall, detail per product name (one row per day or bucket), compare_period, this_period
+    """
     detail = defaultdict(list)
 
     for row in raw_data:
         normalized = normalize_product_item_row(row)
-        # Use product_id as the key for grouping
         detail[normalized["product_name"]].append(normalized)
 
-    overall = build_overall(detail)
+    # Zero rows add nothing to the totals, so the overall is built from the sparse rows
+    overall_by_period = {row["period"]: row for row in build_overall(detail, alignment, granularity)}
+    overall = [
+        overall_by_period.get(day.isoformat()) or _empty_stats_row(day, alignment, granularity)
+        for day in iter_buckets(start_date, end_date, granularity)
+    ]
 
-    # Build detail dictionary with product_id as keys
-    product_detail = {"all": overall}
-    # for product_id, rows in detail.items():
-    #     # Use product_name from first row (all rows for same product should have same name)
-    #     product_name = rows[0]["product_name"] if rows else "Unknown"
-    #     product_detail[product_id] = {
-    #         "product_id": product_id,
-    #         "product_name": product_name,
-    #         product_name: rows
-    #     }
-    for rows in detail.values():
-        if not rows:
-            continue
-
-        product_name = rows[0].get("product_name", "Unknown")
+    if product_names is None:
+        product_names = list(detail)
+    else:
+        product_names = list(dict.fromkeys([*product_names, *detail]))
 
-        # If same product_name appears multiple times, merge rows
-        if product_name in product_detail:
-            product_detail[product_name].extend(rows)
-        else:
-            product_detail[product_name] = rows
+    product_detail = {"all": overall}
+    for product_name in sorted(product_names, key=lambda name: (name is None, name or "")):
+        product_detail[product_name] = list(
+            iter_dense_product_item_rows(
+                product_name, detail.get(product_name, []), start_date, end_date, alignment, granularity
+            )
+        )
 
     return {
         "overall": overall,
         "detail": product_detail,
-        "compare_period": {
-            "from": start_date.replace(year=start_date.year - 1).isoformat(),
-            "to": end_date.replace(year=end_date.year - 1).isoformat(),
-        },
+        "compare_period": compare_period(start_date, end_date, alignment, granularity),
         "this_period": {
             "from": start_date.isoformat(),
             "to": end_date.isoformat(),
         },
     }
 
-def build_orderType_stats_response(raw_data,start_date,end_date):
+@columnar
+def build_orderType_stats_response(raw_data,start_date,end_date,alignment=DEFAULT_ALIGNMENT,granularity=DEFAULT_GRANULARITY):
     detail= defaultdict(list)
     for row in raw_data:
         normalized=normalize_row(row,"channel")
         detail[normalized["channel"]].append(normalized)
         
-    overall=build_overall(detail)
+    overall=build_overall(detail,alignment,granularity)
     
     return {
         "overall":overall,
@@ -510,37 +584,30 @@ def build_orderType_stats_response(raw_data,start_date,end_date):
             "deliverect":detail.get("deliverect",[]),
             "takeaway.com":detail.get("takeaway.com",[])
         },
-        "compare_period":{
-            "from":start_date.replace(year=start_date.year-1).isoformat(),
-            "to":end_date.replace(year=end_date.year-1).isoformat()
-        },
+        "compare_period":compare_period(start_date,end_date,alignment,granularity),
         "this_period":{
             "from":start_date.isoformat(),
             "to":end_date.isoformat(),
         }
     }
 
-def build_monthly_stats_response(raw_data, start_date, end_date):
+@columnar
+def build_monthly_stats_response(raw_data, start_date, end_date, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
     detail = defaultdict(list)
 
     for row in raw_data:
         normalized = normalize_row(row)
         detail[normalized["location"]].append(normalized)
 
-    overall = build_overall(detail)
+    overall = build_overall(detail, alignment, granularity)
 
     return {
         "overall": overall,
         "detail": {
             "all": overall,
-            "south": detail.get("aalst", []),
-            "east": detail.get("berlare", []),
-            "west": detail.get("dendermonde", []),
-        },
-        "compare_period": {
-            "from": start_date.replace(year=start_date.year - 1).isoformat(),
-            "to": end_date.replace(year=end_date.year - 1).isoformat(),
+            **{region: detail.get(location, []) for region, location in location_regions()},
         },
+        "compare_period": compare_period(start_date, end_date, alignment, granularity),
         "this_period": {
             "from": start_date.isoformat(),
             "to": end_date.isoformat(),
@@ -581,7 +648,8 @@ def normalized_product_category_row(row):
         "budget_ly": 0,
     }
 
-def build_product_category_stats_reponse(raw_data,start_date,end_date):
+@columnar
+def build_product_category_stats_reponse(raw_data,start_date,end_date,alignment=DEFAULT_ALIGNMENT,granularity=DEFAULT_GRANULARITY):
     """Build stats response for product category """
     
     details=defaultdict(list)
@@ -590,7 +658,7 @@ def build_product_category_stats_reponse(raw_data,start_date,end_date):
         normalized = normalized_product_category_row(row)
         details[normalized["product_category_name"]].append(normalized)
         
-    overall=build_overall(details)
+    overall=build_overall(details,alignment,granularity)
     # build details dictionary with product_category as key
     product_details = {"all":overall}
     
@@ -608,10 +676,7 @@ def build_product_category_stats_reponse(raw_data,start_date,end_date):
     return {
         "overall":overall,
         "detail":product_details,
-        "compare_period":{
-            "from":start_date.replace(year=start_date.year-1).isoformat(),
-            "to":end_date.replace(year=end_date.year-1).isoformat(),
-        },
+        "compare_period":compare_period(start_date,end_date,alignment,granularity),
         "this_period":{
             "from":start_date.isoformat(),
             "to":end_date.isoformat(),
@@ -620,41 +685,38 @@ def build_product_category_stats_reponse(raw_data,start_date,end_date):
     
     
 #===========================LAbour=======================
-def build_labourArea_stats(raw_data,start_date,end_date):
+@columnar
+def build_labourArea_stats(raw_data,start_date,end_date,alignment=DEFAULT_ALIGNMENT,granularity=DEFAULT_GRANULARITY):
     detail = defaultdict(list)
     
     for row in raw_data:
         normalized = normalized_labour_area_row(row)
         detail[normalized["location"]].append(normalized)
         
-    overall=labour_area_build_overall(detail)
+    overall=labour_area_build_overall(detail,alignment,granularity)
 
     return {
         "overall":overall,
         "detail": {
             "all": overall,
-            "south": detail.get("tipzakske", []),
-            "east": detail.get("frietbooster", []),
-            "west": detail.get("frietchalet", []),
-        },
-        "compare_period":{
-            "from":start_date.replace(year=start_date.year-1).isoformat(),
-            "to":end_date.replace(year=end_date.year-1).isoformat(),
+            **{region: detail.get(account, []) for region, account in account_regions()},
         },
+        "compare_period":compare_period(start_date,end_date,alignment,granularity),
         "this_period":{
             "from":start_date.isoformat(),
             "to":end_date.isoformat(),
         }
     }
     
-def build_labourRole_stats(raw_data,start_date,end_date):
+@columnar
+def build_labourRole_stats(raw_data,start_date,end_date,alignment=DEFAULT_ALIGNMENT,granularity=DEFAULT_GRANULARITY):
     detail=defaultdict(list)
     
     for row in raw_data:
         normalized=normalized_labour_area_row(row,"role")
         detail[normalized["role"]].append(normalized)
         
-    overall=labour_area_build_overall(detail)
+    overall=labour_area_build_overall(detail,alignment,granularity)
     
     return {
         "overall":overall,
@@ -664,17 +726,15 @@ def build_labourRole_stats(raw_data,start_date,end_date):
             "admin":detail.get("admin",[]),
             "employee":detail.get("employee",[])
         },
-        "compare_period":{
-            "from":start_date.replace(year=start_date.year-1).isoformat(),
-            "to":end_date.replace(year=end_date.year-1).isoformat(),
-        },
+        "compare_period":compare_period(start_date,end_date,alignment,granularity),
         "this_period":{
             "from":start_date.isoformat(),
             "to":end_date.isoformat(),
         }
     }
     
-def build_labourHour_stats(raw_data,start_date,end_date):
+@columnar
+def build_labourHour_stats(raw_data,start_date,end_date,alignment=DEFAULT_ALIGNMENT,granularity=DEFAULT_GRANULARITY):
     detail=defaultdict(list)
     
     for row in raw_data:
@@ -694,10 +754,7 @@ def build_labourHour_stats(raw_data,start_date,end_date):
             "saturday":detail.get("saturday",[]),
             "sunday":detail.get("sunday",[])
         },
-        "compare_period":{
-            "from":start_date.replace(year=start_date.year-1).isoformat(),
-            "to":end_date.replace(year=end_date.year-1).isoformat(),
-        },
+        "compare_period":compare_period(start_date,end_date,alignment,granularity),
         "this_period":{
             "from":start_date.isoformat(),
             "to":end_date.isoformat(),
@@ -742,6 +799,7 @@ def normalize_dayOfWeek_stats_row(row, group_by="location"):
         # 🚚 Delivery
         "time_to_serve": row.get("avgdelivery_minutes_current", 0) or 0,
         "time_to_serve_ly": row.get("avgdelivery_minutes_previous", 0) or 0,
+        **service_percentiles(row.get("delivery_histogram_current"), row.get("delivery_histogram_previous")),
 
         # 🚫 Voids (future-ready)
         "void_count": 0,
@@ -763,7 +821,7 @@ def normalize_dayOfWeek_stats_row(row, group_by="location"):
 
     return data
 
-def build_operation_dayOfWeek_overall(detail):
+def build_operation_dayOfWeek_overall(detail, alignment=DEFAULT_ALIGNMENT, service=None):
     """
     detail: dict[str, list[normalized_row]]
     example:
@@ -771,7 +829,10 @@ def build_operation_dayOfWeek_overall(detail):
         "aalst": [ {...}, {...} ],
         "brussels": [ {...} ]
     }
+    service: ServiceHistograms of the detail rows per period (the
+             time-to-serve percentiles)
     """
+    service = service or ServiceHistograms()
 
     by_day = defaultdict(lambda: {
         "total": 0,
@@ -815,7 +876,7 @@ def build_operation_dayOfWeek_overall(detail):
 
         output.append({
             "period": day,
-            "period_ly": day_dt.replace(year=day_dt.year - 1).date().isoformat(),
+            "period_ly": previous_day(day_dt.date(), alignment).isoformat(),
 
             "total": round(d["total"], 3),
             "total_ly": round(d["total_ly"], 3),
@@ -832,6 +893,7 @@ def build_operation_dayOfWeek_overall(detail):
             "time_to_serve_ly": (
                 round(d["ts_ly_sum"] / d["count_ly"], 2) if d["count_ly"] else 0
             ),
+            **service.percentiles(day),
 
             "void_count": 0,
             "void_count_ly": 0,
@@ -847,15 +909,18 @@ def build_operation_dayOfWeek_overall(detail):
 
     return output
 
-def build_operation_dayOfWeek_stats(raw_data,start_date,end_date):
+@columnar
+def build_operation_dayOfWeek_stats(raw_data,start_date,end_date,alignment=DEFAULT_ALIGNMENT,granularity=DEFAULT_GRANULARITY):
     
     detail=defaultdict(list)
+    service=ServiceHistograms()
     
     for row in raw_data:
         normalized=normalize_dayOfWeek_stats_row(row,"day_name")
         detail[normalized["day_name"]].append(normalized)
+        service.add(normalized["period"],row.get("delivery_histogram_current"),row.get("delivery_histogram_previous"))
         
-    overall=build_operation_dayOfWeek_overall(detail)
+    overall=build_operation_dayOfWeek_overall(detail,alignment,service)
     
     return {
         "overall":overall,
@@ -869,10 +934,7 @@ def build_operation_dayOfWeek_stats(raw_data,start_date,end_date):
             "saturday":detail.get("saturday",[]),
             "sunday":detail.get("sunday",[])
         },
-        "compare_period":{
-            "from":start_date.replace(year=start_date.year-1).isoformat(),
-            "to":end_date.replace(year=end_date.year-1).isoformat(),
-        },
+        "compare_period":compare_period(start_date,end_date,alignment,granularity),
         "this_period":{
             "from":start_date.isoformat(),
             "to":end_date.isoformat(),
@@ -900,6 +962,7 @@ def normalized_operation_hourly_row(row, group_by="day_name",period=""):
         # ⏱️ Delivery time
         "time_to_serve": row.get("avgdelivery_minutes_current", 0),
         "time_to_serve_ly": row.get("avgdelivery_minutes_previous", 0),
+        **service_percentiles(row.get("delivery_histogram_current"), row.get("delivery_histogram_previous")),
 
         # ❌ Voids (not available at hourly level)
         "void_count": 0,
@@ -935,12 +998,15 @@ def normalized_operation_hourly_row(row, group_by="day_name",period=""):
 
     return data
   
-def operations_hourly_build_overall_by_day(detail):
+def operations_hourly_build_overall_by_day(detail, service=None):
     """
     Aggregates hourly rows into ONE object per hour_of_day (0–23),
     summing the same hour across all days.
     Output shape matches sales-style normalize_row.
+    service: ServiceHistograms of the rows per hour_of_day (the
+             time-to-serve percentiles)
     """
+    service = service or ServiceHistograms()
 
     by_hour = defaultdict(lambda: {
         "total": 0,
@@ -1030,6 +1096,7 @@ def operations_hourly_build_overall_by_day(detail):
             "time_to_serve_ly": round(
                 d["time_to_serve_ly"] / d["_rows_ly"], 2
             ) if d["_rows_ly"] else 0,
+            **service.percentiles(hour),
 
             "void_count": 0,
             "void_count_ly": 0,
@@ -1050,14 +1117,17 @@ def operations_hourly_build_overall_by_day(detail):
 
     return output
 
-def build_operation_hour_stats(raw_data,start_date,end_date):
+@columnar
+def build_operation_hour_stats(raw_data,start_date,end_date,alignment=DEFAULT_ALIGNMENT,granularity=DEFAULT_GRANULARITY):
     detail=defaultdict(list)
+    service=ServiceHistograms()
     
     for row in raw_data:
         normalized=normalized_operation_hourly_row(row,"day_name")
         detail[normalized["day_name"]].append(normalized)
+        service.add(normalized["hour_of_day"],row.get("delivery_histogram_current"),row.get("delivery_histogram_previous"))
         
-    overall=operations_hourly_build_overall_by_day(detail)
+    overall=operations_hourly_build_overall_by_day(detail,service)
     
     return {
         "overall":overall,
@@ -1071,21 +1141,21 @@ def build_operation_hour_stats(raw_data,start_date,end_date):
             "saturday":detail.get("saturday",[]),
             "sunday":detail.get("sunday",[])
         },
-        "compare_period":{
-            "from":start_date.replace(year=start_date.year-1).isoformat(),
-            "to":end_date.replace(year=end_date.year-1).isoformat(),
-        },
+        "compare_period":compare_period(start_date,end_date,alignment,granularity),
         "this_period":{
             "from":start_date.isoformat(),
             "to":end_date.isoformat(),
         }
     }
 
-def operations_partOfDay_build_overall_by_day(detail):
+def operations_partOfDay_build_overall_by_day(detail, service=None):
     """
     Aggregates data by date only.
     Output = ONE row per date (all part_of_day combined).
+    service: ServiceHistograms of the rows per period (the time-to-serve
+             percentiles)
     """
+    service = service or ServiceHistograms()
 
     agg = defaultdict(lambda: {
         "total": 0,
@@ -1152,6 +1222,7 @@ def operations_partOfDay_build_overall_by_day(detail):
             "time_to_serve_ly": round(
                 d["time_to_serve_ly"] / d["_rows_ly"], 2
             ) if d["_rows_ly"] else 0.0,
+            **service.percentiles(period),
 
             "void_count": 0,
             "void_count_ly": 0,
@@ -1180,6 +1251,7 @@ ZERO_ROW_TEMPLATE = {
     "guest_count_ly": 0,
     "time_to_serve": 0,
     "time_to_serve_ly": 0,
+    **dict.fromkeys(SERVICE_PERCENTILE_FIELDS, 0),
     "void_count": 0,
     "void_count_ly": 0,
     "void_total": 0,
@@ -1190,9 +1262,9 @@ ZERO_ROW_TEMPLATE = {
     "budget_ly": 0,
 }
 
-def normalize_detail_part_of_day(detail, start_date, end_date):
+def normalize_detail_part_of_day(detail, start_date, end_date, granularity=DEFAULT_GRANULARITY):
     """
-    Ensures each part_of_day has rows for ALL dates.
+    Ensures each part_of_day has rows for ALL dates (or buckets).
     Missing dates are filled with zero rows.
     """
     if isinstance(start_date, datetime):
@@ -1209,8 +1281,7 @@ def normalize_detail_part_of_day(detail, start_date, end_date):
         for part in PARTS_OF_DAY
     }
 
-    current = start_date
-    while current <= end_date:
+    for current in iter_buckets(start_date, end_date, granularity):
         period = current.isoformat()
 
         for part in PARTS_OF_DAY:
@@ -1226,22 +1297,24 @@ def normalize_detail_part_of_day(detail, start_date, end_date):
                 })
                 result[part].append(zero_row)
 
-        current += timedelta(days=1)
-
     return result
 
-def build_operations_partOfDay_stats(raw_data,start_date,end_date):
+@columnar
+def build_operations_partOfDay_stats(raw_data,start_date,end_date,alignment=DEFAULT_ALIGNMENT,granularity=DEFAULT_GRANULARITY):
     detail=defaultdict(list)
+    service=ServiceHistograms()
     
     for row in raw_data:
         normalized=normalized_operation_hourly_row(row,"part_of_day","period")
         detail[normalized["part_of_day"]].append(normalized)
+        service.add(normalized["period"],row.get("delivery_histogram_current"),row.get("delivery_histogram_previous"))
         
-    overall=operations_partOfDay_build_overall_by_day(detail)
+    overall=operations_partOfDay_build_overall_by_day(detail,service)
     normalized_detail = normalize_detail_part_of_day(
         detail,
         start_date=start_date,
         end_date=end_date,
+        granularity=granularity,
     )
     return {
         "overall":overall,
@@ -1252,10 +1325,7 @@ def build_operations_partOfDay_stats(raw_data,start_date,end_date):
             "dinner":normalized_detail.get("dinner",[]),
             "late_night":normalized_detail.get("late_night",[])
         },
-        "compare_period":{
-            "from":start_date.replace(year=start_date.year-1).isoformat(),
-            "to":end_date.replace(year=end_date.year-1).isoformat(),
-        },
+        "compare_period":compare_period(start_date,end_date,alignment,granularity),
         "this_period":{
             "from":start_date.isoformat(),
             "to":end_date.isoformat(),
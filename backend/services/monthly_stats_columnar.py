@@ -0,0 +1,900 @@
+"""
+Columnar versions of the report builders in monthly_stats_builder.
+
+The row-by-row builders normalize every raw row into a dict (parsing both of
+its dates with strptime) and then aggregate those dicts with per-key lookups.
+Here the raw rows are transposed into columns once, every distinct date or
+group value is converted a single time, and the per-day / per-hour totals and
+weighted averages are computed with NumPy group sums (np.bincount).
+
+The detail rows carry the raw values untouched, so they are identical to the
+row-by-row ones. The overall rows are summed in float64 instead of Decimal and
+rounded the way Decimals round, so they match up to float error far below the
+rounding.
+
+NumPy is optional: without it, or with settings.REPORT_COLUMNAR_BUILDERS off,
+the report views use the row-by-row builders. The `benchmark_report_builders`
+command checks both paths build the same response and times them.
+"""
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+from itertools import repeat
+from operator import is_not
+
+from django.conf import settings
+
+from backend.services.dimensions import account_regions, location_regions
+from backend.services.monthly_stats_builder import (
+    _empty_stats_row,
+    compare_period,
+    iter_dense_product_item_rows,
+    normalize_detail_part_of_day,
+    to_iso_date,
+)
+from backend.services.service_times import SERVICE_PERCENTILE_FIELDS, ServiceHistograms, service_percentiles
+from backend.services.yoy_sql import DEFAULT_ALIGNMENT, DEFAULT_GRANULARITY, iter_buckets, previous_day
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency, see the module docstring
+    np = None
+
+
+def columnar_available():
+    return np is not None
+
+
+def use_columnar_builders():
+    """True when the reports should be built column-wise."""
+    return columnar_available() and getattr(settings, "REPORT_COLUMNAR_BUILDERS", False)
+
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+
+# ============================== Columns ==============================
+
+def factorize(values):
+    """
+    Number the distinct values of a sequence in first-seen order.
+
+    Returns:
+        tuple: (code of every value as an intp array, list of the distinct values)
+    """
+    distinct = list(dict.fromkeys(values))
+    index = {value: code for code, value in enumerate(distinct)}
+    return np.fromiter(map(index.__getitem__, values), dtype=np.intp, count=len(values)), distinct
+
+
+def _non_integer(value):
+    return bool(value) and not isinstance(value, int)
+
+
+class ReportColumns:
+    """
+    Report rows (ReportRow namedtuples or dicts) transposed into one tuple per
+    column. Raw values keep the type the query returned (Decimal, int, date, ...).
+    """
+
+    def __init__(self, raw_data):
+        rows = raw_data if isinstance(raw_data, list) else list(raw_data)
+        self.length = len(rows)
+        self._numbers = {}
+        if not rows:
+            self._data = {}
+        elif hasattr(rows[0], "_fields"):
+            self._data = dict(zip(rows[0]._fields, zip(*rows)))
+        else:
+            names = dict.fromkeys(name for row in rows for name in row)
+            self._data = {name: tuple(row.get(name) for row in rows) for name in names}
+
+    def __len__(self):
+        return self.length
+
+    def raw(self, name, default=None):
+        """Values of a column as returned by the query; `default` for every row when it is missing."""
+        values = self._data.get(name)
+        return values if values is not None else (default,) * self.length
+
+    def raw_or_zero(self, name):
+        """Like row.get(name, 0) or 0."""
+        return [value or 0 for value in self.raw(name, 0)]
+
+    def numbers(self, name):
+        """
+        A column as an array to aggregate. Integer columns stay integer,
+        anything else (Decimal, NULL) becomes float64 with NULL as 0. A missing
+        column is all zeros, like row.get(name, 0).
+        """
+        if name not in self._numbers:
+            self._numbers[name] = self._to_array(self._data.get(name))
+        return self._numbers[name]
+
+    def _to_array(self, values):
+        if values is None:
+            return np.zeros(self.length, dtype=np.int64)
+        # Postgres returns one type per column: int, Decimal or NULL
+        if isinstance(next((value for value in values if value is not None), None), int):
+            try:
+                return np.fromiter(values, dtype=np.int64, count=self.length)
+            except TypeError:
+                pass
+        try:
+            return np.fromiter(values, dtype=np.float64, count=self.length)
+        except TypeError:
+            array = np.array(values, dtype=np.float64)
+            array[np.isnan(array)] = 0
+            return array
+
+    def non_integers(self, name):
+        """Rows where a column holds a non-zero number that isn't an int."""
+        return np.fromiter(map(_non_integer, self.raw(name, 0)), dtype=bool, count=self.length)
+
+    def present(self, name):
+        """Rows where a column is not NULL (every row when it is missing, like row.get(name, 0))."""
+        values = self._data.get(name)
+        if values is None:
+            return np.ones(self.length, dtype=bool)
+        return np.fromiter(map(is_not, values, repeat(None)), dtype=bool, count=self.length)
+
+    def mapped(self, name, convert, default=None):
+        """
+        A column with `convert` applied, calling it once per distinct value
+        rather than once per row (dates, lower-cased names, ...).
+
+        Returns:
+            list: Converted value of every row
+        """
+        values = self.raw(name, default)
+        converted = {value: convert(value) for value in dict.fromkeys(values)}
+        return list(map(converted.__getitem__, values))
+
+
+class GroupSums:
+    """Per-group aggregates of report columns, grouped by a key per row."""
+
+    def __init__(self, keys, mask=None):
+        """
+        Args:
+            keys: Group key of every row
+            mask: Boolean array of the rows to aggregate (default: all)
+        """
+        codes, self.keys = factorize(keys)
+        self.mask = mask
+        self.codes = codes if mask is None else codes[mask]
+        self.size = len(self.keys)
+
+    def _masked(self, values):
+        return values if self.mask is None else values[self.mask]
+
+    def sum(self, values):
+        """Sum of an array per group (a list, in group order)."""
+        values = self._masked(values)
+        totals = np.bincount(self.codes, weights=values, minlength=self.size)
+        # bincount sums in float64; integer columns are exact below 2**53
+        if values.dtype.kind in "iu":
+            return totals.round().astype(np.int64).tolist()
+        return totals.tolist()
+
+    def count(self, where):
+        """Number of rows per group where a boolean array is set."""
+        return np.bincount(self.codes[self._masked(where)], minlength=self.size).tolist()
+
+    def distinct(self, values):
+        """Set of the distinct truthy values of each group (like adding them to a set per group)."""
+        codes, distinct = factorize(values)
+        if not distinct:
+            return [set() for _ in range(self.size)]
+        truthy = np.array([bool(value) for value in distinct], dtype=bool)[codes]
+        codes, truthy = self._masked(codes), self._masked(truthy)
+        width = len(distinct)
+        sets = [set() for _ in range(self.size)]
+        for pair in np.unique(self.codes[truthy] * width + codes[truthy]).tolist():
+            sets[pair // width].add(distinct[pair % width])
+        return sets
+
+    def last(self, values, order):
+        """
+        Last truthy value of each group when the rows are visited in `order`
+        (an array of row indexes), None for groups without one.
+        """
+        codes, distinct = factorize(values)
+        if not distinct:
+            return [None] * self.size
+        truthy = np.array([bool(value) for value in distinct], dtype=bool)[codes]
+        position = np.empty(len(order), dtype=np.intp)
+        position[order] = np.arange(len(order))
+        truthy, position = self._masked(truthy), self._masked(position)
+        best = np.full(self.size, -1, dtype=np.intp)
+        np.maximum.at(best, self.codes[truthy], position[truthy])
+        return [values[order[i]] if i >= 0 else None for i in best.tolist()]
+
+    def sorted_keys(self):
+        """(group index, key) pairs in key order."""
+        return sorted(enumerate(self.keys), key=lambda item: item[1])
+
+
+def _records(length, fields):
+    """
+    Row dicts built column by column. `fields` are (key, column) pairs in
+    output key order; a column that is not a list or tuple is a constant.
+    """
+    keys = [key for key, _ in fields]
+    columns = [
+        column if isinstance(column, (list, tuple)) else repeat(column, length)
+        for _, column in fields
+    ]
+    return [dict(zip(keys, values)) for values in zip(*columns)]
+
+
+def _group_detail(keys, rows):
+    detail = defaultdict(list)
+    for key, row in zip(keys, rows):
+        detail[key].append(row)
+    return detail
+
+
+def _lower(value):
+    return value.lower() if isinstance(value, str) else value
+
+
+def _lower_or_empty(value):
+    return value.lower() if value else ""
+
+
+def _report_day(value):
+    return datetime.strptime(value, "%d/%m/%Y").date().isoformat()
+
+
+def _hour(value):
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _period_ly(day, alignment, granularity):
+    return previous_day(date.fromisoformat(day), alignment, granularity).isoformat()
+
+
+def _round(value, digits):
+    """
+    round() as the row-by-row builders do it on Decimal sums: ties go to the
+    even digit of the decimal value rather than of its nearest binary float.
+    """
+    if isinstance(value, int):
+        return round(value, digits)
+    return float(round(Decimal(f"{value:.9f}"), digits))
+
+
+def _add(left, right):
+    return [a + b for a, b in zip(left, right)]
+
+
+def _compared_periods(start_date, end_date, alignment, granularity):
+    return {
+        "compare_period": compare_period(start_date, end_date, alignment, granularity),
+        "this_period": {
+            "from": start_date.isoformat(),
+            "to": end_date.isoformat(),
+        },
+    }
+
+
+# ============================== Sales ==============================
+
+def _sales_fields(columns, guest_total, guest_total_ly, raw=None):
+    """(key, column) pairs of the sales metrics shared by the sales-style normalizers."""
+    raw = raw or columns.raw
+    return [
+        ("total", raw("totalpayment_current")),
+        ("total_ly", raw("totalpayment_previous")),
+        ("count", raw("totalorder_current")),
+        ("count_ly", raw("totalorder_previous")),
+        ("guest_count", raw("totalcustomer_current")),
+        ("guest_count_ly", raw("totalcustomer_previous")),
+        ("time_to_serve", raw("avgdelivery_minutes_current")),
+        ("time_to_serve_ly", raw("avgdelivery_minutes_previous")),
+        ("void_count", 0),
+        ("void_count_ly", 0),
+        ("void_total", 0),
+        ("void_total_ly", 0),
+        ("guest_total", guest_total),
+        ("guest_total_ly", guest_total_ly),
+        ("budget", 0),
+        ("budget_ly", 0),
+    ]
+
+
+def _service_fields(columns):
+    """(key, column) pairs of the time-to-serve percentiles of every row."""
+    percentiles = list(map(
+        service_percentiles,
+        columns.raw("delivery_histogram_current"),
+        columns.raw("delivery_histogram_previous"),
+    ))
+    return [(field, [row[field] for row in percentiles]) for field in SERVICE_PERCENTILE_FIELDS]
+
+
+def _service_histograms(columns, keys):
+    """ServiceHistograms of the rows merged per key."""
+    service = ServiceHistograms()
+    for key, histogram, histogram_ly in zip(
+        keys, columns.raw("delivery_histogram_current"), columns.raw("delivery_histogram_previous")
+    ):
+        service.add(key, histogram, histogram_ly)
+    return service
+
+
+# Overall sums → the columns they add up (for or_zero in sales_overall)
+SALES_SUM_SOURCES = {
+    "total": ["totalpayment_current"],
+    "total_ly": ["totalpayment_previous"],
+    "count": ["totalorder_current"],
+    "count_ly": ["totalorder_previous"],
+    "guest_count": ["totalcustomer_current"],
+    "guest_count_ly": ["totalcustomer_previous"],
+    "guest_total": ["totalcustomer_current", "total_guest_count_current"],
+    "guest_total_ly": ["totalcustomer_previous", "total_guest_count_previous"],
+}
+
+
+def sales_overall(
+    columns,
+    periods,
+    guest_totals=False,
+    or_zero=False,
+    alignment=DEFAULT_ALIGNMENT,
+    granularity=DEFAULT_GRANULARITY,
+    service=None,
+):
+    """
+    One row per day with the sales summed over every group and the time to
+    serve weighted by the order count, like build_overall.
+
+    build_operation_dayOfWeek_overall is the same with guest_totals (the
+    guest total is customers plus guests instead of the payment total) and
+    or_zero: its rows replace zero Decimals by the int 0, so a day of zeros
+    sums to an int there, and service (ServiceHistograms per period) for its
+    time-to-serve percentiles.
+    """
+    if not len(columns):
+        return []
+    groups = GroupSums(periods)
+    count = columns.numbers("totalorder_current")
+    count_ly = columns.numbers("totalorder_previous")
+    sums = {
+        "total": groups.sum(columns.numbers("totalpayment_current")),
+        "total_ly": groups.sum(columns.numbers("totalpayment_previous")),
+        "count": groups.sum(count),
+        "count_ly": groups.sum(count_ly),
+        "guest_count": groups.sum(columns.numbers("totalcustomer_current")),
+        "guest_count_ly": groups.sum(columns.numbers("totalcustomer_previous")),
+        "ts_sum": groups.sum(columns.numbers("avgdelivery_minutes_current") * count),
+        "ts_ly_sum": groups.sum(columns.numbers("avgdelivery_minutes_previous") * count_ly),
+    }
+    if guest_totals:
+        sums["guest_total"] = groups.sum(
+            columns.numbers("totalcustomer_current") + columns.numbers("total_guest_count_current")
+        )
+        sums["guest_total_ly"] = groups.sum(
+            columns.numbers("totalcustomer_previous") + columns.numbers("total_guest_count_previous")
+        )
+    else:
+        sums["guest_total"] = sums["total"]
+        sums["guest_total_ly"] = sums["total_ly"]
+    if or_zero:
+        for name, sources in SALES_SUM_SOURCES.items():
+            decimal_rows = groups.count(np.logical_or.reduce([columns.non_integers(source) for source in sources]))
+            sums[name] = [value if decimals else int(value) for value, decimals in zip(sums[name], decimal_rows)]
+
+    output = []
+    for i, day in groups.sorted_keys():
+        d = {name: values[i] for name, values in sums.items()}
+        output.append({
+            "period": day,
+            "period_ly": _period_ly(day, alignment, granularity),
+            "total": _round(d["total"], 3),
+            "total_ly": _round(d["total_ly"], 3),
+            "count": d["count"],
+            "count_ly": d["count_ly"],
+            "guest_count": d["guest_count"],
+            "guest_count_ly": d["guest_count_ly"],
+            "time_to_serve": _round(d["ts_sum"] / d["count"], 2) if d["count"] else 0,
+            "time_to_serve_ly": _round(d["ts_ly_sum"] / d["count_ly"], 2) if d["count_ly"] else 0,
+            **(service.percentiles(day) if service else {}),
+            "void_count": 0,
+            "void_count_ly": 0,
+            "void_total": 0,
+            "void_total_ly": 0,
+            "guest_total": _round(d["guest_total"], 3),
+            "guest_total_ly": _round(d["guest_total_ly"], 3),
+            "budget": 0,
+            "budget_ly": 0,
+        })
+    return output
+
+
+def _grouped_sales(raw_data, group_by):
+    """Columns, ISO periods and normalize_row detail rows grouped by `group_by`."""
+    columns = ReportColumns(raw_data)
+    periods = columns.mapped("current_day", _report_day)
+    keys = columns.mapped(group_by, _lower_or_empty, default="")
+    rows = _records(len(columns), [
+        ("period", periods),
+        ("period_ly", columns.mapped("previous_day", _report_day)),
+        *_sales_fields(
+            columns,
+            _add(columns.raw("totalcustomer_current"), columns.raw("total_guest_count_current")),
+            _add(columns.raw("totalcustomer_previous"), columns.raw("total_guest_count_previous")),
+        ),
+        (group_by, keys),
+    ])
+    return columns, periods, _group_detail(keys, rows)
+
+
+def build_monthly_stats_response(raw_data, start_date, end_date, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
+    columns, periods, detail = _grouped_sales(raw_data, "location")
+    overall = sales_overall(columns, periods, alignment=alignment, granularity=granularity)
+    return {
+        "overall": overall,
+        "detail": {
+            "all": overall,
+            **{region: detail.get(location, []) for region, location in location_regions()},
+        },
+        **_compared_periods(start_date, end_date, alignment, granularity),
+    }
+
+
+def build_orderType_stats_response(raw_data, start_date, end_date, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
+    columns, periods, detail = _grouped_sales(raw_data, "channel")
+    overall = sales_overall(columns, periods, alignment=alignment, granularity=granularity)
+    return {
+        "overall": overall,
+        "detail": {
+            "all": overall,
+            "takeaway": detail.get("takeaway", []),
+            "shopify": detail.get("shopify", []),
+            "deliverect": detail.get("deliverect", []),
+            "takeaway.com": detail.get("takeaway.com", []),
+        },
+        **_compared_periods(start_date, end_date, alignment, granularity),
+    }
+
+
+def _product_rows(columns, periods, leading):
+    """normalize_product_item_row / normalized_product_category_row detail rows."""
+    return _records(len(columns), [
+        *leading,
+        ("location", columns.mapped("location", _lower_or_empty, default="")),
+        ("period", periods),
+        ("period_ly", columns.mapped("previous_day", _report_day)),
+        *_sales_fields(columns, columns.raw("totalpayment_current"), columns.raw("totalpayment_previous")),
+    ])
+
+
+def build_product_item_stats_response(raw_data, start_date, end_date, product_names=None, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
+    columns = ReportColumns(raw_data)
+    periods = columns.mapped("current_day", _report_day)
+    names = columns.raw("product_name", "Unknown Product")
+    detail = _group_detail(names, _product_rows(columns, periods, [("product_name", names)]))
+
+    # Zero rows add nothing to the totals, so the overall is built from the sparse rows
+    overall_by_period = {row["period"]: row for row in sales_overall(columns, periods, alignment=alignment, granularity=granularity)}
+    overall = [
+        overall_by_period.get(day.isoformat()) or _empty_stats_row(day, alignment, granularity)
+        for day in iter_buckets(start_date, end_date, granularity)
+    ]
+
+    if product_names is None:
+        product_names = list(detail)
+    else:
+        product_names = list(dict.fromkeys([*product_names, *detail]))
+
+    product_detail = {"all": overall}
+    for product_name in sorted(product_names, key=lambda name: (name is None, name or "")):
+        product_detail[product_name] = list(
+            iter_dense_product_item_rows(
+                product_name, detail.get(product_name, []), start_date, end_date, alignment, granularity
+            )
+        )
+
+    return {
+        "overall": overall,
+        "detail": product_detail,
+        **_compared_periods(start_date, end_date, alignment, granularity),
+    }
+
+
+def build_product_category_stats_reponse(raw_data, start_date, end_date, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
+    columns = ReportColumns(raw_data)
+    periods = columns.mapped("current_day", _report_day)
+    names = columns.raw("product_category_name", "Unknown Product")
+    details = _group_detail(names, _product_rows(columns, periods, [
+        ("product_category_id", columns.mapped("product_category_id", str, default="unknown")),
+        ("product_category_name", names),
+    ]))
+    overall = sales_overall(columns, periods, alignment=alignment, granularity=granularity)
+
+    product_details = {"all": overall}
+    for name, rows in details.items():
+        if name in product_details:
+            product_details[name].extend(rows)
+        else:
+            product_details[name] = rows
+
+    return {
+        "overall": overall,
+        "detail": product_details,
+        **_compared_periods(start_date, end_date, alignment, granularity),
+    }
+
+
+# ============================== Labour ==============================
+
+def labour_area_overall(columns, periods, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
+    """One row per day with the labour area/role rows summed, like labour_area_build_overall."""
+    if not len(columns):
+        return []
+    groups = GroupSums(periods)
+    sums = {
+        "actual_base_cost": groups.sum(columns.numbers("total_current_duration_costing")),
+        "actual_base_cost_ly": groups.sum(columns.numbers("total_previous_duration_costing")),
+        "actual_shift_num_mins": groups.sum(columns.numbers("total_current_work_duration")),
+        "actual_shift_num_mins_ly": groups.sum(columns.numbers("total_previous_work_duration")),
+        "total_employee": groups.sum(columns.numbers("total_current_employee")),
+        "total_employee_ly": groups.sum(columns.numbers("total_previous_employee")),
+    }
+
+    output = []
+    for i, day in groups.sorted_keys():
+        d = {name: values[i] for name, values in sums.items()}
+        output.append({
+            "period": day,
+            "period_ly": _period_ly(day, alignment, granularity),
+            "actual_base_cost": _round(d["actual_base_cost"], 2),
+            "actual_base_cost_ly": _round(d["actual_base_cost_ly"], 2),
+            "actual_fully_loaded_cost": 0,
+            "actual_fully_loaded_cost_ly": 0,
+            "actual_shift_num_mins": _round(d["actual_shift_num_mins"], 2),
+            "actual_shift_num_mins_ly": _round(d["actual_shift_num_mins_ly"], 2),
+            "forecast_base_cost": 0,
+            "forecast_base_cost_ly": 0,
+            "forecast_fully_loaded_cost": 0,
+            "forecast_fully_loaded_cost_ly": 0,
+            "forecast_shift_num_mins": 0,
+            "forecast_shift_num_mins_ly": 0,
+            "total_employee": d["total_employee"],
+            "total_employee_ly": d["total_employee_ly"],
+        })
+    return output
+
+
+def _labour_area(raw_data, group_by, alignment, granularity):
+    """Overall rows and normalized_labour_area_row detail rows grouped by `group_by`."""
+    columns = ReportColumns(raw_data)
+    periods = columns.mapped("current_day", _report_day)
+    keys = columns.mapped(group_by, _lower_or_empty, default="")
+    rows = _records(len(columns), [
+        ("period", periods),
+        ("period_ly", columns.mapped("previous_day", _report_day)),
+        ("actual_base_cost", columns.raw("total_current_duration_costing")),
+        ("actual_base_cost_ly", columns.raw("total_previous_duration_costing")),
+        ("actual_fully_loaded_cost", 0),
+        ("actual_fully_loaded_cost_ly", 0),
+        ("actual_shift_num_mins", columns.raw("total_current_work_duration")),
+        ("actual_shift_num_mins_ly", columns.raw("total_previous_work_duration")),
+        ("forecast_base_cost", 0),
+        ("forecast_base_cost_ly", 0),
+        ("forecast_fully_loaded_cost", 0),
+        ("forecast_fully_loaded_cost_ly", 0),
+        ("forecast_shift_num_mins", 0),
+        ("forecast_shift_num_mins_ly", 0),
+        ("total", columns.raw("total_current_employee")),
+        ("total_ly", columns.raw("total_previous_employee")),
+        (group_by, keys),
+    ])
+    return labour_area_overall(columns, periods, alignment, granularity), _group_detail(keys, rows)
+
+
+def build_labourArea_stats(raw_data, start_date, end_date, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
+    overall, detail = _labour_area(raw_data, "location", alignment, granularity)
+    return {
+        "overall": overall,
+        "detail": {
+            "all": overall,
+            **{region: detail.get(account, []) for region, account in account_regions()},
+        },
+        **_compared_periods(start_date, end_date, alignment, granularity),
+    }
+
+
+def build_labourRole_stats(raw_data, start_date, end_date, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
+    overall, detail = _labour_area(raw_data, "role", alignment, granularity)
+    return {
+        "overall": overall,
+        "detail": {
+            "all": overall,
+            "hr": detail.get("hr", []),
+            "admin": detail.get("admin", []),
+            "employee": detail.get("employee", []),
+        },
+        **_compared_periods(start_date, end_date, alignment, granularity),
+    }
+
+
+# Detail field → raw column of normalized_labour_hourly_row
+LABOUR_HOURLY_FIELDS = [
+    ("actual_shift_num_mins", "total_shift_duration"),
+    ("actual_work_num_mins", "total_work_duration"),
+    ("actual_base_cost", "total_shift_cost"),
+    ("actual_fully_loaded_cost", "total_hourly_cost"),
+    ("avg_actual_shift_num_mins", "avg_total_shift_duration"),
+    ("avg_actual_work_num_mins", "avg_total_work_duration"),
+    ("avg_actual_base_cost", "avg_total_shift_cost"),
+    ("avg_actual_fully_loaded_cost", "avg_total_hourly_cost"),
+    ("forecast_shift_num_mins", "forecast_total_shift_duration"),
+    ("forecast_work_num_mins", "forecast_total_work_duration"),
+    ("forecast_base_cost", "forecast_total_shift_cost"),
+    ("forecast_fully_loaded_cost", "forecast_total_hourly_cost"),
+    ("avg_forecast_shift_num_mins", "avg_forecast_total_shift_duration"),
+    ("avg_forecast_work_num_mins", "avg_forecast_total_work_duration"),
+    ("avg_forecast_base_cost", "avg_forecast_total_shift_cost"),
+    ("avg_forecast_fully_loaded_cost", "avg_forecast_total_hourly_cost"),
+]
+
+# Fields summed per hour of day; their per-day averages are derived from the sums
+LABOUR_HOURLY_TOTALS = [field for field, _ in LABOUR_HOURLY_FIELDS if not field.startswith("avg_")]
+
+
+def labour_hourly_overall(columns, days):
+    """
+    24 rows, one per hour of day, with the labour totals summed over every
+    day and averaged per distinct day, like labour_hourly_build_overall_by_day.
+    """
+    hours = columns.raw("hour_of_day")
+    groups = GroupSums(hours, mask=columns.present("hour_of_day"))
+    sources = dict(LABOUR_HOURLY_FIELDS)
+    sums = {field: groups.sum(columns.numbers(sources[field])) for field in LABOUR_HOURLY_TOTALS}
+    day_sets = groups.distinct(days)
+    index = {hour: i for i, hour in enumerate(groups.keys)}
+
+    output = []
+    for hour in range(24):
+        i = index.get(hour)
+        d = {field: values[i] if i is not None else 0 for field, values in sums.items()}
+        day_count = (len(day_sets[i]) if i is not None else 0) or 1
+
+        row = {"hour_of_day": hour}
+        for prefix in ("actual", "forecast"):
+            for metric in ("shift_num_mins", "work_num_mins", "base_cost", "fully_loaded_cost"):
+                row[f"{prefix}_{metric}"] = _round(d[f"{prefix}_{metric}"], 2)
+            for metric in ("shift_num_mins", "work_num_mins", "base_cost", "fully_loaded_cost"):
+                row[f"avg_{prefix}_{metric}"] = _round(d[f"{prefix}_{metric}"] / day_count, 2)
+        output.append(row)
+    return output
+
+
+def build_labourHour_stats(raw_data, start_date, end_date, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
+    columns = ReportColumns(raw_data)
+    days = columns.mapped("day_name", _lower)
+    rows = _records(len(columns), [
+        ("hour_of_day", columns.raw("hour_of_day")),
+        *((field, columns.raw(source, 0)) for field, source in LABOUR_HOURLY_FIELDS),
+        ("day_name", days),
+    ])
+    detail = _group_detail(days, rows)
+    overall = labour_hourly_overall(columns, days)
+    return {
+        "overall": overall,
+        "detail": {
+            "all": overall,
+            **{day: detail.get(day, []) for day in WEEKDAYS},
+        },
+        **_compared_periods(start_date, end_date, alignment, granularity),
+    }
+
+
+# ============================== Operations ==============================
+
+def build_operation_dayOfWeek_stats(raw_data, start_date, end_date, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
+    columns = ReportColumns(raw_data)
+    periods = columns.mapped("current_day", to_iso_date)
+    days = columns.mapped("day_name", _lower)
+    customers, customers_ly = columns.raw_or_zero("totalcustomer_current"), columns.raw_or_zero("totalcustomer_previous")
+    fields = _sales_fields(
+        columns,
+        _add(customers, columns.raw_or_zero("total_guest_count_current")),
+        _add(customers_ly, columns.raw_or_zero("total_guest_count_previous")),
+        raw=columns.raw_or_zero,
+    )
+    # normalize_dayOfWeek_stats_row puts the guest totals right after the guest counts
+    guest_totals = fields[12:14]
+    rows = _records(len(columns), [
+        ("period", periods),
+        ("period_ly", columns.mapped("previous_day", to_iso_date)),
+        *fields[:6],
+        *guest_totals,
+        *fields[6:8],
+        *_service_fields(columns),
+        *fields[8:12],
+        *fields[14:],
+        ("day_name", days),
+    ])
+    detail = _group_detail(days, rows)
+    overall = sales_overall(
+        columns, periods, guest_totals=True, or_zero=True, alignment=alignment,
+        service=_service_histograms(columns, periods),
+    )
+    return {
+        "overall": overall,
+        "detail": {
+            "all": overall,
+            **{day: detail.get(day, []) for day in WEEKDAYS},
+        },
+        **_compared_periods(start_date, end_date, alignment, granularity),
+    }
+
+
+def _operation_rows(columns, trailing):
+    """normalized_operation_hourly_row detail rows."""
+    fields = _sales_fields(
+        columns,
+        _add(columns.raw("totalcustomer_current", 0), columns.raw("total_guest_count_current", 0)),
+        _add(columns.raw("totalcustomer_previous", 0), columns.raw("total_guest_count_previous", 0)),
+        raw=lambda name: columns.raw(name, 0),
+    )
+    return _records(len(columns), [
+        *fields[:8],
+        *_service_fields(columns),
+        *fields[8:],
+        *trailing,
+    ])
+
+
+def _operation_sums(columns, groups):
+    count_present = columns.present("avgdelivery_minutes_current")
+    count_present_ly = columns.present("avgdelivery_minutes_previous")
+    return {
+        "total": groups.sum(columns.numbers("totalpayment_current")),
+        "total_ly": groups.sum(columns.numbers("totalpayment_previous")),
+        "count": groups.sum(columns.numbers("totalorder_current")),
+        "count_ly": groups.sum(columns.numbers("totalorder_previous")),
+        "guest_count": groups.sum(columns.numbers("totalcustomer_current")),
+        "guest_count_ly": groups.sum(columns.numbers("totalcustomer_previous")),
+        "guest_total": groups.sum(
+            columns.numbers("totalcustomer_current") + columns.numbers("total_guest_count_current")
+        ),
+        "guest_total_ly": groups.sum(
+            columns.numbers("totalcustomer_previous") + columns.numbers("total_guest_count_previous")
+        ),
+        # Plain (unweighted) average over the rows that have a time to serve
+        "time_to_serve": groups.sum(columns.numbers("avgdelivery_minutes_current")),
+        "time_to_serve_ly": groups.sum(columns.numbers("avgdelivery_minutes_previous")),
+        "_rows": groups.count(count_present),
+        "_rows_ly": groups.count(count_present_ly),
+    }
+
+
+def operations_hourly_overall(columns, days):
+    """24 rows, one per hour of day, summed over every day, like operations_hourly_build_overall_by_day."""
+    hours = columns.mapped("hour_of_day", _hour)
+    groups = GroupSums(hours, mask=np.fromiter(map(is_not, hours, repeat(None)), dtype=bool, count=len(hours)))
+    sums = _operation_sums(columns, groups)
+    service = _service_histograms(columns, columns.raw("hour_of_day"))
+    # The row-by-row builder visits the rows grouped per day name
+    day_codes, _ = factorize(days)
+    labels = groups.last(columns.raw("hour_label"), np.argsort(day_codes, kind="stable"))
+    day_sets = groups.distinct(days)
+    index = {hour: i for i, hour in enumerate(groups.keys)}
+
+    output = []
+    for hour in range(24):
+        i = index.get(hour)
+        d = {name: values[i] if i is not None else 0 for name, values in sums.items()}
+        hour_days = day_sets[i] if i is not None else set()
+        output.append({
+            "hour_of_day": hour,
+            "hour_label": (labels[i] if i is not None else None) or f"{hour:02d}:00",
+            "total": _round(d["total"], 2),
+            "total_ly": _round(d["total_ly"], 2),
+            "count": d["count"],
+            "count_ly": d["count_ly"],
+            "guest_count": d["guest_count"],
+            "guest_count_ly": d["guest_count_ly"],
+            "time_to_serve": _round(d["time_to_serve"] / d["_rows"], 2) if d["_rows"] else 0,
+            "time_to_serve_ly": _round(d["time_to_serve_ly"] / d["_rows_ly"], 2) if d["_rows_ly"] else 0,
+            **service.percentiles(hour),
+            "void_count": 0,
+            "void_count_ly": 0,
+            "void_total": 0,
+            "void_total_ly": 0,
+            "guest_total": d["guest_total"],
+            "guest_total_ly": d["guest_total_ly"],
+            "budget": 0,
+            "budget_ly": 0,
+            "day_name": next(iter(hour_days)) if len(hour_days) == 1 else "all",
+        })
+    return output
+
+
+def build_operation_hour_stats(raw_data, start_date, end_date, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
+    columns = ReportColumns(raw_data)
+    days = columns.mapped("day_name", _lower)
+    rows = _operation_rows(columns, [
+        ("hour_of_day", columns.raw("hour_of_day")),
+        ("hour_label", columns.raw("hour_label")),
+        ("day_name", days),
+    ])
+    detail = _group_detail(days, rows)
+    overall = operations_hourly_overall(columns, days)
+    return {
+        "overall": overall,
+        "detail": {
+            "all": overall,
+            **{day: detail.get(day, []) for day in WEEKDAYS},
+        },
+        **_compared_periods(start_date, end_date, alignment, granularity),
+    }
+
+
+def operations_partOfDay_overall(columns, periods):
+    """One row per day with every part of day combined, like operations_partOfDay_build_overall_by_day."""
+    if not len(columns):
+        return []
+    groups = GroupSums(periods)
+    sums = _operation_sums(columns, groups)
+    service = _service_histograms(columns, periods)
+
+    output = []
+    for i, period in groups.sorted_keys():
+        d = {name: values[i] for name, values in sums.items()}
+        output.append({
+            "total": _round(d["total"], 2),
+            "total_ly": _round(d["total_ly"], 2),
+            "count": float(d["count"]),
+            "count_ly": float(d["count_ly"]),
+            "guest_count": float(d["guest_count"]),
+            "guest_count_ly": float(d["guest_count_ly"]),
+            "time_to_serve": _round(d["time_to_serve"] / d["_rows"], 2) if d["_rows"] else 0.0,
+            "time_to_serve_ly": _round(d["time_to_serve_ly"] / d["_rows_ly"], 2) if d["_rows_ly"] else 0.0,
+            **service.percentiles(period),
+            "void_count": 0,
+            "void_count_ly": 0,
+            "void_total": 0,
+            "void_total_ly": 0,
+            "guest_total": float(d["guest_total"]),
+            "guest_total_ly": float(d["guest_total_ly"]),
+            "budget": 0,
+            "budget_ly": 0,
+            "period": period,
+        })
+    return output
+
+
+def build_operations_partOfDay_stats(raw_data, start_date, end_date, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
+    columns = ReportColumns(raw_data)
+    periods = columns.mapped("current_day", _report_day)
+    parts = columns.mapped("part_of_day", _lower)
+    rows = _operation_rows(columns, [
+        ("period", periods),
+        ("period_ly", columns.mapped("previous_day", _report_day)),
+        ("part_of_day", parts),
+    ])
+    detail = _group_detail(parts, rows)
+    overall = operations_partOfDay_overall(columns, periods)
+    normalized_detail = normalize_detail_part_of_day(
+        detail, start_date=start_date, end_date=end_date, granularity=granularity
+    )
+    return {
+        "overall": overall,
+        "detail": {
+            "all": overall,
+            "breakfast": normalized_detail.get("breakfast", []),
+            "lunch": normalized_detail.get("lunch", []),
+            "dinner": normalized_detail.get("dinner", []),
+            "late_night": normalized_detail.get("late_night", []),
+        },
+        **_compared_periods(start_date, end_date, alignment, granularity),
+    }
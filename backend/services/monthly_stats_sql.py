@@ -1,1423 +1,493 @@
+from collections import namedtuple
 from datetime import timedelta
-from django.db import connection
-
-#==============================Sales===============================
-def fetch_monthly_stats_raw(start_date, end_date):
-    prev_start = start_date.replace(year=start_date.year - 1)
-    prev_end = end_date.replace(year=end_date.year - 1)
-
-    sql = """ 
-    -- 👇 YOUR EXISTING SQL EXACTLY AS IT IS
-    
-    WITH current_dates AS (
-        SELECT generate_series(
-            %s::date,
-            %s::date,
-            INTERVAL '1 day'
-        )::date AS curr_date
-    ),
-    previous_dates AS (
-        SELECT 
-            curr_date,
-            (curr_date - INTERVAL '1 year')::date AS prev_date
-        FROM current_dates
-    ),
-    cte_current_raw AS (
-        SELECT
-            o.location,
-            o.creation_date::date AS day_date,
-            (p.elem->>'amount')::numeric AS payment_amount,
-            (t.elem->>'amount')::numeric as total_guest_count,
-            CASE WHEN o.delivery_date IS NOT NULL 
-                THEN EXTRACT(EPOCH FROM (o.delivery_date - o.creation_date)) / 60
-            END AS delivery_minutes,
-            o.customer_id
-        FROM lightspeed_orders o
-        LEFT JOIN LATERAL jsonb_array_elements(o.order_payments) AS p(elem)
-            ON TRUE
-        left join lateral jsonb_array_elements(o.order_items) as t(elem)
-            ON TRUE
-        WHERE o.creation_date >= %s
-          AND o.creation_date < %s
-    ),
-    cte_current AS (
-        SELECT
-            location,
-            day_date,
-            COUNT(*) AS total_current,
-            COUNT(DISTINCT customer_id) AS total_customer_current,
-            SUM(payment_amount) AS total_payment_current,
-            MAX(total_guest_count) as total_guest_count_current,
-            AVG(delivery_minutes) AS avg_delivery_minutes_current
-        FROM cte_current_raw
-        GROUP BY location, day_date
-    ),
-    cte_previous_raw AS (
-        SELECT
-            o.location,
-            o.creation_date::date AS day_date,
-            (p.elem->>'amount')::numeric AS payment_amount,
-            (t.elem->>'amount')::numeric as total_guest_count,
-            CASE WHEN o.delivery_date IS NOT NULL 
-                THEN EXTRACT(EPOCH FROM (o.delivery_date - o.creation_date)) / 60
-            END AS delivery_minutes,
-            o.customer_id
-        FROM lightspeed_orders o
-        LEFT JOIN LATERAL jsonb_array_elements(o.order_payments) AS p(elem)
-            ON TRUE
-        left join lateral jsonb_array_elements(o.order_items) as t(elem)
-        on true
-        WHERE o.creation_date >= %s
-          AND o.creation_date < %s
-    ),
-    cte_previous AS (
-        SELECT
-            location,
-            day_date,
-            COUNT(*) AS total_previous,
-            COUNT(DISTINCT customer_id) AS total_customer_previous,
-            SUM(payment_amount) AS total_payment_previous,
-            MAX(total_guest_count) as total_guest_count_previous,
-            AVG(delivery_minutes) AS avg_delivery_minutes_previous
-        FROM cte_previous_raw
-        GROUP BY location, day_date
-    ),
-    all_locations AS (
-        SELECT DISTINCT location FROM lightspeed_orders
-    )
-    SELECT
-        loc.location,
-        TO_CHAR(pd.curr_date, 'DD/MM/YYYY') AS current_day,
-        TO_CHAR(pd.prev_date, 'DD/MM/YYYY') AS previous_day,
-        ROUND(COALESCE(c.total_current, 0),2) AS totalOrder_current,
-        ROUND(COALESCE(p.total_previous, 0),2) AS totalOrder_previous,
-        ROUND(COALESCE(c.total_customer_current, 0),2) AS totalCustomer_current,
-        ROUND(COALESCE(p.total_customer_previous, 0),2) AS totalCustomer_previous,
-        ROUND(COALESCE(c.total_guest_count_current, 0),2) AS total_guest_count_current,
-        ROUND(COALESCE(p.total_guest_count_previous, 0),2) AS total_guest_count_previous,
-        ROUND(COALESCE(c.total_payment_current, 0),2) AS totalPayment_current,
-        ROUND(COALESCE(p.total_payment_previous, 0),2) AS totalPayment_previous,
-        ROUND(COALESCE(c.avg_delivery_minutes_current, 0),2) AS avgDelivery_minutes_current,
-        ROUND(COALESCE(p.avg_delivery_minutes_previous, 0),2) AS avgDelivery_minutes_previous
-    FROM previous_dates pd
-    CROSS JOIN all_locations loc
-    LEFT JOIN cte_current c
-           ON c.location = loc.location
-          AND c.day_date = pd.curr_date
-    LEFT JOIN cte_previous p
-           ON p.location = loc.location
-          AND p.day_date = pd.prev_date
-    ORDER BY loc.location, pd.curr_date;
+from functools import lru_cache
+from django.db import connection, transaction
+
+from backend.services.yoy_sql import (
+    DAY_GRANULARITY,
+    DEFAULT_ALIGNMENT,
+    DEFAULT_GRANULARITY,
+    MONTH_GRANULARITY,
+    QUARTER_GRANULARITY,
+    WEEK_GRANULARITY,
+    WEEKDAY_HOURS,
+    Measure,
+    SharedScan,
+    Source,
+    YoYReport,
+)
+
+# Rows fetched per round trip by the server-side report cursors
+STREAM_ITERSIZE = 2000
+
+
+@lru_cache(maxsize=None)
+def _row_type(columns):
     """
-
-    params = [
-        start_date,
-        end_date,
-        start_date,
-        end_date + timedelta(days=1),
-        prev_start,
-        prev_end + timedelta(days=1),
-    ]
-
-    with connection.cursor() as cursor:
-        cursor.execute(sql, params)
-        columns = [col[0] for col in cursor.description]
-        return [dict(zip(columns, row)) for row in cursor.fetchall()]
-
-def fetch_sales_orderType_raw(start_date,end_date):
-    prev_start=start_date.replace(year=start_date.year-1),
-    prev_end=end_date.replace(year=end_date.year-1)
-    
-    sql="""
-    WITH current_dates AS (
-    SELECT generate_series(
-        %s::date,
-        %s::date,
-        INTERVAL '1 day'
-    )::date AS curr_date
-    ),
-    previous_dates AS (
-        SELECT
-            curr_date,
-            (curr_date - INTERVAL '1 year')::date AS prev_date
-        FROM current_dates
-    ),
-
-    -- ---------- CURRENT YEAR RAW ----------
-    cte_current_raw AS (
-        SELECT
-            split_part(o.external_reference, ' ', 1) AS channel,
-            o.creation_date::date AS day_date,
-            (p.elem->>'amount')::numeric AS payment_amount,
-            (t.elem->>'amount')::numeric as total_guest_count,
-            CASE
-                WHEN o.delivery_date IS NOT NULL
-                THEN EXTRACT(EPOCH FROM (o.delivery_date - o.creation_date)) / 60
-            END AS delivery_minutes,
-            o.customer_id
-        FROM lightspeed_orders o
-        LEFT JOIN LATERAL jsonb_array_elements(o.order_payments) AS p(elem)
-            ON TRUE
-        left join lateral jsonb_array_elements(o.order_items) as t(elem)
-            ON TRUE
-        WHERE o.creation_date >= %s
-        AND o.creation_date < %s
-        AND o.external_reference IS NOT NULL
-    ),
-
-    -- ---------- CURRENT YEAR AGG ----------
-    cte_current AS (
-        SELECT
-            channel,
-            day_date,
-            COUNT(*) AS total_current,
-            COUNT(DISTINCT customer_id) AS total_customer_current,
-            SUM(payment_amount) AS total_payment_current,
-            MAX(total_guest_count) as total_guest_count_current,
-            AVG(delivery_minutes) AS avg_delivery_minutes_current
-        FROM cte_current_raw
-        GROUP BY channel, day_date
-    ),
-
-    -- ---------- PREVIOUS YEAR RAW ----------
-    cte_previous_raw AS (
-        SELECT
-            split_part(o.external_reference, ' ', 1) AS channel,
-            o.creation_date::date AS day_date,
-            (p.elem->>'amount')::numeric AS payment_amount,
-            (t.elem->>'amount')::numeric as total_guest_count,
-            CASE
-                WHEN o.delivery_date IS NOT NULL
-                THEN EXTRACT(EPOCH FROM (o.delivery_date - o.creation_date)) / 60
-            END AS delivery_minutes,
-            o.customer_id
-        FROM lightspeed_orders o
-        LEFT JOIN LATERAL jsonb_array_elements(o.order_payments) AS p(elem)
-            ON TRUE
-        left join lateral jsonb_array_elements(o.order_items) as t(elem)
-        on true
-        WHERE o.creation_date >= %s
-        AND o.creation_date < %s
-        AND o.external_reference IS NOT NULL
-    ),
-
-    -- ---------- PREVIOUS YEAR AGG ----------
-    cte_previous AS (
-        SELECT
-            channel,
-            day_date,
-            COUNT(*) AS total_previous,
-            COUNT(DISTINCT customer_id) AS total_customer_previous,
-            SUM(payment_amount) AS total_payment_previous,
-            MAX(total_guest_count) as total_guest_count_previous,
-            AVG(delivery_minutes) AS avg_delivery_minutes_previous
-        FROM cte_previous_raw
-        GROUP BY channel, day_date
-    ),
-
-    -- ---------- ALL CHANNELS (DIMENSION) ----------
-    all_channels AS (
-        SELECT DISTINCT
-            split_part(external_reference, ' ', 1) AS channel
-        FROM lightspeed_orders
-        WHERE external_reference IS NOT NULL
-    )
-
-    -- ---------- FINAL RESULT ----------
-    SELECT
-        ch.channel,
-        TO_CHAR(pd.curr_date, 'DD/MM/YYYY') AS current_day,
-        TO_CHAR(pd.prev_date, 'DD/MM/YYYY') AS previous_day,
-
-        COALESCE(c.total_current, 0) AS totalOrder_current,
-        COALESCE(p.total_previous, 0) AS totalOrder_previous,
-
-        COALESCE(c.total_customer_current, 0) AS totalCustomer_current,
-        COALESCE(p.total_customer_previous, 0) AS totalCustomer_previous,
-        ROUND(COALESCE(c.total_guest_count_current, 0),2) AS total_guest_count_current,
-        ROUND(COALESCE(p.total_guest_count_previous, 0),2) AS total_guest_count_previous,
-        ROUND(COALESCE(c.total_payment_current, 0), 2) AS totalPayment_current,
-        ROUND(COALESCE(p.total_payment_previous, 0), 2) AS totalPayment_previous,
-
-        ROUND(COALESCE(c.avg_delivery_minutes_current, 0), 2) AS avgDelivery_minutes_current,
-        ROUND(COALESCE(p.avg_delivery_minutes_previous, 0), 2) AS avgDelivery_minutes_previous
-
-    FROM previous_dates pd
-    CROSS JOIN all_channels ch
-    LEFT JOIN cte_current c
-        ON c.channel = ch.channel
-        AND c.day_date = pd.curr_date
-    LEFT JOIN cte_previous p
-        ON p.channel = ch.channel
-        AND p.day_date = pd.prev_date
-    ORDER BY ch.channel, pd.curr_date;
+    Namedtuple type for a report result shape.
+    Besides attribute access, rows keep the read-only dict interface the
+    builders use (row["col"], row.get("col", default)).
     """
-    params=[
-        start_date,
-        end_date,
-        start_date,
-        end_date+timedelta(days=1),
-        prev_start,
-        prev_end+timedelta(days=1)
-    ]
-    
-    with connection.cursor() as cursor:
-        cursor.execute(sql,params)
-        columns= [col[0] for col in cursor.description]
-        return [dict(zip(columns,row)) for row in cursor.fetchall()]
-    
-def fetch_sales_productItem_raw(start_date, end_date):
-    prev_start = start_date.replace(year=start_date.year - 1)
-    prev_end = end_date.replace(year=end_date.year - 1)
-
-    sql = """ 
-    
-   WITH current_dates AS (
-    SELECT generate_series(
-        %s::date,
-        %s::date,
-        INTERVAL '1 day'
-    )::date AS curr_date
-),
-previous_dates AS (
-    SELECT
-        curr_date,
-        (curr_date - INTERVAL '1 year')::date AS prev_date
-    FROM current_dates
-),
-
--- ---------- CURRENT YEAR RAW ----------
-cte_current_raw AS (
-    SELECT
-        o.id AS order_id,
-        item.elem->>'productId' AS product_id,
-        lp.name AS product_name,
-        o.creation_date::date AS day_date,
-        COALESCE((item.elem->>'quantity')::numeric, 1) AS quantity,
-        (item.elem->>'unitPrice')::numeric AS unit_price,
-        o.customer_id,
-        CASE
-            WHEN o.delivery_date IS NOT NULL
-            THEN EXTRACT(EPOCH FROM (o.delivery_date - o.creation_date)) / 60
-        END AS delivery_minutes
-    FROM lightspeed_orders o
-    LEFT JOIN LATERAL jsonb_array_elements(o.order_items) item(elem) ON TRUE
-    LEFT JOIN lightspeed_products lp
-           ON lp.id::text = item.elem->>'productId'
-    WHERE o.creation_date >= %s
-      AND o.creation_date < %s
-),
-
--- ---------- CURRENT YEAR AGG ----------
-cte_current AS (
-    SELECT
-        product_id,
-        product_name,
-        day_date,
-        COUNT(DISTINCT order_id) AS total_orders_current,
-        COUNT(DISTINCT customer_id) AS total_customers_current,
-        SUM(quantity) AS total_quantity_current,
-        ROUND(SUM(quantity * unit_price), 2) AS total_revenue_current,
-        ROUND(AVG(delivery_minutes), 2) AS avg_delivery_minutes_current
-    FROM cte_current_raw
-    GROUP BY product_id, product_name, day_date
-),
+    base = namedtuple("ReportRow", columns)
+    index = {name: i for i, name in enumerate(columns)}
 
--- ---------- PREVIOUS YEAR RAW ----------
-cte_previous_raw AS (
-    SELECT
-        o.id AS order_id,
-        item.elem->>'productId' AS product_id,
-        lp.name AS product_name,
-        o.creation_date::date AS day_date,
-        COALESCE((item.elem->>'quantity')::numeric, 1) AS quantity,
-        (item.elem->>'unitPrice')::numeric AS unit_price,
-        o.customer_id,
-        CASE
-            WHEN o.delivery_date IS NOT NULL
-            THEN EXTRACT(EPOCH FROM (o.delivery_date - o.creation_date)) / 60
-        END AS delivery_minutes
-    FROM lightspeed_orders o
-    LEFT JOIN LATERAL jsonb_array_elements(o.order_items) item(elem) ON TRUE
-    LEFT JOIN lightspeed_products lp
-           ON lp.id::text = item.elem->>'productId'
-    WHERE o.creation_date >= %s
-      AND o.creation_date < %s
-),
+    class ReportRow(base):
+        __slots__ = ()
 
--- ---------- PREVIOUS YEAR AGG ----------
-cte_previous AS (
-    SELECT
-        product_id,
-        product_name,
-        day_date,
-        COUNT(DISTINCT order_id) AS total_orders_previous,
-        COUNT(DISTINCT customer_id) AS total_customers_previous,
-        SUM(quantity) AS total_quantity_previous,
-        ROUND(SUM(quantity * unit_price), 2) AS total_revenue_previous,
-        ROUND(AVG(delivery_minutes), 2) AS avg_delivery_minutes_previous
-    FROM cte_previous_raw
-    GROUP BY product_id, product_name, day_date
-),
+        def __getitem__(self, key):
+            if isinstance(key, str):
+                return tuple.__getitem__(self, index[key])
+            return tuple.__getitem__(self, key)
 
--- ---------- PRODUCT DIMENSION ----------
-all_products AS (
-    SELECT
-        id::text AS product_id,
-        name AS product_name
-    FROM lightspeed_products
-),
+        def get(self, key, default=None):
+            i = index.get(key)
+            return default if i is None else tuple.__getitem__(self, i)
 
--- ---------- FINAL RESULT ----------
-cte1 as (
-SELECT
-    prod.product_id,
-    prod.product_name,
-    TO_CHAR(pd.curr_date, 'DD/MM/YYYY') AS current_day,
-    TO_CHAR(pd.prev_date, 'DD/MM/YYYY') AS previous_day,
+    return ReportRow
 
-    COALESCE(c.total_orders_current, 0)      AS totalorder_current,
-    COALESCE(p.total_orders_previous, 0)     AS totalorder_previous,
-
-    COALESCE(c.total_customers_current, 0)   AS totalcustomer_current,
-    COALESCE(p.total_customers_previous, 0)  AS totalcustomer_previous,
-
-    COALESCE(c.total_quantity_current, 0)    AS quantity_current,
-    COALESCE(p.total_quantity_previous, 0)   AS quantity_previous,
-
-    COALESCE(c.total_revenue_current, 0)     AS totalpayment_current,
-    COALESCE(p.total_revenue_previous, 0)    AS totalpayment_previous,
-
-    COALESCE(c.avg_delivery_minutes_current, 0)  AS avgdelivery_minutes_current,
-    COALESCE(p.avg_delivery_minutes_previous, 0) AS avgdelivery_minutes_previous
-
-    FROM previous_dates pd
-    CROSS JOIN all_products prod
-    LEFT JOIN cte_current c
-        ON c.product_id = prod.product_id
-        AND c.day_date = pd.curr_date
-    LEFT JOIN cte_previous p
-        ON p.product_id = prod.product_id
-        AND p.day_date = pd.prev_date
-
-    ORDER BY prod.product_name, pd.curr_date
-    )
-    select
-    product_name,
-    current_day,previous_day,
-    sum(totalorder_current) as totalorder_current,
-    sum(totalorder_previous) as totalorder_previous,
-    sum(totalcustomer_current) as totalcustomer_current,
-    sum(totalcustomer_previous) as totalcustomer_previous,
-    sum(quantity_current) as quantity_current,
-    sum(quantity_previous) as quantiy_previous,
-    sum(totalpayment_current) as totalpayment_current,
-    sum(totalpayment_previous) as totalpayment_previous,
-    sum(avgdelivery_minutes_current) as avgdelivery_minutes_current,
-    sum(avgdelivery_minutes_previous) as avgdelivery_minutes_previous
-    from cte1
-    group by product_name,current_day,previous_day
-    order by current_day
 
+def stream_rows(sql, params):
     """
+    Run a report query on a server-side (named) cursor and yield its rows as
+    ReportRow namedtuples, STREAM_ITERSIZE rows per round trip, instead of
+    materializing the whole result first.
 
-    params = [
-        start_date,
-        end_date,
-        start_date,
-        end_date + timedelta(days=1),
-        prev_start,
-        prev_end + timedelta(days=1),
-    ]
+    Args:
+        sql: Report SQL
+        params: Query parameters
 
-    with connection.cursor() as cursor:
+    Yields:
+        ReportRow: One row per result record
+    """
+    with connection.chunked_cursor() as cursor:
+        cursor.cursor.itersize = STREAM_ITERSIZE
         cursor.execute(sql, params)
-        columns = [col[0] for col in cursor.description]
-        return [dict(zip(columns, row)) for row in cursor.fetchall()]
-
-def fetch_sales_productCategory_raw(start_date,end_date):
-    prev_start=start_date.replace(year=start_date.year-1)
-    prev_end=end_date.replace(year=end_date.year-1)
-    
-    sql = """
-    WITH current_dates AS (
-    SELECT generate_series(
-        %s::date,
-        %s::date,
-        INTERVAL '1 day'
-    )::date AS curr_date
-    ),
-    previous_dates AS (
-        SELECT
-            curr_date,
-            (curr_date - INTERVAL '1 year')::date AS prev_date
-        FROM current_dates
-    ),
-    cte_current_raw AS (
-        SELECT
-            o.id AS order_id,
-            oi.elem->>'productId' AS product_id,
-            p.name AS product_name,
-            p.group_ids,
-            o.creation_date::date AS day_date,
-            (oi.elem->>'amount')::numeric AS quantity,
-            (oi.elem->>'unitPrice')::numeric AS unit_price,
-            o.customer_id,
-            CASE
-                WHEN o.delivery_date IS NOT NULL
-                THEN EXTRACT(EPOCH FROM (o.delivery_date - o.creation_date)) / 60
-            END AS delivery_minutes
-        FROM lightspeed_orders o
-        LEFT JOIN LATERAL jsonb_array_elements(o.order_items) oi(elem) ON TRUE
-        LEFT JOIN lightspeed_products p
-            ON p.id::text = oi.elem->>'productId'
-        WHERE o.creation_date >= %s
-        AND o.creation_date <  %s
-    ),
-    cte_current AS (
-        SELECT
-            product_id,
-            product_name,
-            day_date,
-            group_ids,
-            COUNT(DISTINCT order_id) AS total_orders_current,
-            COUNT(DISTINCT customer_id) AS total_customers_current,
-            SUM(quantity) AS total_quantity_current,
-            ROUND(SUM(quantity * unit_price), 2) AS total_revenue_current,
-            ROUND(AVG(delivery_minutes), 2) AS avg_delivery_minutes_current
-        FROM cte_current_raw
-        GROUP BY product_id, product_name, day_date,group_ids
-    ),
-    cte_previous_raw AS (
-        SELECT
-            o.id AS order_id,
-            oi.elem->>'productId' AS product_id,
-            p.name AS product_name,
-            p.group_ids,
-            o.creation_date::date AS day_date,
-            (oi.elem->>'amount')::numeric AS quantity,
-            (oi.elem->>'unitPrice')::numeric AS unit_price,
-            o.customer_id,
-            CASE
-                WHEN o.delivery_date IS NOT NULL
-                THEN EXTRACT(EPOCH FROM (o.delivery_date - o.creation_date)) / 60
-            END AS delivery_minutes
-        FROM lightspeed_orders o
+        row_type = None
+        for row in cursor:
+            if row_type is None:
+                # Named cursors only describe their columns after the first fetch
+                row_type = _row_type(tuple(col[0] for col in cursor.description))
+            yield row_type._make(row)
+
+
+#==============================Sources===============================
+# Every report below is declared as (source, dimensions, measures) and runs as
+# one single-pass YoY query (see backend.services.yoy_sql): the current and
+# previous-year windows are read in the same scan and split with
+# FILTER (WHERE period = ...), calendar densification comes last.
+# Days, weekdays and the previous-year day each day is compared with come from
+# the calendar dimension (calendar_day, calendar_hour) under the requested
+# alignment (yoy_sql.ALIGNMENTS); at a week, month or quarter granularity
+# (yoy_sql.GRANULARITIES) every report returns one row per bucket instead of
+# per day.
+# Dimension values are read from the small dimension tables the syncs
+# maintain (dim_location, lightspeed_order_channels, lightspeed_product_names),
+# never as DISTINCT keys of a fact table.
+
+ORDERS = Source("lightspeed_orders o", day="o.local_day", partition_column="o.creation_date")
+
+DAILY_SALES = Source("lightspeed_daily_sales s", day="s.day")
+
+# The daily sales summed per week and month (see lightspeed_integration.rollups),
+# keyed on the first day of the week/month, with their customers counted once
+# per week/month from the merged daily customer sketches
+WEEKLY_SALES = Source("lightspeed_weekly_sales s", day="s.week_start")
+MONTHLY_SALES = Source("lightspeed_monthly_sales s", day="s.month_start")
+
+# Quarters merge their three monthly rows, customer sketches included
+QUARTERLY_SALES = Source(
+    """(
+            SELECT
+                m.location,
+                c.quarter_start,
+                SUM(m.order_count) AS order_count,
+                COALESCE(customer_sketch_count(customer_sketch_union(m.customer_sketch)), 0) AS customer_count,
+                SUM(m.payment_total) AS payment_total,
+                SUM(m.max_guest_count) AS max_guest_count,
+                SUM(m.delivery_minutes_total) AS delivery_minutes_total,
+                SUM(m.delivery_count) AS delivery_count
+            FROM lightspeed_monthly_sales m
+            JOIN calendar_day c
+              ON c.day = m.month_start
+            GROUP BY m.location, c.quarter_start
+        ) s""",
+    day="s.quarter_start",
+)
+
+ORDER_LINES = Source(
+    """lightspeed_order_lines ol
+        JOIN lightspeed_products lp
+          ON lp.id = ol.product_id""",
+    day="ol.day",
+)
+
+# One row per order item; orders without items keep one row without a product
+ORDER_ITEMS = Source(
+    """lightspeed_orders o
         LEFT JOIN LATERAL jsonb_array_elements(o.order_items) oi(elem) ON TRUE
-        LEFT JOIN lightspeed_products p
-            ON p.id::text = oi.elem->>'productId'
-        WHERE o.creation_date >= %s
-        AND o.creation_date <  %s
-    ),
-    cte_previous AS (
-        SELECT
-            product_id,
-            product_name,
-            day_date,
-            group_ids,
-            COUNT(DISTINCT order_id) AS total_orders_previous,
-            COUNT(DISTINCT customer_id) AS total_customers_previous,
-            SUM(quantity) AS total_quantity_previous,
-            ROUND(SUM(quantity * unit_price), 2) AS total_revenue_previous,
-            ROUND(AVG(delivery_minutes), 2) AS avg_delivery_minutes_previous
-        FROM cte_previous_raw
-        GROUP BY product_id, product_name, day_date,group_ids
-    ),
-    cte1 as(
-    SELECT
-        TO_CHAR(pd.curr_date, 'DD/MM/YYYY') AS curr_date,
-        TO_CHAR(pd.prev_date, 'DD/MM/YYYY') AS prev_date,
-        --cast(replace(replace(COALESCE(c.group_ids, p.group_ids, '0'),'[',''),']','') as bigint) AS group_ids,
-        CAST(
-    COALESCE(
-        (c.group_ids ->> 0),
-        (p.group_ids ->> 0),
-        '0'
-    ) AS BIGINT
-    ) AS group_ids,
-        cast(COALESCE(c.product_id, p.product_id, '0') as bigint) AS product_id,
-        COALESCE(c.product_name, p.product_name, 'Not Available') AS product_name,
-        COALESCE(c.total_orders_current, 0)   AS orders_current,
-        COALESCE(p.total_orders_previous, 0)  AS orders_previous,
-        COALESCE(c.total_customers_current, 0)  AS customers_current,
-        COALESCE(p.total_customers_previous, 0) AS customers_previous,
-        COALESCE(c.total_quantity_current, 0)  AS quantity_current,
-        COALESCE(p.total_quantity_previous, 0) AS quantity_previous,
-        COALESCE(c.total_revenue_current, 0)  AS revenue_current,
-        COALESCE(p.total_revenue_previous, 0) AS revenue_previous,
-        COALESCE(c.avg_delivery_minutes_current, 0)  AS avg_delivery_minutes_current,
-        COALESCE(p.avg_delivery_minutes_previous, 0) AS avg_delivery_minutes_previous
-    FROM previous_dates pd
-    LEFT JOIN cte_current c
-        ON c.day_date = pd.curr_date 
-    left JOIN cte_previous p
-        ON p.product_id = c.product_id
-        AND p.day_date = pd.prev_date
-    ORDER BY c.product_name, pd.curr_date
-    ),
-    cte2 as (
-    --select * from cte1 join lightspeed_product_groups as pg on pg.id=replace(replace(cte1.group_ids,'[',''),']','')
-    SELECT *
-    FROM cte1
-    JOIN lightspeed_product_groups pg
-    ON pg.id = cte1.group_ids
-    )
-    select 
-    MAX(group_ids) as product_category_id,
-    name as product_category_name,
-    curr_date as current_day,prev_date as previous_day,
-    sum(orders_current) as totalorder_current,
-    sum(orders_previous) as totalorder_previous,
-    sum(customers_current) as totalcustomer_current,
-    sum(customers_previous) as totalcustomer_previous,
-    sum(quantity_current) as quantity_current,
-    sum(quantity_previous) as quantiy_previous,
-    sum(revenue_current) as totalpayment_current,
-    sum(revenue_previous) as totalpayment_previous,
-    sum(avg_delivery_minutes_current) as avgdelivery_minutes_current,
-    sum(avg_delivery_minutes_previous) as avgdelivery_minutes_previous
-    from cte2 
-    group by name,curr_date,prev_date
-    order by curr_date    
+        LEFT JOIN lightspeed_products lp
+          ON lp.id::text = oi.elem->>'productId'""",
+    day="o.local_day",
+    partition_column="o.creation_date",
+)
+
+# Labour facts (see backend.services.labour_facts): one row per clocking with
+# its cost, minutes, role and hours already resolved. The area and role
+# reports only count clockings of a stored shift of their own employee.
+LABOUR_FACTS = Source("labour_fact lf", day="lf.work_date", where="lf.shift_id IS NOT NULL")
+
+# One row per clocking and hour of its work day it overlaps
+LABOUR_FACT_HOURS = Source("labour_fact lf CROSS JOIN unnest(lf.hours) h(hour_of_day)", day="lf.work_date")
+
+# Delivery-minutes histograms per location, day and hour (see
+# lightspeed_integration.rollups); merged per cell, they give the time-to-serve
+# percentiles of the operations reports (backend.services.service_times)
+HOURLY_SERVICE = Source("lightspeed_hourly_service sh", day="sh.day")
+
+LABOUR_HOURLY_COST = "lf.cost / NULLIF(lf.work_minutes / 60.0, 0)"
+
+# Part of the day of an hour expression
+PART_OF_DAY_SQL = """CASE
+                WHEN {hour} BETWEEN 6 AND 11 THEN 'breakfast'
+                WHEN {hour} BETWEEN 12 AND 16 THEN 'lunch'
+                WHEN {hour} BETWEEN 17 AND 22 THEN 'dinner'
+                ELSE 'late_night'
+            END"""
+PART_OF_DAY = PART_OF_DAY_SQL.format(hour="o.local_hour")
+
+#==============================Sales===============================
+SALES_LOCATION_REPORT = YoYReport(
+    DAILY_SALES,
+    dimensions=[("location", "s.location")],
+    measures=[
+        Measure("SUM(s.order_count)", "totalOrder_current", "totalOrder_previous"),
+        Measure("SUM(s.customer_count)", "totalCustomer_current", "totalCustomer_previous"),
+        Measure("SUM(s.max_guest_count)", "total_guest_count_current", "total_guest_count_previous"),
+        Measure("SUM(s.payment_total)", "totalPayment_current", "totalPayment_previous"),
+        Measure(
+            "SUM(s.delivery_minutes_total) {filter} / NULLIF(SUM(s.delivery_count) {filter}, 0)",
+            "avgDelivery_minutes_current", "avgDelivery_minutes_previous",
+        ),
+    ],
+    domain="SELECT name AS location FROM dim_location WHERE name IS NOT NULL",
+    order_by=["k.location", "d.curr_date"],
+    rollups={
+        WEEK_GRANULARITY: WEEKLY_SALES,
+        MONTH_GRANULARITY: MONTHLY_SALES,
+        QUARTER_GRANULARITY: QUARTERLY_SALES,
+    },
+)
+
+SALES_ORDER_TYPE_REPORT = YoYReport(
+    Source(ORDERS.relation, ORDERS.day, ORDERS.partition_column, where="o.external_reference IS NOT NULL"),
+    dimensions=[("channel", "split_part(o.external_reference, ' ', 1)")],
+    measures=[
+        Measure("COUNT(*)", "totalOrder_current", "totalOrder_previous", output="COALESCE({}, 0)"),
+        Measure("COUNT(DISTINCT o.customer_id)", "totalCustomer_current", "totalCustomer_previous", output="COALESCE({}, 0)"),
+        Measure("MAX(o.guest_amount)", "total_guest_count_current", "total_guest_count_previous"),
+        Measure("SUM(o.payment_total)", "totalPayment_current", "totalPayment_previous"),
+        Measure("AVG(o.delivery_minutes)", "avgDelivery_minutes_current", "avgDelivery_minutes_previous"),
+    ],
+    domain="SELECT name AS channel FROM lightspeed_order_channels",
+    order_by=["k.channel", "d.curr_date"],
+)
+
+# Cells are aggregated per product id, then summed per product name
+SALES_PRODUCT_ITEM_REPORT = YoYReport(
+    ORDER_LINES,
+    dimensions=[("product_id", "ol.product_id"), ("product_name", "lp.name")],
+    measures=[
+        Measure("COUNT(DISTINCT ol.order_id)", "totalorder_current", "totalorder_previous", output="SUM(COALESCE({}, 0))"),
+        Measure("COUNT(DISTINCT ol.customer_id)", "totalcustomer_current", "totalcustomer_previous", output="SUM(COALESCE({}, 0))"),
+        Measure("SUM(ol.quantity)", "quantity_current", "quantiy_previous", output="SUM(COALESCE({}, 0))"),
+        Measure(
+            "ROUND(SUM(ol.quantity * ol.unit_price) {filter}, 2)",
+            "totalpayment_current", "totalpayment_previous", output="SUM(COALESCE({}, 0))",
+        ),
+        Measure(
+            "ROUND(AVG(ol.delivery_minutes) {filter}, 2)",
+            "avgdelivery_minutes_current", "avgdelivery_minutes_previous", output="SUM(COALESCE({}, 0))",
+        ),
+    ],
+    dense=False,
+    group_by=["f.product_name"],
+    columns=["f.product_name"],
+    order_by=["f.product_name", "d.curr_date"],
+)
+
+# Cells are aggregated per product, then summed per product group (the
+# product's first group id)
+SALES_PRODUCT_CATEGORY_REPORT = YoYReport(
+    ORDER_ITEMS,
+    dimensions=[
+        ("product_id", "oi.elem->>'productId'"),
+        ("product_name", "lp.name"),
+        ("group_ids", "lp.group_ids"),
+    ],
+    measures=[
+        Measure("COUNT(DISTINCT o.id)", "totalorder_current", "totalorder_previous", output="SUM(COALESCE({}, 0))"),
+        Measure("COUNT(DISTINCT o.customer_id)", "totalcustomer_current", "totalcustomer_previous", output="SUM(COALESCE({}, 0))"),
+        Measure("SUM((oi.elem->>'amount')::numeric)", "quantity_current", "quantiy_previous", output="SUM(COALESCE({}, 0))"),
+        Measure(
+            "ROUND(SUM((oi.elem->>'amount')::numeric * (oi.elem->>'unitPrice')::numeric) {filter}, 2)",
+            "totalpayment_current", "totalpayment_previous", output="SUM(COALESCE({}, 0))",
+        ),
+        Measure(
+            "ROUND(AVG(o.delivery_minutes) {filter}, 2)",
+            "avgdelivery_minutes_current", "avgdelivery_minutes_previous", output="SUM(COALESCE({}, 0))",
+        ),
+    ],
+    dense=False,
+    joins="""JOIN lightspeed_product_groups pg
+      ON pg.id = CAST(COALESCE(f.group_ids ->> 0, '0') AS BIGINT)""",
+    group_by=["pg.name"],
+    columns=["MAX(pg.id) AS product_category_id", "pg.name AS product_category_name"],
+    order_by=["d.curr_date", "pg.name"],
+)
+
+
+def fetch_monthly_stats_raw(start_date, end_date, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
     """
-    
-    params = [
-        start_date,
-        end_date,
-        start_date,
-        end_date+timedelta(days=1),
-        prev_start,
-        prev_end+timedelta(days=1),
-    ]
-    
-    with connection.cursor() as cursor:
-        cursor.execute(sql,params)
-        columns = [col[0] for col in cursor.description]
-        return [dict(zip(columns,row)) for row in cursor.fetchall()]
-#==============================Labour===============================
-def fetch_labour_area_raw(start_date,end_date):
-    prev_start=start_date.replace(year=start_date.year-1)
-    prev_end=end_date.replace(year=end_date.year-1)
-    
-    sql="""
-    WITH current_dates AS (
-        SELECT generate_series(
-            %s::date,
-            %s::date,
-            INTERVAL '1 day'
-        )::date AS curr_date
-    ),
-    previous_dates AS (
-        SELECT 
-            curr_date,
-            (curr_date - INTERVAL '1 year')::date AS prev_date
-        FROM current_dates
-    ),
-    cte_current_raw AS (
-        SELECT
-            c.location,
-            c.id,
-            c.work_date::date AS day_date,
-            c.duration_minutes as work_duration,
-            CASE
-				WHEN c.cost=0 then (s.cost*c.duration_minutes)/s.duration_minutes else c.cost
-			END as duration_costing,
-			--c.cost as duration_costing,
-            c.shift_id as shift_id
-        FROM shyfter_employee_clocking c
-		JOIN shyfter_employee_shift s
-		ON c.shift_id = s.id
-        where c.work_date >= %s
-          AND c.work_date < %s
-    ),
-    cte_current as (
-    select location,day_date,
-    count(*) as total_current_employee,
-    sum(work_duration) as total_work_duration,
-    sum(duration_costing) as total_duration_costing
-    from cte_current_raw
-    group by location,day_date
-    ),
-    cte_previous_raw AS (
-        SELECT
-            c.location,
-            c.id,
-            c.work_date::date AS day_date,
-            c.duration_minutes as work_duration,
-			CASE
-				WHEN c.cost=0 then (s.cost*c.duration_minutes)/s.duration_minutes else c.cost
-			END as duration_costing,
-            --c.cost as duration_costing,
-            c.shift_id as shift_id
-        FROM shyfter_employee_clocking c
-		JOIN shyfter_employee_shift s
-		ON c.shift_id = s.id
-        where c.work_date >= %s
-          AND c.work_date < %s
-    ),
-    cte_previous as (
-    select location,day_date,
-    count(*) as total_previous_employee,
-    sum(work_duration) as total_work_duration,
-    sum(duration_costing) as total_duration_costing
-    from cte_current_raw
-    group by location,day_date
-    ),
-    all_location as (
-    select distinct location from shyfter_employee_clocking
-    )
-    select 
-    loc.location,
-    to_char(pd.curr_date,'DD/MM/YYYY') as current_day,
-    to_char(pd.prev_date,'DD/MM/YYYY') as previous_day,
-    round(coalesce(c.total_current_employee,0),2) as total_current_employee,
-    round(coalesce(p.total_previous_employee,0),2) as total_previous_employee,
-    round(coalesce(c.total_duration_costing,0),2) as total_current_duration_costing,
-    round(coalesce(p.total_duration_costing,0),2) as total_previous_duration_costing,
-    round(coalesce(c.total_work_duration,0),2) as total_current_work_duration,
-    round(coalesce(p.total_work_duration,0),2) as total_previous_work_duration
-    from previous_dates pd 
-    cross join all_location loc
-    left join cte_current c
-    	on c.location=loc.location
-    	and c.day_date =pd.curr_date 
-    left join cte_previous p
-    	on p.location=loc.location
-    	and p.day_date =pd.prev_date
-    order by loc.location,pd.curr_date 
+    Sales per location and day for the current and previous-year window.
+    Reads the pre-aggregated lightspeed_daily_sales rollup, which the order
+    sync keeps up to date (see lightspeed_integration.rollups), or its weekly
+    and monthly rollups per week, month or quarter.
     """
-    params=[
-        start_date,
-        end_date,
-        start_date,
-        end_date+timedelta(days=1),
-        prev_start,
-        prev_end+timedelta(days=1)
-    ]
-    
-    with connection.cursor() as cursor:
-        cursor.execute(sql,params)
-        columns=[col[0] for col in cursor.description]
-        return [dict(zip(columns,row)) for row in cursor.fetchall()]
-    
-def fetch_labour_role_raw(start_date,end_date):
-    prev_start=start_date.replace(year=start_date.year-1)
-    prev_end=end_date.replace(year=end_date.year-1)
-    
-    sql="""
-    WITH current_dates AS (
-        SELECT generate_series(
-            %s::date,
-            %s::date,
-            INTERVAL '1 day'
-        )::date AS curr_date
-    ),
-    previous_dates AS (
-        SELECT 
-            curr_date,
-            (curr_date - INTERVAL '1 year')::date AS prev_date
-        FROM current_dates
-    ),
-    cte_current_raw AS (
-        SELECT
-            c.location,
-            c.id,
-            e.type as role,
-            c.work_date::date AS day_date,
-            c.duration_minutes as work_duration,
-            CASE
-				WHEN c.cost=0 then (s.cost*c.duration_minutes)/s.duration_minutes else c.cost
-			END as duration_costing,
-            c.shift_id as shift_id
-        FROM shyfter_employee_clocking c
-		JOIN shyfter_employee_shift s
-		ON c.shift_id = s.id
-		join shyfter_employee e
-		on e.id=s.employee_id
-        where c.work_date >= %s
-          AND c.work_date < %s
-    ),
-    cte_current as (
-    select day_date,role,
-    count(*) as total_current_employee,
-    sum(work_duration) as total_work_duration,
-    sum(duration_costing) as total_duration_costing
-    from cte_current_raw
-    group by role,day_date
-    ),
-    cte_previous_raw AS (
-        SELECT
-            c.location,
-            c.id,
-            e.type as role,
-            c.work_date::date AS day_date,
-            c.duration_minutes as work_duration,
-			CASE
-				WHEN c.cost=0 then (s.cost*c.duration_minutes)/s.duration_minutes else c.cost
-			END as duration_costing,
-            c.shift_id as shift_id
-        FROM shyfter_employee_clocking c
-		JOIN shyfter_employee_shift s
-		ON c.shift_id = s.id
-		join shyfter_employee e
-		on e.id=s.employee_id
-        where c.work_date >= %s
-          AND c.work_date < %s
-    ),
-    cte_previous as (
-    select day_date,role,
-    count(*) as total_previous_employee,
-    sum(work_duration) as total_work_duration,
-    sum(duration_costing) as total_duration_costing
-    from cte_current_raw
-    group by role,day_date
-    ),
-    all_type as (
-    select distinct type from shyfter_employee
-    )
-    select 
-    loc.type as role,
-    to_char(pd.curr_date,'DD/MM/YYYY') as current_day,
-    to_char(pd.prev_date,'DD/MM/YYYY') as previous_day,
-    round(coalesce(c.total_current_employee,0),2) as total_current_employee,
-    round(coalesce(p.total_previous_employee,0),2) as total_previous_employee,
-    round(coalesce(c.total_duration_costing,0),2) as total_current_duration_costing,
-    round(coalesce(p.total_duration_costing,0),2) as total_previous_duration_costing,
-    round(coalesce(c.total_work_duration,0),2) as total_current_work_duration,
-    round(coalesce(p.total_work_duration,0),2) as total_previous_work_duration
-    from previous_dates pd 
-    cross join all_type loc
-    left join cte_current c
-    	on c.role=loc.type
-    	and c.day_date =pd.curr_date
-    left join cte_previous p
-    	on p.role=loc.type
-    	and p.day_date =pd.prev_date
-    order by loc.type,pd.curr_date 
+    return stream_rows(*SALES_LOCATION_REPORT.query(start_date, end_date, alignment, granularity))
+
+def fetch_sales_orderType_raw(start_date, end_date, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
+    """Sales per order channel (first word of the external reference) and day, both years."""
+    return stream_rows(*SALES_ORDER_TYPE_REPORT.query(start_date, end_date, alignment, granularity))
     
+def fetch_sales_productItem_raw(start_date, end_date, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
     """
-    
-    params=[
-        start_date,
-        end_date,
-        start_date,
-        end_date+timedelta(days=1),
-        prev_start,
-        prev_end+timedelta(days=1)
-    ]
-    
-    with connection.cursor() as cursor:
-        cursor.execute(sql,params)
-        columns=[col[0] for col in cursor.description]
-        return [dict(zip(columns,row)) for row in cursor.fetchall()]
-    
-def fetch_labour_hour_raw(start_date,end_date):
-    # prev_start=start_date.replace(year=start_date.year-1)
-    # prev_end=end_date.replace(year=end_date.year-1)
-    
-    sql="""
-    WITH date_series AS (
-    SELECT generate_series(
-        %s::date,
-        %s::date,
-        INTERVAL '1 day'
-    )::date AS day_date
-    ),
-    hour_series AS (
-        SELECT generate_series(0, 23) AS hour_of_day
-    ),
-    calendar AS (
-        SELECT
-            d.day_date,
-            to_char(d.day_date, 'FMDay') AS day_name,
-            h.hour_of_day,
-            (d.day_date + make_interval(hours => h.hour_of_day)) AS hour_start,
-            (d.day_date + make_interval(hours => h.hour_of_day + 1)) AS hour_end
-        FROM date_series d
-        CROSS JOIN hour_series h
-    ),
-    calendar_prev AS (
-        SELECT
-            (d.day_date - INTERVAL '1 year')::date AS day_date,
-            to_char(d.day_date - INTERVAL '1 year', 'FMDay') AS day_name,
-            h.hour_of_day,
-            ((d.day_date - INTERVAL '1 year') + make_interval(hours => h.hour_of_day)) AS hour_start,
-            ((d.day_date - INTERVAL '1 year') + make_interval(hours => h.hour_of_day + 1)) AS hour_end
-        FROM date_series d
-        CROSS JOIN hour_series h
-    ),
-    cte_hourly AS (
-        SELECT
-            cal.day_name,
-            cal.hour_of_day,
-            cal.day_date,
-            to_char(cal.hour_start, 'HH24:MI') AS hour_label,
-            c.location,
-            c.id AS clocking_id,
-            c.employee_id,
-            c.shift_id,
-            s.duration_minutes AS shift_duration,
-            c.duration_minutes AS work_duration,
-            CASE
-                WHEN c.cost = 0
-                THEN (s.cost * c.duration_minutes) / NULLIF(s.duration_minutes, 0)
-                ELSE c.cost
-            END AS shift_cost,
-            (
-                CASE
-                    WHEN c.cost = 0
-                    THEN (s.cost * c.duration_minutes) / NULLIF(s.duration_minutes, 0)
-                    ELSE c.cost
-                END
-            ) / NULLIF(c.duration_minutes / 60.0, 0) AS hourly_cost
-        FROM calendar cal
-        LEFT JOIN shyfter_employee_clocking c
-            ON c.work_date = cal.day_date
-        AND cal.hour_start < c.end
-        AND cal.hour_end   > c.start
-        LEFT JOIN shyfter_employee_shift s
-            ON s.id = c.shift_id
-        AND s.employee_id = c.employee_id
-    ),
-    cte_hourly_prev AS (
-        SELECT
-            cal.day_name,
-            cal.hour_of_day,
-            cal.day_date,
-            to_char(cal.hour_start, 'HH24:MI') AS hour_label,
-            c.location,
-            c.id AS clocking_id,
-            c.employee_id,
-            c.shift_id,
-            s.duration_minutes AS shift_duration,
-            c.duration_minutes AS work_duration,
-            CASE
-                WHEN c.cost = 0
-                THEN (s.cost * c.duration_minutes) / NULLIF(s.duration_minutes, 0)
-                ELSE c.cost
-            END AS shift_cost,
-            (
-                CASE
-                    WHEN c.cost = 0
-                    THEN (s.cost * c.duration_minutes) / NULLIF(s.duration_minutes, 0)
-                    ELSE c.cost
-                END
-            ) / NULLIF(c.duration_minutes / 60.0, 0) AS hourly_cost
-        FROM calendar_prev cal
-        LEFT JOIN shyfter_employee_clocking c
-            ON c.work_date = cal.day_date
-        AND cal.hour_start < c.end
-        AND cal.hour_end   > c.start
-        LEFT JOIN shyfter_employee_shift s
-            ON s.id = c.shift_id
-        AND s.employee_id = c.employee_id
-    ),
-    final_cte as (
-    SELECT 
-    cur.day_name,
-        cur.hour_of_day,
-        --day_date,
-        --MIN(day_date) AS sample_day_date,                                                                                                                                                                                                                                                                                                                                                                    
-        coalesce(sum(cur.shift_duration),0) as total_shift_duration,
-        coalesce(sum(cur.work_duration),0) as total_work_duration,
-        coalesce(sum(cur.shift_cost),0) as total_shift_cost,
-        coalesce(sum(cur.hourly_cost),0) as total_hourly_cost,
-        coalesce(avg(cur.shift_duration),0) as avg_total_shift_duration,
-        coalesce(avg(cur.work_duration),0) as avg_total_work_duration,
-        coalesce(avg(cur.shift_cost),0) as avg_total_shift_cost,
-        coalesce(avg(cur.hourly_cost),0) as avg_total_hourly__forecastcavg,
-        coalesce(avg(prev.shift_duration),0) as forecast_total_shift_duration,
-        coalesce(avg(prev.work_duration),0) as forecast_total_work_duration,
-        coalesce(avg(prev.shift_cost),0) as forecast_total_shift_cost,
-        coalesce(avg(prev.hourly_cost),0) as forecast_total_hourly_cast
-    FROM cte_hourly cur
-    LEFT JOIN cte_hourly_prev prev
-    ON cur.day_name   = prev.day_name
-    AND cur.hour_of_day = prev.hour_of_day
-    group by cur.hour_of_day,cur.day_name
-    ORDER BY cur.day_name,cur.hour_of_day
-    )
-    select 
-        day_name,
-        hour_of_day,
-        --day_date,
-        --MIN(day_date) AS sample_day_date,                                                                                                                                                                                                                                                                                                                                                                    
-        MAX(total_shift_duration) as total_shift_duration,
-        MAX(total_work_duration) as total_work_duration,
-        MAx(total_shift_cost) as total_shift_cost,
-        MAX(total_hourly_cost) as total_hourly_cost,
-        MAX(avg_total_shift_duration) as avg_total_shift_duration,
-        MAX(avg_total_work_duration) as avg_total_work_duration,
-        MAX(avg_total_shift_cost) as avg_total_shift_cost,
-        MAX(avg_total_hourly__forecastcavg) as avg_total_hourly__forecastcavg,
-        MAX(forecast_total_shift_duration) as forecast_total_shift_duration,
-        MAX(forecast_total_work_duration) as forecast_total_work_duration,
-        MAX(forecast_total_shift_cost) as forecast_total_shift_cost,
-        MAX(forecast_total_hourly_cast) as forecast_total_hourly_cast,
-        coalesce(avg(forecast_total_shift_duration),0) as avg_forecast_total_shift_duration,
-        coalesce(avg(forecast_total_work_duration),0) as avg_forecast_total_work_duration,
-        coalesce(avg(forecast_total_shift_cost),0) as avg_forecast_total_shift_cost,
-        coalesce(avg(forecast_total_hourly_cast),0) as avg_forecast_total_hourly_cast
-    FROM final_cte final
-    group by hour_of_day,day_name
-    ORDER BY day_name,hour_of_day
+    Product item sales per (product, day) for the period and the same days last year.
 
+    Reads lightspeed_order_lines and returns only the cells where the product
+    sold something in either year; products × days densification is left to
+    build_product_item_stats_response.
     """
-    
-    params=[
-        start_date,
-        end_date,
-        # start_date,
-        # end_date+timedelta(days=1),
-        # prev_start,
-        # prev_end+timedelta(days=1)
-    ]
-    
-    with connection.cursor() as cursor:
-        cursor.execute(sql, params)
-        columns = [col[0] for col in cursor.description]
-        return [dict(zip(columns, row)) for row in cursor.fetchall()]
-  
-#==============================Operations===============================  
-def fetch_operation_dayOfWeek_raw(start_date,end_date):
-    prev_start=start_date.replace(year=start_date.year-1)
-    prev_end=end_date.replace(year=end_date.year-1)
-    
-    sql="""
-    WITH current_dates AS (
-    SELECT generate_series(
-        %s::date,
-        %s::date,
-        INTERVAL '1 day'
-    )::date AS curr_date
-    ),
-    previous_dates AS (
-        SELECT
-            curr_date,
-            (curr_date - INTERVAL '1 year')::date AS prev_date
-        FROM current_dates
-    ),
-    cte_current_raw AS (
-        SELECT
-            o.id AS order_id,
-            o.location,
-            o.creation_date::date AS day_date,
-            TO_CHAR(o.creation_date::date, 'FMDay') AS day_name,
-            /* 💰 payment per order */
-            SUM((p.elem->>'amount')::numeric) AS payment_amount,
-            /* 👥 guest count per order (MAX from order_items) */
-            MAX((t.elem->>'amount')::numeric) AS guest_count,
-            /* ⏱️ delivery minutes per order */
-            CASE
-                WHEN o.delivery_date IS NOT NULL
-                THEN EXTRACT(EPOCH FROM (o.delivery_date - o.creation_date)) / 60
-            END AS delivery_minutes,
-            o.customer_id
-        FROM lightspeed_orders o
-        LEFT JOIN LATERAL jsonb_array_elements(o.order_payments) p(elem)
-            ON TRUE
-        LEFT JOIN LATERAL jsonb_array_elements(o.order_items) t(elem)
-            ON TRUE
-        WHERE o.creation_date >= %s
-        AND o.creation_date <  %s
-        GROUP BY
-            o.id,
-            o.location,
-            o.creation_date,
-            o.delivery_date,
-            o.customer_id
-    ),
-    cte_current AS (
-        SELECT
-            location,
-            day_date,
-            day_name,
-            COUNT(order_id)             AS total_current,
-            COUNT(DISTINCT customer_id) AS total_customer_current,
-            SUM(payment_amount)         AS total_payment_current,
-            
-            SUM(guest_count)            AS total_guest_count_current,
-            AVG(delivery_minutes)       AS avg_delivery_minutes_current
-        FROM cte_current_raw
-        GROUP BY location, day_date, day_name
-    ),
-    cte_previous_raw AS (
-        SELECT
-            o.id AS order_id,
-            o.location,
-            o.creation_date::date AS day_date,
-            TO_CHAR(o.creation_date::date, 'FMDay') AS day_name,
-            SUM((p.elem->>'amount')::numeric) AS payment_amount,
-            MAX((t.elem->>'amount')::numeric) AS guest_count,
-            CASE
-                WHEN o.delivery_date IS NOT NULL
-                THEN EXTRACT(EPOCH FROM (o.delivery_date - o.creation_date)) / 60
-            END AS delivery_minutes,
-            o.customer_id
-        FROM lightspeed_orders o
-        LEFT JOIN LATERAL jsonb_array_elements(o.order_payments) p(elem)
-            ON TRUE
-        LEFT JOIN LATERAL jsonb_array_elements(o.order_items) t(elem)
-            ON TRUE
-        WHERE o.creation_date >= %s
-        AND o.creation_date <  %s
-        GROUP BY
-            o.id,
-            o.location,
-            o.creation_date,
-            o.delivery_date,
-            o.customer_id
-    ),
-    cte_previous AS (
-        SELECT
-            location,
-            day_date,
-            day_name,
-
-            COUNT(order_id)             AS total_previous,
-            COUNT(DISTINCT customer_id) AS total_customer_previous,
+    return stream_rows(*SALES_PRODUCT_ITEM_REPORT.query(start_date, end_date, alignment, granularity))
 
-            SUM(payment_amount)         AS total_payment_previous,
-            SUM(guest_count)            AS total_guest_count_previous,
 
-            AVG(delivery_minutes)       AS avg_delivery_minutes_previous
-        FROM cte_previous_raw
-        GROUP BY location, day_date, day_name
-    ),
-    all_locations AS (
-        SELECT DISTINCT location
-        FROM lightspeed_orders
-        WHERE creation_date >= %s
-        AND creation_date <  %s
-    )
-    SELECT
-        loc.location,
-        pd.curr_date AS current_day,
-        pd.prev_date AS previous_day,
-        TO_CHAR(pd.curr_date, 'FMDay') AS day_name,
-        COALESCE(c.total_current, 0)           AS totalOrder_current,
-        COALESCE(p.total_previous, 0)          AS totalOrder_previous,
-        COALESCE(c.total_customer_current, 0)  AS totalCustomer_current,
-        COALESCE(p.total_customer_previous, 0) AS totalCustomer_previous,
-        
-        COALESCE(c.total_guest_count_current, 0)  AS total_guest_count_current,
-        COALESCE(p.total_guest_count_previous, 0) AS total_guest_count_previous,
-        ROUND(COALESCE(c.total_payment_current, 0), 2)
-            AS totalPayment_current,
-        ROUND(COALESCE(p.total_payment_previous, 0), 2)
-            AS totalPayment_previous,
-        ROUND(COALESCE(c.avg_delivery_minutes_current, 0), 2)
-            AS avgDelivery_minutes_current,
-        ROUND(COALESCE(p.avg_delivery_minutes_previous, 0), 2)
-            AS avgDelivery_minutes_previous
-    FROM previous_dates pd
-    CROSS JOIN all_locations loc
-    LEFT JOIN cte_current c
-        ON c.location = loc.location
-    AND c.day_date = pd.curr_date
-    LEFT JOIN cte_previous p
-        ON p.location = loc.location
-    AND p.day_date = pd.prev_date
-    ORDER BY pd.curr_date;
-    """
-    params=[
-        start_date,
-        end_date,
-        start_date,
-        end_date+timedelta(days=1),
-        prev_start,
-        prev_end+timedelta(days=1),
-        prev_start,
-        end_date+timedelta(days=1),
-    ]
-    
+def fetch_product_names_raw():
+    """Product names of the product dimension, the product axis of the product item report."""
     with connection.cursor() as cursor:
-        cursor.execute(sql, params)
-        columns = [col[0] for col in cursor.description]
-        return [dict(zip(columns, row)) for row in cursor.fetchall()]
-    
-def fetch_operations_hour_raw(start_date,end_date):
-    
-    prev_start=start_date.replace(year=start_date.year-1)
-    prev_end=end_date.replace(year=end_date.year-1)
-    
-    sql="""
-    WITH date_series AS (
-    SELECT generate_series(
-        %s::date,
-        %s::date,
-        INTERVAL '1 day'
-    )::date AS day_date
-    ),
-    hour_series AS (
-        SELECT generate_series(0, 23) AS hour_of_day
-    ),
-
-    -- 🔹 Current year calendar
-    calendar AS (
-        SELECT
-            d.day_date,
-            to_char(d.day_date, 'FMDay') AS day_name,
-            h.hour_of_day,
-            d.day_date + make_interval(hours => h.hour_of_day)     AS hour_start,
-            d.day_date + make_interval(hours => h.hour_of_day + 1) AS hour_end
-        FROM date_series d
-        CROSS JOIN hour_series h
-    ),
-
-    -- 🔹 Previous year calendar
-    calendar_prev AS (
-        SELECT
-            (d.day_date - INTERVAL '1 year')::date AS day_date,
-            to_char(d.day_date - INTERVAL '1 year', 'FMDay') AS day_name,
-            h.hour_of_day,
-            (d.day_date - INTERVAL '1 year') + make_interval(hours => h.hour_of_day)     AS hour_start,
-            (d.day_date - INTERVAL '1 year') + make_interval(hours => h.hour_of_day + 1) AS hour_end
-        FROM date_series d
-        CROSS JOIN hour_series h
-    ),
-
-    -- 🔹 Current year hourly orders
-    cte_current_hourly AS (
-        SELECT
-            cal.day_date,
-            cal.day_name,
-            cal.hour_of_day,
-            o.location,
-            o.id AS order_id,
-            o.customer_id,
-            SUM((p.elem->>'amount')::numeric) AS payment_amount,
-            MAX((i.elem->>'amount')::numeric) AS guest_count,
-            CASE
-                WHEN o.delivery_date IS NOT NULL
-                THEN EXTRACT(EPOCH FROM (o.delivery_date - o.creation_date)) / 60
-            END AS delivery_minutes
-        FROM calendar cal
-        LEFT JOIN lightspeed_orders o
-            ON o.creation_date >= cal.hour_start
-        AND o.creation_date <  cal.hour_end
-        LEFT JOIN LATERAL jsonb_array_elements(o.order_payments) p(elem)
-            ON TRUE
-        LEFT JOIN LATERAL jsonb_array_elements(o.order_items) i(elem)
-            ON TRUE
-        GROUP BY
-            cal.day_date, cal.day_name, cal.hour_of_day,
-            o.location, o.id, o.customer_id, o.delivery_date
-    ),
-
-    -- 🔹 Previous year hourly orders
-    cte_previous_hourly AS (
-        SELECT
-            cal.day_date,
-            cal.day_name,
-            cal.hour_of_day,
-            o.location,
-            o.id AS order_id,
-            o.customer_id,
-            SUM((p.elem->>'amount')::numeric) AS payment_amount,
-            MAX((i.elem->>'amount')::numeric) AS guest_count,
-            CASE
-                WHEN o.delivery_date IS NOT NULL
-                THEN EXTRACT(EPOCH FROM (o.delivery_date - o.creation_date)) / 60
-            END AS delivery_minutes
-        FROM calendar_prev cal
-        LEFT JOIN lightspeed_orders o
-            ON o.creation_date >= cal.hour_start
-        AND o.creation_date <  cal.hour_end
-        LEFT JOIN LATERAL jsonb_array_elements(o.order_payments) p(elem)
-            ON TRUE
-        LEFT JOIN LATERAL jsonb_array_elements(o.order_items) i(elem)
-            ON TRUE
-        GROUP BY
-            cal.day_date, cal.day_name, cal.hour_of_day,
-            o.location, o.id, o.customer_id, o.delivery_date
-    )
-
-    SELECT
-        cur.day_name,
-        cur.hour_of_day,
-        to_char(make_interval(hours => cur.hour_of_day), 'HH24:MI') AS hour_label,
-
-        COUNT(cur.order_id)                         AS totalOrder_current,
-        COUNT(prev.order_id)                        AS totalOrder_previous,
-
-        COUNT(DISTINCT cur.customer_id)             AS totalCustomer_current,
-        COUNT(DISTINCT prev.customer_id)            AS totalCustomer_previous,
-
-        COALESCE(SUM(cur.guest_count), 0)            AS total_guest_count_current,
-        COALESCE(SUM(prev.guest_count), 0)           AS total_guest_count_previous,
+        cursor.execute("SELECT name FROM lightspeed_product_names")
+        return [row[0] for row in cursor.fetchall()]
 
-        ROUND(COALESCE(SUM(cur.payment_amount), 0), 2) AS totalPayment_current,
-        ROUND(COALESCE(SUM(prev.payment_amount), 0), 2) AS totalPayment_previous,
-
-        ROUND(COALESCE(AVG(cur.delivery_minutes), 0), 2) AS avgDelivery_minutes_current,
-        ROUND(COALESCE(AVG(prev.delivery_minutes), 0), 2) AS avgDelivery_minutes_previous
-
-    FROM cte_current_hourly cur
-    LEFT JOIN cte_previous_hourly prev
-        ON cur.location    = prev.location
-    AND cur.day_name    = prev.day_name
-    AND cur.hour_of_day = prev.hour_of_day
-
-    GROUP BY
-        cur.day_name,
-        cur.hour_of_day
-
-    ORDER BY
-        cur.hour_of_day;
-    """
-
-    params=[
-        start_date,
-        end_date,
-        # start_date,
-        # end_date+timedelta(days=1),
-        # prev_start,
-        # prev_end+timedelta(days=1),
-        # prev_start,
-        # end_date+timedelta(days=1),
-    ]
-    
-    with connection.cursor() as cursor:
-        cursor.execute(sql, params)
-        columns = [col[0] for col in cursor.description]
-        return [dict(zip(columns, row)) for row in cursor.fetchall()]
-    
-def fetch_operations_partOfDay_raw(start_date,end_date):
-    
-    prev_start=start_date.replace(year=start_date.year-1)
-    prev_end=end_date.replace(year=end_date.year-1)
-    
-    sql="""
-    WITH current_dates AS (
-    SELECT generate_series(
-        %s::date,
-        %s::date,
-        INTERVAL '1 day'
-    )::date AS curr_date
-    ),
-    previous_dates AS (
-        SELECT 
-            curr_date,
-            (curr_date - INTERVAL '1 year')::date AS prev_date
-        FROM current_dates
-    ),
-    -- 🔹 Current year raw
-    cte_current_raw AS (
-        SELECT
-            o.creation_date::date AS day_date,
-            CASE
-                WHEN EXTRACT(HOUR FROM o.creation_date) BETWEEN 6 AND 11 THEN 'breakfast'
-                WHEN EXTRACT(HOUR FROM o.creation_date) BETWEEN 12 AND 16 THEN 'lunch'
-                WHEN EXTRACT(HOUR FROM o.creation_date) BETWEEN 17 AND 22 THEN 'dinner'
-                ELSE 'late_night'
-            END AS part_of_day,
-            (p.elem->>'amount')::numeric AS payment_amount,
-            (t.elem->>'amount')::numeric AS total_guest_count,
-            o.customer_id,
-            CASE
-                WHEN o.delivery_date IS NOT NULL
-                THEN EXTRACT(EPOCH FROM (o.delivery_date - o.creation_date)) / 60
-            END AS delivery_minutes
-        FROM lightspeed_orders o
-        LEFT JOIN LATERAL jsonb_array_elements(o.order_payments) p(elem) ON TRUE
-        LEFT JOIN LATERAL jsonb_array_elements(o.order_items) t(elem) ON TRUE
-        WHERE o.creation_date >= %s
-        AND o.creation_date <  %s
-    ),
-    cte_current AS (
-        SELECT
-            day_date,
-            part_of_day,
-            COUNT(*) AS total_current,
-            COUNT(DISTINCT customer_id) AS total_customer_current,
-            SUM(payment_amount) AS total_payment_current,
-            MAX(total_guest_count) AS total_guest_count_current,
-            AVG(delivery_minutes) AS avg_delivery_minutes_current
-        FROM cte_current_raw
-        GROUP BY day_date, part_of_day
-    ),
-    -- 🔹 Previous year raw
-    cte_previous_raw AS (
-        SELECT
-            o.creation_date::date AS day_date,
-            CASE
-                WHEN EXTRACT(HOUR FROM o.creation_date) BETWEEN 6 AND 11 THEN 'breakfast'
-                WHEN EXTRACT(HOUR FROM o.creation_date) BETWEEN 12 AND 16 THEN 'lunch'
-                WHEN EXTRACT(HOUR FROM o.creation_date) BETWEEN 17 AND 22 THEN 'dinner'
-                ELSE 'late_night'
-            END AS part_of_day,
-            (p.elem->>'amount')::numeric AS payment_amount,
-            (t.elem->>'amount')::numeric AS total_guest_count,
-            o.customer_id,
-            CASE
-                WHEN o.delivery_date IS NOT NULL
-                THEN EXTRACT(EPOCH FROM (o.delivery_date - o.creation_date)) / 60
-            END AS delivery_minutes
-        FROM lightspeed_orders o
-        LEFT JOIN LATERAL jsonb_array_elements(o.order_payments) p(elem) ON TRUE
-        LEFT JOIN LATERAL jsonb_array_elements(o.order_items) t(elem) ON TRUE
-        WHERE o.creation_date >= %s
-        AND o.creation_date < %s
-    ),
-    cte_previous AS (
-        SELECT
-            day_date,
-            part_of_day,
-            COUNT(*) AS total_previous,
-            COUNT(DISTINCT customer_id) AS total_customer_previous,
-            SUM(payment_amount) AS total_payment_previous,
-            MAX(total_guest_count) AS total_guest_count_previous,
-            AVG(delivery_minutes) AS avg_delivery_minutes_previous
-        FROM cte_previous_raw
-        GROUP BY day_date, part_of_day
-    )
-    -- 🔹 Final result (date-driven, zero-filled)
-    SELECT
-        TO_CHAR(pd.curr_date, 'DD/MM/YYYY') AS current_day,
-        TO_CHAR(pd.prev_date, 'DD/MM/YYYY') AS previous_day,
-        cur.part_of_day,
-        ROUND(COALESCE(cur.total_current, 0), 2) AS totalOrder_current,
-        ROUND(COALESCE(prev.total_previous, 0), 2) AS totalOrder_previous,
-        ROUND(COALESCE(cur.total_customer_current, 0), 2) AS totalCustomer_current,
-        ROUND(COALESCE(prev.total_customer_previous, 0), 2) AS totalCustomer_previous,
-        ROUND(COALESCE(cur.total_guest_count_current, 0), 2) AS total_guest_count_current,
-        ROUND(COALESCE(prev.total_guest_count_previous, 0), 2) AS total_guest_count_previous,
-        ROUND(COALESCE(cur.total_payment_current, 0), 2) AS totalPayment_current,
-        ROUND(COALESCE(prev.total_payment_previous, 0), 2) AS totalPayment_previous,
-        ROUND(COALESCE(cur.avg_delivery_minutes_current, 0), 2) AS avgDelivery_minutes_current,
-        ROUND(COALESCE(prev.avg_delivery_minutes_previous, 0), 2) AS avgDelivery_minutes_previous
-    FROM previous_dates pd
-    LEFT JOIN cte_current cur
-        ON cur.day_date = pd.curr_date
-    LEFT JOIN cte_previous prev
-        ON prev.day_date = pd.prev_date
-        AND prev.part_of_day = cur.part_of_day
-    ORDER BY
-        pd.curr_date,
-        CASE cur.part_of_day
+def fetch_sales_productCategory_raw(start_date, end_date, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
+    """Sales per product group and day, both years; only cells where the group sold something."""
+    return stream_rows(*SALES_PRODUCT_CATEGORY_REPORT.query(start_date, end_date, alignment, granularity))
+#==============================Labour===============================
+LABOUR_MEASURES = [
+    Measure("COUNT(*)", "total_current_employee", "total_previous_employee"),
+    Measure("SUM(lf.cost)", "total_current_duration_costing", "total_previous_duration_costing"),
+    Measure("SUM(lf.work_minutes)", "total_current_work_duration", "total_previous_work_duration"),
+]
+
+LABOUR_AREA_REPORT = YoYReport(
+    LABOUR_FACTS,
+    dimensions=[("location", "lf.location")],
+    measures=LABOUR_MEASURES,
+    domain="SELECT account AS location FROM dim_location WHERE account IS NOT NULL",
+    order_by=["k.location", "d.curr_date"],
+)
+
+LABOUR_ROLE_REPORT = YoYReport(
+    LABOUR_FACTS,
+    dimensions=[("role", "lf.role")],
+    measures=LABOUR_MEASURES,
+    domain="SELECT DISTINCT type AS role FROM shyfter_employee",
+    order_by=["k.role", "d.curr_date"],
+)
+
+# Totals and averages of the period per weekday and hour; the previous
+# year's averages are the forecast
+LABOUR_HOUR_REPORT = YoYReport(
+    LABOUR_FACT_HOURS,
+    dimensions=[("day_name", "p.day_name"), ("hour_of_day", "h.hour_of_day")],
+    measures=[
+        Measure("SUM(lf.shift_minutes)", "total_shift_duration", None, output="COALESCE({}, 0)"),
+        Measure("SUM(lf.work_minutes)", "total_work_duration", None, output="COALESCE({}, 0)"),
+        Measure("SUM(lf.cost)", "total_shift_cost", None, output="COALESCE({}, 0)"),
+        Measure(f"SUM({LABOUR_HOURLY_COST})", "total_hourly_cost", None, output="COALESCE({}, 0)"),
+        Measure("AVG(lf.shift_minutes)", "avg_total_shift_duration", "forecast_total_shift_duration", output="COALESCE({}, 0)"),
+        Measure("AVG(lf.work_minutes)", "avg_total_work_duration", "forecast_total_work_duration", output="COALESCE({}, 0)"),
+        Measure("AVG(lf.cost)", "avg_total_shift_cost", "forecast_total_shift_cost", output="COALESCE({}, 0)"),
+        Measure(f"AVG({LABOUR_HOURLY_COST})", "avg_total_hourly_cost", "forecast_total_hourly_cost", output="COALESCE({}, 0)"),
+    ],
+    by_day=False,
+    domain=WEEKDAY_HOURS,
+    columns=[
+        "COALESCE(f.forecast_total_shift_duration, 0) AS avg_forecast_total_shift_duration",
+        "COALESCE(f.forecast_total_work_duration, 0) AS avg_forecast_total_work_duration",
+        "COALESCE(f.forecast_total_shift_cost, 0) AS avg_forecast_total_shift_cost",
+        "COALESCE(f.forecast_total_hourly_cost, 0) AS avg_forecast_total_hourly_cost",
+    ],
+    order_by=["k.day_name", "k.hour_of_day"],
+)
+
+
+def fetch_labour_area_raw(start_date, end_date, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
+    """Clockings, clocked cost and minutes per location and day, both years."""
+    return stream_rows(*LABOUR_AREA_REPORT.query(start_date, end_date, alignment, granularity))
+    
+def fetch_labour_role_raw(start_date, end_date, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
+    """Clockings, clocked cost and minutes per employee type and day, both years."""
+    return stream_rows(*LABOUR_ROLE_REPORT.query(start_date, end_date, alignment, granularity))
+    
+def fetch_labour_hour_raw(start_date, end_date, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
+    """Clocked minutes and cost per weekday and hour, with last year's averages as forecast."""
+    return stream_rows(*LABOUR_HOUR_REPORT.query(start_date, end_date, alignment, granularity))
+  
+#==============================Operations===============================  
+# Order columns of the operations reports
+OPERATION_MEASURES = [
+    Measure("COUNT(o.id)", "totalOrder_current", "totalOrder_previous", output="COALESCE({}, 0)"),
+    Measure("COUNT(DISTINCT o.customer_id)", "totalCustomer_current", "totalCustomer_previous", output="COALESCE({}, 0)"),
+    Measure("SUM(o.guest_amount)", "total_guest_count_current", "total_guest_count_previous", output="COALESCE({}, 0)"),
+    Measure("SUM(o.payment_total)", "totalPayment_current", "totalPayment_previous"),
+    Measure("AVG(o.delivery_minutes)", "avgDelivery_minutes_current", "avgDelivery_minutes_previous"),
+]
+
+# Merged delivery-minutes histogram of a cell (NULL without deliveries), for
+# the time-to-serve percentiles
+SERVICE_HISTOGRAM_MEASURES = [
+    Measure(
+        "service_histogram_union(sh.delivery_histogram)",
+        "delivery_histogram_current", "delivery_histogram_previous", output="{}",
+    ),
+]
+
+# Per location and day, for the locations with orders in either window
+OPERATION_DAY_OF_WEEK_REPORT = YoYReport(
+    ORDERS,
+    dimensions=[("location", "o.location")],
+    measures=OPERATION_MEASURES,
+    domain="SELECT DISTINCT location FROM facts",
+    day_format=None,
+    columns=["d.day_name"],
+    order_by=["d.curr_date", "k.location"],
+    granularities=[DAY_GRANULARITY],
+    extra_facts=YoYReport(HOURLY_SERVICE, [("location", "sh.location")], SERVICE_HISTOGRAM_MEASURES),
+)
+
+OPERATION_HOUR_REPORT = YoYReport(
+    ORDERS,
+    dimensions=[("day_name", "p.day_name"), ("hour_of_day", "o.local_hour")],
+    measures=OPERATION_MEASURES,
+    by_day=False,
+    domain=WEEKDAY_HOURS,
+    columns=["k.hour_label"],
+    order_by=["k.hour_of_day", "k.day_name"],
+    extra_facts=YoYReport(
+        HOURLY_SERVICE,
+        [("day_name", "p.day_name"), ("hour_of_day", "sh.hour")],
+        SERVICE_HISTOGRAM_MEASURES,
+        by_day=False,
+    ),
+)
+
+# Every day, with one row per part of the day that had orders
+# (a row without part_of_day when it had none)
+OPERATION_PART_OF_DAY_REPORT = YoYReport(
+    ORDERS,
+    dimensions=[("part_of_day", PART_OF_DAY)],
+    measures=[
+        Measure("COUNT(*)", "totalOrder_current", "totalOrder_previous"),
+        Measure("COUNT(DISTINCT o.customer_id)", "totalCustomer_current", "totalCustomer_previous"),
+        Measure("MAX(o.guest_amount)", "total_guest_count_current", "total_guest_count_previous"),
+        Measure("SUM(o.payment_total)", "totalPayment_current", "totalPayment_previous"),
+        Measure("AVG(o.delivery_minutes)", "avgDelivery_minutes_current", "avgDelivery_minutes_previous"),
+    ],
+    require_current=True,
+    order_by=[
+        "d.curr_date",
+        """CASE f.part_of_day
             WHEN 'breakfast'  THEN 1
             WHEN 'lunch'      THEN 2
             WHEN 'dinner'     THEN 3
             WHEN 'late_night' THEN 4
-        END;
+        END""",
+    ],
+    extra_facts=YoYReport(
+        HOURLY_SERVICE,
+        [("part_of_day", PART_OF_DAY_SQL.format(hour="sh.hour"))],
+        SERVICE_HISTOGRAM_MEASURES,
+    ),
+)
+
+
+def fetch_operation_dayOfWeek_raw(start_date, end_date, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
+    """Orders per location and day (dates and weekday name), both years, with their delivery-minutes histograms."""
+    return stream_rows(*OPERATION_DAY_OF_WEEK_REPORT.query(start_date, end_date, alignment, granularity))
+    
+def fetch_operations_hour_raw(start_date, end_date, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
+    """Orders per weekday and hour over the period, both years, with their delivery-minutes histograms."""
+    return stream_rows(*OPERATION_HOUR_REPORT.query(start_date, end_date, alignment, granularity))
+    
+def fetch_operations_partOfDay_raw(start_date, end_date, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
+    """Orders per day and part of the day, both years, with their delivery-minutes histograms."""
+    return stream_rows(*OPERATION_PART_OF_DAY_REPORT.query(start_date, end_date, alignment, granularity))
+    
+#==============================Shared scans===============================
+# Report name (as cached, see report_cache.REPORT_SOURCES) → its declaration
+YOY_REPORTS = {
+    "sales_area": SALES_LOCATION_REPORT,
+    "sales_location": SALES_LOCATION_REPORT,
+    "sales_orderType": SALES_ORDER_TYPE_REPORT,
+    "sales_productItem": SALES_PRODUCT_ITEM_REPORT,
+    "sales_productCategory": SALES_PRODUCT_CATEGORY_REPORT,
+    "labour_area": LABOUR_AREA_REPORT,
+    "labour_role": LABOUR_ROLE_REPORT,
+    "labour_hour": LABOUR_HOUR_REPORT,
+    "operation_dayOfWeek": OPERATION_DAY_OF_WEEK_REPORT,
+    "operation_hour": OPERATION_HOUR_REPORT,
+    "operation_partOfDay": OPERATION_PART_OF_DAY_REPORT,
+}
+
+
+def fetch_reports_raw(names, start_date, end_date, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
+    """
+    Raw rows of several reports (YOY_REPORTS names) for the same period, YoY
+    alignment and granularity.
 
+    Reports reading the same source rows (e.g. the order type, day of week,
+    hour and part of day reports over lightspeed_orders) are aggregated in one
+    shared scan (see yoy_sql.SharedScan); a report declared once per name
+    (sales_area/sales_location) is queried once.
+
+    Returns:
+        dict: Report name → list of ReportRow
     """
-    
-    params=[
-        start_date,
-        end_date,
-        start_date,
-        end_date+timedelta(days=1),
-        prev_start,
-        prev_end+timedelta(days=1),
-    ]
-    
-    with connection.cursor() as cursor:
-        cursor.execute(sql,params)
-        columns=[col[0] for col in cursor.description]
-        return [dict(zip(columns,row)) for row in cursor.fetchall()]
-    
+    by_report = {}
+    for name in names:
+        by_report.setdefault(YOY_REPORTS[name], []).append(name)
+
+    by_source = {}
+    for report in by_report:
+        by_source.setdefault(report.source_for(granularity).scan_key, []).append(report)
+
+    results = {}
+    for reports in by_source.values():
+        if len(reports) == 1:
+            rows = list(stream_rows(*reports[0].query(start_date, end_date, alignment, granularity)))
+            results.update((name, rows) for name in by_report[reports[0]])
+            continue
+
+        scan = SharedScan({by_report[report][0]: report for report in reports}, granularity)
+        create_sql, params, queries = scan.query(start_date, end_date, alignment)
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(create_sql, params)
+            for name, sql in queries.items():
+                rows = list(stream_rows(sql, params))
+                results.update((alias, rows) for alias in by_report[YOY_REPORTS[name]])
+            with connection.cursor() as cursor:
+                cursor.execute(scan.drop_sql)
+    return results
+
 #==============================Inventory===============================
 
 def fetch_inventory_location_raw(start_date,end_date):
@@ -1437,7 +507,4 @@ def fetch_inventory_location_raw(start_date,end_date):
         prev_end+timedelta(days=1),
     ]
     
-    with connection.cursor() as cursor:
-        cursor.execute(sql,params)
-        columns=[col[0] for col in cursor.description]
-        return [dict(zip(columns,row)) for row in cursor.fetchall()]
\ No newline at end of file
+    return stream_rows(sql, params)
\ No newline at end of file
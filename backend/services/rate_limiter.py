@@ -0,0 +1,59 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Tokens refill continuously at `rate` per second up to `capacity`; each
+    request takes one. Callers block in acquire() only when the bucket is
+    empty, so bursts up to `capacity` go out immediately and the long-run
+    throughput never exceeds `rate`.
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = float(rate)
+        self.capacity = max(1, int(capacity))
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def acquire(self, tokens: int = 1):
+        """Block until `tokens` are available, then take them."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def drain(self, seconds: float):
+        """Take every token and push the refill `seconds` into the future (e.g. after a 429 Retry-After)."""
+        with self._lock:
+            self._refill()
+            self._tokens = -seconds * self.rate
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, rate: float, capacity: int = 1) -> TokenBucket:
+    """
+    Return the process-wide bucket registered under `name`, creating it on first use.
+    Every caller hitting the same API quota must use the same name.
+    """
+    with _buckets_lock:
+        bucket = _buckets.get(name)
+        if bucket is None:
+            bucket = TokenBucket(rate, capacity)
+            _buckets[name] = bucket
+        return bucket
@@ -0,0 +1,94 @@
+from backend.services.monthly_stats_builder import (
+    build_labourArea_stats,
+    build_labourHour_stats,
+    build_labourRole_stats,
+    build_monthly_stats_response,
+    build_operation_dayOfWeek_stats,
+    build_operation_hour_stats,
+    build_operations_partOfDay_stats,
+    build_orderType_stats_response,
+    build_product_category_stats_reponse,
+    build_product_item_stats_response,
+)
+from backend.services.monthly_stats_sql import fetch_product_names_raw, fetch_reports_raw
+from backend.services.report_cache import report_cache
+from backend.services.yoy_sql import DEFAULT_ALIGNMENT, DEFAULT_GRANULARITY, bucket_bounds, yoy_options
+
+
+def _build_product_items(raw_data, start_date, end_date, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
+    return build_product_item_stats_response(
+        raw_data,
+        start_date,
+        end_date,
+        product_names=fetch_product_names_raw(),
+        alignment=alignment,
+        granularity=granularity,
+    )
+
+
+# Bundle name (the report endpoint's path, reports/lightspeed/<name>/) →
+# (report name as cached and fetched, builder of its response)
+BUNDLE_REPORTS = {
+    "sales-area": ("sales_area", build_monthly_stats_response),
+    "sales-location": ("sales_location", build_monthly_stats_response),
+    "sales-productItem": ("sales_productItem", _build_product_items),
+    "sales-productCategory": ("sales_productCategory", build_product_category_stats_reponse),
+    "sales-orderType": ("sales_orderType", build_orderType_stats_response),
+    "labour-area": ("labour_area", build_labourArea_stats),
+    "labour-role": ("labour_role", build_labourRole_stats),
+    "labour-hour": ("labour_hour", build_labourHour_stats),
+    "operation-dayOfWeek": ("operation_dayOfWeek", build_operation_dayOfWeek_stats),
+    "operation-hour": ("operation_hour", build_operation_hour_stats),
+    "operation-partOfDay": ("operation_partOfDay", build_operations_partOfDay_stats),
+}
+
+# Report name → bundle name
+BUNDLE_NAMES = {report: name for name, (report, _) in BUNDLE_REPORTS.items()}
+
+
+def build_report_bundle(names, start_date, end_date, filters=None):
+    """
+    Responses of several report endpoints for the same period.
+
+    Responses already in report_cache are reused. The others are fetched
+    together (fetch_reports_raw: one shared scan per source table, e.g. one
+    pass over lightspeed_orders for the order type, day of week, hour and part
+    of day reports), built with the endpoints' builders and cached under the
+    endpoints' keys, so a later call of a single endpoint is a cache hit.
+
+    Args:
+        names: BUNDLE_REPORTS names
+        start_date: First day of the period
+        end_date: Last day of the period
+        filters: Remaining query params (part of the cache keys); `alignment`
+                 and `granularity` select the YoY alignment and the report
+                 granularity (see yoy_sql.yoy_options)
+
+    Returns:
+        dict: Name → that endpoint's response data, in the order requested
+    """
+    names = list(dict.fromkeys(names))
+    alignment, granularity = yoy_options(filters or {})
+    responses = {}
+    missing = {}
+    for name in names:
+        report, _ = BUNDLE_REPORTS[name]
+        key = report_cache.make_key(report, start_date, end_date, filters)
+        data = report_cache.get(key)
+        if data is None:
+            missing[name] = key
+        else:
+            responses[name] = data
+
+    if missing:
+        start_date, end_date = bucket_bounds(start_date, end_date, granularity)
+        raw = fetch_reports_raw(
+            [BUNDLE_REPORTS[name][0] for name in missing], start_date, end_date, alignment, granularity
+        )
+        for name, key in missing.items():
+            report, build = BUNDLE_REPORTS[name]
+            data = build(raw[report], start_date, end_date, alignment=alignment, granularity=granularity)
+            report_cache.set(key, data, start_date, end_date, filters)
+            responses[name] = data
+
+    return {name: responses[name] for name in names}
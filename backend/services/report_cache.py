@@ -0,0 +1,320 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.response import Response
+
+from backend.services.yoy_sql import bucket_bounds, previous_period, yoy_options
+
+logger = logging.getLogger(__name__)
+
+
+# Data each report is computed from; stores of these sources invalidate it
+REPORT_SOURCES = {
+    "sales_area": {"orders"},
+    "sales_location": {"orders"},
+    "sales_orderType": {"orders"},
+    "sales_productItem": {"orders", "products"},
+    "sales_productCategory": {"orders", "products"},
+    "labour_area": {"clockings"},
+    "labour_role": {"clockings"},
+    "labour_hour": {"clockings"},
+    "operation_dayOfWeek": {"orders"},
+    "operation_hour": {"orders"},
+    "operation_partOfDay": {"orders"},
+    "inventory_location": {"receipts"},
+}
+
+_DEFAULTS = {
+    "MAX_ENTRIES": 256,
+    # Periods that include today keep changing while orders come in
+    "OPEN_PERIOD_TTL": 300,
+    # Past periods only change through a sync, which invalidates them explicitly
+    "CLOSED_PERIOD_TTL": 24 * 60 * 60,
+    # Invalidation log rows older than this can no longer match a live entry
+    "LOG_RETENTION": 2 * 24 * 60 * 60,
+    # Seconds between reads of the invalidation log; lookups in between are served from memory
+    "INVALIDATION_POLL_INTERVAL": 5,
+}
+
+
+def _config(name):
+    return getattr(settings, "REPORT_CACHE", {}).get(name, _DEFAULTS[name])
+
+
+def period_ttl(end_date):
+    """Seconds a report of a period ending on end_date stays valid without invalidation."""
+    return _config("OPEN_PERIOD_TTL") if end_date >= timezone.localdate() else _config("CLOSED_PERIOD_TTL")
+
+
+class _Entry:
+    __slots__ = ("data", "expires_at", "sources", "location", "ranges")
+
+    def __init__(self, data, expires_at, sources, location, ranges):
+        self.data = data
+        self.expires_at = expires_at
+        self.sources = sources
+        self.location = location
+        self.ranges = ranges
+
+    def depends_on(self, source, location, start_day, end_day):
+        if source not in self.sources:
+            return False
+        if location and self.location and location.lower() != self.location.lower():
+            return False
+        if start_day is None and end_day is None:
+            return True
+        start_day = start_day or date.min
+        end_day = end_day or date.max
+        return any(start_day <= r_end and r_start <= end_day for r_start, r_end in self.ranges)
+
+
+class ReportCache:
+    """
+    In-process LRU cache of built report responses, keyed by
+    (report, start_date, end_date, filters).
+
+    Entries expire after a TTL (short for periods that include today, long for
+    past periods) and are evicted least-recently-used beyond MAX_ENTRIES.
+    Syncs call invalidate() for the location and days they stored; the call is
+    also recorded in backend.models.ReportCacheInvalidation so every worker
+    process drops the same entries on its first lookup after the next poll
+    of the log (at most every INVALIDATION_POLL_INTERVAL seconds).
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_invalidation_id = None
+        self._last_poll = None
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------ keys
+
+    @staticmethod
+    def make_key(report, start_date, end_date, filters=None):
+        return (report, str(start_date), str(end_date), tuple(sorted((filters or {}).items())))
+
+    # --------------------------------------------------------------- lookups
+
+    def get(self, key):
+        self._apply_remote_invalidations()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.data
+
+    def set(self, key, data, start_date, end_date, filters=None):
+        report = key[0]
+        alignment, granularity = yoy_options(filters or {})
+        start_date, end_date = bucket_bounds(start_date, end_date, granularity)
+        entry = _Entry(
+            data=data,
+            expires_at=time.monotonic() + period_ttl(end_date),
+            sources=REPORT_SOURCES.get(report, set()),
+            location=(filters or {}).get("location"),
+            ranges=(
+                (start_date, end_date),
+                previous_period(start_date, end_date, alignment, granularity),
+            ),
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > _config("MAX_ENTRIES"):
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    # ---------------------------------------------------------- invalidation
+
+    def invalidate(self, source, location=None, start_day=None, end_day=None):
+        """
+        Drop every cached report computed from `source` data of `location`
+        (None = any location) between start_day and end_day (None = unbounded),
+        in this process and, through the invalidation log, in all others.
+        """
+        from backend.models import ReportCacheInvalidation
+
+        try:
+            ReportCacheInvalidation.objects.create(
+                source=source,
+                location=location,
+                start_day=start_day,
+                end_day=end_day,
+            )
+            ReportCacheInvalidation.objects.filter(
+                created_at__lt=timezone.now() - timedelta(seconds=_config("LOG_RETENTION"))
+            ).delete()
+        except Exception as exc:
+            # Without the log other workers keep their entries until the TTL expires
+            logger.error("Could not record report cache invalidation: %s", exc)
+
+        try:
+            from backend.services.report_jobs import drop_report_results
+
+            drop_report_results(source, location, start_day, end_day)
+        except Exception as exc:
+            logger.error("Could not drop stored report job results: %s", exc)
+
+        dropped = self._invalidate_local(source, location, start_day, end_day)
+        logger.info(
+            "Report cache invalidated for %s %s %s→%s (%s entries)",
+            source, location or "all locations", start_day, end_day, dropped,
+        )
+
+    def _invalidate_local(self, source, location, start_day, end_day):
+        with self._lock:
+            stale = [
+                key for key, entry in self._entries.items()
+                if entry.depends_on(source, location, start_day, end_day)
+            ]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def _apply_remote_invalidations(self):
+        from backend.models import ReportCacheInvalidation
+
+        now = time.monotonic()
+        if self._last_poll is not None and now - self._last_poll < _config("INVALIDATION_POLL_INTERVAL"):
+            return
+        self._last_poll = now
+
+        try:
+            if self._last_invalidation_id is None:
+                # Fresh process: nothing cached yet, only later invalidations matter
+                latest = ReportCacheInvalidation.objects.order_by("-id").values_list("id", flat=True).first()
+                self._last_invalidation_id = latest or 0
+                return
+
+            pending = list(
+                ReportCacheInvalidation.objects
+                .filter(id__gt=self._last_invalidation_id)
+                .order_by("id")
+                .values_list("id", "source", "location", "start_day", "end_day")
+            )
+        except Exception as exc:
+            logger.error("Could not read report cache invalidations: %s", exc)
+            return
+
+        for inv_id, source, location, start_day, end_day in pending:
+            self._invalidate_local(source, location, start_day, end_day)
+            self._last_invalidation_id = inv_id
+
+
+report_cache = ReportCache()
+
+
+def invalidate_reports(source, location=None, start_day=None, end_day=None):
+    """Shortcut for report_cache.invalidate(); see ReportCache.invalidate."""
+    report_cache.invalidate(source, location, start_day, end_day)
+
+
+def report_options(params, report=None):
+    """
+    Period and YoY options of a report request's query params.
+
+    Args:
+        params: Query params (start_date, end_date, alignment, granularity)
+        report: Report name; its granularities are checked when it is one of YOY_REPORTS
+
+    Returns:
+        tuple: (start_date, end_date, alignment, granularity), the dates widened
+               to whole buckets of the granularity
+
+    Raises:
+        ValueError: Missing or malformed dates, unknown alignment or
+                    granularity, or a granularity the report isn't available at
+    """
+    from backend.services.monthly_stats_sql import YOY_REPORTS
+
+    start = params.get("start_date")
+    end = params.get("end_date")
+    if not start or not end:
+        raise ValueError("start_date and end_date are required")
+    try:
+        start_day = datetime.strptime(start, "%Y-%m-%d").date()
+        end_day = datetime.strptime(end, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError("start_date and end_date must be YYYY-MM-DD dates")
+
+    alignment, granularity = yoy_options(params)
+    if report in YOY_REPORTS and granularity not in YOY_REPORTS[report].granularities:
+        raise ValueError(f"{report} is not available per {granularity}")
+
+    start_day, end_day = bucket_bounds(start_day, end_day, granularity)
+    return start_day, end_day, alignment, granularity
+
+
+def cached_report(report):
+    """
+    Parse a report view's period and YoY options once (report_options) and
+    cache its successful responses in report_cache.
+
+    The view is called with start_date, end_date, alignment and granularity
+    keyword arguments; invalid options get a 400 without calling it. The key
+    is (report, start_date, end_date, remaining query params).
+    With ?async=true the report is queued instead (backend.services.report_jobs)
+    and the response is the job to poll.
+
+    Usage:
+        @api_view(["GET"])
+        @permission_classes([IsAnyAuthenticatedUser])
+        @cached_report("sales_area")
+        def lightspeed_sales_area(request, start_date, end_date, alignment, granularity): ...
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            try:
+                start_day, end_day, alignment, granularity = report_options(request.GET, report)
+            except ValueError as exc:
+                return Response({"error": str(exc)}, status=400)
+
+            filters = {
+                name: value for name, value in request.GET.items()
+                if name not in ("start_date", "end_date", "async")
+            }
+
+            from backend.services.report_bundle import BUNDLE_NAMES
+            from backend.services.report_jobs import job_response, submit_report_job, wants_async
+
+            # Reports without a bundle builder are cheap enough to stay synchronous
+            if wants_async(request) and report in BUNDLE_NAMES:
+                return job_response(request, submit_report_job([BUNDLE_NAMES[report]], start_day, end_day, filters))
+
+            key = report_cache.make_key(report, start_day, end_day, filters)
+
+            data = report_cache.get(key)
+            if data is not None:
+                return Response(data)
+
+            response = view(
+                request, *args,
+                start_date=start_day, end_date=end_day, alignment=alignment, granularity=granularity,
+                **kwargs,
+            )
+            if response.status_code == 200:
+                report_cache.set(key, response.data, start_day, end_day, filters)
+            return response
+
+        return wrapper
+
+    return decorator
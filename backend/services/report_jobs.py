@@ -0,0 +1,228 @@
+import hashlib
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.response import Response
+
+from backend.models import ReportJob, ReportJobResult
+from backend.services.report_bundle import BUNDLE_REPORTS, build_report_bundle
+from backend.services.report_cache import REPORT_SOURCES, period_ttl
+from backend.services.yoy_sql import bucket_bounds, previous_day, yoy_options
+
+logger = logging.getLogger(__name__)
+
+# Worker threads of this process computing queued reports
+REPORT_JOB_WORKERS = 2
+# Seconds after which a running (or still queued) job is considered lost with its worker process
+REPORT_JOB_TIMEOUT = 30 * 60
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _workers():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=getattr(settings, "REPORT_JOB_WORKERS", REPORT_JOB_WORKERS),
+                thread_name_prefix="report-job",
+            )
+        return _pool
+
+
+def wants_async(request):
+    """Whether a report request opted into the job queue (?async=true)."""
+    return request.GET.get("async", "").lower() in ("1", "true", "yes")
+
+
+def job_key(names, start_date, end_date, filters=None, bundle=False):
+    """Hash identifying a report request; identical requests share one job and result."""
+    request = {
+        "reports": list(names),
+        "bundle": bundle,
+        "start_date": str(start_date),
+        "end_date": str(end_date),
+        "filters": sorted((filters or {}).items()),
+    }
+    return hashlib.sha256(json.dumps(request).encode()).hexdigest()
+
+
+def submit_report_job(names, start_date, end_date, filters=None, bundle=False):
+    """
+    Queue the computation of report endpoints' responses, unless an identical
+    request is already queued or running (that job is returned) or has a
+    result that is still valid (its finished job is returned). Returning a
+    queued job starts a worker in this process too, so jobs left behind by a
+    dead process still get drained; jobs queued or running for longer than
+    REPORT_JOB_TIMEOUT are failed and queued again.
+
+    Args:
+        names: BUNDLE_REPORTS names
+        start_date: First day of the period
+        end_date: Last day of the period
+        filters: Remaining query params
+        bundle: The result is the bundle response ({name: data}) rather than
+                the single report's data
+
+    Returns:
+        ReportJob: Job to poll
+    """
+    names = list(dict.fromkeys(names))
+    filters = filters or {}
+    key = job_key(names, start_date, end_date, filters, bundle)
+
+    if ReportJobResult.objects.filter(key=key, expires_at__gt=timezone.now()).exists():
+        done = ReportJob.objects.filter(key=key, status=ReportJob.STATUS_DONE, result_id=key).order_by("-finished_at").first()
+        if done is not None:
+            return done
+
+    now = timezone.now()
+    timeout = timedelta(seconds=getattr(settings, "REPORT_JOB_TIMEOUT", REPORT_JOB_TIMEOUT))
+    ReportJob.objects.filter(key=key, status=ReportJob.STATUS_RUNNING, started_at__lt=now - timeout).update(
+        status=ReportJob.STATUS_FAILED, error="Abandoned by its worker", finished_at=now,
+    )
+    ReportJob.objects.filter(key=key, status=ReportJob.STATUS_QUEUED, created_at__lt=now - timeout).update(
+        status=ReportJob.STATUS_FAILED, error="Never picked up by a worker", finished_at=now,
+    )
+
+    active = ReportJob.objects.filter(key=key, status__in=ReportJob.ACTIVE_STATUSES).first()
+    if active is not None:
+        if active.status == ReportJob.STATUS_QUEUED:
+            # Its worker may have died with the process that queued it
+            transaction.on_commit(lambda: _workers().submit(_drain))
+        return active
+
+    try:
+        with transaction.atomic():
+            job = ReportJob.objects.create(
+                key=key,
+                reports=names,
+                bundle=bundle,
+                start_date=start_date,
+                end_date=end_date,
+                filters=filters,
+            )
+    except IntegrityError:
+        # An identical request queued it first
+        job = ReportJob.objects.filter(key=key).order_by("-created_at").first()
+        if job is not None:
+            return job
+        raise
+
+    transaction.on_commit(lambda: _workers().submit(_drain))
+    logger.info("Report job %s queued: %s %s→%s", job.id, ", ".join(names), start_date, end_date)
+    return job
+
+
+def _claim_next():
+    """Mark the oldest queued job running and return it (None when the queue is empty)."""
+    with transaction.atomic():
+        job = (
+            ReportJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=ReportJob.STATUS_QUEUED)
+            .order_by("created_at")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = ReportJob.STATUS_RUNNING
+        job.started_at = timezone.now()
+        job.save(update_fields=["status", "started_at"])
+    return job
+
+
+def _drain():
+    """Worker thread: run queued jobs (of any process) until none is left."""
+    try:
+        while True:
+            job = _claim_next()
+            if job is None:
+                return
+            run_report_job(job)
+    except Exception:
+        logger.exception("Report job worker stopped")
+    finally:
+        connection.close()
+
+
+def run_report_job(job):
+    """Compute a claimed job's response and store it as the result of its key."""
+    try:
+        responses = build_report_bundle(job.reports, job.start_date, job.end_date, job.filters)
+        alignment, granularity = yoy_options(job.filters)
+        start_day, end_day = bucket_bounds(job.start_date, job.end_date, granularity)
+        ReportJobResult.objects.update_or_create(
+            key=job.key,
+            defaults={
+                "data": responses if job.bundle else responses[job.reports[0]],
+                "sources": sorted(set().union(*(REPORT_SOURCES.get(BUNDLE_REPORTS[name][0], ()) for name in job.reports))),
+                "location": job.filters.get("location"),
+                "first_day": previous_day(start_day, alignment, granularity),
+                "last_day": end_day,
+                "expires_at": timezone.now() + timedelta(seconds=period_ttl(end_day)),
+            },
+        )
+        job.status = ReportJob.STATUS_DONE
+        job.result_id = job.key
+    except Exception as exc:
+        logger.exception("Report job %s failed", job.id)
+        job.status = ReportJob.STATUS_FAILED
+        job.error = str(exc)
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "result", "error", "finished_at"])
+    logger.info("Report job %s %s in %.2fs", job.id, job.status, (job.finished_at - job.started_at).total_seconds())
+
+
+def drop_report_results(source, location=None, start_day=None, end_day=None):
+    """
+    Delete stored results built from `source` data of `location` (None = any)
+    between start_day and end_day (None = unbounded), and expired ones.
+    Jobs keep their status; polling them reports the result as expired.
+    """
+    stale = Q(sources__contains=[source])
+    if location:
+        stale &= Q(location__isnull=True) | Q(location__iexact=location)
+    if start_day is not None:
+        stale &= Q(last_day__gte=start_day)
+    if end_day is not None:
+        stale &= Q(first_day__lte=end_day)
+    return ReportJobResult.objects.filter(stale | Q(expires_at__lte=timezone.now())).delete()[0]
+
+
+def job_response(request, job, status=None):
+    """
+    Response describing a job: its state, the URL to poll and, once done,
+    the report data (the same data the synchronous request returns).
+    """
+    payload = {
+        "job_id": str(job.id),
+        "status": job.status,
+        "reports": job.reports,
+        "start_date": str(job.start_date),
+        "end_date": str(job.end_date),
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "poll_url": request.build_absolute_uri(reverse("lightspeed_report_job", args=[job.id])),
+    }
+    if job.status == ReportJob.STATUS_FAILED:
+        payload["error"] = job.error
+    elif job.status == ReportJob.STATUS_DONE:
+        result = job.result
+        if result is None or result.expires_at <= timezone.now():
+            # Invalidated by a sync since; requesting the report again recomputes it
+            payload["status"] = "expired"
+        else:
+            payload["result"] = result.data
+    return Response(payload, status=status or (202 if job.status in ReportJob.ACTIVE_STATUSES else 200))
@@ -0,0 +1,101 @@
+"""
+Time-to-serve percentiles from the delivery-minutes histograms stored per
+location, day and hour in lightspeed_hourly_service.
+
+A histogram is a list of order counts, one per bucket of
+SERVICE_HISTOGRAM_EDGES. Histograms of any set of hours merge by adding them
+up (service_histogram_union in SQL, merge_histograms here): the operations
+reports return the merged histogram of each of their cells, and the builders
+merge those of the cells an overall row covers before reading percentiles.
+"""
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import accumulate
+from operator import add
+
+# Lower edge (minutes) of every histogram bucket: one-minute buckets below an
+# hour, five-minute buckets below three hours, then one bucket for longer
+# times. The SQL twin is service_histogram_bucket (lightspeed_integration
+# migration 0019).
+SERVICE_HISTOGRAM_EDGES = tuple(range(0, 60)) + tuple(range(60, 180, 5)) + (180,)
+
+# Percentiles the operations reports return
+SERVICE_PERCENTILES = (50, 90, 99)
+
+# Row fields holding them, current and previous year
+SERVICE_PERCENTILE_FIELDS = tuple(
+    field
+    for percentile in SERVICE_PERCENTILES
+    for field in (f"time_to_serve_p{percentile}", f"time_to_serve_p{percentile}_ly")
+)
+
+
+def merge_histograms(histograms):
+    """Bucket-wise sum of histograms, None ones skipped (None when all are)."""
+    merged = None
+    for histogram in histograms:
+        if histogram is None:
+            continue
+        merged = list(histogram) if merged is None else list(map(add, merged, histogram))
+    return merged
+
+
+def histogram_percentiles(histogram, percentiles=SERVICE_PERCENTILES):
+    """
+    Delivery minutes under which each of `percentiles` % of a histogram's
+    orders were served, interpolated linearly inside their bucket; the
+    open-ended last bucket gives its lower edge. 0s for an empty (or None)
+    histogram.
+    """
+    cumulative = list(accumulate(histogram)) if histogram else []
+    total = cumulative[-1] if cumulative else 0
+    if not total:
+        return [0] * len(percentiles)
+
+    values = []
+    for percentile in percentiles:
+        rank = total * percentile / 100
+        # First bucket reaching the rank; it has orders since rank > 0
+        i = bisect_left(cumulative, rank)
+        lower = SERVICE_HISTOGRAM_EDGES[i]
+        if i + 1 == len(SERVICE_HISTOGRAM_EDGES):
+            values.append(float(lower))
+            continue
+        seen = cumulative[i - 1] if i else 0
+        width = SERVICE_HISTOGRAM_EDGES[i + 1] - lower
+        values.append(round(lower + width * (rank - seen) / (cumulative[i] - seen), 2))
+    return values
+
+
+def service_percentiles(histogram, histogram_ly):
+    """SERVICE_PERCENTILE_FIELDS of a report row from its current and previous-year histograms."""
+    current = histogram_percentiles(histogram)
+    previous = histogram_percentiles(histogram_ly)
+    return dict(zip(SERVICE_PERCENTILE_FIELDS, (value for pair in zip(current, previous) for value in pair)))
+
+
+class ServiceHistograms:
+    """
+    Histograms of report cells merged per key (e.g. the day of an overall
+    row), the current and previous year apart.
+
+    Usage:
+        service = ServiceHistograms()
+        for row in raw_data:
+            service.add(row["current_day"], row["delivery_histogram_current"], row["delivery_histogram_previous"])
+        service.percentiles(day)  # SERVICE_PERCENTILE_FIELDS of the day
+    """
+
+    def __init__(self):
+        self._merged = defaultdict(lambda: [None, None])
+
+    def add(self, key, histogram, histogram_ly):
+        merged = self._merged[key]
+        if histogram is not None:
+            merged[0] = merge_histograms((merged[0], histogram))
+        if histogram_ly is not None:
+            merged[1] = merge_histograms((merged[1], histogram_ly))
+
+    def percentiles(self, key):
+        histogram, histogram_ly = self._merged.get(key, (None, None))
+        return service_percentiles(histogram, histogram_ly)
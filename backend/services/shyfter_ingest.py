@@ -0,0 +1,270 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db import connections
+
+from backend.models import ShyfterEmployee, ShyfterEmployeeClocking, ShyfterEmployeeShift
+from backend.services.bulk_upsert import BULK_UPSERT_BATCH_SIZE, BulkUpserter
+from backend.services.dimensions import add_locations
+from backend.services.http_client import get_http_client
+from backend.services.labour_facts import refresh_labour_facts
+from backend.services.iter_90_day_ranges import iter_90_day_ranges
+from backend.services.shyfter_mappers import _get_shyfter_headers, _map_clocking_to_model_fields, _map_shift_to_model_fields
+
+logger = logging.getLogger(__name__)
+
+# Records per bulk upsert of the DB writer
+SHYFTER_WRITE_BATCH_SIZE = BULK_UPSERT_BATCH_SIZE
+
+_KINDS = {
+    "clockings": (ShyfterEmployeeClocking, _map_clocking_to_model_fields),
+    "shifts": (ShyfterEmployeeShift, _map_shift_to_model_fields),
+}
+
+# refresh_labour_facts() argument naming the upserted ids of each kind
+_FACT_IDS = {
+    "clockings": "clocking_ids",
+    "shifts": "shift_ids",
+}
+
+_DONE = object()
+
+
+def _http_fetch(location):
+    """
+    Default fetcher: a blocking GET through the shared Shyfter client (pooled
+    session, per-location token bucket, 429/5xx retries). Returns the JSON payload.
+    """
+    client = get_http_client("shyfter")
+
+    def fetch(url, headers):
+        response = client.get(url, headers=headers, timeout=20, limiter_key=location)
+        response.raise_for_status()
+        return response.json()
+
+    return fetch
+
+
+def _iter_jobs(kind, employees, start_date, end_date, base_url):
+    """First-page URL of every (employee, window) the sync has to walk."""
+    for employee in employees:
+        if kind == "shifts":
+            # Shyfter only serves shifts in windows of at most 90 days
+            for win_start, win_end in iter_90_day_ranges(start_date, end_date):
+                query = urlencode({"start": win_start, "end": win_end})
+                yield employee, f"{base_url}/employees/{employee.id}/shifts?{query}"
+        else:
+            query = urlencode({"start": start_date})
+            yield employee, f"{base_url}/employees/{employee.id}/clockings?{query}"
+
+
+def _write_batch(upserter, rows, kind):
+    """
+    Upsert one batch of (id, fields) rows, rebuild the labour facts of the
+    clockings it touched and add new accounts to the location dimension;
+    runs in the writer's DB thread.
+    """
+    for pk, fields in rows:
+        upserter.add(pk, fields)
+    upserter.flush()
+    refresh_labour_facts(**{_FACT_IDS[kind]: [pk for pk, _ in rows]})
+    add_locations(accounts=(fields["location"] for _, fields in rows))
+
+
+async def _fetch_worker(jobs, records, fetch, headers, http_pool, stats):
+    """Walk the pages of queued (employee, url) jobs and hand the records to the writer."""
+    loop = asyncio.get_running_loop()
+    while True:
+        job = await jobs.get()
+        if job is _DONE:
+            return
+        employee, next_url = job
+        while next_url:
+            try:
+                payload = await loop.run_in_executor(http_pool, fetch, next_url, headers)
+            except Exception as exc:
+                logger.warning("Shyfter fetch failed for employee=%s url=%s : %s", employee.id, next_url, exc)
+                stats["failed_requests"] += 1
+                break  # move to next window / employee
+
+            stats["requests"] += 1
+            rows = payload.get("data", [])
+            stats["total_fetched"] += len(rows)
+            await records.put((employee, rows))
+            next_url = payload.get("links", {}).get("next")
+
+
+async def _db_writer(records, kind, location, batch_size, stats):
+    """
+    Single consumer that turns fetched records into bulk upserts of batch_size.
+    Writes run in one dedicated thread so the sync holds a single DB connection.
+    """
+    model, mapper = _KINDS[kind]
+    upserter = BulkUpserter(model, batch_size=batch_size)
+    loop = asyncio.get_running_loop()
+    db_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"shyfter-{kind}-db")
+    pending = {}
+
+    async def flush():
+        if not pending:
+            return
+        rows = list(pending.items())
+        pending.clear()
+        await loop.run_in_executor(db_pool, _write_batch, upserter, rows, kind)
+        stats["inserted"] = upserter.inserted
+        stats["updated"] = upserter.updated
+        stats["total_saved"] = upserter.saved
+        stats["batches"] = upserter.batches
+
+    try:
+        while True:
+            item = await records.get()
+            if item is _DONE:
+                break
+            employee, rows = item
+            for row in rows:
+                if not row.get("id"):
+                    stats["skipped"] += 1
+                    continue
+                fields = mapper(row, employee, location)
+                if not fields["start"]:
+                    stats["skipped"] += 1
+                    continue
+                # Later pages win if Shyfter returns the same record twice
+                pending[str(row["id"])] = fields
+                work_date = fields["work_date"]
+                stats["first_day"] = min(filter(None, (stats["first_day"], work_date)))
+                stats["last_day"] = max(filter(None, (stats["last_day"], work_date)))
+            if len(pending) >= batch_size:
+                await flush()
+        await flush()
+    finally:
+        await loop.run_in_executor(db_pool, connections.close_all)
+        db_pool.shutdown()
+
+
+async def _ingest(kind, location, employees, start_date, end_date, concurrency, batch_size, fetch, base_url):
+    stats = {
+        "requests": 0,
+        "failed_requests": 0,
+        "total_fetched": 0,
+        "total_saved": 0,
+        "inserted": 0,
+        "updated": 0,
+        "skipped": 0,
+        "batches": 0,
+        "first_day": None,
+        "last_day": None,
+    }
+    headers = _get_shyfter_headers(location)
+    jobs = asyncio.Queue()
+    # Bounded so fetchers wait for the writer instead of buffering everything in memory
+    records = asyncio.Queue(maxsize=concurrency * 4)
+
+    for job in _iter_jobs(kind, employees, start_date, end_date, base_url):
+        jobs.put_nowait(job)
+    for _ in range(concurrency):
+        jobs.put_nowait(_DONE)
+
+    http_pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f"shyfter-{kind}-http")
+    writer = asyncio.create_task(_db_writer(records, kind, location, batch_size, stats))
+    fetchers = asyncio.gather(*(
+        _fetch_worker(jobs, records, fetch, headers, http_pool, stats)
+        for _ in range(concurrency)
+    ))
+    done = None
+    try:
+        await asyncio.wait({fetchers, writer}, return_when=asyncio.FIRST_COMPLETED)
+        if writer.done():
+            # The writer only stops before the fetchers when a write failed
+            writer.result()
+        await fetchers
+        # A full queue only drains while the writer runs; if its last flushes
+        # fail the put would wait forever, so wait on the writer as well
+        done = asyncio.ensure_future(records.put(_DONE))
+        await asyncio.wait({done, writer}, return_when=asyncio.FIRST_COMPLETED)
+        if writer.done():
+            writer.result()
+        await writer
+    finally:
+        fetchers.cancel()
+        writer.cancel()
+        if done is not None:
+            done.cancel()
+        http_pool.shutdown(wait=False)
+    return stats
+
+
+def ingest_shyfter(kind, location, start_date, end_date=None, employee_ids=None,
+                   concurrency=None, batch_size=None, fetch=None, base_url=None):
+    """
+    Fetch Shyfter clockings or shifts for every employee of a location
+    concurrently and bulk upsert them.
+
+    (employee, window) page chains are fanned out over `concurrency` asyncio
+    workers; the HTTP calls themselves run in a thread pool of the same size
+    through the shared Shyfter client, so the token bucket applies across all of
+    them. One writer coroutine batches the records into bulk upserts and
+    rebuilds the labour_fact rows of every batch.
+
+    Args:
+        kind: "clockings" or "shifts"
+        location: Shyfter account (credentials and stored location)
+        start_date: First day to fetch
+        end_date: Last day (shifts only; default: today)
+        employee_ids: Restrict to these employees (default: all of the location)
+        concurrency: Page chains fetched at once (default: settings.SHYFTER_SYNC_CONCURRENCY)
+        batch_size: Records per bulk upsert (default: SHYFTER_WRITE_BATCH_SIZE)
+        fetch: Callable (url, headers) -> JSON payload replacing the HTTP layer,
+               e.g. for a local stub
+        base_url: Shyfter API root (default: settings.SHYFTER_API_URL)
+
+    Returns:
+        dict: location, kind, employees_processed, requests, failed_requests,
+              total_fetched, total_saved, inserted, updated, skipped, batches,
+              first_day, last_day, duration
+    """
+    if kind not in _KINDS:
+        raise ValueError(f"Unknown Shyfter ingest kind: {kind}")
+
+    start_date = date.fromisoformat(start_date) if isinstance(start_date, str) else start_date
+    end_date = date.fromisoformat(end_date) if isinstance(end_date, str) else (end_date or date.today())
+    concurrency = concurrency or settings.SHYFTER_SYNC_CONCURRENCY
+    batch_size = batch_size or SHYFTER_WRITE_BATCH_SIZE
+
+    employees = ShyfterEmployee.objects.filter(location=location)
+    if employee_ids:
+        employees = employees.filter(id__in=employee_ids)
+    employees = list(employees)
+
+    started = time.time()
+    stats = asyncio.run(_ingest(
+        kind,
+        location,
+        employees,
+        start_date,
+        end_date,
+        concurrency,
+        batch_size,
+        fetch or _http_fetch(location),
+        (base_url or settings.SHYFTER_API_URL or "").rstrip("/"),
+    ))
+    duration = round(time.time() - started, 2)
+
+    logger.info(
+        "Shyfter %s sync %s | employees=%s requests=%s fetched=%s inserted=%s updated=%s failed=%s duration=%.2fs",
+        kind, location, len(employees), stats["requests"], stats["total_fetched"],
+        stats["inserted"], stats["updated"], stats["failed_requests"], duration,
+    )
+    return {
+        "location": location,
+        "kind": kind,
+        "employees_processed": len(employees),
+        **stats,
+        "duration": duration,
+    }
@@ -0,0 +1,167 @@
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+
+
+def _get_shyfter_headers(location: str = "Frietchalet") -> dict:
+    """
+    Build Shyfter headers for the given location.
+
+    Supports both:
+      - New per-location credentials via SHYFTER_AUTHORIZATION_CREDENTIALS (mapping)
+      - Old single-token setup via SHYFTER_AUTHORIZATION_TOKEN (backward compatible)
+
+    Expected SHYFTER_AUTHORIZATION_CREDENTIALS structure (per location):
+        {
+            "Frietchalet": {
+                "token": "<bearer_token>",
+                "department": "<department_id>"
+            },
+            "Tipzakske": { ... },
+            "Frietbooster": { ... }
+        }
+
+    If a location is missing or credentials are incomplete, this safely falls
+    back to the legacy env values.
+    """
+    default_department = "zVJk0KP2O45e3LZO"
+    token = getattr(settings, "SHYFTER_AUTHORIZATION_TOKEN", None)
+    department = default_department
+
+    creds_by_location = getattr(settings, "SHYFTER_AUTHORIZATION_CREDENTIALS", None)
+    if isinstance(creds_by_location, dict):
+        creds = creds_by_location.get(location)
+        if isinstance(creds, dict):
+            token = creds.get("token") or token
+            department = creds.get("Shyfter-Department") or default_department
+        elif isinstance(creds, str):
+            # If value is just a token string, keep default department
+            token = creds or token
+
+    headers = {
+        "Accept": "application/json",
+        "Shyfter-Department": department,
+    }
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+
+    return headers
+
+
+def _map_shyfter_employee_to_model_fields(emp, location):
+    return {
+        # 🔑 Core
+        "type": emp.get("type"),
+        "active": emp.get("active", True),
+        "location": location,
+
+        # 👤 Personal
+        "first_name": emp.get("first_name"),
+        "last_name": emp.get("last_name"),
+        "display_name": emp.get("display_name"),
+
+        "gender": emp.get("gender"),
+        "civil_state": emp.get("civil_state"),
+        "avatar": emp.get("avatar"),
+
+        # 📞 Contact
+        "email": emp.get("email"),
+        "phone": emp.get("phone"),
+        "national_number": emp.get("national_number"),
+        "iban": emp.get("iban"),
+
+        # 🌍 Locale
+        "language": emp.get("language", "en"),
+
+        # 🎂 Birth
+        "birth_date": emp.get("birth_date") or None,
+        "birth_place": emp.get("birth_place"),
+        "birth_country": emp.get("birth_country"),
+
+        # 💰 Work
+        "hourly_cost": emp.get("hourly_cost") or 0,
+        "category": emp.get("category"),
+
+        # 🧩 JSON blobs (IMPORTANT)
+        "address": emp.get("address") or {},
+        "settings": emp.get("settings") or {},
+        "defaults": emp.get("defaults") or {},
+        "custom_fields": emp.get("custom_fields") or [],
+
+        # 🧾 RAW PAYLOAD (CRITICAL)
+        "raw_data": emp,
+    }
+    
+
+def _safe_parse_dt(value):
+    if isinstance(value, str):
+        return parse_datetime(value)
+    return None
+
+
+def _map_shift_to_model_fields(shift, employee, location):
+    start_dt = _safe_parse_dt(shift.get("start"))
+    end_dt = _safe_parse_dt(shift.get("end"))
+
+    duration = 0
+    if start_dt and end_dt and end_dt >= start_dt:
+        duration = int((end_dt - start_dt).total_seconds() / 60)
+
+    return {
+        "employee": employee,
+        "start": start_dt,
+        "end": end_dt,
+        "work_date": start_dt.date() if start_dt else None,
+        "duration_minutes": duration,
+
+        "published": shift.get("published", False),
+        "type": shift.get("type"),
+        "cost": shift.get("cost"),
+
+        "breaks": shift.get("breaks") or {},
+        "social_secretary": shift.get("socialSecretary") or {},
+
+        "location": location,
+        "raw_data": shift,
+    }
+
+
+def _safe_parse_datetime(value):
+    if not value or not isinstance(value, str):
+        return None
+    return parse_datetime(value)
+
+def _map_clocking_to_model_fields(clocking, employee, location):
+    start_dt = _safe_parse_datetime(clocking.get("start"))
+    end_dt = _safe_parse_datetime(clocking.get("end"))
+
+    duration = 0
+   
+    if start_dt and end_dt:
+        if end_dt >= start_dt:
+            duration = int((end_dt - start_dt).total_seconds() / 60)
+        else:
+            # 🚨 Invalid clocking (end before start)
+            duration = 0
+            # optional: mark in raw_data for later audit
+
+    return {
+        "employee": employee,
+        "shift_id": clocking.get("shift"),
+        "start": start_dt,
+        "end": end_dt,
+        "work_date": start_dt.date() if start_dt else None,
+        "duration_minutes": duration,
+        "cost": clocking.get("cost"),
+        "approved": clocking.get("approved", False),
+        "comment": clocking.get("comment"),
+        "location": location,
+
+        # JSON
+        "skills": clocking.get("skills") or [],
+        "clock_in": clocking.get("in") or {},
+        "clock_out": clocking.get("out") or {},
+        "breaks": clocking.get("breaks") or [],
+
+        # RAW
+        "raw_data": clocking,
+    }
@@ -0,0 +1,613 @@
+from datetime import timedelta
+
+from lightspeed_integration.partitions import creation_bounds
+
+# Values of the period flag every source row is tagged with
+CURRENT = "current"
+PREVIOUS = "previous"
+
+# How a report day maps to the previous-year day it is compared with:
+# the same date (29 Feb compares with 28 Feb, like Postgres'
+# `- INTERVAL '1 year'`) or the same weekday 52 weeks earlier. Both are
+# precomputed per day in calendar_day (backend.models.CalendarDay).
+DATE_ALIGNMENT = "date"
+WEEKDAY_ALIGNMENT = "weekday"
+ALIGNMENTS = (DATE_ALIGNMENT, WEEKDAY_ALIGNMENT)
+DEFAULT_ALIGNMENT = DATE_ALIGNMENT
+
+# Report granularities: the calendar_day column holding the first day of
+# the bucket (week, month or quarter) a day is reported in. A report over
+# buckets spans whole buckets and has one row per bucket, keyed on its
+# first day.
+DAY_GRANULARITY = "day"
+WEEK_GRANULARITY = "week"
+MONTH_GRANULARITY = "month"
+QUARTER_GRANULARITY = "quarter"
+GRANULARITIES = {
+    DAY_GRANULARITY: "day",
+    WEEK_GRANULARITY: "week_start",
+    MONTH_GRANULARITY: "month_start",
+    QUARTER_GRANULARITY: "quarter_start",
+}
+DEFAULT_GRANULARITY = DAY_GRANULARITY
+
+# Report days or buckets (keyed on their first day, with its weekday) and
+# the previous-year day or bucket each one is compared with, read from the
+# calendar dimension. Days follow %(alignment)s; weeks compare with the week
+# 52 weeks earlier and months and quarters with the same one a year earlier.
+# yoy_periods has one row per (report day or bucket, day it reads, period)
+# with the weekday of the day it reads; `once` is false on the second
+# mapping of a 28 Feb (same-date alignment of a 29 Feb), so reports without
+# a day in their result count it once.
+YOY_DAYS_SQL = """
+    yoy_days AS (
+        SELECT
+            c.day AS curr_date,
+            c.day_name,
+            {prev_date} AS prev_date,
+            {prev_once} AS prev_once
+        FROM calendar_day c
+        WHERE c.day BETWEEN %(start)s AND %(end)s{bucket_filter}
+    ),
+    yoy_periods AS (
+        SELECT d.curr_date, c.day, c.day_name, 'current' AS period, TRUE AS once
+        FROM yoy_days d
+        JOIN calendar_day c
+          ON c.{bucket} = d.curr_date
+        WHERE c.day BETWEEN %(start)s AND %(end)s
+        UNION ALL
+        SELECT d.curr_date, c.day, c.day_name, 'previous' AS period, d.prev_once AS once
+        FROM yoy_days d
+        JOIN calendar_day c
+          ON c.{bucket} = d.prev_date
+        WHERE c.day BETWEEN %(prev_start)s AND %(prev_end)s
+    )"""
+
+# Dimension values of the weekday × hour reports: the weekdays in the
+# period, each with the 24 hours of the hour dimension
+WEEKDAY_HOURS = """
+    SELECT w.day_name, h.hour_of_day, h.hour_label
+    FROM (SELECT DISTINCT day_name FROM yoy_periods WHERE period = 'current') w
+    CROSS JOIN calendar_hour h
+"""
+
+
+def yoy_days_sql(granularity=DEFAULT_GRANULARITY):
+    """yoy_days and yoy_periods (YOY_DAYS_SQL) of a granularity (see GRANULARITIES)."""
+    bucket = GRANULARITIES[granularity]
+    if granularity == DAY_GRANULARITY:
+        return YOY_DAYS_SQL.format(
+            prev_date="CASE %(alignment)s WHEN 'weekday' THEN c.same_weekday_last_year ELSE c.same_date_last_year END",
+            prev_once="%(alignment)s = 'weekday' OR NOT c.is_leap_day",
+            bucket_filter="",
+            bucket=bucket,
+        )
+    return YOY_DAYS_SQL.format(
+        prev_date="c.same_weekday_last_year" if granularity == WEEK_GRANULARITY else "c.same_date_last_year",
+        prev_once="TRUE",
+        bucket_filter=f"\n          AND c.day = c.{bucket}",
+        bucket=bucket,
+    )
+
+
+def yoy_options(params):
+    """
+    (alignment, granularity) of a report request's query params, defaulting
+    to DEFAULT_ALIGNMENT and DEFAULT_GRANULARITY.
+
+    Raises:
+        ValueError: Unknown alignment or granularity
+    """
+    alignment = params.get("alignment", DEFAULT_ALIGNMENT)
+    if alignment not in ALIGNMENTS:
+        raise ValueError(f"alignment must be one of: {', '.join(ALIGNMENTS)}")
+    granularity = params.get("granularity", DEFAULT_GRANULARITY)
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of: {', '.join(GRANULARITIES)}")
+    return alignment, granularity
+
+
+def year_before(day):
+    """Same calendar day one year earlier; 29 Feb falls back to 28 Feb."""
+    try:
+        return day.replace(year=day.year - 1)
+    except ValueError:
+        return day.replace(year=day.year - 1, day=28)
+
+
+def bucket_start(day, granularity=DEFAULT_GRANULARITY):
+    """First day of the bucket `day` is reported in."""
+    if granularity == WEEK_GRANULARITY:
+        return day - timedelta(days=day.weekday())
+    if granularity == MONTH_GRANULARITY:
+        return day.replace(day=1)
+    if granularity == QUARTER_GRANULARITY:
+        return day.replace(month=(day.month - 1) // 3 * 3 + 1, day=1)
+    return day
+
+
+def next_bucket(day, granularity=DEFAULT_GRANULARITY):
+    """First day of the bucket after the one `day` is reported in."""
+    start = bucket_start(day, granularity)
+    if granularity == WEEK_GRANULARITY:
+        return start + timedelta(weeks=1)
+    if granularity in (MONTH_GRANULARITY, QUARTER_GRANULARITY):
+        month = start.month - 1 + (3 if granularity == QUARTER_GRANULARITY else 1)
+        return start.replace(year=start.year + month // 12, month=month % 12 + 1)
+    return start + timedelta(days=1)
+
+
+def bucket_bounds(start_date, end_date, granularity=DEFAULT_GRANULARITY):
+    """start_date..end_date widened to whole buckets: (first day, last day)."""
+    return bucket_start(start_date, granularity), next_bucket(end_date, granularity) - timedelta(days=1)
+
+
+def iter_buckets(start_date, end_date, granularity=DEFAULT_GRANULARITY):
+    """First days of the buckets start_date..end_date spans, in order."""
+    day = bucket_start(start_date, granularity)
+    while day <= end_date:
+        yield day
+        day = next_bucket(day, granularity)
+
+
+def previous_day(day, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
+    """
+    Previous-year day a report day (or a bucket's first day) is compared
+    with: per `alignment` (see ALIGNMENTS) for days, 52 weeks earlier for
+    weeks, one year earlier for months and quarters.
+    """
+    if granularity == WEEK_GRANULARITY or granularity == DAY_GRANULARITY and alignment == WEEKDAY_ALIGNMENT:
+        return day - timedelta(weeks=52)
+    return year_before(day)
+
+
+def previous_period(start_date, end_date, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
+    """
+    (first, last) previous-year day of the days start_date..end_date (whole
+    buckets) are compared with.
+    """
+    if granularity == DAY_GRANULARITY:
+        return previous_day(start_date, alignment), previous_day(end_date, alignment)
+    last = previous_day(next_bucket(end_date, granularity), alignment, granularity) - timedelta(days=1)
+    return previous_day(start_date, alignment, granularity), last
+
+
+def hour_slices(start, end, day, alias="h"):
+    """
+    Derived table splitting a [start, end) interval into the hour buckets it
+    overlaps on `day`: one row per hour ({alias}.hour_start,
+    {alias}.hour_of_day), clipped to that day, none when `end` is NULL.
+    It refers to the columns of the outer row, so it goes in the FROM of a
+    correlated subquery or after CROSS JOIN LATERAL.
+
+    Only the hours an interval covers are generated, so the cost is linear
+    in the rows instead of testing every row against 24 calendar hours.
+    """
+    return f"""(
+            SELECT slice AS hour_start, EXTRACT(HOUR FROM slice)::int AS hour_of_day
+            FROM generate_series(
+                date_trunc('hour', GREATEST({start}, {day}::timestamptz)),
+                LEAST({end}, ({day} + 1)::timestamptz) - INTERVAL '1 microsecond',
+                INTERVAL '1 hour'
+            ) slice
+        ) {alias}"""
+
+
+class Source:
+    """
+    Rows a report aggregates.
+
+    Args:
+        relation: FROM clause (tables, joins, LATERALs) with their aliases
+        day: Expression of a row's report day; the current and previous-year
+             windows are both matched on it
+        partition_column: Partition key of a partitioned table (see
+                          lightspeed_integration.partitions); bounding it per
+                          window lets the planner prune the monthly partitions
+        where: Extra row filter
+    """
+
+    def __init__(self, relation, day, partition_column=None, where=None):
+        self.relation = relation
+        self.day = day
+        self.partition_column = partition_column
+        self.where = where
+
+    @property
+    def scan_key(self):
+        """Sources with the same key read the same rows, apart from `where`."""
+        return (self.relation, self.day, self.partition_column)
+
+    def window_filters(self):
+        """Row filters selecting both windows (without `where`)."""
+        filters = [f"({self.day} BETWEEN %(start)s AND %(end)s OR {self.day} BETWEEN %(prev_start)s AND %(prev_end)s)"]
+        if self.partition_column:
+            column = self.partition_column
+            filters.append(
+                f"({column} >= %(created_from)s AND {column} < %(created_to)s"
+                f" OR {column} >= %(prev_created_from)s AND {column} < %(prev_created_to)s)"
+            )
+        return filters
+
+
+class Measure:
+    """
+    Aggregate computed for the current and the previous period in the same pass.
+
+    Args:
+        aggregate: Aggregate over the source rows. `{filter}` marks where the
+                   period's FILTER (WHERE ...) clause goes and is appended
+                   when missing, e.g. "COUNT(DISTINCT o.customer_id)" or
+                   "ROUND(SUM(ol.quantity * ol.unit_price) {filter}, 2)"
+        current: Result column of the current period (None: not returned)
+        previous: Result column of the previous period (None: not returned)
+        output: How the value is returned, `{}` being the aggregated value
+                (NULL where a cell has no rows); an aggregate itself for
+                reports with a group_by
+    """
+
+    def __init__(self, aggregate, current, previous, output="ROUND(COALESCE({}, 0), 2)"):
+        self.aggregate = aggregate
+        self.current = current
+        self.previous = previous
+        self.output = output
+
+    def filtered(self, period, conditions=()):
+        """The aggregate over the rows of `period` that also match `conditions`."""
+        condition = " AND ".join([f"p.period = '{period}'", *conditions])
+        clause = f"FILTER (WHERE {condition})"
+        if "{filter}" in self.aggregate:
+            return self.aggregate.replace("{filter}", clause)
+        return f"{self.aggregate} {clause}"
+
+    def columns(self):
+        """(result column, period) pairs this measure returns."""
+        return [(name, period) for name, period in ((self.current, CURRENT), (self.previous, PREVIOUS)) if name]
+
+
+class YoYReport:
+    """
+    A year-over-year report declared as (source, dimensions, measures).
+
+    The generated query scans the source once for both windows: each row is
+    joined to the report day it is compared on (yoy_periods) and tagged with
+    its period, every measure is aggregated per period with
+    FILTER (WHERE period = ...), and only that aggregate is densified against
+    the calendar and the dimension values.
+
+    Args:
+        source: Source of the rows
+        dimensions: [(column, expression)] the rows are grouped by, besides the day
+        measures: [Measure]
+        by_day: One result row per report day (current_day/previous_day
+                columns); otherwise the periods are only split by the dimensions
+        domain: SELECT of every dimension value a result row is returned for
+                (e.g. all locations), crossed with the days; may read `yoy_days`
+                and the aggregated `facts`
+        dense: Return rows without data (zeros); otherwise only cells where
+               either period has rows
+        require_current: Only cells where the current period has rows
+        day_format: TO_CHAR format of current_day/previous_day (None: dates)
+        joins: Joins added after the aggregated facts (f) in the final query
+        group_by: Final grouping of the cells (product → its name or
+                  category); the measure outputs are aggregates then
+        columns: Extra result columns; may read the days (d), the dimension
+                 values (k), the facts (f), the extra facts (x) and `joins`
+        order_by: Result order
+        rollups: {granularity: Source} of the same rows pre-aggregated per
+                 bucket (keyed on its first day), read instead of `source`
+                 at that granularity
+        granularities: Granularities the report can be queried at
+        extra_facts: YoYReport over another source with the same by_day and
+                     dimension names, aggregated alongside the report's facts
+                     and joined to its result on the day and dimension
+                     values; its measures are returned after the report's own
+    """
+
+    def __init__(
+        self,
+        source,
+        dimensions,
+        measures,
+        by_day=True,
+        domain=None,
+        dense=True,
+        require_current=False,
+        day_format="DD/MM/YYYY",
+        joins="",
+        group_by=None,
+        columns=(),
+        order_by=(),
+        rollups=None,
+        granularities=tuple(GRANULARITIES),
+        extra_facts=None,
+    ):
+        self.source = source
+        self.dimensions = list(dimensions)
+        self.measures = list(measures)
+        self.by_day = by_day
+        self.domain = domain
+        self.dense = dense
+        self.require_current = require_current
+        self.day_format = day_format
+        self.joins = joins
+        self.group_by = group_by
+        self.columns = list(columns)
+        self.order_by = list(order_by)
+        self.rollups = dict(rollups or {})
+        self.granularities = tuple(granularities)
+        self.extra_facts = extra_facts
+        self._sql = {}
+
+    def source_for(self, granularity=DEFAULT_GRANULARITY):
+        """Source the report reads at `granularity`."""
+        return self.rollups.get(granularity, self.source)
+
+    def keys(self):
+        """Grouping expressions of the aggregated cells."""
+        return (["p.curr_date"] if self.by_day else []) + [expression for _, expression in self.dimensions]
+
+    def row_conditions(self):
+        """
+        Conditions every aggregated row must meet besides its window: reports
+        without a day count a previous-year day once.
+        """
+        return [] if self.by_day else ["p.once"]
+
+    def _facts_sql(self, granularity=DEFAULT_GRANULARITY, name="facts"):
+        source = self.source_for(granularity)
+        keys = (["p.curr_date"] if self.by_day else []) + [
+            f"{expression} AS {name}" for name, expression in self.dimensions
+        ]
+        conditions = self.row_conditions()
+        aggregates = [
+            f"{measure.filtered(period, conditions)} AS {name}"
+            for measure in self.measures
+            for name, period in measure.columns()
+        ]
+
+        filters = source.window_filters()
+        if source.where:
+            filters.append(f"({source.where})")
+
+        having = f"\n        HAVING COUNT(*) FILTER (WHERE p.period = '{CURRENT}') > 0" if self.require_current else ""
+        newline = ",\n            "
+        conjunction = "\n          AND "
+        return f"""
+    {name} AS (
+        SELECT
+            {newline.join(keys + aggregates)}
+        FROM {source.relation}
+        JOIN yoy_periods p
+          ON p.day = {source.day}
+        WHERE {conjunction.join(filters)}
+        GROUP BY {", ".join(str(i) for i in range(1, len(keys) + 1))}{having}
+    )"""
+
+    def _extra_facts_sql(self, granularity=DEFAULT_GRANULARITY):
+        """The extra_facts CTE (with its leading comma), empty without extra facts."""
+        if self.extra_facts is None:
+            return ""
+        return "," + self.extra_facts._facts_sql(granularity, name="extra_facts")
+
+    def _final_sql(self):
+        frame = []
+        on = []
+        if self.by_day:
+            frame.append("yoy_days d")
+            on.append("f.curr_date = d.curr_date")
+        if self.domain:
+            frame.append(f"({self.domain}) k")
+            on.extend(f"f.{name} = k.{name}" for name, _ in self.dimensions)
+
+        columns = []
+        if self.group_by is None:
+            owner = "k" if self.domain else "f"
+            columns.extend(f"{owner}.{name}" for name, _ in self.dimensions)
+        if self.by_day:
+            if self.day_format:
+                columns.append(f"TO_CHAR(d.curr_date, '{self.day_format}') AS current_day")
+                columns.append(f"TO_CHAR(d.prev_date, '{self.day_format}') AS previous_day")
+            else:
+                columns.append("d.curr_date AS current_day")
+                columns.append("d.prev_date AS previous_day")
+        columns.extend(self.columns)
+        columns.extend(
+            f"{measure.output.replace('{}', f'f.{name}')} AS {name}"
+            for measure in self.measures
+            for name, _ in measure.columns()
+        )
+        if self.extra_facts is not None:
+            columns.extend(
+                f"{measure.output.replace('{}', f'x.{name}')} AS {name}"
+                for measure in self.extra_facts.measures
+                for name, _ in measure.columns()
+            )
+
+        join = "LEFT JOIN" if self.dense else "JOIN"
+        newline = ",\n        "
+        sql = f"""
+    SELECT
+        {newline.join(columns)}
+    FROM {" CROSS JOIN ".join(frame)}
+    {join} facts f
+      ON {" AND ".join(on)}"""
+        if self.extra_facts is not None:
+            owner = "k" if self.domain else "f"
+            extra_on = (["x.curr_date = d.curr_date"] if self.by_day else []) + [
+                f"x.{name} = {owner}.{name}" for name, _ in self.dimensions
+            ]
+            sql += f"\n    LEFT JOIN extra_facts x\n      ON {' AND '.join(extra_on)}"
+        if self.joins:
+            sql += f"\n    {self.joins}"
+        if self.group_by:
+            group_by = list(self.group_by) + (["d.curr_date", "d.prev_date"] if self.by_day else [])
+            sql += f"\n    GROUP BY {', '.join(group_by)}"
+        if self.order_by:
+            sql += f"\n    ORDER BY {', '.join(self.order_by)}"
+        return sql
+
+    def sql(self, granularity=DEFAULT_GRANULARITY):
+        if granularity not in self._sql:
+            self._sql[granularity] = (
+                f"WITH{yoy_days_sql(granularity)},{self._facts_sql(granularity)}"
+                f"{self._extra_facts_sql(granularity)}{self._final_sql()}\n"
+            )
+        return self._sql[granularity]
+
+    def query(self, start_date, end_date, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
+        """
+        SQL and parameters of the report for start_date..end_date (widened to
+        whole buckets of `granularity`) and the previous-year days they are
+        compared with under `alignment`.
+
+        Returns:
+            tuple: (sql, params)
+        """
+        if granularity not in self.granularities:
+            raise ValueError(f"Report not available per {granularity}")
+        return self.sql(granularity), yoy_params(start_date, end_date, alignment, granularity)
+
+
+def yoy_params(start_date, end_date, alignment=DEFAULT_ALIGNMENT, granularity=DEFAULT_GRANULARITY):
+    """
+    Query parameters of the YoY queries for start_date..end_date (widened to
+    whole buckets of `granularity`) and the previous-year days they are
+    compared with under `alignment`. The SQL is the same for every alignment.
+    """
+    start_date, end_date = bucket_bounds(start_date, end_date, granularity)
+    prev_start, prev_end = previous_period(start_date, end_date, alignment, granularity)
+    created_from, created_to = creation_bounds(start_date, end_date)
+    prev_created_from, prev_created_to = creation_bounds(prev_start, prev_end)
+    return {
+        "alignment": alignment,
+        "start": start_date,
+        "end": end_date,
+        "prev_start": prev_start,
+        "prev_end": prev_end,
+        "created_from": created_from,
+        "created_to": created_to,
+        "prev_created_from": prev_created_from,
+        "prev_created_to": prev_created_to,
+    }
+
+
+class SharedScan:
+    """
+    Several YoY reports over the same source rows, aggregated in one scan.
+
+    The scan groups the rows by every report's keys at once
+    (GROUP BY GROUPING SETS) into a temporary table, with one column per
+    distinct dimension and per distinct filtered aggregate; a report's own
+    `where` and row conditions become part of its aggregates' FILTER. Each
+    report then runs its usual densification over its grouping set of that
+    table instead of over the source.
+
+    Usage:
+        scan = SharedScan({"operation_hour": OPERATION_HOUR_REPORT, ...})
+        create_sql, params, queries = scan.query(start_date, end_date)
+        # run create_sql, then each report's queries[name] (same params),
+        # then scan.drop_sql, in one transaction
+    """
+
+    TABLE = "yoy_shared_facts"
+
+    def __init__(self, reports, granularity=DEFAULT_GRANULARITY):
+        self.reports = dict(reports)
+        self.granularity = granularity
+        sources = {report.source_for(granularity).scan_key for report in self.reports.values()}
+        if len(sources) != 1:
+            raise ValueError("Reports of a shared scan must read the same source")
+        if any(granularity not in report.granularities for report in self.reports.values()):
+            raise ValueError(f"Reports of the shared scan not available per {granularity}")
+        self.source = next(iter(self.reports.values())).source_for(granularity)
+        self.drop_sql = f"DROP TABLE IF EXISTS {self.TABLE}"
+        self._sql = None
+
+    def _build(self):
+        keys = {}
+        aggregates = {}
+
+        def key_column(expression):
+            if expression == "p.curr_date":
+                return keys.setdefault(expression, "curr_date")
+            return keys.setdefault(expression, f"k{sum(column != 'curr_date' for column in keys.values())}")
+
+        def aggregate_column(expression):
+            return aggregates.setdefault(expression, f"m{len(aggregates)}")
+
+        plans = {}
+        for name, report in self.reports.items():
+            where = report.source_for(self.granularity).where
+            conditions = report.row_conditions() + ([f"({where})"] if where else [])
+            dimensions = [(column, key_column(expression)) for column, expression in report.dimensions]
+            if report.by_day:
+                key_column("p.curr_date")
+            measures = [
+                (column, aggregate_column(measure.filtered(period, conditions)))
+                for measure in report.measures
+                for column, period in measure.columns()
+            ]
+            # Cells the report's own query would have: its rows pass `where`
+            # (and the current period has rows where required)
+            exists = [f"p.period = '{CURRENT}'"] if report.require_current else []
+            exists += [f"({where})"] if where else []
+            exists_column = aggregate_column(f"COUNT(*) FILTER (WHERE {' AND '.join(exists)})") if exists else None
+            plans[name] = (report, dimensions, measures, exists_column)
+
+        days_sql = yoy_days_sql(self.granularity)
+        grouping = list(keys)
+        newline = ",\n            "
+        conjunction = "\n          AND "
+        sets = []
+        queries = {}
+        for name, (report, dimensions, measures, exists_column) in plans.items():
+            report_keys = report.keys()
+            # GROUPING() sets a bit (first argument highest) per expression not grouped by
+            mask = sum(1 << (len(grouping) - 1 - i) for i, key in enumerate(grouping) if key not in report_keys)
+            group = f"({', '.join(report_keys)})"
+            if group not in sets:
+                sets.append(group)
+
+            columns = (["curr_date"] if report.by_day else []) + [
+                f"{key} AS {column}" for column, key in dimensions
+            ] + [f"{aggregate} AS {column}" for column, aggregate in measures]
+            where = [f"grouping_set = {mask}"] + ([f"{exists_column} > 0"] if exists_column else [])
+            facts = f"""
+    facts AS (
+        SELECT
+            {newline.join(columns)}
+        FROM {self.TABLE}
+        WHERE {" AND ".join(where)}
+    )"""
+            queries[name] = f"WITH{days_sql},{facts}{report._extra_facts_sql(self.granularity)}{report._final_sql()}\n"
+
+        selected = [f"GROUPING({', '.join(grouping)}) AS grouping_set"] + [
+            f"{expression} AS {column}" for expression, column in keys.items()
+        ] + [f"{expression} AS {column}" for expression, column in aggregates.items()]
+        create = f"""CREATE TEMPORARY TABLE {self.TABLE} ON COMMIT DROP AS
+    WITH{days_sql}
+    SELECT
+            {newline.join(selected)}
+        FROM {self.source.relation}
+        JOIN yoy_periods p
+          ON p.day = {self.source.day}
+        WHERE {conjunction.join(self.source.window_filters())}
+        GROUP BY GROUPING SETS ({", ".join(sets)})
+"""
+        return create, queries
+
+    def query(self, start_date, end_date, alignment=DEFAULT_ALIGNMENT):
+        """
+        The scan (CREATE TEMPORARY TABLE) and each report's query over it, for
+        start_date..end_date (widened to whole buckets of the scan's
+        granularity) and the previous-year days they are compared with under
+        `alignment`.
+
+        Returns:
+            tuple: (scan sql, params, {report name: sql})
+        """
+        if self._sql is None:
+            self._sql = self._build()
+        create, queries = self._sql
+        return create, yoy_params(start_date, end_date, alignment, self.granularity), queries
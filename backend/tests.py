@@ -1,3 +1,264 @@
-from django.test import TestCase
-
-# Create your tests here.
+import random
+import time
+from bisect import bisect_right
+from datetime import date
+from unittest import mock, skipUnless
+
+from django.db import DatabaseError, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from backend.management.commands.benchmark_report_builders import REPORT_BUILDERS, _differences, _synthetic_rows
+from backend.models import ReportCacheInvalidation, ShyfterEmployee, ShyfterEmployeeClocking
+from backend.services import monthly_stats_columnar
+from backend.services.monthly_stats_sql import YOY_REPORTS
+from backend.services.report_cache import ReportCache, report_options
+from backend.services.service_times import (
+    SERVICE_HISTOGRAM_EDGES,
+    SERVICE_PERCENTILES,
+    histogram_percentiles,
+    merge_histograms,
+)
+from backend.services.shyfter_ingest import ingest_shyfter
+from backend.services.yoy_sql import bucket_bounds
+
+SHYFTER_URL = "https://shyfter.test/api"
+
+
+class FakeShyfter:
+    """
+    Stand-in for the Shyfter HTTP layer: `pages` maps a URL to its JSON
+    payload, or to an exception raised when it is fetched.
+    """
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.fetched = []
+
+    def __call__(self, url, headers):
+        self.fetched.append(url)
+        page = self.pages[url]
+        if isinstance(page, Exception):
+            raise page
+        return page
+
+
+def clocking(pk, start="2025-03-03T09:00:00+01:00", end="2025-03-03T17:00:00+01:00"):
+    return {"id": pk, "start": start, "end": end, "approved": True}
+
+
+def clockings_url(employee_id):
+    return f"{SHYFTER_URL}/employees/{employee_id}/clockings?start=2025-03-01"
+
+
+class IngestShyfterTests(TransactionTestCase):
+    # The DB writer runs in its own thread and connection, so it has to see
+    # committed employees
+
+    location = "Frietchalet"
+
+    def setUp(self):
+        for pk in ("e1", "e2", "e3"):
+            ShyfterEmployee.objects.create(id=pk, type="employee", location=self.location)
+        ShyfterEmployee.objects.create(id="other", type="employee", location="Tipzakske")
+
+        page_2 = f"{SHYFTER_URL}/employees/e1/clockings?start=2025-03-01&page=2"
+        self.fetch = FakeShyfter({
+            clockings_url("e1"): {"data": [clocking("c1"), clocking("c2")], "links": {"next": page_2}},
+            # c2 again on the next page: counted once
+            page_2: {"data": [clocking("c3"), clocking("c2")], "links": {"next": None}},
+            clockings_url("e2"): ConnectionError("Shyfter unavailable"),
+            clockings_url("e3"): {"data": [clocking("c4"), clocking("c5", start=None), {"start": "2025-03-03T09:00:00+01:00"}]},
+        })
+
+    def ingest(self, **kwargs):
+        return ingest_shyfter(
+            "clockings", self.location, date(2025, 3, 1),
+            concurrency=2, fetch=self.fetch, base_url=SHYFTER_URL, **kwargs,
+        )
+
+    def test_pages_and_counts(self):
+        result = self.ingest()
+
+        self.assertEqual(result["employees_processed"], 3)
+        self.assertEqual(result["requests"], 3)
+        self.assertEqual(result["total_fetched"], 7)
+        self.assertEqual(result["skipped"], 2)
+        self.assertEqual((result["inserted"], result["updated"], result["total_saved"]), (4, 0, 4))
+        self.assertEqual(
+            sorted(ShyfterEmployeeClocking.objects.values_list("id", "employee_id")),
+            [("c1", "e1"), ("c2", "e1"), ("c3", "e1"), ("c4", "e3")],
+        )
+        self.assertEqual((result["first_day"], result["last_day"]), (date(2025, 3, 3), date(2025, 3, 3)))
+
+        # A second sync of the same records only updates them
+        result = self.ingest()
+        self.assertEqual((result["inserted"], result["updated"], result["total_saved"]), (0, 4, 4))
+
+    def test_failed_employee_does_not_stop_the_others(self):
+        result = self.ingest()
+
+        self.assertEqual(result["failed_requests"], 1)
+        self.assertIn(clockings_url("e3"), self.fetch.fetched)
+        self.assertFalse(ShyfterEmployeeClocking.objects.filter(employee_id="e2").exists())
+        self.assertTrue(ShyfterEmployeeClocking.objects.filter(employee_id="e3").exists())
+
+    def test_employee_ids_stay_within_the_location(self):
+        result = self.ingest(employee_ids=["e1", "other"])
+
+        self.assertEqual(result["employees_processed"], 1)
+        self.assertEqual(self.fetch.fetched[0], clockings_url("e1"))
+        self.assertEqual(set(ShyfterEmployeeClocking.objects.values_list("employee_id", flat=True)), {"e1"})
+
+    def test_failed_write_is_raised_instead_of_hanging(self):
+        # Five one-record pages with concurrency=1: while the first write
+        # fails slowly the other four fill the records queue (maxsize 4)
+        pages = {}
+        for n in range(5):
+            url = clockings_url("e1") + (f"&page={n}" if n else "")
+            next_url = clockings_url("e1") + f"&page={n + 1}" if n < 4 else None
+            pages[url] = {"data": [clocking(f"c{n}")], "links": {"next": next_url}}
+        fetch = FakeShyfter(pages)
+
+        def failing_write(*args):
+            time.sleep(0.2)
+            raise DatabaseError("write failed")
+
+        with mock.patch("backend.services.shyfter_ingest._write_batch", side_effect=failing_write):
+            with self.assertRaises(DatabaseError):
+                ingest_shyfter(
+                    "clockings", self.location, date(2025, 3, 1), employee_ids=["e1"],
+                    concurrency=1, batch_size=1, fetch=fetch, base_url=SHYFTER_URL,
+                )
+        self.assertEqual(len(fetch.fetched), 5)
+
+
+@skipUnless(monthly_stats_columnar.columnar_available(), "NumPy is not installed")
+class ColumnarBuilderTests(TestCase):
+    """
+    The columnar builders build the same responses as the row-by-row ones
+    (builder.rowwise) on fixed synthetic rows; the 1M-row timing stays in
+    the benchmark_report_builders command.
+    """
+    rows = 3000
+    regions = [("south", "aalst"), ("east", "berlare"), ("west", "dendermonde")]
+    accounts = [("south", "tipzakske"), ("east", "frietbooster"), ("west", "frietchalet")]
+
+    def setUp(self):
+        for module in ("monthly_stats_builder", "monthly_stats_columnar"):
+            for name, value in (("location_regions", self.regions), ("account_regions", self.accounts)):
+                patcher = mock.patch(f"backend.services.{module}.{name}", return_value=value)
+                patcher.start()
+                self.addCleanup(patcher.stop)
+
+    def assertSameResponses(self, granularity):
+        start_date, end_date = bucket_bounds(date(2025, 1, 1), date(2025, 3, 31), granularity)
+        days = (end_date - start_date).days + 1
+        for report, (builder, _) in REPORT_BUILDERS.items():
+            if granularity not in YOY_REPORTS[report].granularities:
+                continue
+            with self.subTest(report=report):
+                rows = _synthetic_rows(report, self.rows, start_date, days, random.Random(report), granularity=granularity)
+                expected = builder.rowwise(rows, start_date, end_date, granularity=granularity)
+                actual = getattr(monthly_stats_columnar, builder.__name__)(rows, start_date, end_date, granularity=granularity)
+                count, differences = _differences(expected, actual, 1e-6)
+                self.assertEqual(count, 0, "\n".join(differences))
+
+    def test_day(self):
+        self.assertSameResponses("day")
+
+    def test_week(self):
+        self.assertSameResponses("week")
+
+    def test_month(self):
+        self.assertSameResponses("month")
+
+
+class ServiceTimeTests(TestCase):
+    """Time-to-serve percentiles from the hourly delivery histograms (lightspeed_integration migration 0019)."""
+
+    def histogram(self, minutes):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT service_histogram_agg(m) FROM unnest(%s::numeric[]) m", [minutes])
+            return cursor.fetchone()[0]
+
+    def assertInBucket(self, estimate, exact):
+        i = bisect_right(SERVICE_HISTOGRAM_EDGES, exact) - 1
+        lower = SERVICE_HISTOGRAM_EDGES[i]
+        upper = SERVICE_HISTOGRAM_EDGES[i + 1] if i + 1 < len(SERVICE_HISTOGRAM_EDGES) else lower
+        self.assertTrue(lower <= estimate <= upper, f"{estimate} outside [{lower}, {upper}] of {exact}")
+
+    def test_merged_hours_give_percentiles_in_the_right_bucket(self):
+        rng = random.Random(25)
+        hours = [
+            [round(rng.uniform(5, 40), 2) for _ in range(300)],
+            [round(rng.lognormvariate(3.3, 0.5), 2) for _ in range(200)],
+            [round(rng.uniform(45, 240), 2) for _ in range(50)],
+        ]
+        histograms = [self.histogram(minutes) for minutes in hours]
+        merged = merge_histograms(histograms)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT service_histogram_union(h) FROM (VALUES (%s::integer[]), (%s::integer[]), (%s::integer[])) v(h)",
+                histograms,
+            )
+            self.assertEqual(cursor.fetchone()[0], merged)
+        self.assertEqual(merged, self.histogram([m for minutes in hours for m in minutes]))
+
+        served = sorted(m for minutes in hours for m in minutes)
+        for percentile, estimate in zip(SERVICE_PERCENTILES, histogram_percentiles(merged)):
+            with self.subTest(percentile=percentile):
+                # percentile_disc: the first time reaching the percentile's rank
+                exact = served[max(0, -(-len(served) * percentile // 100) - 1)]
+                self.assertInBucket(estimate, exact)
+
+    def test_merge_skips_missing_hours(self):
+        histogram = self.histogram([1.5, 2.5, 75])
+        self.assertEqual(merge_histograms([None, histogram, None]), histogram)
+        self.assertIsNone(merge_histograms([None, None]))
+
+    def test_long_and_missing_times(self):
+        self.assertEqual(histogram_percentiles(self.histogram([200, 300, 400])), [180.0, 180.0, 180.0])
+        self.assertEqual(histogram_percentiles(None), [0, 0, 0])
+        self.assertEqual(histogram_percentiles([0] * len(SERVICE_HISTOGRAM_EDGES)), [0, 0, 0])
+
+
+class ReportOptionsTests(TestCase):
+    def test_dates_widen_to_whole_buckets(self):
+        params = {"start_date": "2025-03-05", "end_date": "2025-03-20", "granularity": "month", "alignment": "date"}
+        self.assertEqual(
+            report_options(params, "sales_area"),
+            (date(2025, 3, 1), date(2025, 3, 31), "date", "month"),
+        )
+
+    def test_invalid_options(self):
+        for params, report in (
+            ({"start_date": "2025-03-05"}, "sales_area"),
+            ({"start_date": "2025-03-05", "end_date": "20/03/2025"}, "sales_area"),
+            ({"start_date": "2025-03-05", "end_date": "2025-03-20", "alignment": "lunar"}, "sales_area"),
+            ({"start_date": "2025-03-05", "end_date": "2025-03-20", "granularity": "week"}, "operation_dayOfWeek"),
+        ):
+            with self.subTest(params=params), self.assertRaises(ValueError):
+                report_options(params, report)
+
+
+class ReportCacheTests(TestCase):
+    start, end = date(2024, 1, 1), date(2024, 1, 31)
+
+    def setUp(self):
+        self.cache = ReportCache()
+        self.key = ReportCache.make_key("sales_area", self.start, self.end)
+        # First lookup reads the invalidation log
+        self.assertIsNone(self.cache.get(self.key))
+        self.cache.set(self.key, {"rows": []}, self.start, self.end)
+
+    @override_settings(REPORT_CACHE={"INVALIDATION_POLL_INTERVAL": 60})
+    def test_warm_hit_does_not_query(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.cache.get(self.key), {"rows": []})
+
+    @override_settings(REPORT_CACHE={"INVALIDATION_POLL_INTERVAL": 0})
+    def test_invalidation_of_another_process_applies_on_the_next_poll(self):
+        ReportCacheInvalidation.objects.create(source="orders", start_day=date(2024, 1, 15), end_day=date(2024, 1, 15))
+
+        self.assertIsNone(self.cache.get(self.key))
@@ -1,7 +1,7 @@
 from django.urls import include, path
 from rest_framework import routers
 from . import views
-from .views import MyTokenObtainPairView, MyTokenRefreshView, ShipdayOrdersDetailsView,lightspeed_sales_area,lightspeed_sales_location,lightspeed_sales_productItem,lightspeed_product_Items,lightspeed_product_Categories,lightspeed_sales_productCategory,lightspeed_sales_orderType,lightspeed_operation_dayOfWeek,lightspeed_operation_hour,lightspeed_operation_partOfDay,lightspeed_inventory_location
+from .views import MyTokenObtainPairView, MyTokenRefreshView, ShipdayOrdersDetailsView,lightspeed_sales_area,lightspeed_sales_location,lightspeed_sales_productItem,lightspeed_product_Items,lightspeed_product_Categories,lightspeed_sales_productCategory,lightspeed_sales_orderType,lightspeed_operation_dayOfWeek,lightspeed_operation_hour,lightspeed_operation_partOfDay,lightspeed_inventory_location,lightspeed_report_bundle,lightspeed_report_job
 from .views import ShipdayOrdersView,XMLUploadView,ShyfterEmployeesView,ShyfterEmployeeClockingsView,ShyfterAllEmployeesClockingsView,ShyfterEmployeeShiftsView,ShyfterAllEmployeesShiftsView,lightspeed_labour_area,lightspeed_labour_role,lightspeed_labour_hour
 
 router = routers.DefaultRouter()
@@ -51,6 +51,7 @@ urlpatterns = [
     path("shyfter/employees/clockings/",ShyfterAllEmployeesClockingsView.as_view()),
     path("shyfter/employees/<str:employee_id>/shifts/", ShyfterEmployeeShiftsView.as_view()),
     path("shyfter/employees/shifts/",ShyfterAllEmployeesShiftsView.as_view()),
+    path("upstream/http-stats/", views.upstream_http_stats, name="upstream-http-stats"),
     path('upload-xml/', XMLUploadView.as_view(), name='upload-xml'),
     
     #reports genrated on db data
@@ -69,6 +70,10 @@ urlpatterns = [
     path("reports/lightspeed/operation-partOfDay/",lightspeed_operation_partOfDay),
     #==============================Inventory===============================
     path("reports/lightspeed/inventory-location/",lightspeed_inventory_location),
+    #==============================Bundle===============================
+    path("reports/lightspeed/bundle/",lightspeed_report_bundle),
+    #==============================Jobs===============================
+    path("reports/lightspeed/jobs/<uuid:job_id>/",lightspeed_report_job,name="lightspeed_report_job"),
     #lookup items for filter
     path("lightspeed/productItems/",lightspeed_product_Items),
     path("lightspeed/productCategories/",lightspeed_product_Categories)
@@ -1,28 +1,31 @@
 import re
 from datetime import date, datetime
-from django.utils.dateparse import parse_datetime
-import time
 import requests
 from time import sleep
 from rest_framework import viewsets
 from django.db import connection
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 import logging
-from backend.services.iter_90_day_ranges import iter_90_day_ranges
+from backend.services.shyfter_ingest import ingest_shyfter
+from backend.services.shyfter_mappers import _get_shyfter_headers, _map_shyfter_employee_to_model_fields
 from backend.services.monthly_stats_builder import build_labourArea_stats, build_labourHour_stats, build_labourRole_stats, build_monthly_stats_response, build_operation_dayOfWeek_stats, build_operation_hour_stats,build_operations_partOfDay_stats, build_orderType_stats_response, build_product_category_stats_reponse, build_product_item_stats_response
-from backend.services.monthly_stats_sql import fetch_inventory_location_raw, fetch_labour_area_raw, fetch_labour_hour_raw, fetch_labour_role_raw, fetch_monthly_stats_raw, fetch_operation_dayOfWeek_raw, fetch_operations_hour_raw, fetch_operations_partOfDay_raw, fetch_sales_orderType_raw, fetch_sales_productCategory_raw, fetch_sales_productItem_raw
+from backend.services.bulk_upsert import BulkUpserter
+from backend.services.http_client import get_http_client, http_stats
+from backend.services.labour_facts import refresh_labour_facts
+from backend.services.report_bundle import BUNDLE_REPORTS, build_report_bundle
+from backend.services.report_cache import cached_report, invalidate_reports, report_options
+from backend.services.report_jobs import job_response, submit_report_job, wants_async
+from backend.services.monthly_stats_sql import fetch_inventory_location_raw, fetch_labour_area_raw, fetch_labour_hour_raw, fetch_labour_role_raw, fetch_monthly_stats_raw, fetch_operation_dayOfWeek_raw, fetch_operations_hour_raw, fetch_operations_partOfDay_raw, fetch_sales_orderType_raw, fetch_sales_productCategory_raw, fetch_sales_productItem_raw, fetch_product_names_raw, YOY_REPORTS
 from .serializers import (
     ShyfterEmployeeSeriallizer, UserSerializer, UserListSerializer, SearchSerializer, OrderSerializer, WishlistSerializer,
     ProductSerializer, ScraperSerializer, TagSerializer, VendorSerializer
     )
 from .models import (
-    ShyfterEmployee, ShyfterEmployeeClocking, ShyfterEmployeeShift, UserData, Payment, Orders, Searches, Wishlist, Products, Scraper, Tag, Vendor,
+    ShyfterEmployee, UserData, Payment, Orders, Searches, Wishlist, Products, Scraper, Tag, Vendor,
     UserDataResetPassword
     )
 from lightspeed_integration.models import LightspeedProduct,LightspeedProductGroup
 from django.db.models.functions import Trim
-from backend.models import XMLFile
+from backend.models import ReportJob, XMLFile
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.views import APIView
@@ -789,7 +792,7 @@ class ShipdayOrdersView(APIView):
         }
 
         try:
-            response = requests.get(f"{settings.SHIPDAY_API_URL}orders", headers=headers)
+            response = get_http_client("shipday").get(f"{settings.SHIPDAY_API_URL}orders", headers=headers, limiter_key=location)
             response.raise_for_status()  # raise error if request failed
             return Response(response.json(), status=response.status_code)
         except requests.exceptions.RequestException as e:
@@ -805,137 +808,15 @@ class ShipdayOrdersDetailsView(APIView):
         }
 
         try:
-            response = requests.get(f"{settings.SHIPDAY_API_URL}orders/{ordernumber}", headers=headers)
+            response = get_http_client("shipday").get(
+                f"{settings.SHIPDAY_API_URL}orders/{ordernumber}", headers=headers, limiter_key=location
+            )
             response.raise_for_status()  # raise error if request failed
             return Response(response.json(), status=response.status_code)
         except requests.exceptions.RequestException as e:
             return Response({"error": str(e)}, status=500)
 
 
-
-def _get_shyfter_headers(location: str = "Frietchalet") -> dict:
-    """
-    Build Shyfter headers for the given location.
-
-    Supports both:
-      - New per-location credentials via SHYFTER_AUTHORIZATION_CREDENTIALS (mapping)
-      - Old single-token setup via SHYFTER_AUTHORIZATION_TOKEN (backward compatible)
-
-    Expected SHYFTER_AUTHORIZATION_CREDENTIALS structure (per location):
-        {
-            "Frietchalet": {
-                "token": "<bearer_token>",
-                "department": "<department_id>"
-            },
-            "Tipzakske": { ... },
-            "Frietbooster": { ... }
-        }
-
-    If a location is missing or credentials are incomplete, this safely falls
-    back to the legacy env values.
-    """
-    default_department = "zVJk0KP2O45e3LZO"
-    token = getattr(settings, "SHYFTER_AUTHORIZATION_TOKEN", None)
-    department = default_department
-
-    creds_by_location = getattr(settings, "SHYFTER_AUTHORIZATION_CREDENTIALS", None)
-    if isinstance(creds_by_location, dict):
-        creds = creds_by_location.get(location)
-        if isinstance(creds, dict):
-            token = creds.get("token") or token
-            department = creds.get("Shyfter-Department") or default_department
-        elif isinstance(creds, str):
-            # If value is just a token string, keep default department
-            token = creds or token
-
-    headers = {
-        "Accept": "application/json",
-        "Shyfter-Department": department,
-    }
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
-
-    return headers
-
-
-def _map_shyfter_employee_to_model_fields(emp, location):
-    return {
-        # 🔑 Core
-        "type": emp.get("type"),
-        "active": emp.get("active", True),
-        "location": location,
-
-        # 👤 Personal
-        "first_name": emp.get("first_name"),
-        "last_name": emp.get("last_name"),
-        "display_name": emp.get("display_name"),
-
-        "gender": emp.get("gender"),
-        "civil_state": emp.get("civil_state"),
-        "avatar": emp.get("avatar"),
-
-        # 📞 Contact
-        "email": emp.get("email"),
-        "phone": emp.get("phone"),
-        "national_number": emp.get("national_number"),
-        "iban": emp.get("iban"),
-
-        # 🌍 Locale
-        "language": emp.get("language", "en"),
-
-        # 🎂 Birth
-        "birth_date": emp.get("birth_date") or None,
-        "birth_place": emp.get("birth_place"),
-        "birth_country": emp.get("birth_country"),
-
-        # 💰 Work
-        "hourly_cost": emp.get("hourly_cost") or 0,
-        "category": emp.get("category"),
-
-        # 🧩 JSON blobs (IMPORTANT)
-        "address": emp.get("address") or {},
-        "settings": emp.get("settings") or {},
-        "defaults": emp.get("defaults") or {},
-        "custom_fields": emp.get("custom_fields") or [],
-
-        # 🧾 RAW PAYLOAD (CRITICAL)
-        "raw_data": emp,
-    }
-    
-
-def _safe_parse_dt(value):
-    if isinstance(value, str):
-        return parse_datetime(value)
-    return None
-
-
-def _map_shift_to_model_fields(shift, employee, location):
-    start_dt = _safe_parse_dt(shift.get("start"))
-    end_dt = _safe_parse_dt(shift.get("end"))
-
-    duration = 0
-    if start_dt and end_dt and end_dt >= start_dt:
-        duration = int((end_dt - start_dt).total_seconds() / 60)
-
-    return {
-        "employee": employee,
-        "start": start_dt,
-        "end": end_dt,
-        "work_date": start_dt.date() if start_dt else None,
-        "duration_minutes": duration,
-
-        "published": shift.get("published", False),
-        "type": shift.get("type"),
-        "cost": shift.get("cost"),
-
-        "breaks": shift.get("breaks") or {},
-        "social_secretary": shift.get("socialSecretary") or {},
-
-        "location": location,
-        "raw_data": shift,
-    }
-
-
 class ShyfterAllEmployeesShiftsView(APIView):
     """
     Sync planned shifts for all employees or a single employee.
@@ -951,22 +832,6 @@ class ShyfterAllEmployeesShiftsView(APIView):
         start_date = date.fromisoformat(start)
         end_date = date.fromisoformat(end) if end else date.today()
 
-        headers = _get_shyfter_headers(location)
-        session = requests.Session()
-        session.headers.update(headers)
-
-        retry_strategy = Retry(
-            total=5,
-            backoff_factor=1.5,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["GET"],
-        )
-
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        session.mount("https://", adapter)
-        session.mount("http://", adapter)
-
-
         # 👤 Employees selection
         if employee_id:
             employees = ShyfterEmployee.objects.filter(
@@ -978,106 +843,32 @@ class ShyfterAllEmployeesShiftsView(APIView):
                     {"error": "Employee not found"},
                     status=404
                 )
-        else:
-            employees = ShyfterEmployee.objects.filter(location=location)
-
-        total_fetched = total_saved = skipped = 0
 
-        for employee in employees:
-            for win_start, win_end in iter_90_day_ranges(start_date, end_date):
-
-                next_url = (
-                    f"{settings.SHYFTER_API_URL}/employees/"
-                    f"{employee.id}/shifts"
-                    f"?start={win_start}&end={win_end}"
-                )
+        # 🚀 Employees × 90-day windows fetched concurrently, bulk upserted in batches
+        result = ingest_shyfter(
+            "shifts",
+            location,
+            start_date,
+            end_date,
+            employee_ids=[employee_id] if employee_id else None,
+        )
 
-                while next_url:
-                    time.sleep(0.6)
-                    # res = requests.get(next_url, headers=headers)
-                    # res.raise_for_status()
-                    try:
-                        res = session.get(next_url, timeout=20)
-                        res.raise_for_status()
-                    except requests.exceptions.RequestException as exc:
-                        _logger.warning(
-                            "Shyfter shifts failed for employee=%s window=%s→%s : %s",
-                            employee.id,
-                            win_start,
-                            win_end,
-                            exc,
-                        )
-                        break  # move to next window / employee
-
-                    payload = res.json()
-
-                    shifts = payload.get("data", [])
-                    total_fetched += len(shifts)
-                    print(shifts)
-                    for s in shifts:
-                        if not s.get("id"):
-                            skipped += 1
-                            continue
-
-                        ShyfterEmployeeShift.objects.update_or_create(
-                            id=str(s["id"]),
-                            defaults=_map_shift_to_model_fields(
-                                s, employee, location
-                            ),
-                        )
-                        total_saved += 1
-
-                    next_url = payload.get("links", {}).get("next")
+        if result["total_saved"]:
+            invalidate_reports("clockings", location, start_date, end_date)
 
         return Response({
             "location": location,
-            "employees_processed": employees.count(),
-            "total_fetched": total_fetched,
-            "total_saved": total_saved,
-            "skipped": skipped,
+            "employees_processed": result["employees_processed"],
+            "total_fetched": result["total_fetched"],
+            "total_saved": result["total_saved"],
+            "inserted": result["inserted"],
+            "updated": result["updated"],
+            "skipped": result["skipped"],
+            "failed_requests": result["failed_requests"],
+            "duration": result["duration"],
         })
 
 
-def _safe_parse_datetime(value):
-    if not value or not isinstance(value, str):
-        return None
-    return parse_datetime(value)
-
-def _map_clocking_to_model_fields(clocking, employee, location):
-    start_dt = _safe_parse_datetime(clocking.get("start"))
-    end_dt = _safe_parse_datetime(clocking.get("end"))
-
-    duration = 0
-   
-    if start_dt and end_dt:
-        if end_dt >= start_dt:
-            duration = int((end_dt - start_dt).total_seconds() / 60)
-        else:
-            # 🚨 Invalid clocking (end before start)
-            duration = 0
-            # optional: mark in raw_data for later audit
-
-    return {
-        "employee": employee,
-        "shift_id": clocking.get("shift"),
-        "start": start_dt,
-        "end": end_dt,
-        "work_date": start_dt.date() if start_dt else None,
-        "duration_minutes": duration,
-        "cost": clocking.get("cost"),
-        "approved": clocking.get("approved", False),
-        "comment": clocking.get("comment"),
-        "location": location,
-
-        # JSON
-        "skills": clocking.get("skills") or [],
-        "clock_in": clocking.get("in") or {},
-        "clock_out": clocking.get("out") or {},
-        "breaks": clocking.get("breaks") or [],
-
-        # RAW
-        "raw_data": clocking,
-    }
 # class ShyfterEmployeesView(APIView):
 #     def get(self, request):
 #         location = request.GET.get("location") or "Frietchalet"
@@ -1116,40 +907,44 @@ class ShyfterEmployeesView(APIView):
         try:
             # 🔁 Pagination loop (Shyfter-style)
             while next_url:
-                time.sleep(0.4)
-                res = requests.get(next_url, headers=headers)
+                res = get_http_client("shyfter").get(next_url, headers=headers, limiter_key=location)
                 res.raise_for_status()
                 data = res.json()
 
                 all_employees.extend(data.get("data", []))
                 next_url = data.get("links", {}).get("next")
 
-            saved_employees = []
+            saved_ids = []
             skipped = 0
 
-            # 💾 Save to DB (Lightspeed-style)
-            for emp in all_employees:
-                if not isinstance(emp, dict):
-                    skipped += 1
-                    continue
+            # 💾 Save to DB in bulk upserts
+            with BulkUpserter(ShyfterEmployee) as upserter:
+                for emp in all_employees:
+                    if not isinstance(emp, dict):
+                        skipped += 1
+                        continue
+
+                    emp_id = emp.get("id")
+                    if not emp_id:
+                        skipped += 1
+                        continue
 
-                emp_id = emp.get("id")
-                if not emp_id:
-                    skipped += 1
-                    continue
+                    upserter.add(str(emp_id), _map_shyfter_employee_to_model_fields(emp, location))
+                    saved_ids.append(str(emp_id))
 
-                obj, _ = ShyfterEmployee.objects.update_or_create(
-                    id=str(emp.get("id")),
-                    defaults=_map_shyfter_employee_to_model_fields(emp, location),
-                )
-                saved_employees.append(obj)
+            # 🔄 Roles of the labour facts follow the employees' type
+            if refresh_labour_facts(employee_ids=saved_ids):
+                invalidate_reports("clockings")
 
+            saved_employees = ShyfterEmployee.objects.filter(id__in=saved_ids)
             serializer = ShyfterEmployeeSeriallizer(saved_employees, many=True)
 
             return Response(
                 {
                     "total_fetched": len(all_employees),
-                    "total_saved": len(saved_employees),
+                    "total_saved": upserter.saved,
+                    "inserted": upserter.inserted,
+                    "updated": upserter.updated,
                     "skipped": skipped,
                     "location": location,
                     "employees": serializer.data,
@@ -1169,7 +964,7 @@ class ShyfterEmployeeClockingsView(APIView):
 
         try:
             url = f"{settings.SHYFTER_API_URL}/employees/{employee_id}/clockings"
-            response = requests.get(url, headers=headers)
+            response = get_http_client("shyfter").get(url, headers=headers, limiter_key=location)
             response.raise_for_status()
 
             return Response(response.json(), status=response.status_code)
@@ -1187,8 +982,6 @@ class ShyfterAllEmployeesClockingsView(APIView):
         start_date = request.query_params.get("start", "2021-11-01")
         employee_id = request.query_params.get("employee_id")  
 
-        headers = _get_shyfter_headers(location)
-
         # 🎯 Decide employee queryset dynamically
         if employee_id:
             employees = ShyfterEmployee.objects.filter(
@@ -1200,53 +993,30 @@ class ShyfterAllEmployeesClockingsView(APIView):
                     {"error": "Employee not found for this location"},
                     status=404
                 )
-        else:
-            employees = ShyfterEmployee.objects.filter(
-                location=location,
-            )
-
-        total_fetched = 0
-        total_saved = 0
-        skipped = 0
-
-        for employee in employees:
-            next_url = (
-                f"{settings.SHYFTER_API_URL}/employees/"
-                f"{employee.id}/clockings?start={start_date}"
-            )
 
-            while next_url:
-                time.sleep(0.4)
-                res = requests.get(next_url, headers=headers)
-                res.raise_for_status()
-                payload = res.json()
-
-                clockings = payload.get("data", [])
-                total_fetched += len(clockings)
-                print(clockings)
-                for c in clockings:
-                    if not c.get("id"):
-                        skipped += 1
-                        continue
-
-                    ShyfterEmployeeClocking.objects.update_or_create(
-                        id=str(c["id"]),
-                        defaults=_map_clocking_to_model_fields(
-                            c, employee, location
-                        ),
-                    )
-                    total_saved += 1
+        # 🚀 Employees fetched concurrently, bulk upserted in batches
+        result = ingest_shyfter(
+            "clockings",
+            location,
+            start_date,
+            employee_ids=[employee_id] if employee_id else None,
+        )
 
-                next_url = payload.get("links", {}).get("next")
+        if result["first_day"]:
+            invalidate_reports("clockings", location, result["first_day"], result["last_day"])
 
         return Response({
             "location": location,
             "employee_mode": "single" if employee_id else "all",
             "employee_id": employee_id,
-            "employees_processed": employees.count(),
-            "total_fetched": total_fetched,
-            "total_saved": total_saved,
-            "skipped": skipped,
+            "employees_processed": result["employees_processed"],
+            "total_fetched": result["total_fetched"],
+            "total_saved": result["total_saved"],
+            "inserted": result["inserted"],
+            "updated": result["updated"],
+            "skipped": result["skipped"],
+            "failed_requests": result["failed_requests"],
+            "duration": result["duration"],
         })
 
 class ShyfterEmployeeShiftsView(APIView):
@@ -1256,7 +1026,7 @@ class ShyfterEmployeeShiftsView(APIView):
 
         try:
             url = f"{settings.SHYFTER_API_URL}/employees/{employee_id}/shifts"
-            response = requests.get(url, headers=headers)
+            response = get_http_client("shyfter").get(url, headers=headers, limiter_key=location)
             response.raise_for_status()
 
             return Response(response.json(), status=response.status_code)
@@ -1306,27 +1076,23 @@ class XMLUploadView(APIView):
 # ======================Sales Area =========================
 @api_view(["GET"])
 @permission_classes([IsAnyAuthenticatedUser])
-def lightspeed_sales_area(request):
-    start_date = request.GET.get("start_date")
-    end_date = request.GET.get("end_date")
-
-    if not start_date or not end_date:
-        return Response({"error": "start_date and end_date are required"}, status=400)
-
-    start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
-    end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date()
-
+@cached_report("sales_area")
+def lightspeed_sales_area(request, start_date, end_date, alignment, granularity):
     # 🔹 1. Fetch raw flat data (UNCHANGED SQL)
     raw_data = fetch_monthly_stats_raw(
-        start_date=start_date_obj,
-        end_date=end_date_obj
+        start_date=start_date,
+        end_date=end_date,
+        alignment=alignment,
+        granularity=granularity
     )
 
     # 🔹 2. Build frontend response shape
     response = build_monthly_stats_response(
         raw_data=raw_data,
-        start_date=start_date_obj,
-        end_date=end_date_obj
+        start_date=start_date,
+        end_date=end_date,
+        alignment=alignment,
+        granularity=granularity
     )
 
     return Response(response)
@@ -1334,25 +1100,21 @@ def lightspeed_sales_area(request):
 # ======================Sales Order Type =========================
 @api_view(["GET"])
 @permission_classes([IsAnyAuthenticatedUser])
-def lightspeed_sales_orderType(request):
-    start_date=request.GET.get("start_date")
-    end_date=request.GET.get("end_date")
-    
-    if not start_date or not end_date:
-        return Response({"error":"start date and end date are required"},status=400)
-    
-    start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
-    end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date()
-    
+@cached_report("sales_orderType")
+def lightspeed_sales_orderType(request, start_date, end_date, alignment, granularity):
     raw_data=fetch_sales_orderType_raw(
-        start_date=start_date_obj,
-        end_date=end_date_obj
+        start_date=start_date,
+        end_date=end_date,
+        alignment=alignment,
+        granularity=granularity
     )
     
     response= build_orderType_stats_response(
         raw_data=raw_data,
-        start_date=start_date_obj,
-        end_date=end_date_obj
+        start_date=start_date,
+        end_date=end_date,
+        alignment=alignment,
+        granularity=granularity
     )
     
     return Response(response)
@@ -1360,27 +1122,23 @@ def lightspeed_sales_orderType(request):
 # ======================Sales Location =========================
 @api_view(["GET"])
 @permission_classes([IsAnyAuthenticatedUser])
-def lightspeed_sales_location(request):
-    start_date = request.GET.get("start_date")
-    end_date = request.GET.get("end_date")
-
-    if not start_date or not end_date:
-        return Response({"error": "start_date and end_date are required"}, status=400)
-
-    start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
-    end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date()
-
+@cached_report("sales_location")
+def lightspeed_sales_location(request, start_date, end_date, alignment, granularity):
     # 🔹 1. Fetch raw flat data (UNCHANGED SQL)
     raw_data = fetch_monthly_stats_raw(
-        start_date=start_date_obj,
-        end_date=end_date_obj
+        start_date=start_date,
+        end_date=end_date,
+        alignment=alignment,
+        granularity=granularity
     )
 
     # 🔹 2. Build frontend response shape
     response = build_monthly_stats_response(
         raw_data=raw_data,
-        start_date=start_date_obj,
-        end_date=end_date_obj
+        start_date=start_date,
+        end_date=end_date,
+        alignment=alignment,
+        granularity=granularity
     )
 
     return Response(response)
@@ -1388,27 +1146,24 @@ def lightspeed_sales_location(request):
 # ======================Sales Product Items =========================
 @api_view(["GET"])
 @permission_classes([IsAnyAuthenticatedUser])
-def lightspeed_sales_productItem(request):
-    start_date=request.GET.get("start_date")
-    end_date=request.GET.get("end_date")
-    
-    if not start_date or not end_date:
-        return Response({"error":"start date and end date are required"},status=400)
-    
-    start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
-    end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date()
-    
-    # 🔹 1. Fetch raw flat data (UNCHANGED SQL)
+@cached_report("sales_productItem")
+def lightspeed_sales_productItem(request, start_date, end_date, alignment, granularity):
+    # 🔹 1. Fetch sparse (product, day) cells
     raw_data = fetch_sales_productItem_raw(
-        start_date=start_date_obj,
-        end_date=end_date_obj
+        start_date=start_date,
+        end_date=end_date,
+        alignment=alignment,
+        granularity=granularity
     )
 
-    # 🔹 2. Build frontend response shape
+    # 🔹 2. Build frontend response shape (densified over all products × days)
     response = build_product_item_stats_response(
         raw_data=raw_data,
-        start_date=start_date_obj,
-        end_date=end_date_obj
+        start_date=start_date,
+        end_date=end_date,
+        product_names=fetch_product_names_raw(),
+        alignment=alignment,
+        granularity=granularity
     )
 
     return Response(response)
@@ -1488,24 +1243,18 @@ def lightspeed_product_Categories(request):
 # ======================Sales Product Category =========================
 @api_view(["GET"])
 @permission_classes([IsAnyAuthenticatedUser])
-def lightspeed_sales_productCategory(request):
-    start_date = request.GET.get("start_date")
-    end_date = request.GET.get("end_date")
-
-    if not start_date or not end_date:
-        return Response({"error": "start_date and end_date are required"}, status=400)
-
-    start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
-    end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date()
-    
+@cached_report("sales_productCategory")
+def lightspeed_sales_productCategory(request, start_date, end_date, alignment, granularity):
     # fetch raw data
-    raw_data=fetch_sales_productCategory_raw(start_date=start_date_obj, end_date=end_date_obj)
+    raw_data=fetch_sales_productCategory_raw(start_date=start_date, end_date=end_date, alignment=alignment, granularity=granularity)
     
     # build frontend response shape
     response= build_product_category_stats_reponse(
         raw_data=raw_data,
-        start_date=start_date_obj,
-        end_date=end_date_obj
+        start_date=start_date,
+        end_date=end_date,
+        alignment=alignment,
+        granularity=granularity
     )
     
     return Response(response)
@@ -1513,170 +1262,217 @@ def lightspeed_sales_productCategory(request):
 #====================================Labour=====================
 @api_view(["GET"])
 @permission_classes([IsAnyAuthenticatedUser])
-def lightspeed_labour_area(request):
-    start_date=request.GET.get("start_date")
-    end_date=request.GET.get("end_date")
-    if not start_date or not end_date:
-        return Response({"error":"start date and end  date are required"},status=400)
-    
-    start_date_obj=datetime.strptime(start_date,"%Y-%m-%d").date()
-    end_date_obj=datetime.strptime(end_date,"%Y-%m-%d").date()
-    
+@cached_report("labour_area")
+def lightspeed_labour_area(request, start_date, end_date, alignment, granularity):
     raw_data=fetch_labour_area_raw(
-        start_date=start_date_obj,
-        end_date=end_date_obj
+        start_date=start_date,
+        end_date=end_date,
+        alignment=alignment,
+        granularity=granularity
     )
     response = build_labourArea_stats(
         raw_data=raw_data,
-        start_date=start_date_obj,
-        end_date=end_date_obj
+        start_date=start_date,
+        end_date=end_date,
+        alignment=alignment,
+        granularity=granularity
         
     )
     return Response(response)
 
 @api_view(["GET"])
 @permission_classes([IsAnyAuthenticatedUser])
-def lightspeed_labour_role(request):
-    start_date=request.GET.get("start_date")
-    end_date=request.GET.get("end_date")
-    
-    if not start_date or not end_date:
-        return Response({"error":"start date and end date are required"},status=400)
-     
-    start_date_obj=datetime.strptime(start_date,"%Y-%m-%d").date()
-    end_date_obj=datetime.strptime(end_date,"%Y-%m-%d")
-    
+@cached_report("labour_role")
+def lightspeed_labour_role(request, start_date, end_date, alignment, granularity):
     raw_data=fetch_labour_role_raw(
-        start_date=start_date_obj,
-        end_date=end_date_obj,
+        start_date=start_date,
+        end_date=end_date,
+        alignment=alignment,
+        granularity=granularity,
     )
     
     response=build_labourRole_stats(
         raw_data=raw_data,
-        start_date=start_date_obj,
-        end_date=end_date_obj,
+        start_date=start_date,
+        end_date=end_date,
+        alignment=alignment,
+        granularity=granularity,
     )
     
     return Response(response)
 
 @api_view(["GET"])
 @permission_classes([IsAnyAuthenticatedUser])
-def lightspeed_labour_hour(request):
-    start_date=request.GET.get("start_date")
-    end_date=request.GET.get("end_date")
-    
-    if not start_date or not end_date:
-        return Response({"error":"start date and end date are required"},status=400)
-     
-    start_date_obj=datetime.strptime(start_date,"%Y-%m-%d").date()
-    end_date_obj=datetime.strptime(end_date,"%Y-%m-%d")
-    
+@cached_report("labour_hour")
+def lightspeed_labour_hour(request, start_date, end_date, alignment, granularity):
     raw_data=fetch_labour_hour_raw(
-        start_date=start_date_obj,
-        end_date=end_date_obj,
+        start_date=start_date,
+        end_date=end_date,
+        alignment=alignment,
+        granularity=granularity,
     )
     
     response=build_labourHour_stats(
         raw_data=raw_data,
-        start_date=start_date_obj,
-        end_date=end_date_obj,
+        start_date=start_date,
+        end_date=end_date,
+        alignment=alignment,
+        granularity=granularity,
     )
     
     return Response(response)
 
 @api_view(["GET"])
 @permission_classes([IsAnyAuthenticatedUser])
-def lightspeed_operation_dayOfWeek(request):
-    start_date=request.GET.get("start_date")
-    end_date=request.GET.get("end_date")
-    
-    if not start_date or not end_date:
-        return Response({"error":"start date and end date are required"},status=400)
-    
-    start_date_obj=datetime.strptime(start_date,"%Y-%m-%d").date()
-    end_date_obj=datetime.strptime(end_date,"%Y-%m-%d").date()
+@cached_report("operation_dayOfWeek")
+def lightspeed_operation_dayOfWeek(request, start_date, end_date, alignment, granularity):
     raw_data=fetch_operation_dayOfWeek_raw(
-        start_date=start_date_obj,
-        end_date=end_date_obj
+        start_date=start_date,
+        end_date=end_date,
+        alignment=alignment,
+        granularity=granularity
     )
     response = build_operation_dayOfWeek_stats(
         raw_data=raw_data,
-        start_date=start_date_obj,
-        end_date=end_date_obj
+        start_date=start_date,
+        end_date=end_date,
+        alignment=alignment,
+        granularity=granularity
     )
     return Response(response)
 
 
 @api_view(["GET"])
 @permission_classes([IsAnyAuthenticatedUser])
-def lightspeed_operation_hour(request):
-    start_date=request.GET.get("start_date")
-    end_date=request.GET.get("end_date")
-    
-    if not start_date or not end_date:
-        return Response({"error":"start date and end date are required"},status=400)
-    
-    start_date_obj=datetime.strptime(start_date,"%Y-%m-%d").date()
-    end_date_obj=datetime.strptime(end_date,"%Y-%m-%d").date()
-    
+@cached_report("operation_hour")
+def lightspeed_operation_hour(request, start_date, end_date, alignment, granularity):
     raw_data=fetch_operations_hour_raw(
-        start_date=start_date_obj,
-        end_date=end_date_obj
+        start_date=start_date,
+        end_date=end_date,
+        alignment=alignment,
+        granularity=granularity
     )
     response = build_operation_hour_stats(
         raw_data=raw_data,
-        start_date=start_date_obj,
-        end_date=end_date_obj
+        start_date=start_date,
+        end_date=end_date,
+        alignment=alignment,
+        granularity=granularity
     )
     return Response(response)
 
 @api_view(["GET"])
 @permission_classes([IsAnyAuthenticatedUser])
-def lightspeed_operation_partOfDay(request):
-    start_date=request.GET.get("start_date")
-    end_date=request.GET.get("end_date")
-    
-    if not start_date or not end_date:
-        return Response({"error":"start date and end date are required"},status=400)
-    
-    start_date_obj=datetime.strptime(start_date,"%Y-%m-%d").date()
-    end_date_obj=datetime.strptime(end_date,"%Y-%m-%d")
-    
+@cached_report("operation_partOfDay")
+def lightspeed_operation_partOfDay(request, start_date, end_date, alignment, granularity):
     raw_data=fetch_operations_partOfDay_raw(
-        start_date=start_date_obj,
-        end_date=end_date_obj
+        start_date=start_date,
+        end_date=end_date,
+        alignment=alignment,
+        granularity=granularity
     )
     
     response=build_operations_partOfDay_stats(
         raw_data=raw_data,
-        start_date=start_date_obj,
-        end_date=end_date_obj
+        start_date=start_date,
+        end_date=end_date,
+        alignment=alignment,
+        granularity=granularity
     )
     
     return Response(response)
 
 @api_view(["GET"])
 @permission_classes([IsAnyAuthenticatedUser])
-def lightspeed_inventory_location(request):
-    
-    start_date=request.GET.get("start_date")
-    end_date=request.GET.get("end_date")
-    
-    if not start_date or not end_date:
-        return Response({"error":"start date and end date are required"},status=400)
-    
-    start_date_obj=datetime.strptime(start_date,"%Y-%m-%d").date()
-    end_date_obj=datetime.strptime(end_date,"%Y-%m-%d")
-    
+@cached_report("inventory_location")
+def lightspeed_inventory_location(request, start_date, end_date, alignment, granularity):
     raw_data=fetch_inventory_location_raw(
-        start_date=start_date_obj,
-        end_date=end_date_obj
+        start_date=start_date,
+        end_date=end_date
     )
     
     # response=build_inventory_location_stats(
     #     raw_data=raw_data,
-    #     start_date=start_date_obj,
-    #     end_date=end_date_obj
+    #     start_date=start_date,
+    #     end_date=end_date
     # )
     
-    return Response(raw_data)
\ No newline at end of file
+    return Response(list(raw_data))
+
+
+# ======================Report bundle =========================
+@api_view(["GET"])
+@permission_classes([IsAnyAuthenticatedUser])
+def lightspeed_report_bundle(request):
+    """
+    Several reports for the same period in one response, e.g.
+    ?start_date=2025-03-01&end_date=2025-05-31&reports=sales-area,sales-orderType,operation-hour
+
+    `reports` takes report endpoint names (comma separated and/or repeated).
+    Reports over the same table share one scan; see build_report_bundle.
+    With async=true the bundle is queued and the response is the job to poll.
+    """
+    try:
+        start_date,end_date,_,granularity=report_options(request.GET)
+    except ValueError as exc:
+        return Response({"error":str(exc)},status=400)
+    
+    names=[
+        name.strip()
+        for value in request.GET.getlist("reports")
+        for name in value.split(",")
+        if name.strip()
+    ]
+    if not names:
+        return Response({"error":"reports is required"},status=400)
+    
+    unknown=[name for name in names if name not in BUNDLE_REPORTS]
+    if unknown:
+        return Response(
+            {"error":f"unknown reports: {', '.join(unknown)}","reports":list(BUNDLE_REPORTS)},
+            status=400
+        )
+    
+    unavailable=[
+        name for name in names
+        if granularity not in YOY_REPORTS[BUNDLE_REPORTS[name][0]].granularities
+    ]
+    if unavailable:
+        return Response({"error":f"not available per {granularity}: {', '.join(unavailable)}"},status=400)
+    
+    filters={
+        name: value for name, value in request.GET.items()
+        if name not in ("start_date", "end_date", "reports", "async")
+    }
+    
+    if wants_async(request):
+        job=submit_report_job(names, start_date, end_date, filters, bundle=True)
+        return job_response(request, job)
+    
+    response=build_report_bundle(names, start_date, end_date, filters)
+    return Response(response)
+
+
+# ======================Report jobs =========================
+@api_view(["GET"])
+@permission_classes([IsAnyAuthenticatedUser])
+def lightspeed_report_job(request, job_id):
+    """
+    State of a queued report request (?async=true on a report endpoint);
+    includes the report data once the job is done.
+    """
+    job=ReportJob.objects.select_related("result").filter(id=job_id).first()
+    if job is None:
+        return Response({"error":"job not found"},status=404)
+    
+    return job_response(request, job)
+
+
+@api_view(["GET"])
+@permission_classes([IsAnyAuthenticatedUser])
+def upstream_http_stats(request):
+    """
+    Latency counters of the shared upstream HTTP client (this worker process),
+    per API and endpoint. Optional ?api=lightspeed|shopify|shyfter|shipday.
+    """
+    return Response(http_stats(request.GET.get("api")), status=status.HTTP_200_OK)
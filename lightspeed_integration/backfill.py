@@ -0,0 +1,235 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+
+from django.db import connections
+from django.db.models import Count, F, Max, Min, Q, Sum
+from django.utils import timezone
+
+from backend.services.report_cache import invalidate_reports
+from lightspeed_integration.models import LightspeedReceipt, LightspeedReceiptBackfillWindow
+from lightspeed_integration.services import lightspeed_get_with_backoff
+from lightspeed_integration.utils.mappers import map_receipt_to_model
+
+logger = logging.getLogger(__name__)
+
+RECEIPT_BACKFILL_START = date(2022, 1, 1)
+RECEIPT_WINDOW_DAYS = 7
+RECEIPT_PAGE_SIZE = 100
+RECEIPT_BACKFILL_WORKERS = 4
+# Seconds a window stays claimed by the run fetching it; a window still
+# "running" after that was left behind by an interrupted run
+RECEIPT_WINDOW_LEASE = 60 * 60
+
+Window = LightspeedReceiptBackfillWindow
+
+
+def plan_receipt_windows(location, start_day=RECEIPT_BACKFILL_START, end_day=None, window_days=RECEIPT_WINDOW_DAYS):
+    """
+    Make sure a checkpoint row exists for every window between start_day and end_day.
+
+    Windows already done stay done, except the one that was still open (fetched
+    before its last day had passed), which is re-queued to pick up late receipts.
+
+    Returns:
+        int: Number of windows created or re-queued
+    """
+    end_day = end_day or timezone.localdate()
+    existing = {w.start_day: w for w in Window.objects.filter(location=location, start_day__gte=start_day, start_day__lte=end_day)}
+
+    to_create, queued = [], 0
+    current = start_day
+    while current <= end_day:
+        window_end = min(current + timedelta(days=window_days - 1), end_day)
+        window = existing.get(current)
+        if window is None:
+            to_create.append(Window(location=location, start_day=current, end_day=window_end))
+        elif window.end_day != window_end or (
+            window.status == Window.STATUS_DONE and window.finished_at and window.finished_at.date() <= window.end_day
+        ):
+            window.end_day = window_end
+            window.status = Window.STATUS_PENDING
+            window.save(update_fields=["end_day", "status", "updated_at"])
+            queued += 1
+        current = window_end + timedelta(days=1)
+
+    Window.objects.bulk_create(to_create, ignore_conflicts=True)
+    return len(to_create) + queued
+
+
+def _bulk_upsert_receipts(receipts, location):
+    """Insert or update one page of receipts in a single statement."""
+    update_fields = [
+        field.name for field in LightspeedReceipt._meta.concrete_fields
+        if field.name not in ("id", "created_at")
+    ]
+    objs = {}
+    for receipt in receipts:
+        receipt_id = receipt.get("id")
+        if not receipt_id:
+            continue
+        fields = map_receipt_to_model(receipt, location)
+        if fields["creation_date"] is None:
+            # creation_date is the partition key; such a receipt can't be stored
+            logger.warning("Receipt %s has no creation date; skipping", receipt_id)
+            continue
+        objs[receipt_id] = LightspeedReceipt(id=receipt_id, **fields)
+    LightspeedReceipt.objects.bulk_create(
+        list(objs.values()),
+        update_conflicts=True,
+        # The partitioned table's primary key is (id, creation_date)
+        unique_fields=["id", "creation_date"],
+        update_fields=update_fields,
+    )
+    return len(objs)
+
+
+def backfill_receipt_window(window_id):
+    """
+    Fetch every receipt page of one window and upsert them; checkpoint the result.
+    A window another run already claimed or finished is returned untouched.
+    Runs in a backfill worker thread. All Lightspeed calls go through
+    lightspeed_get, so workers of the same location share its token bucket.
+    """
+    # Claim the window unless another run got to it first
+    claimed = (
+        Window.objects
+        .filter(id=window_id, status__in=[Window.STATUS_PENDING, Window.STATUS_FAILED])
+        .update(
+            status=Window.STATUS_RUNNING,
+            attempts=F("attempts") + 1,
+            started_at=timezone.now(),
+            last_error=None,
+            updated_at=timezone.now(),
+        )
+    )
+    window = Window.objects.get(id=window_id)
+    if not claimed:
+        connections.close_all()
+        return window
+
+    fetched = saved = 0
+    offset = 0
+    try:
+        while True:
+            params = {
+                "from": window.start_day.strftime("%Y-%m-%d"),
+                "to": window.end_day.strftime("%Y-%m-%d"),
+                "offset": offset,
+                "amount": RECEIPT_PAGE_SIZE,
+            }
+            response = lightspeed_get_with_backoff("financial/receipt/", params, window.location)
+            results = response.get("results", []) if isinstance(response, dict) else response
+            if not results:
+                break
+
+            fetched += len(results)
+            saved += _bulk_upsert_receipts(results, window.location)
+            offset += RECEIPT_PAGE_SIZE
+
+        window.status = Window.STATUS_DONE
+        if fetched:
+            invalidate_reports("receipts", window.location, window.start_day, window.end_day)
+    except Exception as exc:
+        logger.exception("Receipt backfill failed for %s", window)
+        window.status = Window.STATUS_FAILED
+        window.last_error = str(exc)
+    finally:
+        window.fetched = fetched
+        window.saved = saved
+        window.finished_at = timezone.now()
+        window.save(update_fields=["status", "fetched", "saved", "finished_at", "last_error", "updated_at"])
+        connections.close_all()
+
+    return window
+
+
+def run_receipt_backfill(location, start_day=RECEIPT_BACKFILL_START, end_day=None, workers=RECEIPT_BACKFILL_WORKERS, retry_failed=True):
+    """
+    Backfill Lightspeed receipts for a location, resuming from the checkpoints.
+
+    Args:
+        location: Location passed to the Lightspeed API and stored on receipts
+        start_day: First day to backfill
+        end_day: Last day to backfill (default: today)
+        workers: Windows fetched concurrently
+        retry_failed: Also retry windows whose last attempt failed
+
+    Returns:
+        dict: receipt_backfill_status() of the location after the run
+    """
+    end_day = end_day or timezone.localdate()
+    plan_receipt_windows(location, start_day, end_day)
+
+    # Windows left "running" by an interrupted run are picked up again once
+    # their lease ran out; younger ones may belong to a run still in progress
+    Window.objects.filter(
+        Q(started_at__isnull=True) | Q(started_at__lt=timezone.now() - timedelta(seconds=RECEIPT_WINDOW_LEASE)),
+        location=location,
+        status=Window.STATUS_RUNNING,
+    ).update(status=Window.STATUS_PENDING)
+
+    statuses = [Window.STATUS_PENDING] + ([Window.STATUS_FAILED] if retry_failed else [])
+    window_ids = list(
+        Window.objects
+        .filter(location=location, status__in=statuses, start_day__gte=start_day, start_day__lte=end_day)
+        .order_by("start_day")
+        .values_list("id", flat=True)
+    )
+    logger.info("Receipt backfill for %s: %s windows to fetch with %s workers", location, len(window_ids), workers)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"receipts-{location}") as pool:
+        futures = [pool.submit(backfill_receipt_window, window_id) for window_id in window_ids]
+        for future in as_completed(futures):
+            window = future.result()
+            logger.info(
+                "Receipt window %s → %s %s (fetched=%s saved=%s)",
+                window.start_day, window.end_day, window.status, window.fetched, window.saved,
+            )
+
+    return next(iter(receipt_backfill_status(location)), {})
+
+
+def receipt_backfill_status(location=None):
+    """
+    Progress of the receipt backfill per location.
+
+    Returns:
+        list: One dict per location with window counts per status, receipts
+              saved, covered date range, progress percentage and the latest error
+    """
+    windows = Window.objects.all()
+    if location:
+        windows = windows.filter(location=location)
+
+    rows = (
+        windows.values("location")
+        .annotate(
+            total=Count("id"),
+            done=Count("id", filter=Q(status=Window.STATUS_DONE)),
+            running=Count("id", filter=Q(status=Window.STATUS_RUNNING)),
+            pending=Count("id", filter=Q(status=Window.STATUS_PENDING)),
+            failed=Count("id", filter=Q(status=Window.STATUS_FAILED)),
+            receipts_saved=Sum("saved"),
+            first_day=Min("start_day"),
+            last_day=Max("end_day"),
+            last_activity=Max("updated_at"),
+        )
+        .order_by("location")
+    )
+
+    status = []
+    for row in rows:
+        last_failed = (
+            windows.filter(location=row["location"], status=Window.STATUS_FAILED)
+            .order_by("-finished_at")
+            .values("start_day", "end_day", "last_error")
+            .first()
+        )
+        status.append({
+            **row,
+            "receipts_saved": row["receipts_saved"] or 0,
+            "progress": round(100 * row["done"] / row["total"], 1) if row["total"] else 0,
+            "last_error": last_failed,
+        })
+    return status
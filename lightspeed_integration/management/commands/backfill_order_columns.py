@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from lightspeed_integration.models import LightspeedOrder
+from lightspeed_integration.rollups import refresh_daily_sales, refresh_order_columns
+
+
+class Command(BaseCommand):
+    help = "Recomputes the report columns of stored Lightspeed orders from their JSON payload"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000, help="Order ids updated per statement")
+        parser.add_argument("--only-missing", action="store_true", help="Only orders whose columns were never derived")
+        parser.add_argument("--skip-rollups", action="store_true", help="Don't rebuild lightspeed_daily_sales afterwards")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        orders = LightspeedOrder.objects.order_by("id")
+        if options["only_missing"]:
+            orders = orders.filter(local_day__isnull=True, creation_date__isnull=False)
+
+        updated = 0
+        last_id = None
+        while True:
+            # Keyset batches: Lightspeed ids are sparse, so walk the stored ids rather than the id range
+            batch = orders if last_id is None else orders.filter(id__gt=last_id)
+            ids = list(batch.values_list("id", flat=True)[:batch_size])
+            if not ids:
+                break
+            written = refresh_order_columns(ids[0], ids[-1], only_missing=options["only_missing"])
+            updated += written
+            self.stdout.write(f"Orders {ids[0]}-{ids[-1]}: {written} updated")
+            last_id = ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(f"Updated report columns of {updated} orders"))
+
+        if not options["skip_rollups"]:
+            written = refresh_daily_sales()
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} daily sales rows"))
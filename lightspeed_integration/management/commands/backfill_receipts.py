@@ -0,0 +1,49 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from lightspeed_integration.backfill import (
+    RECEIPT_BACKFILL_START,
+    RECEIPT_BACKFILL_WORKERS,
+    receipt_backfill_status,
+    run_receipt_backfill,
+)
+
+
+class Command(BaseCommand):
+    help = "Backfills Lightspeed financial receipts in checkpointed windows (resumes where the last run stopped)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--location", action="append", help="Location to backfill (repeatable, default: Dendermonde)")
+        parser.add_argument("--start", type=date.fromisoformat, default=RECEIPT_BACKFILL_START, help="First day (YYYY-MM-DD)")
+        parser.add_argument("--end", type=date.fromisoformat, help="Last day (YYYY-MM-DD, default: today)")
+        parser.add_argument("--workers", type=int, default=RECEIPT_BACKFILL_WORKERS, help="Windows fetched concurrently per location")
+        parser.add_argument("--skip-failed", action="store_true", help="Do not retry windows that failed before")
+        parser.add_argument("--status", action="store_true", help="Only print progress, do not fetch")
+
+    def handle(self, *args, **options):
+        locations = options["location"] or ["Dendermonde"]
+
+        for location in locations:
+            if options["status"]:
+                status = next(iter(receipt_backfill_status(location)), {})
+            else:
+                status = run_receipt_backfill(
+                    location,
+                    start_day=options["start"],
+                    end_day=options["end"],
+                    workers=options["workers"],
+                    retry_failed=not options["skip_failed"],
+                )
+
+            if not status:
+                self.stdout.write(f"{location}: no backfill windows")
+                continue
+
+            self.stdout.write(
+                f"{location}: {status['done']}/{status['total']} windows done ({status['progress']}%), "
+                f"{status['failed']} failed, {status['pending']} pending, {status['receipts_saved']} receipts"
+            )
+            if status["failed"]:
+                self.stdout.write(self.style.WARNING(f"  last error: {status['last_error']}"))
+        self.stdout.write(self.style.SUCCESS("Receipt backfill finished"))
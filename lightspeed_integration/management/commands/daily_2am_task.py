@@ -1,10 +1,28 @@
 from django.core.management.base import BaseCommand
-from tasks import daily_2am_task
+from tasks import LOCATIONS, daily_2am_task
 
 class Command(BaseCommand):
     help = "Runs daily task at 2 AM"
 
+    def add_arguments(self, parser):
+        parser.add_argument("--location", action="append", choices=LOCATIONS, help="Only sync this location (repeatable)")
+        parser.add_argument("--max-workers", type=int, help="Maximum number of locations synced at once")
+
     def handle(self, *args, **kwargs):
-        daily_2am_task()
-        self.stdout.write(self.style.SUCCESS('Successfully executed daily 2 AM task'))
-        
\ No newline at end of file
+        summary = daily_2am_task(locations=kwargs["location"], max_workers=kwargs["max_workers"])
+        for result in summary["locations"]:
+            if result["ok"]:
+                self.stdout.write(
+                    f"{result['location']}: fetched={result['fetched']} saved={result['saved']} "
+                    f"skipped={result['skipped']} in {result['duration']:.2f}s"
+                )
+            else:
+                self.stdout.write(self.style.ERROR(f"{result['location']}: failed after {result['duration']:.2f}s - {result['error']}"))
+        self.stdout.write(
+            f"Wall time {summary['wall_time']}s (sum of locations {summary['location_time_total']}s, "
+            f"slowest {summary['slowest_location']} {summary['slowest_duration']}s)"
+        )
+        if summary["failed_locations"]:
+            self.stdout.write(self.style.WARNING(f"Failed locations: {', '.join(summary['failed_locations'])}"))
+        else:
+            self.stdout.write(self.style.SUCCESS('Successfully executed daily 2 AM task'))
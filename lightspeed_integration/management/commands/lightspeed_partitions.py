@@ -0,0 +1,53 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from lightspeed_integration.partitions import (
+    PARTITION_MONTHS_AHEAD,
+    PARTITIONED_TABLES,
+    detach_partitions,
+    ensure_partitions,
+    list_partitions,
+)
+
+
+class Command(BaseCommand):
+    help = "Lists, creates and detaches the monthly partitions of lightspeed_orders and lightspeed_financial_receipts"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--table", action="append", choices=sorted(PARTITIONED_TABLES), help="Only this table (repeatable)")
+        parser.add_argument("--ensure", action="store_true", help="Create missing partitions up to --ahead months from now")
+        parser.add_argument("--from", dest="start", type=date.fromisoformat, help="With --ensure: first month to create (YYYY-MM-DD)")
+        parser.add_argument("--ahead", type=int, default=PARTITION_MONTHS_AHEAD, help="Months created ahead of the current one")
+        parser.add_argument("--detach-before", type=date.fromisoformat, help="Detach partitions of months before this date (YYYY-MM-DD)")
+        parser.add_argument("--archive-schema", help="With --detach-before: move detached partitions into this schema")
+        parser.add_argument("--drop", action="store_true", help="With --detach-before: drop detached partitions")
+
+    def handle(self, *args, **options):
+        tables = options["table"] or list(PARTITIONED_TABLES)
+        if options["drop"] and options["archive_schema"]:
+            raise CommandError("--drop and --archive-schema are mutually exclusive")
+
+        if options["ensure"]:
+            created = ensure_partitions(tables, months_ahead=options["ahead"], start=options["start"])
+            self.stdout.write(self.style.SUCCESS(f"Created {len(created)} partitions"))
+            for name in created:
+                self.stdout.write(f"  {name}")
+
+        if options["detach_before"]:
+            for table in tables:
+                detached = detach_partitions(
+                    table,
+                    options["detach_before"],
+                    archive_schema=options["archive_schema"],
+                    drop=options["drop"],
+                )
+                self.stdout.write(self.style.SUCCESS(f"{table}: detached {len(detached)} partitions"))
+                for name in detached:
+                    self.stdout.write(f"  {name}")
+
+        for table in tables:
+            partitions = list_partitions(table)
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{table} ({len(partitions)} partitions)"))
+            for partition in partitions:
+                self.stdout.write(f"  {partition['name']:<48} ~{partition['rows']} rows")
@@ -0,0 +1,22 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from lightspeed_integration.rollups import refresh_daily_sales
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the lightspeed_daily_sales rollup from stored orders"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--location", help="Stored location value, e.g. Dendermonde (default: all)")
+        parser.add_argument("--start", type=date.fromisoformat, help="First day to rebuild (YYYY-MM-DD)")
+        parser.add_argument("--end", type=date.fromisoformat, help="Last day to rebuild (YYYY-MM-DD)")
+
+    def handle(self, *args, **options):
+        written = refresh_daily_sales(
+            location=options["location"],
+            start_day=options["start"],
+            end_day=options["end"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} daily sales rows"))
@@ -0,0 +1,67 @@
+# Generated by Django 4.2.13 on 2026-10-18 14:12
+
+from django.db import migrations, models
+
+
+POPULATE_DAILY_SALES_SQL = """
+    INSERT INTO lightspeed_daily_sales (
+        location, day, order_count, customer_count, payment_total,
+        max_guest_count, delivery_minutes_total, delivery_count, refreshed_at
+    )
+    SELECT
+        o.location,
+        o.creation_date::date,
+        COUNT(*),
+        COUNT(DISTINCT o.customer_id),
+        COALESCE(SUM(p.payment_amount), 0),
+        COALESCE(MAX(g.guest_count), 0),
+        COALESCE(SUM(EXTRACT(EPOCH FROM (o.delivery_date - o.creation_date)) / 60), 0),
+        COUNT(o.delivery_date),
+        NOW()
+    FROM lightspeed_orders o
+    LEFT JOIN LATERAL (
+        SELECT SUM((elem->>'amount')::numeric) AS payment_amount
+        FROM jsonb_array_elements(o.order_payments) AS elem
+    ) p ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT MAX((elem->>'amount')::numeric) AS guest_count
+        FROM jsonb_array_elements(o.order_items) AS elem
+    ) g ON TRUE
+    WHERE o.creation_date IS NOT NULL
+    GROUP BY o.location, o.creation_date::date
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lightspeed_integration', '0008_lightspeedreceipt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LightspeedDailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('location', models.CharField(help_text='Order location', max_length=100)),
+                ('day', models.DateField(help_text='Order creation day')),
+                ('order_count', models.IntegerField(default=0, help_text='Number of orders')),
+                ('customer_count', models.IntegerField(default=0, help_text='Distinct customers')),
+                ('payment_total', models.DecimalField(decimal_places=2, default=0, help_text='Sum of order payments', max_digits=14)),
+                ('max_guest_count', models.DecimalField(decimal_places=2, default=0, help_text='Largest order item amount of the day', max_digits=12)),
+                ('delivery_minutes_total', models.DecimalField(decimal_places=4, default=0, help_text='Sum of delivery minutes', max_digits=16)),
+                ('delivery_count', models.IntegerField(default=0, help_text='Orders with a delivery date')),
+                ('refreshed_at', models.DateTimeField(auto_now=True, help_text='When this row was last rebuilt')),
+            ],
+            options={
+                'db_table': 'lightspeed_daily_sales',
+                'ordering': ['location', 'day'],
+                'indexes': [models.Index(fields=['day'], name='lightspeed__day_6486ad_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='lightspeeddailysales',
+            constraint=models.UniqueConstraint(fields=('location', 'day'), name='lightspeed_daily_sales_location_day_uniq'),
+        ),
+        migrations.RunSQL(POPULATE_DAILY_SALES_SQL, migrations.RunSQL.noop),
+    ]
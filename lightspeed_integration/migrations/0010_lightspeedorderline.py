@@ -0,0 +1,65 @@
+# Generated by Django 4.2.13 on 2026-10-18 14:15
+
+from django.db import migrations, models
+
+
+POPULATE_ORDER_LINES_SQL = """
+    INSERT INTO lightspeed_order_lines (
+        order_id, line_number, location, creation_date, day,
+        customer_id, delivery_minutes, product_id, quantity, unit_price
+    )
+    SELECT
+        o.id,
+        item.line_number,
+        o.location,
+        o.creation_date,
+        o.creation_date::date,
+        o.customer_id,
+        EXTRACT(EPOCH FROM (o.delivery_date - o.creation_date)) / 60,
+        CASE
+            WHEN item.elem->>'productId' ~ '^-?[0-9]+$'
+            THEN (item.elem->>'productId')::bigint
+        END,
+        COALESCE((item.elem->>'quantity')::numeric, 1),
+        (item.elem->>'unitPrice')::numeric
+    FROM lightspeed_orders o
+    CROSS JOIN LATERAL jsonb_array_elements(o.order_items)
+        WITH ORDINALITY AS item(elem, line_number)
+    WHERE o.creation_date IS NOT NULL
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lightspeed_integration', '0009_lightspeeddailysales'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LightspeedOrderLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_id', models.BigIntegerField(help_text='Lightspeed order ID')),
+                ('line_number', models.IntegerField(help_text='Position of the item in the order')),
+                ('location', models.CharField(help_text='Order location', max_length=100)),
+                ('creation_date', models.DateTimeField(help_text='Order creation date')),
+                ('day', models.DateField(help_text='Order creation day')),
+                ('customer_id', models.BigIntegerField(blank=True, help_text='Customer ID', null=True)),
+                ('delivery_minutes', models.DecimalField(blank=True, decimal_places=6, help_text='Minutes between creation and delivery', max_digits=16, null=True)),
+                ('product_id', models.BigIntegerField(blank=True, help_text='Lightspeed product ID', null=True)),
+                ('quantity', models.DecimalField(decimal_places=3, default=1, help_text='Item quantity', max_digits=12)),
+                ('unit_price', models.DecimalField(blank=True, decimal_places=4, help_text='Item unit price', max_digits=12, null=True)),
+            ],
+            options={
+                'db_table': 'lightspeed_order_lines',
+                'ordering': ['order_id', 'line_number'],
+                'indexes': [models.Index(fields=['product_id', 'day'], name='lightspeed__product_8e5891_idx'), models.Index(fields=['day', 'location'], name='lightspeed__day_c96fd7_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='lightspeedorderline',
+            constraint=models.UniqueConstraint(fields=('order_id', 'line_number'), name='lightspeed_order_lines_order_line_uniq'),
+        ),
+        migrations.RunSQL(POPULATE_ORDER_LINES_SQL, migrations.RunSQL.noop),
+    ]
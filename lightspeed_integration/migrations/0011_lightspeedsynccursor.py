@@ -0,0 +1,29 @@
+# Generated by Django 4.2.13 on 2026-10-18 14:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lightspeed_integration', '0010_lightspeedorderline'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LightspeedSyncCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('location', models.CharField(help_text='Lightspeed account location (e.g. Frietchalet)', max_length=100, unique=True)),
+                ('last_creation_date', models.DateTimeField(blank=True, help_text='Creation date of the newest ingested order', null=True)),
+                ('last_order_id', models.BigIntegerField(blank=True, help_text='ID of the newest ingested order', null=True)),
+                ('last_run_at', models.DateTimeField(blank=True, help_text='When the last sync finished', null=True)),
+                ('last_run_saved', models.IntegerField(default=0, help_text='Orders saved by the last sync')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'lightspeed_sync_cursors',
+                'ordering': ['location'],
+            },
+        ),
+    ]
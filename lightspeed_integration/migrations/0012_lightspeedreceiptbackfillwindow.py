@@ -0,0 +1,39 @@
+# Generated by Django 4.2.13 on 2026-10-18 14:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lightspeed_integration', '0011_lightspeedsynccursor'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LightspeedReceiptBackfillWindow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('location', models.CharField(help_text='Location passed to the Lightspeed API', max_length=100)),
+                ('start_day', models.DateField(help_text='First day of the window')),
+                ('end_day', models.DateField(help_text='Last day of the window (inclusive)')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('fetched', models.IntegerField(default=0, help_text='Receipts fetched in the last attempt')),
+                ('saved', models.IntegerField(default=0, help_text='Receipts written in the last attempt')),
+                ('attempts', models.IntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, null=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'lightspeed_receipt_backfill_windows',
+                'ordering': ['location', 'start_day'],
+                'indexes': [models.Index(fields=['location', 'status'], name='lightspeed__locatio_d5fb55_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='lightspeedreceiptbackfillwindow',
+            constraint=models.UniqueConstraint(fields=('location', 'start_day'), name='lightspeed_receipt_backfill_location_start_uniq'),
+        ),
+    ]
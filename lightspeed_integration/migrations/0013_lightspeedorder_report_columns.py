@@ -0,0 +1,89 @@
+# Generated by Django 4.2.13 on 2026-10-18 14:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Same derivation as _order_report_fields (utils/mappers.py), for the orders
+# stored before the columns existed.
+POPULATE_ORDER_REPORT_COLUMNS_SQL = """
+    UPDATE lightspeed_orders o
+    SET
+        payment_total = COALESCE((
+            SELECT SUM((elem->>'amount')::numeric)
+            FROM jsonb_array_elements(
+                CASE WHEN jsonb_typeof(o.order_payments) = 'array' THEN o.order_payments ELSE '[]'::jsonb END
+            ) AS elem
+            WHERE elem->>'amount' ~ '^-?[0-9]+(\\.[0-9]+)?([eE][-+]?[0-9]+)?$'
+        ), 0),
+        item_count = CASE WHEN jsonb_typeof(o.order_items) = 'array' THEN jsonb_array_length(o.order_items) ELSE 0 END,
+        item_quantity_total = COALESCE(items.quantity_total, 0),
+        guest_amount = items.guest_amount,
+        delivery_minutes = ROUND(EXTRACT(EPOCH FROM (o.delivery_date - o.creation_date)) / 60, 6),
+        local_day = (o.creation_date AT TIME ZONE %s)::date,
+        local_hour = EXTRACT(HOUR FROM o.creation_date AT TIME ZONE %s)
+    FROM lightspeed_orders src
+    LEFT JOIN LATERAL (
+        SELECT
+            SUM((elem->>'amount')::numeric) AS quantity_total,
+            MAX((elem->>'amount')::numeric) AS guest_amount
+        FROM jsonb_array_elements(
+            CASE WHEN jsonb_typeof(src.order_items) = 'array' THEN src.order_items ELSE '[]'::jsonb END
+        ) AS elem
+        WHERE elem->>'amount' ~ '^-?[0-9]+(\\.[0-9]+)?([eE][-+]?[0-9]+)?$'
+    ) items ON TRUE
+    WHERE src.id = o.id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lightspeed_integration', '0012_lightspeedreceiptbackfillwindow'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lightspeedorder',
+            name='delivery_minutes',
+            field=models.DecimalField(blank=True, decimal_places=6, help_text='Minutes from creation to delivery', max_digits=16, null=True),
+        ),
+        migrations.AddField(
+            model_name='lightspeedorder',
+            name='guest_amount',
+            field=models.DecimalField(blank=True, decimal_places=3, help_text='Largest order item amount (guest count in reports)', max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='lightspeedorder',
+            name='item_count',
+            field=models.IntegerField(default=0, help_text='Number of order items'),
+        ),
+        migrations.AddField(
+            model_name='lightspeedorder',
+            name='item_quantity_total',
+            field=models.DecimalField(decimal_places=3, default=0, help_text='Sum of order item amounts', max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='lightspeedorder',
+            name='local_day',
+            field=models.DateField(blank=True, help_text='Creation day in settings.TIME_ZONE', null=True),
+        ),
+        migrations.AddField(
+            model_name='lightspeedorder',
+            name='local_hour',
+            field=models.SmallIntegerField(blank=True, help_text='Creation hour (0-23) in settings.TIME_ZONE', null=True),
+        ),
+        migrations.AddField(
+            model_name='lightspeedorder',
+            name='payment_total',
+            field=models.DecimalField(decimal_places=4, default=0, help_text='Sum of order payment amounts', max_digits=14),
+        ),
+        migrations.AddIndex(
+            model_name='lightspeedorder',
+            index=models.Index(fields=['local_day', 'location'], name='lightspeed_orders_day_loc_idx'),
+        ),
+        migrations.RunSQL(
+            [(POPULATE_ORDER_REPORT_COLUMNS_SQL, [settings.TIME_ZONE, settings.TIME_ZONE])],
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.13 on 2026-10-18 14:42
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without locking writes on the live tables
+    atomic = False
+
+    dependencies = [
+        ('lightspeed_integration', '0013_lightspeedorder_report_columns'),
+    ]
+
+    operations = [
+        RemoveIndexConcurrently(
+            model_name='lightspeedorder',
+            name='lightspeed_orders_day_loc_idx',
+        ),
+        AddIndexConcurrently(
+            model_name='lightspeedorder',
+            index=models.Index(fields=['local_day', 'location'], include=('payment_total', 'guest_amount', 'delivery_minutes', 'customer_id', 'local_hour', 'external_reference'), name='lightspeed_orders_day_loc_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='lightspeedorder',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['creation_date'], name='lightspeed_orders_created_brin'),
+        ),
+        AddIndexConcurrently(
+            model_name='lightspeedreceipt',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['creation_date'], name='lightspeed_rcpt_created_brin'),
+        ),
+    ]
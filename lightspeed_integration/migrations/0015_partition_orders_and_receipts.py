@@ -0,0 +1,128 @@
+from datetime import date
+
+from django.db import migrations, models
+from django.utils import timezone
+
+# Kept in sync with lightspeed_integration.partitions.PARTITIONED_TABLES
+TABLES = {
+    "lightspeed_orders": "creation_date",
+    "lightspeed_financial_receipts": "creation_date",
+}
+MONTHS_AHEAD = 3
+# The receipt dump goes back to here (backfill.RECEIPT_BACKFILL_START)
+FIRST_MONTH = date(2022, 1, 1)
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _index_definitions(cursor, table):
+    """CREATE INDEX statements of every non-primary-key index on `table`."""
+    cursor.execute(
+        """
+        SELECT i.indexname, i.indexdef
+        FROM pg_indexes i
+        JOIN pg_class c ON c.relname = i.indexname
+        JOIN pg_index x ON x.indexrelid = c.oid
+        WHERE i.tablename = %s AND NOT x.indisprimary
+        """,
+        [table],
+    )
+    return cursor.fetchall()
+
+
+def _columns(cursor, table):
+    cursor.execute(
+        """
+        SELECT column_name FROM information_schema.columns
+        WHERE table_name = %s AND table_schema = current_schema()
+        ORDER BY ordinal_position
+        """,
+        [table],
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _rebuild(cursor, table, column, partitioned):
+    """
+    Swap `table` for a partitioned (or plain) copy holding the same rows,
+    primary key and indexes (same names, so later migrations keep working).
+    """
+    legacy = f"{table}_unpartitioned" if partitioned else f"{table}_partitioned"
+    indexes = _index_definitions(cursor, table)
+    columns = _columns(cursor, table)
+
+    cursor.execute(f'ALTER TABLE "{table}" RENAME TO "{legacy}"')
+    cursor.execute(
+        f'CREATE TABLE "{table}" (LIKE "{legacy}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+        + (f' PARTITION BY RANGE ("{column}")' if partitioned else "")
+    )
+    # The partition column becomes part of the primary key
+    cursor.execute(f'ALTER TABLE "{table}" ALTER COLUMN "{column}" {"SET" if partitioned else "DROP"} NOT NULL')
+
+    if partitioned:
+        cursor.execute(f'SELECT MIN("{column}") FROM "{legacy}"')
+        oldest = cursor.fetchone()[0]
+        today = timezone.localdate()
+        month = min(FIRST_MONTH, date(oldest.year, oldest.month, 1)) if oldest else FIRST_MONTH
+        last = _add_months(date(today.year, today.month, 1), MONTHS_AHEAD)
+        while month <= last:
+            cursor.execute(
+                f'CREATE TABLE "{table}_p{month:%Y_%m}" PARTITION OF "{table}" FOR VALUES FROM (%s) TO (%s)',
+                [f"{month:%Y-%m-%d} 00:00:00+00", f"{_add_months(month, 1):%Y-%m-%d} 00:00:00+00"],
+            )
+            month = _add_months(month, 1)
+        cursor.execute(f'CREATE TABLE "{table}_default" PARTITION OF "{table}" DEFAULT')
+
+    # Rows stored without a creation date fall back to when we stored them
+    select_list = ", ".join(
+        f'COALESCE("{name}", created_at)' if name == column else f'"{name}"' for name in columns
+    )
+    column_list = ", ".join(f'"{name}"' for name in columns)
+    cursor.execute(f'INSERT INTO "{table}" ({column_list}) SELECT {select_list} FROM "{legacy}"')
+    cursor.execute(f'DROP TABLE "{legacy}"')
+
+    primary_key = f'"id", "{column}"' if partitioned else '"id"'
+    cursor.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_pkey" PRIMARY KEY ({primary_key})')
+    for _, definition in indexes:
+        # Partitioned parents report their indexes as "ON ONLY"; CONCURRENTLY isn't allowed on them
+        cursor.execute(definition.replace(" ON ONLY ", " ON "))
+    cursor.execute(f'ANALYZE "{table}"')
+
+
+def partition_tables(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for table, column in TABLES.items():
+            _rebuild(cursor, table, column, partitioned=True)
+
+
+def unpartition_tables(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for table, column in TABLES.items():
+            _rebuild(cursor, table, column, partitioned=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lightspeed_integration', '0014_report_covering_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_tables, unpartition_tables),
+        # NOT NULL is set (and dropped on reverse) by the rebuild itself
+        migrations.SeparateDatabaseAndState(state_operations=[
+            migrations.AlterField(
+                model_name='lightspeedorder',
+                name='creation_date',
+                field=models.DateTimeField(help_text='Order creation date (partition key)'),
+            ),
+            migrations.AlterField(
+                model_name='lightspeedreceipt',
+                name='creation_date',
+                field=models.DateTimeField(help_text='Receipt creation date (partition key)'),
+            ),
+        ]),
+    ]
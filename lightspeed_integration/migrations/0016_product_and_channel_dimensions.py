@@ -0,0 +1,59 @@
+# Generated by Django 4.2.13 on 2026-10-18 15:17
+
+from django.db import migrations, models
+
+
+POPULATE_DIMENSIONS_SQL = """
+    INSERT INTO lightspeed_order_channels (name, created_at)
+    SELECT DISTINCT split_part(external_reference, ' ', 1), NOW()
+    FROM lightspeed_orders
+    WHERE external_reference IS NOT NULL;
+
+    INSERT INTO lightspeed_product_names (name, product_count, refreshed_at)
+    SELECT name, COUNT(*), NOW()
+    FROM lightspeed_products
+    WHERE name IS NOT NULL
+    GROUP BY name;
+
+    INSERT INTO dim_location (name, is_default, created_at, updated_at)
+    SELECT DISTINCT o.location, FALSE, NOW(), NOW()
+    FROM lightspeed_orders o
+    WHERE NOT EXISTS (SELECT 1 FROM dim_location l WHERE l.name = o.location);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0011_location_dimension'),
+        ('lightspeed_integration', '0015_partition_orders_and_receipts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LightspeedOrderChannel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Channel name', max_length=100, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'lightspeed_order_channels',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='LightspeedProductName',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Product name', max_length=255, unique=True)),
+                ('product_count', models.IntegerField(default=0, help_text='Stored products with this name')),
+                ('refreshed_at', models.DateTimeField(auto_now=True, help_text='When this row was last rebuilt')),
+            ],
+            options={
+                'db_table': 'lightspeed_product_names',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.RunSQL(POPULATE_DIMENSIONS_SQL, migrations.RunSQL.noop),
+    ]
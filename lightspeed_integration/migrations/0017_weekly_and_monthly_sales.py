@@ -0,0 +1,93 @@
+# Generated by Django 4.2.13 on 2026-10-18 15:28
+
+from django.db import migrations, models
+
+
+POPULATE_PERIOD_SALES_SQL = """
+    INSERT INTO lightspeed_weekly_sales (
+        location, week_start, order_count, customer_count, payment_total,
+        max_guest_count, delivery_minutes_total, delivery_count, refreshed_at
+    )
+    SELECT
+        s.location, c.week_start, SUM(s.order_count), SUM(s.customer_count), SUM(s.payment_total),
+        SUM(s.max_guest_count), SUM(s.delivery_minutes_total), SUM(s.delivery_count), NOW()
+    FROM lightspeed_daily_sales s
+    JOIN calendar_day c
+      ON c.day = s.day
+    GROUP BY s.location, c.week_start;
+
+    INSERT INTO lightspeed_monthly_sales (
+        location, month_start, order_count, customer_count, payment_total,
+        max_guest_count, delivery_minutes_total, delivery_count, refreshed_at
+    )
+    SELECT
+        s.location, c.month_start, SUM(s.order_count), SUM(s.customer_count), SUM(s.payment_total),
+        SUM(s.max_guest_count), SUM(s.delivery_minutes_total), SUM(s.delivery_count), NOW()
+    FROM lightspeed_daily_sales s
+    JOIN calendar_day c
+      ON c.day = s.day
+    GROUP BY s.location, c.month_start;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0012_calendar_dimension'),
+        ('lightspeed_integration', '0016_product_and_channel_dimensions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LightspeedMonthlySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('location', models.CharField(help_text='Order location', max_length=100)),
+                ('month_start', models.DateField(help_text='First day of the month')),
+                ('order_count', models.IntegerField(default=0, help_text='Number of orders')),
+                ('customer_count', models.IntegerField(default=0, help_text='Sum of the daily distinct customers')),
+                ('payment_total', models.DecimalField(decimal_places=2, default=0, help_text='Sum of order payments', max_digits=14)),
+                ('max_guest_count', models.DecimalField(decimal_places=2, default=0, help_text='Sum of the daily largest order item amounts', max_digits=12)),
+                ('delivery_minutes_total', models.DecimalField(decimal_places=4, default=0, help_text='Sum of delivery minutes', max_digits=16)),
+                ('delivery_count', models.IntegerField(default=0, help_text='Orders with a delivery date')),
+                ('refreshed_at', models.DateTimeField(auto_now=True, help_text='When this row was last rebuilt')),
+            ],
+            options={
+                'db_table': 'lightspeed_monthly_sales',
+                'ordering': ['location', 'month_start'],
+            },
+        ),
+        migrations.CreateModel(
+            name='LightspeedWeeklySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('location', models.CharField(help_text='Order location', max_length=100)),
+                ('week_start', models.DateField(help_text='Monday of the week')),
+                ('order_count', models.IntegerField(default=0, help_text='Number of orders')),
+                ('customer_count', models.IntegerField(default=0, help_text='Sum of the daily distinct customers')),
+                ('payment_total', models.DecimalField(decimal_places=2, default=0, help_text='Sum of order payments', max_digits=14)),
+                ('max_guest_count', models.DecimalField(decimal_places=2, default=0, help_text='Sum of the daily largest order item amounts', max_digits=12)),
+                ('delivery_minutes_total', models.DecimalField(decimal_places=4, default=0, help_text='Sum of delivery minutes', max_digits=16)),
+                ('delivery_count', models.IntegerField(default=0, help_text='Orders with a delivery date')),
+                ('refreshed_at', models.DateTimeField(auto_now=True, help_text='When this row was last rebuilt')),
+            ],
+            options={
+                'db_table': 'lightspeed_weekly_sales',
+                'ordering': ['location', 'week_start'],
+                'indexes': [models.Index(fields=['week_start'], name='lightspeed__week_st_185fda_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='lightspeedweeklysales',
+            constraint=models.UniqueConstraint(fields=('location', 'week_start'), name='lightspeed_weekly_sales_location_week_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='lightspeedmonthlysales',
+            index=models.Index(fields=['month_start'], name='lightspeed__month_s_2cae38_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='lightspeedmonthlysales',
+            constraint=models.UniqueConstraint(fields=('location', 'month_start'), name='lightspeed_monthly_sales_location_month_uniq'),
+        ),
+        migrations.RunSQL(POPULATE_PERIOD_SALES_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,132 @@
+# Generated by Django 4.2.13 on 2026-10-18 15:34
+
+from django.db import migrations, models
+
+
+# HyperLogLog sketches of customer ids: 2048 one-byte registers (about 2%
+# standard error; linear counting keeps small counts within a few customers).
+# A customer sets register (hash & 2047) to the rank of the first set bit of
+# the remaining 53 hash bits; sketches merge by taking every register's max,
+# so the distinct customers of several days are counted from their sketches.
+CUSTOMER_SKETCH_SQL = r"""
+    CREATE FUNCTION customer_sketch_add(sketch bytea, customer_id bigint) RETURNS bytea
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+        SELECT CASE
+            WHEN customer_id IS NULL THEN sketch
+            ELSE set_byte(registers, register, GREATEST(get_byte(registers, register), rank))
+        END
+        FROM (
+            SELECT
+                COALESCE(sketch, decode(repeat('00', 2048), 'hex')) AS registers,
+                (hash & 2047)::integer AS register,
+                54 - length(ltrim((hash >> 11)::bit(53)::text, '0')) AS rank
+            FROM (SELECT hashint8extended(customer_id, 0) AS hash) h
+        ) r
+    $$;
+
+    CREATE FUNCTION customer_sketch_merge(a bytea, b bytea) RETURNS bytea
+    LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE AS $$
+        SELECT decode(string_agg(lpad(to_hex(GREATEST(get_byte(a, i), get_byte(b, i))), 2, '0'), '' ORDER BY i), 'hex')
+        FROM generate_series(0, length(a) - 1) i
+    $$;
+
+    CREATE FUNCTION customer_sketch_count(sketch bytea) RETURNS integer
+    LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE AS $$
+        SELECT round(CASE
+            WHEN estimate <= 2.5 * m AND zeros > 0 THEN m * ln(m / zeros)
+            ELSE estimate
+        END)::integer
+        FROM (
+            SELECT
+                length(sketch)::float8 AS m,
+                COUNT(*) FILTER (WHERE rank = 0)::float8 AS zeros,
+                0.7213 / (1 + 1.079 / length(sketch)) * length(sketch)::float8 ^ 2 / SUM(2.0::float8 ^ -rank) AS estimate
+            FROM (SELECT get_byte(sketch, i) AS rank FROM generate_series(0, length(sketch) - 1) i) r
+        ) e
+    $$;
+
+    -- Sketch of the customer ids of a group (NULL when it has none)
+    CREATE AGGREGATE customer_sketch_agg(bigint) (SFUNC = customer_sketch_add, STYPE = bytea);
+
+    -- Union of sketches: the sketch of all their customers
+    CREATE AGGREGATE customer_sketch_union(bytea) (SFUNC = customer_sketch_merge, STYPE = bytea, PARALLEL = SAFE);
+"""
+
+DROP_CUSTOMER_SKETCH_SQL = """
+    DROP AGGREGATE customer_sketch_union(bytea);
+    DROP AGGREGATE customer_sketch_agg(bigint);
+    DROP FUNCTION customer_sketch_count(bytea);
+    DROP FUNCTION customer_sketch_merge(bytea, bytea);
+    DROP FUNCTION customer_sketch_add(bytea, bigint);
+"""
+
+POPULATE_CUSTOMER_SKETCHES_SQL = """
+    UPDATE lightspeed_daily_sales s
+    SET customer_sketch = o.sketch
+    FROM (
+        SELECT location, local_day, customer_sketch_agg(customer_id) AS sketch
+        FROM lightspeed_orders
+        WHERE local_day IS NOT NULL
+        GROUP BY location, local_day
+    ) o
+    WHERE o.location = s.location AND o.local_day = s.day;
+
+    UPDATE lightspeed_weekly_sales w
+    SET customer_sketch = d.sketch, customer_count = COALESCE(customer_sketch_count(d.sketch), 0)
+    FROM (
+        SELECT s.location, c.week_start, customer_sketch_union(s.customer_sketch) AS sketch
+        FROM lightspeed_daily_sales s
+        JOIN calendar_day c
+          ON c.day = s.day
+        GROUP BY s.location, c.week_start
+    ) d
+    WHERE d.location = w.location AND d.week_start = w.week_start;
+
+    UPDATE lightspeed_monthly_sales m
+    SET customer_sketch = d.sketch, customer_count = COALESCE(customer_sketch_count(d.sketch), 0)
+    FROM (
+        SELECT s.location, c.month_start, customer_sketch_union(s.customer_sketch) AS sketch
+        FROM lightspeed_daily_sales s
+        JOIN calendar_day c
+          ON c.day = s.day
+        GROUP BY s.location, c.month_start
+    ) d
+    WHERE d.location = m.location AND d.month_start = m.month_start;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lightspeed_integration', '0017_weekly_and_monthly_sales'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CUSTOMER_SKETCH_SQL, DROP_CUSTOMER_SKETCH_SQL),
+        migrations.AddField(
+            model_name='lightspeeddailysales',
+            name='customer_sketch',
+            field=models.BinaryField(blank=True, help_text='HyperLogLog sketch of the customers (customer_sketch_agg)', null=True),
+        ),
+        migrations.AddField(
+            model_name='lightspeedmonthlysales',
+            name='customer_sketch',
+            field=models.BinaryField(blank=True, help_text='Union of the daily customer sketches', null=True),
+        ),
+        migrations.AddField(
+            model_name='lightspeedweeklysales',
+            name='customer_sketch',
+            field=models.BinaryField(blank=True, help_text='Union of the daily customer sketches', null=True),
+        ),
+        migrations.AlterField(
+            model_name='lightspeedmonthlysales',
+            name='customer_count',
+            field=models.IntegerField(default=0, help_text='Distinct customers, estimated from customer_sketch'),
+        ),
+        migrations.AlterField(
+            model_name='lightspeedweeklysales',
+            name='customer_count',
+            field=models.IntegerField(default=0, help_text='Distinct customers, estimated from customer_sketch'),
+        ),
+        migrations.RunSQL(POPULATE_CUSTOMER_SKETCHES_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,108 @@
+# Generated by Django 4.2.13 on 2026-10-18 15:38
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+# Histograms of delivery minutes: orders counted per bucket of one minute
+# below an hour, of five minutes below three hours, and one bucket for
+# longer times (85 buckets; backend.services.service_times.SERVICE_HISTOGRAM_EDGES
+# holds their lower edges). Histograms merge by adding them up bucket by bucket.
+SERVICE_HISTOGRAM_SQL = r"""
+    CREATE FUNCTION service_histogram_bucket(minutes numeric) RETURNS integer
+    LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE AS $$
+        SELECT CASE
+            WHEN minutes < 60 THEN GREATEST(floor(minutes)::integer, 0) + 1
+            WHEN minutes < 180 THEN 61 + floor((minutes - 60) / 5)::integer
+            ELSE 85
+        END
+    $$;
+
+    CREATE FUNCTION service_histogram_add(histogram integer[], minutes numeric) RETURNS integer[]
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+        SELECT CASE
+            WHEN minutes IS NULL THEN histogram
+            ELSE h[:b - 1] || (h[b] + 1) || h[b + 1:]
+        END
+        FROM (
+            SELECT
+                COALESCE(histogram, array_fill(0, ARRAY[85])) AS h,
+                service_histogram_bucket(minutes) AS b
+        ) s
+    $$;
+
+    CREATE FUNCTION service_histogram_merge(a integer[], b integer[]) RETURNS integer[]
+    LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE AS $$
+        SELECT array_agg(x + y ORDER BY i)
+        FROM unnest(a, b) WITH ORDINALITY AS u(x, y, i)
+    $$;
+
+    -- Histogram of the delivery minutes of a group (NULL when it has none)
+    CREATE AGGREGATE service_histogram_agg(numeric) (
+        SFUNC = service_histogram_add, STYPE = integer[],
+        COMBINEFUNC = service_histogram_merge, PARALLEL = SAFE
+    );
+
+    -- Sum of histograms: the histogram of all their orders
+    CREATE AGGREGATE service_histogram_union(integer[]) (
+        SFUNC = service_histogram_merge, STYPE = integer[],
+        COMBINEFUNC = service_histogram_merge, PARALLEL = SAFE
+    );
+"""
+
+DROP_SERVICE_HISTOGRAM_SQL = """
+    DROP AGGREGATE service_histogram_union(integer[]);
+    DROP AGGREGATE service_histogram_agg(numeric);
+    DROP FUNCTION service_histogram_merge(integer[], integer[]);
+    DROP FUNCTION service_histogram_add(integer[], numeric);
+    DROP FUNCTION service_histogram_bucket(numeric);
+"""
+
+POPULATE_HOURLY_SERVICE_SQL = """
+    INSERT INTO lightspeed_hourly_service (location, day, hour, delivery_count, delivery_histogram, refreshed_at)
+    SELECT
+        location,
+        local_day,
+        local_hour,
+        COUNT(*),
+        service_histogram_agg(delivery_minutes),
+        NOW()
+    FROM lightspeed_orders
+    WHERE local_day IS NOT NULL
+      AND local_hour IS NOT NULL
+      AND delivery_minutes IS NOT NULL
+    GROUP BY location, local_day, local_hour
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lightspeed_integration', '0018_customer_sketches'),
+    ]
+
+    operations = [
+        migrations.RunSQL(SERVICE_HISTOGRAM_SQL, DROP_SERVICE_HISTOGRAM_SQL),
+        migrations.CreateModel(
+            name='LightspeedHourlyService',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('location', models.CharField(help_text='Order location', max_length=100)),
+                ('day', models.DateField(help_text='Order creation day')),
+                ('hour', models.SmallIntegerField(help_text='Local hour of the order creation (0-23)')),
+                ('delivery_count', models.IntegerField(default=0, help_text='Orders with a delivery date')),
+                ('delivery_histogram', django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), default=list, help_text='Orders per delivery-minutes bucket (service_histogram_agg, see service_times.SERVICE_HISTOGRAM_EDGES)', size=None)),
+                ('refreshed_at', models.DateTimeField(auto_now=True, help_text='When this row was last rebuilt')),
+            ],
+            options={
+                'db_table': 'lightspeed_hourly_service',
+                'ordering': ['location', 'day', 'hour'],
+                'indexes': [models.Index(fields=['day'], name='lightspeed__day_574629_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='lightspeedhourlyservice',
+            constraint=models.UniqueConstraint(fields=('location', 'day', 'hour'), name='lightspeed_hourly_service_location_day_hour_uniq'),
+        ),
+        migrations.RunSQL(POPULATE_HOURLY_SERVICE_SQL, migrations.RunSQL.noop),
+    ]
@@ -1,3 +1,5 @@
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import BrinIndex
 from django.db import models
 from django.utils import timezone
 
@@ -12,7 +14,8 @@ class LightspeedOrder(models.Model):
     
     # Order dates
     delivery_date = models.DateTimeField(null=True, blank=True, help_text="Order delivery date")
-    creation_date = models.DateTimeField(null=True, blank=True, help_text="Order creation date")
+    # Partition key of the monthly partitions (part of the primary key in the database, see partitions.py)
+    creation_date = models.DateTimeField(help_text="Order creation date (partition key)")
     
     # Order details
     type = models.CharField(max_length=50, null=True, blank=True, help_text="Order type (e.g., delivery)")
@@ -38,6 +41,15 @@ class LightspeedOrder(models.Model):
     # Location field with default value
     location = models.CharField(max_length=100, default="Dendermonde", help_text="Order location")
     
+    # Report columns derived from the JSON payload on write (utils.mappers._order_report_fields)
+    payment_total = models.DecimalField(max_digits=14, decimal_places=4, default=0, help_text="Sum of order payment amounts")
+    item_count = models.IntegerField(default=0, help_text="Number of order items")
+    item_quantity_total = models.DecimalField(max_digits=12, decimal_places=3, default=0, help_text="Sum of order item amounts")
+    guest_amount = models.DecimalField(max_digits=12, decimal_places=3, null=True, blank=True, help_text="Largest order item amount (guest count in reports)")
+    delivery_minutes = models.DecimalField(max_digits=16, decimal_places=6, null=True, blank=True, help_text="Minutes from creation to delivery")
+    local_day = models.DateField(null=True, blank=True, help_text="Creation day in settings.TIME_ZONE")
+    local_hour = models.SmallIntegerField(null=True, blank=True, help_text="Creation hour (0-23) in settings.TIME_ZONE")
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True, help_text="When this record was created in our DB")
     updated_at = models.DateTimeField(auto_now=True, help_text="When this record was last updated in our DB")
@@ -51,6 +63,13 @@ class LightspeedOrder(models.Model):
             models.Index(fields=['creation_date']),
             models.Index(fields=['type']),
             models.Index(fields=['location']),
+            # Covers the report queries (day range, grouped by location/channel) without heap reads
+            models.Index(
+                fields=['local_day', 'location'],
+                include=['payment_total', 'guest_amount', 'delivery_minutes', 'customer_id', 'local_hour', 'external_reference'],
+                name='lightspeed_orders_day_loc_idx',
+            ),
+            BrinIndex(fields=['creation_date'], name='lightspeed_orders_created_brin'),
         ]
     
     def __str__(self):
@@ -178,7 +197,8 @@ class LightspeedReceipt(models.Model):
     type = models.CharField(max_length=50, null=True, blank=True)
 
     # Dates
-    creation_date = models.DateTimeField(null=True, blank=True)
+    # Partition key of the monthly partitions (part of the primary key in the database, see partitions.py)
+    creation_date = models.DateTimeField(help_text="Receipt creation date (partition key)")
     modification_date = models.DateTimeField(null=True, blank=True)
     delivery_date = models.DateTimeField(null=True, blank=True)
     closing_date = models.DateTimeField(null=True, blank=True)
@@ -216,7 +236,301 @@ class LightspeedReceipt(models.Model):
             models.Index(fields=["status"]),
             models.Index(fields=["type"]),
             models.Index(fields=["location"]),
+            BrinIndex(fields=["creation_date"], name="lightspeed_rcpt_created_brin"),
         ]
 
     def __str__(self):
         return f"Receipt #{self.id}"
+
+
+class LightspeedDailySales(models.Model):
+    """
+    Pre-aggregated Lightspeed sales per location and day.
+    Rebuilt from lightspeed_orders by lightspeed_integration.rollups whenever
+    orders for a location/day are stored, so sales reports never unpack the
+    order JSON on read.
+    """
+    location = models.CharField(max_length=100, help_text="Order location")
+    day = models.DateField(help_text="Order creation day")
+
+    # Aggregates (one order counted once, regardless of items/payments)
+    order_count = models.IntegerField(default=0, help_text="Number of orders")
+    customer_count = models.IntegerField(default=0, help_text="Distinct customers")
+    customer_sketch = models.BinaryField(null=True, blank=True, help_text="HyperLogLog sketch of the customers (customer_sketch_agg)")
+    payment_total = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text="Sum of order payments")
+    max_guest_count = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Largest order item amount of the day")
+    delivery_minutes_total = models.DecimalField(max_digits=16, decimal_places=4, default=0, help_text="Sum of delivery minutes")
+    delivery_count = models.IntegerField(default=0, help_text="Orders with a delivery date")
+
+    # Timestamps
+    refreshed_at = models.DateTimeField(auto_now=True, help_text="When this row was last rebuilt")
+
+    class Meta:
+        db_table = "lightspeed_daily_sales"
+        ordering = ["location", "day"]
+        constraints = [
+            models.UniqueConstraint(fields=["location", "day"], name="lightspeed_daily_sales_location_day_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["day"]),
+        ]
+
+    def __str__(self):
+        return f"{self.location} | {self.day}"
+
+
+class LightspeedWeeklySales(models.Model):
+    """
+    Lightspeed daily sales summed per location and ISO week (Monday first).
+    Rebuilt from lightspeed_daily_sales by lightspeed_integration.rollups
+    with the daily rows, so multi-year sales reports per week read one row
+    per week instead of seven.
+    """
+    location = models.CharField(max_length=100, help_text="Order location")
+    week_start = models.DateField(help_text="Monday of the week")
+
+    # Sums of the daily rows of the week; customers are counted once per week
+    # by merging the daily customer sketches
+    order_count = models.IntegerField(default=0, help_text="Number of orders")
+    customer_count = models.IntegerField(default=0, help_text="Distinct customers, estimated from customer_sketch")
+    customer_sketch = models.BinaryField(null=True, blank=True, help_text="Union of the daily customer sketches")
+    payment_total = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text="Sum of order payments")
+    max_guest_count = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Sum of the daily largest order item amounts")
+    delivery_minutes_total = models.DecimalField(max_digits=16, decimal_places=4, default=0, help_text="Sum of delivery minutes")
+    delivery_count = models.IntegerField(default=0, help_text="Orders with a delivery date")
+
+    # Timestamps
+    refreshed_at = models.DateTimeField(auto_now=True, help_text="When this row was last rebuilt")
+
+    class Meta:
+        db_table = "lightspeed_weekly_sales"
+        ordering = ["location", "week_start"]
+        constraints = [
+            models.UniqueConstraint(fields=["location", "week_start"], name="lightspeed_weekly_sales_location_week_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["week_start"]),
+        ]
+
+    def __str__(self):
+        return f"{self.location} | {self.week_start}"
+
+
+class LightspeedMonthlySales(models.Model):
+    """
+    Lightspeed daily sales summed per location and calendar month.
+    Rebuilt from lightspeed_daily_sales by lightspeed_integration.rollups
+    with the daily rows; sales reports per month and per quarter (three
+    months merged) read it.
+    """
+    location = models.CharField(max_length=100, help_text="Order location")
+    month_start = models.DateField(help_text="First day of the month")
+
+    # Sums of the daily rows of the month; customers are counted once per month
+    # by merging the daily customer sketches
+    order_count = models.IntegerField(default=0, help_text="Number of orders")
+    customer_count = models.IntegerField(default=0, help_text="Distinct customers, estimated from customer_sketch")
+    customer_sketch = models.BinaryField(null=True, blank=True, help_text="Union of the daily customer sketches")
+    payment_total = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text="Sum of order payments")
+    max_guest_count = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Sum of the daily largest order item amounts")
+    delivery_minutes_total = models.DecimalField(max_digits=16, decimal_places=4, default=0, help_text="Sum of delivery minutes")
+    delivery_count = models.IntegerField(default=0, help_text="Orders with a delivery date")
+
+    # Timestamps
+    refreshed_at = models.DateTimeField(auto_now=True, help_text="When this row was last rebuilt")
+
+    class Meta:
+        db_table = "lightspeed_monthly_sales"
+        ordering = ["location", "month_start"]
+        constraints = [
+            models.UniqueConstraint(fields=["location", "month_start"], name="lightspeed_monthly_sales_location_month_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["month_start"]),
+        ]
+
+    def __str__(self):
+        return f"{self.location} | {self.month_start}"
+
+
+class LightspeedHourlyService(models.Model):
+    """
+    Time to serve of Lightspeed orders per location, day and hour of the day,
+    kept as a fixed-bucket histogram of the delivery minutes. Rebuilt from
+    lightspeed_orders with the daily sales by lightspeed_integration.rollups;
+    histograms merge by adding them up, so the operations reports get the
+    percentiles of any period and grouping from these rows
+    (see backend.services.service_times).
+    """
+    location = models.CharField(max_length=100, help_text="Order location")
+    day = models.DateField(help_text="Order creation day")
+    hour = models.SmallIntegerField(help_text="Local hour of the order creation (0-23)")
+
+    delivery_count = models.IntegerField(default=0, help_text="Orders with a delivery date")
+    delivery_histogram = ArrayField(
+        models.IntegerField(),
+        default=list,
+        help_text="Orders per delivery-minutes bucket (service_histogram_agg, see service_times.SERVICE_HISTOGRAM_EDGES)",
+    )
+
+    # Timestamps
+    refreshed_at = models.DateTimeField(auto_now=True, help_text="When this row was last rebuilt")
+
+    class Meta:
+        db_table = "lightspeed_hourly_service"
+        ordering = ["location", "day", "hour"]
+        constraints = [
+            models.UniqueConstraint(fields=["location", "day", "hour"], name="lightspeed_hourly_service_location_day_hour_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["day"]),
+        ]
+
+    def __str__(self):
+        return f"{self.location} | {self.day} {self.hour:02d}h"
+
+
+class LightspeedOrderLine(models.Model):
+    """
+    One row per item of a stored Lightspeed order (the order_items JSON, normalized).
+    Rebuilt from lightspeed_orders by lightspeed_integration.rollups whenever
+    an order is stored, so product reports read plain columns instead of
+    expanding order JSON per request.
+    """
+    # Source order (plain id, not a FK, so lines can be rebuilt independently)
+    order_id = models.BigIntegerField(help_text="Lightspeed order ID")
+    line_number = models.IntegerField(help_text="Position of the item in the order")
+
+    # Copied from the order so reports never need to join back
+    location = models.CharField(max_length=100, help_text="Order location")
+    creation_date = models.DateTimeField(help_text="Order creation date")
+    day = models.DateField(help_text="Order creation day")
+    customer_id = models.BigIntegerField(null=True, blank=True, help_text="Customer ID")
+    delivery_minutes = models.DecimalField(max_digits=16, decimal_places=6, null=True, blank=True, help_text="Minutes between creation and delivery")
+
+    # Item details
+    product_id = models.BigIntegerField(null=True, blank=True, help_text="Lightspeed product ID")
+    quantity = models.DecimalField(max_digits=12, decimal_places=3, default=1, help_text="Item quantity")
+    unit_price = models.DecimalField(max_digits=12, decimal_places=4, null=True, blank=True, help_text="Item unit price")
+
+    class Meta:
+        db_table = "lightspeed_order_lines"
+        ordering = ["order_id", "line_number"]
+        constraints = [
+            models.UniqueConstraint(fields=["order_id", "line_number"], name="lightspeed_order_lines_order_line_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["product_id", "day"]),
+            models.Index(fields=["day", "location"]),
+        ]
+
+    def __str__(self):
+        return f"Order #{self.order_id} line {self.line_number}"
+
+
+class LightspeedProductName(models.Model):
+    """
+    Product dimension: one row per distinct product name of
+    lightspeed_products, the product axis of the product item report.
+    Rebuilt by lightspeed_integration.rollups whenever products are stored.
+    """
+    name = models.CharField(max_length=255, unique=True, help_text="Product name")
+    product_count = models.IntegerField(default=0, help_text="Stored products with this name")
+    refreshed_at = models.DateTimeField(auto_now=True, help_text="When this row was last rebuilt")
+
+    class Meta:
+        db_table = "lightspeed_product_names"
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+
+class LightspeedOrderChannel(models.Model):
+    """
+    Order channel dimension (first word of an order's external reference,
+    e.g. "deliverect"), the axis of the order type report. Channels of
+    stored orders are added by lightspeed_integration.rollups.
+    """
+    name = models.CharField(max_length=100, unique=True, help_text="Channel name")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "lightspeed_order_channels"
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+
+class LightspeedSyncCursor(models.Model):
+    """
+    High-water mark of the Lightspeed order sync, one row per location account.
+    Order fetchers page newest-first and stop as soon as they reach an order at
+    or below this mark, so each run only pays for orders created since the last one.
+    """
+    location = models.CharField(max_length=100, unique=True, help_text="Lightspeed account location (e.g. Frietchalet)")
+
+    # Newest order ingested so far
+    last_creation_date = models.DateTimeField(null=True, blank=True, help_text="Creation date of the newest ingested order")
+    last_order_id = models.BigIntegerField(null=True, blank=True, help_text="ID of the newest ingested order")
+
+    # Last run
+    last_run_at = models.DateTimeField(null=True, blank=True, help_text="When the last sync finished")
+    last_run_saved = models.IntegerField(default=0, help_text="Orders saved by the last sync")
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "lightspeed_sync_cursors"
+        ordering = ["location"]
+
+    def __str__(self):
+        return f"{self.location} | #{self.last_order_id} @ {self.last_creation_date}"
+
+
+class LightspeedReceiptBackfillWindow(models.Model):
+    """
+    Checkpoint of the receipt backfill: one row per location and date window.
+    lightspeed_integration.backfill fetches pending/failed windows and marks
+    them done, so an interrupted backfill resumes where it stopped.
+    """
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    location = models.CharField(max_length=100, help_text="Location passed to the Lightspeed API")
+    start_day = models.DateField(help_text="First day of the window")
+    end_day = models.DateField(help_text="Last day of the window (inclusive)")
+
+    # Progress
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    fetched = models.IntegerField(default=0, help_text="Receipts fetched in the last attempt")
+    saved = models.IntegerField(default=0, help_text="Receipts written in the last attempt")
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(null=True, blank=True)
+
+    # Timestamps
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "lightspeed_receipt_backfill_windows"
+        ordering = ["location", "start_day"]
+        constraints = [
+            models.UniqueConstraint(fields=["location", "start_day"], name="lightspeed_receipt_backfill_location_start_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["location", "status"]),
+        ]
+
+    def __str__(self):
+        return f"{self.location} | {self.start_day} → {self.end_day} | {self.status}"
@@ -15,6 +15,8 @@ import requests
 from bs4 import BeautifulSoup
 from django.conf import settings
 
+from backend.services.http_client import get_http_client
+
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.StreamHandler())
 logger.setLevel(logging.INFO)
@@ -54,7 +56,11 @@ class LightspeedAuth:
             if token_file
             else os.path.join(settings.BASE_DIR, "lightspeed_tokens.json")
         )
-        self._file_lock = threading.Lock()
+        # Re-entrant so read-modify-write updates can hold it across _read_tokens/_write_tokens
+        self._file_lock = threading.RLock()
+        # One refresh at a time per location: refresh tokens are single-use
+        self._refresh_locks: Dict[str, threading.Lock] = {}
+        self._refresh_locks_guard = threading.Lock()
         self.token_expiry_buffer = int(token_expiry_buffer)
         self.max_workers = int(max_workers)
 
@@ -105,6 +111,20 @@ class LightspeedAuth:
                 os.fsync(fh.fileno())
             os.replace(tmp, self.token_file)
 
+    def _update_location_token(self, location: str, token: Dict[str, Any]) -> None:
+        """
+        Store the token of one location without clobbering tokens that other
+        threads refreshed for other locations in the meantime.
+        """
+        with self._file_lock:
+            all_tokens = self._read_tokens()
+            all_tokens[location] = token
+            self._write_tokens(all_tokens)
+
+    def _refresh_lock(self, location: str) -> threading.Lock:
+        with self._refresh_locks_guard:
+            return self._refresh_locks.setdefault(location, threading.Lock())
+
     # ----------------------
     # Authorization / Exchange
     # ----------------------
@@ -201,7 +221,9 @@ class LightspeedAuth:
             "code": auth_code,
         }
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
-        resp = requests.post(settings.LIGHTSPEED["TOKEN_URL"], data=payload, headers=headers)
+        resp = get_http_client("lightspeed").post(
+            settings.LIGHTSPEED["TOKEN_URL"], data=payload, headers=headers, limiter_key="oauth"
+        )
 
         if resp.status_code != 200:
             logger.error(
@@ -212,9 +234,7 @@ class LightspeedAuth:
         token_data = resp.json()
         token_data["timestamp"] = int(time.time())
 
-        all_tokens = self._read_tokens()
-        all_tokens[location] = token_data
-        self._write_tokens(all_tokens)
+        self._update_location_token(location, token_data)
         logger.info("Stored token for location '%s'.", location)
         return token_data
 
@@ -244,7 +264,9 @@ class LightspeedAuth:
             "refresh_token": refresh_token,
         }
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
-        resp = requests.post(settings.LIGHTSPEED["TOKEN_URL"], data=payload, headers=headers)
+        resp = get_http_client("lightspeed").post(
+            settings.LIGHTSPEED["TOKEN_URL"], data=payload, headers=headers, limiter_key="oauth"
+        )
 
         if resp.status_code != 200:
             logger.error(
@@ -255,8 +277,7 @@ class LightspeedAuth:
         new_token = resp.json()
         new_token["timestamp"] = int(time.time())
 
-        all_tokens[location] = new_token
-        self._write_tokens(all_tokens)
+        self._update_location_token(location, new_token)
         logger.info("Refreshed token for location '%s'.", location)
         return new_token
 
@@ -288,8 +309,12 @@ class LightspeedAuth:
         if token_payload and not self._is_expired(token_payload):
             return token_payload.get("access_token")
 
-        # token missing/expired -> try refresh
-        refreshed = self.refresh_token_for_location(location)
+        # token missing/expired -> try refresh (once: concurrent callers wait and reuse the result)
+        with self._refresh_lock(location):
+            token_payload = self._read_tokens().get(location)
+            if token_payload and not self._is_expired(token_payload):
+                return token_payload.get("access_token")
+            refreshed = self.refresh_token_for_location(location)
         if refreshed and not self._is_expired(refreshed):
             return refreshed.get("access_token")
         # final fallback: no token available
@@ -0,0 +1,199 @@
+import logging
+import re
+from datetime import date, datetime, time, timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+# Tables range-partitioned by month on their partition column (see migration 0015)
+PARTITIONED_TABLES = {
+    "lightspeed_orders": "creation_date",
+    "lightspeed_financial_receipts": "creation_date",
+}
+
+# Months created ahead of the current one, so inserts never land in the default partition
+PARTITION_MONTHS_AHEAD = 3
+
+_PARTITION_SUFFIX = re.compile(r"_p(\d{4})_(\d{2})$")
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table, month):
+    """Name of the partition holding `month`, e.g. lightspeed_orders_p2025_03."""
+    return f"{table}_p{month:%Y_%m}"
+
+
+def _bound(month):
+    # Month boundaries in UTC; pruning only needs the bounds to be constants
+    return f"{month:%Y-%m-%d} 00:00:00+00"
+
+
+def creation_bounds(start_day, end_day):
+    """
+    creation_date range [start_day 00:00, end_day + 1 00:00) in settings.TIME_ZONE,
+    i.e. the orders whose local_day lies between the two days. Adding it next to
+    a local_day filter lets the planner prune the monthly partitions.
+
+    Returns:
+        list: [lower bound, upper bound (exclusive)] as aware datetimes
+    """
+    tz = timezone.get_default_timezone()
+    return [
+        datetime.combine(start_day, time.min, tzinfo=tz),
+        datetime.combine(end_day + timedelta(days=1), time.min, tzinfo=tz),
+    ]
+
+
+def is_partitioned(table):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE relname = %s", [table])
+        row = cursor.fetchone()
+    return bool(row) and row[0] == "p"
+
+
+def list_partitions(table):
+    """
+    Partitions currently attached to a partitioned table.
+
+    Returns:
+        list: One dict per partition: name, month (None for the default
+              partition), bound (partition bound expression) and estimated rows
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname, pg_get_expr(child.relpartbound, child.oid), child.reltuples
+            FROM pg_inherits i
+            JOIN pg_class child ON child.oid = i.inhrelid
+            JOIN pg_class parent ON parent.oid = i.inhparent
+            WHERE parent.relname = %s
+            ORDER BY child.relname
+            """,
+            [table],
+        )
+        rows = cursor.fetchall()
+
+    partitions = []
+    for name, bound, tuples in rows:
+        match = _PARTITION_SUFFIX.search(name)
+        partitions.append({
+            "name": name,
+            "month": date(int(match.group(1)), int(match.group(2)), 1) if match else None,
+            "bound": bound,
+            "rows": max(int(tuples), 0),
+        })
+    return partitions
+
+
+def create_partition(table, month):
+    """
+    Create and attach the partition of `month` if it doesn't exist yet.
+
+    The partition is built as a standalone table, rows of that month that
+    ended up in the default partition are moved into it, and it is attached
+    afterwards; attaching creates the partitioned indexes on it.
+
+    Returns:
+        bool: True when a partition was created
+    """
+    column = PARTITIONED_TABLES[table]
+    name = partition_name(table, month)
+    lower, upper = _bound(month), _bound(add_months(month, 1))
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_class WHERE relname = %s", [name])
+            if cursor.fetchone():
+                return False
+
+            cursor.execute(f'CREATE TABLE "{name}" (LIKE "{table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+            cursor.execute(
+                f"""
+                WITH moved AS (
+                    DELETE FROM "{table}_default"
+                    WHERE "{column}" >= %s AND "{column}" < %s
+                    RETURNING *
+                )
+                INSERT INTO "{name}" SELECT * FROM moved
+                """,
+                [lower, upper],
+            )
+            moved = cursor.rowcount
+            cursor.execute(f'ALTER TABLE "{table}" ATTACH PARTITION "{name}" FOR VALUES FROM (%s) TO (%s)', [lower, upper])
+
+    logger.info("Created partition %s (%s rows moved from the default partition)", name, moved)
+    return True
+
+
+def ensure_partitions(tables=None, months_ahead=PARTITION_MONTHS_AHEAD, start=None, today=None):
+    """
+    Make sure the monthly partitions from `start` (default: the current month)
+    through `months_ahead` months after the current one exist. Safe to run
+    repeatedly (daily task, deploys, before a backfill of older months).
+
+    Returns:
+        list: Names of the partitions created
+    """
+    current = month_start(today or timezone.localdate())
+    last = add_months(current, months_ahead)
+    created = []
+    for table in tables or PARTITIONED_TABLES:
+        if not is_partitioned(table):
+            logger.warning("%s is not partitioned; skipping partition maintenance", table)
+            continue
+        month = month_start(start) if start else current
+        while month <= last:
+            if create_partition(table, month):
+                created.append(partition_name(table, month))
+            month = add_months(month, 1)
+    return created
+
+
+def detach_partitions(table, before_month, archive_schema=None, drop=False):
+    """
+    Detach the monthly partitions that end on or before `before_month`.
+
+    Detached partitions stay ordinary tables with their data (no rows are
+    copied), so archiving a month is a catalog change. They can be moved to
+    `archive_schema`, dropped, or re-attached later with ATTACH PARTITION.
+
+    Args:
+        table: Partitioned table
+        before_month: First month to keep attached
+        archive_schema: Move the detached tables into this schema
+        drop: Drop the detached tables instead
+
+    Returns:
+        list: Names of the partitions detached
+    """
+    before_month = month_start(before_month)
+    detached = []
+    for partition in list_partitions(table):
+        if partition["month"] is None or partition["month"] >= before_month:
+            continue
+        name = partition["name"]
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"')
+                if drop:
+                    cursor.execute(f'DROP TABLE "{name}"')
+                elif archive_schema:
+                    cursor.execute(f'CREATE SCHEMA IF NOT EXISTS "{archive_schema}"')
+                    cursor.execute(f'ALTER TABLE "{name}" SET SCHEMA "{archive_schema}"')
+        logger.info(
+            "Detached partition %s%s", name,
+            " (dropped)" if drop else f" into schema {archive_schema}" if archive_schema else "",
+        )
+        detached.append(name)
+    return detached
@@ -0,0 +1,440 @@
+import logging
+from collections import defaultdict
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from backend.services.dimensions import add_locations
+from backend.services.report_cache import invalidate_reports
+from backend.services.yoy_sql import MONTH_GRANULARITY, WEEK_GRANULARITY, bucket_start, next_bucket
+from lightspeed_integration.partitions import creation_bounds
+
+logger = logging.getLogger(__name__)
+
+
+# One row per (location, day), aggregated from the per-order report columns
+# (payment_total, guest_amount, delivery_minutes, local_day) so an order is
+# counted exactly once without unpacking its JSON. The customers are also
+# kept as a mergeable sketch (customer_sketch_agg, see lightspeed_integration
+# migration 0018) for the weekly and monthly rows.
+DAILY_SALES_INSERT_SQL = """
+    INSERT INTO lightspeed_daily_sales (
+        location,
+        day,
+        order_count,
+        customer_count,
+        customer_sketch,
+        payment_total,
+        max_guest_count,
+        delivery_minutes_total,
+        delivery_count,
+        refreshed_at
+    )
+    SELECT
+        o.location,
+        o.local_day AS day,
+        COUNT(*) AS order_count,
+        COUNT(DISTINCT o.customer_id) AS customer_count,
+        customer_sketch_agg(o.customer_id) AS customer_sketch,
+        COALESCE(SUM(o.payment_total), 0) AS payment_total,
+        COALESCE(MAX(o.guest_amount), 0) AS max_guest_count,
+        COALESCE(SUM(o.delivery_minutes), 0) AS delivery_minutes_total,
+        COUNT(o.delivery_minutes) AS delivery_count,
+        NOW()
+    FROM lightspeed_orders o
+    WHERE o.local_day IS NOT NULL
+      {filters}
+    GROUP BY o.location, o.local_day
+"""
+
+
+# One row per (location, day, hour) with orders that have a delivery time:
+# the histogram of their delivery minutes (service_histogram_agg, see
+# lightspeed_integration migration 0019), from which the operations reports
+# read time-to-serve percentiles of any period.
+HOURLY_SERVICE_INSERT_SQL = """
+    INSERT INTO lightspeed_hourly_service (
+        location,
+        day,
+        hour,
+        delivery_count,
+        delivery_histogram,
+        refreshed_at
+    )
+    SELECT
+        o.location,
+        o.local_day AS day,
+        o.local_hour AS hour,
+        COUNT(*) AS delivery_count,
+        service_histogram_agg(o.delivery_minutes) AS delivery_histogram,
+        NOW()
+    FROM lightspeed_orders o
+    WHERE o.local_day IS NOT NULL
+      AND o.local_hour IS NOT NULL
+      AND o.delivery_minutes IS NOT NULL
+      {filters}
+    GROUP BY o.location, o.local_day, o.local_hour
+"""
+
+
+# Weekly and monthly sales: the daily sales summed per (location, week or
+# month), the bucket of a day read from the calendar dimension. Customers
+# are counted once per week/month from the union of the daily sketches.
+PERIOD_SALES_TABLES = {
+    WEEK_GRANULARITY: ("lightspeed_weekly_sales", "week_start"),
+    MONTH_GRANULARITY: ("lightspeed_monthly_sales", "month_start"),
+}
+
+PERIOD_SALES_INSERT_SQL = """
+    INSERT INTO {table} (
+        location,
+        {bucket},
+        order_count,
+        customer_count,
+        customer_sketch,
+        payment_total,
+        max_guest_count,
+        delivery_minutes_total,
+        delivery_count,
+        refreshed_at
+    )
+    SELECT
+        s.location,
+        c.{bucket},
+        SUM(s.order_count),
+        COALESCE(customer_sketch_count(customer_sketch_union(s.customer_sketch)), 0),
+        customer_sketch_union(s.customer_sketch),
+        SUM(s.payment_total),
+        SUM(s.max_guest_count),
+        SUM(s.delivery_minutes_total),
+        SUM(s.delivery_count),
+        NOW()
+    FROM lightspeed_daily_sales s
+    JOIN calendar_day c
+      ON c.day = s.day
+    WHERE TRUE
+      {filters}
+    GROUP BY s.location, c.{bucket}
+"""
+
+
+# One row per order item. Non-numeric product ids are kept as NULL rather than
+# failing the whole insert.
+ORDER_LINES_INSERT_SQL = """
+    INSERT INTO lightspeed_order_lines (
+        order_id,
+        line_number,
+        location,
+        creation_date,
+        day,
+        customer_id,
+        delivery_minutes,
+        product_id,
+        quantity,
+        unit_price
+    )
+    SELECT
+        o.id,
+        item.line_number,
+        o.location,
+        o.creation_date,
+        o.local_day,
+        o.customer_id,
+        o.delivery_minutes,
+        CASE
+            WHEN item.elem->>'productId' ~ '^-?[0-9]+$'
+            THEN (item.elem->>'productId')::bigint
+        END,
+        COALESCE((item.elem->>'quantity')::numeric, 1),
+        (item.elem->>'unitPrice')::numeric
+    FROM lightspeed_orders o
+    CROSS JOIN LATERAL jsonb_array_elements(o.order_items)
+        WITH ORDINALITY AS item(elem, line_number)
+    WHERE o.local_day IS NOT NULL
+      {filters}
+"""
+
+
+# Product dimension: distinct names of the stored products
+PRODUCT_NAMES_SQL = """
+    INSERT INTO lightspeed_product_names (name, product_count, refreshed_at)
+    SELECT name, COUNT(*), NOW()
+    FROM lightspeed_products
+    WHERE name IS NOT NULL
+    GROUP BY name
+    ON CONFLICT (name) DO UPDATE SET
+        product_count = EXCLUDED.product_count,
+        refreshed_at = EXCLUDED.refreshed_at
+"""
+
+
+# Derives the report columns of LightspeedOrder from its JSON payload; the SQL
+# twin of utils.mappers._order_report_fields, used to backfill stored orders.
+# Non-numeric amounts are ignored, as they are by the mapper.
+ORDER_REPORT_COLUMNS_SQL = """
+    UPDATE lightspeed_orders o
+    SET
+        payment_total = COALESCE(payments.payment_total, 0),
+        item_count = CASE WHEN jsonb_typeof(o.order_items) = 'array' THEN jsonb_array_length(o.order_items) ELSE 0 END,
+        item_quantity_total = COALESCE(items.quantity_total, 0),
+        guest_amount = items.guest_amount,
+        delivery_minutes = ROUND(EXTRACT(EPOCH FROM (o.delivery_date - o.creation_date)) / 60, 6),
+        local_day = (o.creation_date AT TIME ZONE %s)::date,
+        local_hour = EXTRACT(HOUR FROM o.creation_date AT TIME ZONE %s)
+    FROM lightspeed_orders src
+    LEFT JOIN LATERAL (
+        SELECT SUM((elem->>'amount')::numeric) AS payment_total
+        FROM jsonb_array_elements(
+            CASE WHEN jsonb_typeof(src.order_payments) = 'array' THEN src.order_payments ELSE '[]'::jsonb END
+        ) AS elem
+        WHERE elem->>'amount' ~ '^-?[0-9]+(\\.[0-9]+)?([eE][-+]?[0-9]+)?$'
+    ) payments ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT
+            SUM((elem->>'amount')::numeric) AS quantity_total,
+            MAX((elem->>'amount')::numeric) AS guest_amount
+        FROM jsonb_array_elements(
+            CASE WHEN jsonb_typeof(src.order_items) = 'array' THEN src.order_items ELSE '[]'::jsonb END
+        ) AS elem
+        WHERE elem->>'amount' ~ '^-?[0-9]+(\\.[0-9]+)?([eE][-+]?[0-9]+)?$'
+    ) items ON TRUE
+    WHERE src.id = o.id
+      {filters}
+"""
+
+
+def _order_day(order):
+    """Return the report day of a stored order (local_day, derived on write)."""
+    if order.local_day is not None:
+        return order.local_day
+    return timezone.localtime(order.creation_date).date() if timezone.is_aware(order.creation_date) else order.creation_date.date()
+
+
+def _days_by_location(orders):
+    days_by_location = defaultdict(list)
+    for order in orders:
+        if order.creation_date is None:
+            continue
+        days_by_location[order.location].append(_order_day(order))
+    return days_by_location
+
+
+def refresh_daily_sales(location=None, start_day=None, end_day=None):
+    """
+    Rebuild lightspeed_daily_sales and lightspeed_hourly_service rows from
+    lightspeed_orders, then the weekly and monthly sales of the weeks and
+    months they fall in.
+
+    Args:
+        location: Stored location value (e.g. "Dendermonde"); None = all locations
+        start_day: First day to rebuild (inclusive); None = no lower bound
+        end_day: Last day to rebuild (inclusive); None = no upper bound
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    delete_filters, delete_params = [], []
+    insert_filters, insert_params = [], []
+
+    if location is not None:
+        delete_filters.append("location = %s")
+        delete_params.append(location)
+        insert_filters.append("AND o.location = %s")
+        insert_params.append(location)
+    if start_day is not None:
+        delete_filters.append("day >= %s")
+        delete_params.append(start_day)
+        insert_filters.append("AND o.local_day >= %s AND o.creation_date >= %s")
+        insert_params.extend([start_day, creation_bounds(start_day, start_day)[0]])
+    if end_day is not None:
+        delete_filters.append("day <= %s")
+        delete_params.append(end_day)
+        insert_filters.append("AND o.local_day <= %s AND o.creation_date < %s")
+        insert_params.extend([end_day, creation_bounds(end_day, end_day)[1]])
+
+    where = " WHERE " + " AND ".join(delete_filters) if delete_filters else ""
+    filters = "\n      ".join(insert_filters)
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM lightspeed_daily_sales" + where, delete_params)
+            cursor.execute(DAILY_SALES_INSERT_SQL.format(filters=filters), insert_params)
+            written = cursor.rowcount
+            cursor.execute("DELETE FROM lightspeed_hourly_service" + where, delete_params)
+            cursor.execute(HOURLY_SERVICE_INSERT_SQL.format(filters=filters), insert_params)
+        refresh_period_sales(location, start_day, end_day)
+    return written
+
+
+def refresh_period_sales(location=None, start_day=None, end_day=None):
+    """
+    Rebuild the lightspeed_weekly_sales and lightspeed_monthly_sales rows
+    of the weeks and months overlapping start_day..end_day from
+    lightspeed_daily_sales.
+
+    Args:
+        location: Stored location value; None = all locations
+        start_day: First day whose week/month is rebuilt; None = no lower bound
+        end_day: Last day whose week/month is rebuilt; None = no upper bound
+    """
+    for granularity, (table, bucket) in PERIOD_SALES_TABLES.items():
+        delete_filters, delete_params = [], []
+        insert_filters, insert_params = [], []
+
+        if location is not None:
+            delete_filters.append("location = %s")
+            delete_params.append(location)
+            insert_filters.append("AND s.location = %s")
+            insert_params.append(location)
+        if start_day is not None:
+            first_bucket = bucket_start(start_day, granularity)
+            delete_filters.append(f"{bucket} >= %s")
+            delete_params.append(first_bucket)
+            insert_filters.append("AND s.day >= %s")
+            insert_params.append(first_bucket)
+        if end_day is not None:
+            delete_filters.append(f"{bucket} <= %s")
+            delete_params.append(end_day)
+            insert_filters.append("AND s.day < %s")
+            insert_params.append(next_bucket(end_day, granularity))
+
+        delete_sql = f"DELETE FROM {table}"
+        if delete_filters:
+            delete_sql += " WHERE " + " AND ".join(delete_filters)
+
+        with connection.cursor() as cursor:
+            cursor.execute(delete_sql, delete_params)
+            cursor.execute(
+                PERIOD_SALES_INSERT_SQL.format(table=table, bucket=bucket, filters="\n      ".join(insert_filters)),
+                insert_params,
+            )
+
+
+def refresh_daily_sales_for_orders(orders):
+    """
+    Rebuild the daily sales rows touched by a batch of stored orders.
+    Each location is refreshed once over the span of days present in the batch.
+    """
+    for location, days in _days_by_location(orders).items():
+        written = refresh_daily_sales(location, min(days), max(days))
+        logger.info(
+            "Daily sales rollup refreshed for %s %s→%s (%s rows)",
+            location, min(days), max(days), written,
+        )
+
+
+def refresh_order_lines(order_ids):
+    """
+    Rebuild lightspeed_order_lines rows for the given orders from lightspeed_orders.
+
+    Args:
+        order_ids: Iterable of Lightspeed order IDs
+
+    Returns:
+        int: Number of order lines written
+    """
+    order_ids = list(order_ids)
+    if not order_ids:
+        return 0
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM lightspeed_order_lines WHERE order_id = ANY(%s)", [order_ids])
+            cursor.execute(
+                ORDER_LINES_INSERT_SQL.format(filters="AND o.id = ANY(%s)"),
+                [order_ids],
+            )
+            return cursor.rowcount
+
+
+def refresh_order_channels(orders):
+    """
+    Add the channels (first word of the external reference) of a batch of
+    stored orders to the order channel dimension.
+
+    Returns:
+        int: Number of channels added
+    """
+    channels = sorted({
+        order.external_reference.split(" ")[0]
+        for order in orders
+        if order.external_reference is not None
+    })
+    if not channels:
+        return 0
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO lightspeed_order_channels (name, created_at)
+            SELECT name, NOW() FROM unnest(%s::text[]) AS name
+            ON CONFLICT (name) DO NOTHING
+            """,
+            [channels],
+        )
+        return cursor.rowcount
+
+
+def refresh_product_names():
+    """
+    Rebuild the product dimension (lightspeed_product_names) from
+    lightspeed_products; names no product carries anymore are dropped.
+
+    Returns:
+        int: Number of product names
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                DELETE FROM lightspeed_product_names n
+                WHERE NOT EXISTS (SELECT 1 FROM lightspeed_products p WHERE p.name = n.name)
+                """
+            )
+            cursor.execute(PRODUCT_NAMES_SQL)
+            return cursor.rowcount
+
+
+def refresh_order_rollups(orders):
+    """
+    Rebuild every table derived from a batch of stored orders:
+    the order lines of each order, the daily sales of the touched days and
+    the location and channel dimensions, then drop the cached reports
+    covering those days.
+    """
+    orders = list(orders)
+    written = refresh_order_lines(order.id for order in orders)
+    logger.info("Order lines refreshed for %s orders (%s lines)", len(orders), written)
+    refresh_daily_sales_for_orders(orders)
+    add_locations(names=(order.location for order in orders))
+    refresh_order_channels(orders)
+
+    for location, days in _days_by_location(orders).items():
+        invalidate_reports("orders", location, min(days), max(days))
+
+
+def refresh_order_columns(start_id=None, end_id=None, only_missing=False):
+    """
+    Recompute the report columns of stored orders from their JSON payload.
+
+    Args:
+        start_id: Lowest order id to update (inclusive); None = no lower bound
+        end_id: Highest order id to update (inclusive); None = no upper bound
+        only_missing: Only orders whose local_day was never derived
+
+    Returns:
+        int: Number of orders updated
+    """
+    filters, params = [], [settings.TIME_ZONE, settings.TIME_ZONE]
+    if start_id is not None:
+        filters.append("AND o.id >= %s")
+        params.append(start_id)
+    if end_id is not None:
+        filters.append("AND o.id <= %s")
+        params.append(end_id)
+    if only_missing:
+        filters.append("AND o.local_day IS NULL AND o.creation_date IS NOT NULL")
+
+    with connection.cursor() as cursor:
+        cursor.execute(ORDER_REPORT_COLUMNS_SQL.format(filters="\n      ".join(filters)), params)
+        return cursor.rowcount
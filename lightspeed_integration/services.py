@@ -1,13 +1,19 @@
 import json
 import os
+import threading
 import time
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from django.conf import settings
-from datetime import datetime, timedelta
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from datetime import datetime, timedelta, timezone as dt_timezone
+from backend.services.dimensions import map_location_to_value
+from backend.services.http_client import get_http_client
 from lightspeed_integration.oauth import LightspeedAuth
 import logging
-from lightspeed_integration.models import LightspeedOrder
-from lightspeed_integration.utils.mappers import _map_location_to_value, _map_order_to_model_fields
+from lightspeed_integration.models import LightspeedOrder, LightspeedSyncCursor
+from lightspeed_integration.rollups import refresh_order_rollups
+from lightspeed_integration.utils.mappers import _map_order_to_model_fields
 logger = logging.getLogger(__name__)
 
 
@@ -15,15 +21,20 @@ logger = logging.getLogger(__name__)
 TOKEN_FILE = os.path.join(settings.BASE_DIR, "lightspeed_tokens.json")
 BASE_URL = "https://lightspeedapis.com/resto/rest"
 
+# Orders written per bulk upsert in fetch_and_store_orders
+ORDER_WRITE_BATCH_SIZE = 100
+
 # Create a shared LightspeedAuth instance for token management
 _auth_instance = None
+_auth_instance_lock = threading.Lock()
 
 
 def get_auth_instance():
     """Get or create the shared LightspeedAuth instance."""
     global _auth_instance
-    if _auth_instance is None:
-        _auth_instance = LightspeedAuth()
+    with _auth_instance_lock:
+        if _auth_instance is None:
+            _auth_instance = LightspeedAuth()
     return _auth_instance
 
 
@@ -73,7 +84,9 @@ def get_saved_token(location="Frietchalet"):
                     "refresh_token": refresh_token,
                 }
                 headers = {"Content-Type": "application/x-www-form-urlencoded"}
-                resp = requests.post(settings.LIGHTSPEED["TOKEN_URL"], data=payload, headers=headers)
+                resp = get_http_client("lightspeed").post(
+                    settings.LIGHTSPEED["TOKEN_URL"], data=payload, headers=headers, limiter_key="oauth"
+                )
                 
                 if resp.status_code == 200:
                     new_token = resp.json()
@@ -97,6 +110,11 @@ def get_saved_token(location="Frietchalet"):
     raise Exception(f"No token found for location '{location}' and no fallback token available.")
 
 
+def get_lightspeed_rate_limiter(location="Frietchalet"):
+    """Token bucket shared by every Lightspeed request made with this location's token."""
+    return get_http_client("lightspeed").limiter(location)
+
+
 def lightspeed_get(endpoint, params=None, location="Frietchalet"):
     """
     Authenticated GET request to Lightspeed API (auto refresh).
@@ -114,7 +132,9 @@ def lightspeed_get(endpoint, params=None, location="Frietchalet"):
 
     url = f"{BASE_URL}/{endpoint.lstrip('/')}"
     print(url, params)
-    response = requests.get(url, headers=headers, params=params)
+    # Pooled session, per-location token bucket and 429/5xx retries live in the shared client
+    client = get_http_client("lightspeed")
+    response = client.get(url, headers=headers, params=params, limiter_key=location)
 
     # Handle expired token during request
     if response.status_code == 401:
@@ -122,7 +142,7 @@ def lightspeed_get(endpoint, params=None, location="Frietchalet"):
         # Refresh token and retry
         access_token = get_saved_token(location)
         headers["Authorization"] = f"Bearer {access_token}"
-        response = requests.get(url, headers=headers, params=params)
+        response = client.get(url, headers=headers, params=params, limiter_key=location)
 
     if response.status_code == 200:
         return response.json()
@@ -132,6 +152,37 @@ def lightspeed_get(endpoint, params=None, location="Frietchalet"):
  
  
 
+def lightspeed_get_with_backoff(url, params, location, max_retries=5):
+    """
+    Lightspeed API call with exponential backoff for 429 / Cloudflare.
+
+    The shared HTTP client already retries 429/5xx honouring Retry-After; this
+    adds a slower outer backoff for long rate-limit stretches (e.g. Cloudflare
+    pages) that outlast the client's own retries.
+    """
+    delay = 5  # seconds
+
+    for attempt in range(max_retries):
+        try:
+            return lightspeed_get(url, params, location=location)
+
+        except Exception as exc:
+            msg = str(exc).lower()
+
+            if "429" in msg or "rate limit" in msg or "cloudflare" in msg:
+                logger.warning(
+                    "Rate limited. Sleeping %s sec (attempt %s/%s)",
+                    delay, attempt + 1, max_retries
+                )
+                time.sleep(delay)
+                delay *= 2
+                continue
+
+            raise exc
+
+    raise Exception("Max retries exceeded due to rate limiting")
+
+
 def summarize_orders_by_date(orders, from_date, to_date):
     # Convert input strings to date objects if needed
     if isinstance(from_date, str):
@@ -158,90 +209,288 @@ def summarize_orders_by_date(orders, from_date, to_date):
     return result
 
 
-def fetch_and_store_orders(location, max_orders=500):
+def _fetch_order_detail(order_data, location):
+    """
+    Fetch the full payload of one order (runs in the detail worker pool).
+
+    Returns:
+        tuple: (order payload, detail exception or None). The list payload is
+               returned when the detail call fails so the order is still stored.
+    """
+    order_id = order_data["id"]
+    try:
+        detail_payload = lightspeed_get(
+            f"onlineordering/order/{order_id}",
+            location=location
+        )
+        if isinstance(detail_payload, dict):
+            return detail_payload, None
+        return order_data, None
+    except Exception as detail_exc:
+        return order_data, detail_exc
+
+
+def _bulk_upsert_orders(orders):
+    """
+    Insert or update a batch of LightspeedOrder objects in one statement.
+    Falls back to row-by-row update_or_create when the batch fails so a single
+    bad order cannot drop the others.
+
+    Returns:
+        tuple: (saved orders, number of orders that could not be saved)
+    """
+    update_fields = [
+        field.name for field in LightspeedOrder._meta.concrete_fields
+        if field.name not in ("id", "created_at")
+    ]
+    try:
+        saved = LightspeedOrder.objects.bulk_create(
+            orders,
+            update_conflicts=True,
+            # The partitioned table's primary key is (id, creation_date)
+            unique_fields=["id", "creation_date"],
+            update_fields=update_fields,
+        )
+        return saved, 0
+    except Exception as e:
+        logger.warning("Bulk order upsert failed, saving one by one: %s", e)
+
+    saved, failed = [], 0
+    for order in orders:
+        try:
+            order_obj, _ = LightspeedOrder.objects.update_or_create(
+                id=order.id,
+                defaults={name: getattr(order, name) for name in update_fields},
+            )
+            saved.append(order_obj)
+        except Exception as e:
+            logger.error("Error saving order %s: %s", order.id, str(e))
+            failed += 1
+    return saved, failed
+
+
+def _order_sync_key(order_data):
+    """
+    Position of an order in the newest-first order list: (creation date, id).
+    Creation date is None when the payload has none or it cannot be parsed.
+    """
+    created = None
+    try:
+        created = parse_datetime(order_data.get("creationDate") or "")
+    except (ValueError, TypeError):
+        pass
+    if created is not None and timezone.is_naive(created):
+        created = timezone.make_aware(created, dt_timezone.utc)
+    return created, order_data["id"]
+
+
+def _reached_sync_cursor(order_data, cursor):
+    """True when the order is at or below the location's high-water mark (already ingested)."""
+    if cursor is None or cursor.last_order_id is None:
+        return False
+    created, order_id = _order_sync_key(order_data)
+    if created is not None and cursor.last_creation_date is not None:
+        return (created, order_id) <= (cursor.last_creation_date, cursor.last_order_id)
+    return order_id <= cursor.last_order_id
+
+
+def _seed_sync_cursor(cursor, location):
+    """
+    Start an unset cursor at the newest order already stored for the location,
+    so the first incremental run stops there instead of re-paging the history.
+    """
+    newest = (
+        LightspeedOrder.objects
+        # Stored under the mapped location, like _map_order_to_model_fields writes it
+        .filter(location=map_location_to_value(location))
+        .order_by("-creation_date", "-id")
+        .values_list("creation_date", "id")
+        .first()
+    )
+    if newest is None:
+        return
+    cursor.last_creation_date, cursor.last_order_id = newest
+    cursor.save(update_fields=["last_creation_date", "last_order_id", "updated_at"])
+
+
+def _advance_sync_cursor(cursor, orders, saved_count):
+    """
+    Move the high-water mark up to the newest of `orders` (never down) and
+    record the run; no orders only records the run.
+    """
+    for order_data in orders:
+        created, order_id = _order_sync_key(order_data)
+        if created is None:
+            continue
+        if cursor.last_creation_date is None or (created, order_id) > (cursor.last_creation_date, cursor.last_order_id):
+            cursor.last_creation_date = created
+            cursor.last_order_id = order_id
+
+    cursor.last_run_at = timezone.now()
+    cursor.last_run_saved = saved_count
+    cursor.save()
+
+
+def fetch_and_store_orders(location, max_orders=500, incremental=True):
     """
     Fetch all Lightspeed orders for a location
     Save to DB (prevent duplicates)
     Used by API + Cron
+
+    Pipeline: list pages are fetched one after another; new order IDs of each
+    page (one existence query per page) go straight to a pool of
+    LIGHTSPEED["DETAIL_WORKERS"] detail fetchers while the next page loads,
+    and finished orders are written in bulk upserts of ORDER_WRITE_BATCH_SIZE.
+    All requests share the location's token bucket instead of fixed sleeps.
+
+    With incremental=True paging stops at the first order at or below the
+    location's LightspeedSyncCursor; the cursor is moved to the newest order
+    seen once every new order has been stored. An unset cursor starts at the
+    newest stored order of the location. incremental=False re-pages the list
+    from the start (up to max_orders) without reading the cursor.
+
+    In incremental runs max_orders caps the orders not stored yet, not the
+    orders paged: stored orders are skipped without counting, so a later run
+    gets past the ones an earlier capped run stored. A run that stops at
+    max_orders before reaching the cursor or the end of the list leaves the
+    cursor where it was: the orders between the last page read and the mark
+    were not seen.
     """
     start = time.time()
 
-    existing_count = LightspeedOrder.objects.filter(
-        location=_map_location_to_value(location)
-    ).count()
+    cursor, _ = LightspeedSyncCursor.objects.get_or_create(location=location)
+    if cursor.last_order_id is None:
+        _seed_sync_cursor(cursor, location)
+    stop_at = cursor if incremental else None
+    reached_cursor = False
+    list_exhausted = False
+    failed_count = 0
 
     all_orders = []
+    new_count = 0
     limit = 100
     offset = 0
 
-    while len(all_orders) < max_orders:
-        time.sleep(0.4)
-
-        endpoint = f"onlineordering/order?offset={offset}&amount={limit}"
-        chunk = lightspeed_get(endpoint, location=location)
-
-        if isinstance(chunk, dict):
-            results = chunk.get("results", [])
-            if not results:
-                break
-            all_orders.extend(results)
-
-        elif isinstance(chunk, list):
-            if not chunk:
-                break
-            all_orders.extend(chunk)
-
-        else:
-            break
-
-        offset += limit
-
     saved_orders = []
     skipped_count = 0
     detail_failures = 0
 
-    for order_data in all_orders:
-        if not isinstance(order_data, dict):
-            skipped_count += 1
-            continue
-
-        order_id = order_data.get("id")
-        if not order_id:
-            skipped_count += 1
-            continue
-
-        if LightspeedOrder.objects.filter(id=order_id).exists():
-            skipped_count += 1
-            continue
-
-        try:
-            try:
-                time.sleep(0.4)
-                detail_payload = lightspeed_get(
-                    f"onlineordering/order/{order_id}",
-                    location=location
-                )
-                if isinstance(detail_payload, dict):
-                    order_data = detail_payload
-            except Exception as detail_exc:
+    seen_ids = set()
+    pending_details = []
+    pending_writes = []
+
+    def collect(block):
+        # Map finished detail fetches; write a batch whenever enough are ready
+        nonlocal detail_failures, skipped_count, failed_count, pending_writes
+        still_running = []
+        for future in pending_details:
+            if not block and not future.done():
+                still_running.append(future)
+                continue
+
+            order_data, detail_exc = future.result()
+            if detail_exc is not None:
                 detail_failures += 1
                 logger.warning(
                     "Detail fetch failed for order %s: %s",
-                    order_id,
+                    order_data["id"],
                     detail_exc
                 )
+            try:
+                defaults = _map_order_to_model_fields(order_data, location)
+                if defaults["creation_date"] is None:
+                    # creation_date is the partition key; such an order can't be stored
+                    logger.warning("Order %s has no creation date; skipping", order_data["id"])
+                    skipped_count += 1
+                    continue
+                pending_writes.append(LightspeedOrder(id=order_data["id"], **defaults))
+            except Exception as e:
+                logger.error("Error mapping order %s: %s", order_data["id"], str(e))
+                skipped_count += 1
+                failed_count += 1
+
+        pending_details[:] = still_running
+
+        if pending_writes and (block or len(pending_writes) >= ORDER_WRITE_BATCH_SIZE):
+            saved, failed = _bulk_upsert_orders(pending_writes)
+            saved_orders.extend(saved)
+            skipped_count += failed
+            failed_count += failed
+            pending_writes = []
+
+    with ThreadPoolExecutor(max_workers=settings.LIGHTSPEED.get("DETAIL_WORKERS", 4)) as pool:
+        while (new_count if incremental else len(all_orders)) < max_orders:
+            endpoint = f"onlineordering/order?offset={offset}&amount={limit}"
+            chunk = lightspeed_get(endpoint, location=location)
+
+            if isinstance(chunk, dict):
+                results = chunk.get("results", [])
+            elif isinstance(chunk, list):
+                results = chunk
+            else:
+                break
 
-            defaults = _map_order_to_model_fields(order_data, location)
+            if not results:
+                list_exhausted = True
+                break
+            all_orders.extend(results)
 
-            order_obj, _ = LightspeedOrder.objects.update_or_create(
-                id=order_id,
-                defaults=defaults
+            page = []
+            for order_data in results:
+                if not isinstance(order_data, dict) or not order_data.get("id"):
+                    skipped_count += 1
+                    continue
+                # Orders can shift onto the next page while paging; keep the first copy
+                if order_data["id"] in seen_ids:
+                    continue
+                if _reached_sync_cursor(order_data, stop_at):
+                    reached_cursor = True
+                    skipped_count += 1
+                    continue
+                seen_ids.add(order_data["id"])
+                page.append(order_data)
+
+            existing_ids = set(
+                LightspeedOrder.objects
+                .filter(id__in=[order_data["id"] for order_data in page])
+                .values_list("id", flat=True)
             )
-            saved_orders.append(order_obj)
 
-        except Exception as e:
-            logger.error("Error saving order %s: %s", order_id, str(e))
-            skipped_count += 1
+            for order_data in page:
+                if order_data["id"] in existing_ids:
+                    skipped_count += 1
+                    continue
+                new_count += 1
+                pending_details.append(pool.submit(_fetch_order_detail, order_data, location))
+
+            collect(block=False)
+            if reached_cursor:
+                break
+            offset += limit
+
+        collect(block=True)
+
+    refresh_order_rollups(saved_orders)
+
+    # An order that failed to store must be retried next run, so the mark only moves on a clean run
+    if failed_count:
+        logger.warning(
+            "Sync cursor for %s not advanced: %s orders could not be stored",
+            location, failed_count,
+        )
+    elif not (reached_cursor or list_exhausted):
+        # Capped by max_orders: orders below the last page are still unseen
+        logger.info(
+            "Sync cursor for %s not advanced: stopped at %s new orders before reaching it",
+            location, new_count,
+        )
+        _advance_sync_cursor(cursor, (), len(saved_orders))
+    else:
+        _advance_sync_cursor(
+            cursor,
+            (order_data for order_data in all_orders if isinstance(order_data, dict) and order_data.get("id")),
+            len(saved_orders),
+        )
 
     duration = time.time() - start
 
@@ -252,5 +501,7 @@ def fetch_and_store_orders(location, max_orders=500):
         "skipped": skipped_count,
         "detail_failures": detail_failures,
         "duration": duration,
+        "reached_sync_cursor": reached_cursor,
         "saved_orders": saved_orders,
-    }
\ No newline at end of file
+        "all_orders": all_orders,
+    }
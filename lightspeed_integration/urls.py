@@ -16,7 +16,8 @@ from .views import (
     InventoryProductView,
     InventoryProductGroupView,
     FinanceReceiptActualView,
-    LightspeedReceiptFullDumpView
+    LightspeedReceiptFullDumpView,
+    LightspeedReceiptBackfillStatusView,
 )
 
 urlpatterns = [
@@ -37,5 +38,6 @@ urlpatterns = [
     path("inventory/products/", InventoryProductView.as_view(), name="lightspeed-inventory-products"),
     path("inventory/productgroups/", InventoryProductGroupView.as_view(), name="lightspeed-inventory-productgroups"),
     path("finance/actual-receipts/dumpdata/",LightspeedReceiptFullDumpView.as_view()),
+    path("finance/actual-receipts/dumpdata/status/", LightspeedReceiptBackfillStatusView.as_view(), name="lightspeed-receipt-backfill-status"),
     
 ]
@@ -1,33 +1,56 @@
 from typing import Any, Dict, Optional
 import logging
 from datetime import datetime, date
+from decimal import Decimal, InvalidOperation
+from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 
+from backend.services.dimensions import map_location_to_value
+
 logger = logging.getLogger(__name__)
 
-def _map_location_to_value(location):
+
+def _to_decimal(value) -> Optional[Decimal]:
+    """Decimal of a JSON number/string, None when missing or not numeric."""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return Decimal(str(value))
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def _order_report_fields(order_items, order_payments, creation_date, delivery_date) -> Dict[str, Any]:
     """
-    Map location parameter to actual location value.
-    
-    Mapping:
-    - Frietbooster -> Berlare
-    - Frietchalet -> Dendermonde
-    - Tipzakske -> Aalst
-    - Default -> Dendermonde
-    
-    Args:
-        location: Location string from request
-        
-    Returns:
-        str: Mapped location value
+    Scalar report columns derived from an order payload, so the report SQL
+    aggregates plain columns instead of unpacking order_items/order_payments.
+    Keep in sync with ORDER_REPORT_COLUMNS_SQL (lightspeed_integration/rollups.py).
+
+    - payment_total: sum of the payment amounts
+    - item_count / item_quantity_total: number of items and sum of their amounts
+    - guest_amount: largest item amount (what the reports count as guests)
+    - delivery_minutes: delivery_date - creation_date in minutes
+    - local_day / local_hour: creation date in settings.TIME_ZONE
     """
-    location_mapping = {
-        "Frietbooster": "Berlare",
-        "Frietchalet": "Dendermonde",
-        "Tipzakske": "Aalst",
-    }
-    return location_mapping.get(location, "Dendermonde")
+    payments = [_to_decimal(p.get("amount")) for p in order_payments or [] if isinstance(p, dict)]
+    amounts = [_to_decimal(i.get("amount")) for i in order_items or [] if isinstance(i, dict)]
+    amounts = [a for a in amounts if a is not None]
+
+    delivery_minutes = None
+    if creation_date and delivery_date:
+        delivery_minutes = Decimal(str((delivery_date - creation_date).total_seconds())) / 60
 
+    local_created = timezone.localtime(creation_date) if creation_date and timezone.is_aware(creation_date) else creation_date
+
+    return {
+        "payment_total": sum((p for p in payments if p is not None), Decimal(0)),
+        "item_count": len(order_items or []),
+        "item_quantity_total": sum(amounts, Decimal(0)),
+        "guest_amount": max(amounts) if amounts else None,
+        "delivery_minutes": round(delivery_minutes, 6) if delivery_minutes is not None else None,
+        "local_day": local_created.date() if local_created else None,
+        "local_hour": local_created.hour if local_created else None,
+    }
 
 
 def _map_order_to_model_fields(order_data: Dict[str, Any], location: str = "Frietchalet") -> Dict[str, Any]:
@@ -49,15 +72,20 @@ def _map_order_to_model_fields(order_data: Dict[str, Any], location: str = "Frie
             logger.warning("Failed to parse datetime: %s", value)
             return None
     
+    creation_date = parse_datetime_safe(order_data.get("creationDate"))
+    delivery_date = parse_datetime_safe(order_data.get("deliveryDate"))
+    order_items = order_data.get("orderItems", [])
+    order_payments = order_data.get("orderPayments", [])
+
     return {
-        "delivery_date": parse_datetime_safe(order_data.get("deliveryDate")),
-        "creation_date": parse_datetime_safe(order_data.get("creationDate")),
+        "delivery_date": delivery_date,
+        "creation_date": creation_date,
         "type": order_data.get("type"),
         "receipt_id": order_data.get("receiptId"),
         "link_to_open_receipt_on_table": bool(order_data.get("linkToOpenReceiptOnTable", False)),
         "status": order_data.get("status"),
-        "order_items": order_data.get("orderItems", []),
-        "order_payments": order_data.get("orderPayments", []),
+        "order_items": order_items,
+        "order_payments": order_payments,
         "order_tax_info": order_data.get("orderTaxInfo", []),
         "note": order_data.get("note"),
         "number_of_customers": order_data.get("numberOfCustomers", 0) or 0,
@@ -65,6 +93,53 @@ def _map_order_to_model_fields(order_data: Dict[str, Any], location: str = "Frie
         "external_reference": order_data.get("externalReference"),
         "customer_id": order_data.get("customerId"),
         "raw_data": order_data,
-        "location": _map_location_to_value(location),
+        "location": map_location_to_value(location),
+        **_order_report_fields(order_items, order_payments, creation_date, delivery_date),
     }
 
+
+def safe_parse_datetime(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        return parse_datetime(value)
+    return None
+
+
+def map_receipt_to_model(receipt, location):
+    return {
+        "uuid": receipt.get("uuid"),
+        "order_id": receipt.get("orderId"),
+
+        "table_id": receipt.get("tableId"),
+        "floor_id": receipt.get("floorId"),
+        "customer_id": receipt.get("customerId"),
+        "customer_uuid": receipt.get("customerUuid"),
+        "user_id": receipt.get("userId"),
+        "parent_id": receipt.get("parentId"),
+
+        "status": receipt.get("status"),
+        "type": receipt.get("type"),
+
+        "creation_date": safe_parse_datetime(receipt.get("creationDate")),
+        "modification_date": safe_parse_datetime(receipt.get("modificationDate")),
+        "delivery_date": safe_parse_datetime(receipt.get("deliveryDate")),
+        "closing_date": safe_parse_datetime(receipt.get("closingDate")),
+        "print_date": safe_parse_datetime(receipt.get("printDate")),
+
+        "total": receipt.get("total"),
+        "total_without_tax": receipt.get("totalWithoutTax"),
+
+        "number_of_customers": receipt.get("numberOfCustomers", 0),
+        "current_course": receipt.get("currentCourse"),
+
+        "items": receipt.get("items", []),
+        "payments": receipt.get("payments", []),
+        "tax_info": receipt.get("taxInfo", []),
+        "action_items": receipt.get("actionItems", []),
+
+        "raw_data": receipt,
+        "location": location,
+    }
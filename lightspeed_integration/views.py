@@ -6,48 +6,28 @@ from rest_framework import status
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.utils.dateparse import parse_datetime
 
 from lightspeed_integration.oauth import LightspeedAuth
-from .services import lightspeed_get, summarize_orders_by_date
+from .services import fetch_and_store_orders, lightspeed_get, summarize_orders_by_date
+from .utils.mappers import _map_order_to_model_fields
+from .rollups import refresh_order_rollups, refresh_product_names
+from backend.services.dimensions import map_location_to_value
+from backend.services.report_cache import invalidate_reports
 from .models import LightspeedOrder, LightspeedProduct, LightspeedProductGroup
 from .serializers import LightspeedOrderSerializer, LightspeedProductSerializer, LightspeedProductGroupSerializer
+import threading
 import time
-from datetime import date, timedelta
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from rest_framework import status
 
-from .models import LightspeedReceipt
+from .models import LightspeedReceiptBackfillWindow
+from .backfill import RECEIPT_BACKFILL_START, receipt_backfill_status, run_receipt_backfill
 logger = logging.getLogger(__name__)
 
 
-def _map_location_to_value(location):
-    """
-    Map location parameter to actual location value.
-    
-    Mapping:
-    - Frietbooster -> Berlare
-    - Frietchalet -> Dendermonde
-    - Tipzakske -> Aalst
-    - Default -> Dendermonde
-    
-    Args:
-        location: Location string from request
-        
-    Returns:
-        str: Mapped location value
-    """
-    location_mapping = {
-        "Frietbooster": "Berlare",
-        "Frietchalet": "Dendermonde",
-        "Tipzakske": "Aalst",
-    }
-    return location_mapping.get(location, "Dendermonde")
-
-
 def _build_url_with_params(base: str, params: Optional[Dict[str, Optional[str]]] = None) -> str:
     """Build a URL with query parameters from a mapping, ignoring None/empty values."""
     if not params:
@@ -103,96 +83,25 @@ class OrdersView(APIView):
     def get(self, request, *_, **__):
         start = time.time()
         location = request.query_params.get("location") or "Frietchalet"
-        existing_count = LightspeedOrder.objects.filter(location= _map_location_to_value(location)).count()
+        # ?full=true ignores the sync cursor and re-pages the whole order list
+        incremental = request.query_params.get("full", "").lower() not in ("1", "true")
         try:
-            all_orders = []
-            limit = 100   # Lightspeed default page size
-            offset = 0
-
-            # Fetch all orders from Lightspeed API
-            while len(all_orders)<3000:
-                time.sleep(0.4)
-                endpoint = f"onlineordering/order?offset={offset}&amount={limit}"
-                chunk = lightspeed_get(endpoint, location=location)
-
-                # Handle different response formats
-                if isinstance(chunk, dict):
-                    # If response is a dict with 'results' key
-                    results = chunk.get("results", [])
-                    if not results or len(results) == 0:
-                        break
-                    all_orders.extend(results)
-                elif isinstance(chunk, list):
-                    # If response is directly a list
-                    if len(chunk) == 0:
-                        break
-                    all_orders.extend(chunk)
-                else:
-                    # Unexpected format, break
-                    break
-
-                # Move to next page
-                offset += limit
-
-            # Save orders to database (prevent duplicates by using order ID as primary key)
-            saved_orders = []
-            skipped_count = 0
-            detail_failures = 0
-            
-            for order_data in all_orders:
-                if not isinstance(order_data, dict):
-                    skipped_count += 1
-                    continue
-                
-                order_id = order_data.get("id")
-                if order_id is None:
-                    skipped_count += 1
-                    logger.warning("Skipping order with missing ID: %s", order_data)
-                    continue
-                # Skip if already saved
-                existing = LightspeedOrder.objects.filter(id=order_id).first()
-                if existing:
-                    skipped_count += 1
-                    continue
-                
-                try:
-                    # Try to fetch full detail for this order so items/payments are captured
-                    try:
-                        print(f"Fetching data for ID : {order_id}")
-                        time.sleep(0.4)
-                        detail_payload = lightspeed_get(f"onlineordering/order/{order_id}", location=location)
-                        if isinstance(detail_payload, dict):
-                            order_data = detail_payload
-                    except Exception as detail_exc:
-                        detail_failures += 1
-                        logger.warning("Detail fetch failed for order %s: %s", order_id, detail_exc)
-                    # Map API data to model fields
-                    defaults = _map_order_to_model_fields(order_data, location)
-                    
-                    # Use update_or_create to prevent duplicates (id is primary key)
-                    order_obj, created = LightspeedOrder.objects.update_or_create(
-                        id=order_id,
-                        defaults=defaults
-                    )
-                    saved_orders.append(order_obj)
-                except Exception as e:
-                    logger.error("Error saving order %s: %s", order_id, str(e))
-                    skipped_count += 1
-                    continue
+            result = fetch_and_store_orders(location, max_orders=3000, incremental=incremental)
 
             # # Serialize saved orders
-            serializer = LightspeedOrderSerializer(saved_orders, many=True)
+            serializer = LightspeedOrderSerializer(result["saved_orders"], many=True)
             end = time.time()
             duration = end - start
             print("Total tiem taken in getting order",duration)
             return Response({
-                "total_fetched": len(all_orders),
-                "total_saved": len(saved_orders),
-                "skipped": skipped_count,
-                "detail_failures": detail_failures,
+                "total_fetched": result["total_fetched"],
+                "total_saved": result["total_saved"],
+                "skipped": result["skipped"],
+                "detail_failures": result["detail_failures"],
+                "reached_sync_cursor": result["reached_sync_cursor"],
                 "location": location,
                 "orders": serializer.data,
-                "all_orders":all_orders
+                "all_orders": result["all_orders"]
             }, status=status.HTTP_200_OK)
 
         except Exception as exc:
@@ -203,45 +112,6 @@ class OrdersView(APIView):
             )
 
 
-def _map_order_to_model_fields(order_data: Dict[str, Any], location: str = "Frietchalet") -> Dict[str, Any]:
-    """
-    Map Lightspeed API order data to LightspeedOrder model fields.
-    Handles missing/null values gracefully.
-    
-    Args:
-        order_data: Order data from Lightspeed API
-        location: Location parameter to map to location value
-    """
-    def parse_datetime_safe(value):
-        """Safely parse datetime string, return None if invalid."""
-        if not value:
-            return None
-        try:
-            return parse_datetime(value)
-        except (ValueError, TypeError):
-            logger.warning("Failed to parse datetime: %s", value)
-            return None
-    
-    return {
-        "delivery_date": parse_datetime_safe(order_data.get("deliveryDate")),
-        "creation_date": parse_datetime_safe(order_data.get("creationDate")),
-        "type": order_data.get("type"),
-        "receipt_id": order_data.get("receiptId"),
-        "link_to_open_receipt_on_table": bool(order_data.get("linkToOpenReceiptOnTable", False)),
-        "status": order_data.get("status"),
-        "order_items": order_data.get("orderItems", []),
-        "order_payments": order_data.get("orderPayments", []),
-        "order_tax_info": order_data.get("orderTaxInfo", []),
-        "note": order_data.get("note"),
-        "number_of_customers": order_data.get("numberOfCustomers", 0) or 0,
-        "table_id": order_data.get("tableId"),
-        "external_reference": order_data.get("externalReference"),
-        "customer_id": order_data.get("customerId"),
-        "raw_data": order_data,
-        "location": _map_location_to_value(location),
-    }
-
-
 def _map_product_to_model_fields(product_data: Dict[str, Any],location: str = "Frietchalet") -> Dict[str, Any]:
     """
     Map Lightspeed API product data to LightspeedProduct model fields.
@@ -281,7 +151,7 @@ def _map_product_to_model_fields(product_data: Dict[str, Any],location: str = "F
         "additions": product_data.get("additions", []),
         "info": product_data.get("info"),
         "raw_data": product_data,
-        "location": _map_location_to_value(location),
+        "location": map_location_to_value(location),
         
     }
 
@@ -298,7 +168,7 @@ def _map_product_group_to_model_fields(group_data: Dict[str, Any],location: str
         "shortcut_category": bool(group_data.get("shortcutCategory", False)),
         "products": group_data.get("products", []),
         "raw_data": group_data,
-        "location": _map_location_to_value(location),
+        "location": map_location_to_value(location),
     }
 
 
@@ -320,6 +190,7 @@ class OrderDetailView(APIView):
                 id=data.get("id", order_id),
                 defaults=defaults,
             )
+            refresh_order_rollups([order_obj])
             serializer = LightspeedOrderSerializer(order_obj)
             return Response(serializer.data, status=status.HTTP_200_OK)
         except Exception as exc:
@@ -395,6 +266,10 @@ class ProductsView(APIView):
                     skipped_count += 1
                     continue
 
+            if saved_products:
+                refresh_product_names()
+                invalidate_reports("products", location)
+
             # Serialize saved products
             serializer = LightspeedProductSerializer(saved_products, many=True)
             end = time.time()
@@ -426,6 +301,8 @@ class ProductDetailView(APIView):
                 id=data.get("id", product_id),
                 defaults=defaults,
             )
+            refresh_product_names()
+            invalidate_reports("products", product_obj.location)
             serializer = LightspeedProductSerializer(product_obj)
             return Response(serializer.data, status=status.HTTP_200_OK)
         except Exception as exc:
@@ -751,6 +628,9 @@ class InventoryProductGroupView(APIView):
                 )
                 saved_groups.append(obj)
 
+            if saved_groups:
+                invalidate_reports("products", location)
+
             serializer = LightspeedProductGroupSerializer(saved_groups, many=True)
             return Response(
                 {
@@ -767,187 +647,48 @@ class InventoryProductGroupView(APIView):
             return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
 
-# helper fun.
-def safe_parse_datetime(value):
-    if value is None:
-        return None
-    if isinstance(value, datetime):
-        return value
-    if isinstance(value, str):
-        return parse_datetime(value)
-    return None
-
-
-def map_receipt_to_model(receipt, location):
-    return {
-        "uuid": receipt.get("uuid"),
-        "order_id": receipt.get("orderId"),
-
-        "table_id": receipt.get("tableId"),
-        "floor_id": receipt.get("floorId"),
-        "customer_id": receipt.get("customerId"),
-        "customer_uuid": receipt.get("customerUuid"),
-        "user_id": receipt.get("userId"),
-        "parent_id": receipt.get("parentId"),
-
-        "status": receipt.get("status"),
-        "type": receipt.get("type"),
-
-        "creation_date": safe_parse_datetime(receipt.get("creationDate")),
-        "modification_date": safe_parse_datetime(receipt.get("modificationDate")),
-        "delivery_date": safe_parse_datetime(receipt.get("deliveryDate")),
-        "closing_date": safe_parse_datetime(receipt.get("closingDate")),
-        "print_date": safe_parse_datetime(receipt.get("printDate")),
-
-        "total": receipt.get("total"),
-        "total_without_tax": receipt.get("totalWithoutTax"),
-
-        "number_of_customers": receipt.get("numberOfCustomers", 0),
-        "current_course": receipt.get("currentCourse"),
-
-        "items": receipt.get("items", []),
-        "payments": receipt.get("payments", []),
-        "tax_info": receipt.get("taxInfo", []),
-        "action_items": receipt.get("actionItems", []),
-
-        "raw_data": receipt,
-        "location": location,
-    }
-def lightspeed_get_with_backoff(url, params, location, max_retries=5):
-    """
-    Lightspeed API call with exponential backoff for 429 / Cloudflare.
-    """
-    delay = 5  # seconds
-
-    for attempt in range(max_retries):
-        try:
-            return lightspeed_get(url, params, location=location)
-
-        except Exception as exc:
-            msg = str(exc).lower()
-
-            if "429" in msg or "rate limit" in msg or "cloudflare" in msg:
-                logger.warning(
-                    "Rate limited. Sleeping %s sec (attempt %s/%s)",
-                    delay, attempt + 1, max_retries
-                )
-                time.sleep(delay)
-                delay *= 2
-                continue
-
-            raise exc
-
-    raise Exception("Max retries exceeded due to rate limiting")
-
-
 class LightspeedReceiptFullDumpView(APIView):
     """
-    Dump ALL Lightspeed receipts from 2021-01-01 till today.
-    Uses:
-    - 7 day window
-    - offset + amount pagination
-    - rate limit backoff
+    Dump ALL Lightspeed receipts from 2022-01-01 till today.
+
+    Starts lightspeed_integration.backfill.run_receipt_backfill in a background
+    thread (checkpointed 7 day windows, fetched concurrently, bulk upserts) and
+    returns immediately; progress is at LightspeedReceiptBackfillStatusView.
+    Long backfills should run with `manage.py backfill_receipts` instead.
     """
     permission_classes = (AllowAny,)
 
     def get(self, request, *_, **__):
-        start_time = time.time()
-
         location = request.query_params.get("location") or "Dendermonde"
 
-        START_DATE = date(2022, 1, 1)
-        END_DATE = date.today()
-
-        WINDOW_DAYS = 7
-        AMOUNT = 100
-
-        url = "financial/receipt/"
-
-        total_fetched = 0
-        total_saved = 0
-        total_skipped = 0
-
-        current_start = START_DATE
-
         try:
-            while current_start <= END_DATE:
-                current_end = min(
-                    current_start + timedelta(days=WINDOW_DAYS - 1),
-                    END_DATE,
-                )
-
-                offset = 0
-                logger.info(
-                    "Fetching receipts from %s to %s",
-                    current_start, current_end
+            running = LightspeedReceiptBackfillWindow.objects.filter(
+                location=location,
+                status=LightspeedReceiptBackfillWindow.STATUS_RUNNING,
+            ).exists()
+            if running:
+                return Response(
+                    {"status": "already running", "backfill": receipt_backfill_status(location)},
+                    status=status.HTTP_409_CONFLICT,
                 )
 
-                while True:
-                    params = {
-                        "from": current_start.strftime("%Y-%m-%d"),
-                        "to": current_end.strftime("%Y-%m-%d"),
-                        "offset": offset,
-                        "amount": AMOUNT,
-                    }
-
-                    response = lightspeed_get_with_backoff(
-                        url, params, location
-                    )
-
-                    if isinstance(response, dict):
-                        results = response.get("results", [])
-                    else:
-                        results = response
-
-                    if not results:
-                        break
-
-                    total_fetched += len(results)
-
-                    for receipt in results:
-                        receipt_id = receipt.get("id")
-                        if not receipt_id:
-                            total_skipped += 1
-                            continue
-
-                        try:
-                            defaults = map_receipt_to_model(receipt, location)
-
-                            _, created = LightspeedReceipt.objects.update_or_create(
-                                id=receipt_id,
-                                defaults=defaults,
-                            )
-
-                            if created:
-                                total_saved += 1
-
-                        except Exception as e:
-                            logger.error(
-                                "Failed saving receipt %s: %s",
-                                receipt_id, str(e)
-                            )
-                            total_skipped += 1
-
-                    offset += AMOUNT
-
-                    # ✅ IMPORTANT: throttle
-                    time.sleep(1.0)
-
-                current_start = current_end + timedelta(days=1)
-
-            duration = round(time.time() - start_time, 2)
+            thread = threading.Thread(
+                target=run_receipt_backfill,
+                args=(location,),
+                name=f"receipt-backfill-{location}",
+                daemon=True,
+            )
+            thread.start()
 
             return Response(
                 {
-                    "status": "completed",
-                    "from_date": START_DATE.isoformat(),
-                    "to_date": END_DATE.isoformat(),
-                    "total_fetched": total_fetched,
-                    "total_saved": total_saved,
-                    "total_skipped": total_skipped,
-                    "time_taken_sec": duration,
+                    "status": "started",
+                    "location": location,
+                    "from_date": RECEIPT_BACKFILL_START.isoformat(),
+                    "to_date": date.today().isoformat(),
+                    "backfill": receipt_backfill_status(location),
                 },
-                status=status.HTTP_200_OK,
+                status=status.HTTP_202_ACCEPTED,
             )
 
         except Exception as exc:
@@ -955,4 +696,17 @@ class LightspeedReceiptFullDumpView(APIView):
             return Response(
                 {"error": str(exc)},
                 status=status.HTTP_400_BAD_REQUEST,
-            )
\ No newline at end of file
+            )
+
+
+class LightspeedReceiptBackfillStatusView(APIView):
+    """Progress of the receipt backfill per location (optionally ?location=...)."""
+    permission_classes = (AllowAny,)
+
+    def get(self, request, *_, **__):
+        try:
+            location = request.query_params.get("location")
+            return Response({"results": receipt_backfill_status(location)}, status=status.HTTP_200_OK)
+        except Exception as exc:
+            logger.exception("Error reading receipt backfill status")
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
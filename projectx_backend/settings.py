@@ -1,168 +1,215 @@
-"""
-Django settings for projectx_backend project.
-"""
-
-from datetime import datetime, timedelta
-from pathlib import Path
-import os, json
-from dotenv import load_dotenv
-
-# Load environment variables
-BASE_DIR = Path(__file__).resolve().parent.parent
-load_dotenv(os.path.join(BASE_DIR, '.env'))
-
-# SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = os.getenv('SECRET_KEY')
-
-# SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'
-ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS', '*').split(',')
-
-CORS_ORIGIN_ALLOW_ALL = True
-
-GROWTH_VALUE_BASE_URL = os.getenv('GROWTH_VALUE_BASE_URL')
-GROWTH_VALUE_SUPPORT = os.getenv('GROWTH_VALUE_SUPPORT')
-
-INSTALLED_APPS = [
-    'rest_framework_simplejwt.token_blacklist',
-    'rest_framework',
-    'backend',
-    'corsheaders',
-    'django.contrib.admin',
-    'django.contrib.auth',
-    'django.contrib.contenttypes',
-    'django.contrib.sessions',
-    'django.contrib.messages',
-    'django.contrib.staticfiles',
-    'shopify_integration',
-    'lightspeed_integration',
-]
-
-MIDDLEWARE = [
-    'corsheaders.middleware.CorsMiddleware',
-    'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
-    'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'backend.middlewares.PaymentRequiredMiddleware',
-]
-
-ROOT_URLCONF = 'projectx_backend.urls'
-
-TEMPLATES = [
-    {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [os.path.join(BASE_DIR, "backend/templates")],
-        'APP_DIRS': True,
-        'OPTIONS': {
-            'context_processors': [
-                'django.template.context_processors.debug',
-                'django.template.context_processors.request',
-                'django.contrib.auth.context_processors.auth',
-                'django.contrib.messages.context_processors.messages',
-            ],
-        },
-    },
-]
-
-REST_FRAMEWORK = {
-    'DEFAULT_PERMISSION_CLASSES': (
-        'rest_framework.permissions.IsAuthenticated',
-    ),
-    'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    ),
-}
-
-SIMPLE_JWT = {
-    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
-    "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
-    "ROTATE_REFRESH_TOKENS": True,
-    "BLACKLIST_AFTER_ROTATION": True,
-    "SIGNING_KEY": SECRET_KEY,
-    "ALGORITHM": "HS256",
-    "AUTH_HEADER_TYPES": ("Bearer",),
-}
-
-WSGI_APPLICATION = 'projectx_backend.wsgi.application'
-
-# Database
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': 'growthvalue',
-        'USER': 'postgres',
-        'PASSWORD': '1234',
-        'HOST': 'localhost',
-        'PORT': '5432',
-    }
-}
-
-# Lightspeed config
-LIGHTSPEED = {
-    "CLIENT_ID": os.getenv("LIGHTSPEED_CLIENT_ID"),
-    "CLIENT_SECRET": os.getenv("LIGHTSPEED_CLIENT_SECRET"),
-    "REDIRECT_URI": os.getenv("LIGHTSPEED_REDIRECT_URI"),
-    "AUTHORIZE_URL": os.getenv("LIGHTSPEED_AUTHORIZE_URL"),
-    "TOKEN_URL": os.getenv("LIGHTSPEED_TOKEN_URL"),
-    "BASE_API_URL": os.getenv("LIGHTSPEED_BASE_API_URL"),
-    "CODE_CHALLENGE_METHOD": "S256",
-    "LOGIN_ID": os.getenv("LIGHTSPEED_LOGIN_ID"),
-    "PASSWORD": os.getenv("LIGHTSPEED_LOGIN_PASSWORD"),
-    "LOGIN_CREDENTIALS": json.loads(os.getenv("LIGHTSPEED_LOGIN_CREDENTIALS"))
-}
-
-AUTH_PASSWORD_VALIDATORS = [
-    {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
-    {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
-    {'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator'},
-    {'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator'},
-]
-
-LANGUAGE_CODE = 'en-us'
-TIME_ZONE = 'UTC'
-USE_I18N = True
-USE_TZ = True
-
-STATIC_URL = 'static/'
-STATIC_ROOT = os.path.join(BASE_DIR, 'static/')
-
-DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
-AUTH_USER_MODEL = 'backend.UserData'
-AUTHENTICATION_BACKENDS = [
-    'django.contrib.auth.backends.ModelBackend',
-]
-LOGIN_REDIRECT_URL = '/'
-LOGOUT_REDIRECT_URL = '/'
-
-CUTOFF_DATE = datetime(2024, 7, 22, 23, 59, 59)
-
-# Email configuration
-EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
-EMAIL_HOST = os.getenv("EMAIL_HOST", "smtp.gmail.com")
-EMAIL_PORT = int(os.getenv("EMAIL_PORT", 587))
-EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
-EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
-EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", "True").lower() == "true"
-EMAIL_USE_SSL = os.getenv("EMAIL_USE_SSL", "False").lower() == "true"
-
-MEDIA_URL = '/media/'
-MEDIA_ROOT = BASE_DIR / 'uploads'
-
-SHYFTER_LOGIN_ID=os.getenv("SHYFTER_LOGIN_ID")
-SHYFTER_LOGIN_PASSWORD=os.getenv("SHYFTER_LOGIN_PASSWORD")
-SHYFTER_API_URL=os.getenv("SHYFTER_API_URL")
-SHYFTER_AUTHORIZATION_TOKEN=os.getenv("SHYFTER_AUTHORIZATION_TOKEN")
-SHYFTER_AUTHORIZATION_CREDENTIALS= json.loads(os.getenv("SHYFTER_AUTHORIZATION_CREDENTIALS"))
-
-SHIPDAY_API_URL = os.getenv("SHIPDAY_API_URL")
-SHIPDAY_AUTH_HEADER = os.getenv("SHIPDAY_AUTH_HEADER")
-SHIPDAY_AUTH_HEADER_CREDENTIALS=json.loads(os.getenv("SHIPDAY_AUTH_HEADER_CREDENTIAL"))
-
-SHOPIFY_STORE_NAME = os.getenv("SHOPIFY_STORE_NAME")
-SHOPIFY_ACCESS_TOKEN = os.getenv("SHOPIFY_ACCESS_TOKEN")
-SHOPIFY_API_VERSION = os.getenv("SHOPIFY_API_VERSION")
-SHOPIFY_AUTHORIZATION_CREDENTIALS=json.loads(os.getenv("SHOPIFY_AUTHORIZATION_CREDENTIALS"))
+"""
+Django settings for projectx_backend project.
+"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+import os, json
+from dotenv import load_dotenv
+
+# Load environment variables
+BASE_DIR = Path(__file__).resolve().parent.parent
+load_dotenv(os.path.join(BASE_DIR, '.env'))
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = os.getenv('SECRET_KEY')
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'
+ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS', '*').split(',')
+
+CORS_ORIGIN_ALLOW_ALL = True
+
+GROWTH_VALUE_BASE_URL = os.getenv('GROWTH_VALUE_BASE_URL')
+GROWTH_VALUE_SUPPORT = os.getenv('GROWTH_VALUE_SUPPORT')
+
+INSTALLED_APPS = [
+    'rest_framework_simplejwt.token_blacklist',
+    'rest_framework',
+    'backend',
+    'corsheaders',
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'shopify_integration',
+    'lightspeed_integration',
+]
+
+MIDDLEWARE = [
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'backend.middlewares.PaymentRequiredMiddleware',
+]
+
+ROOT_URLCONF = 'projectx_backend.urls'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [os.path.join(BASE_DIR, "backend/templates")],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+        },
+    },
+]
+
+REST_FRAMEWORK = {
+    'DEFAULT_PERMISSION_CLASSES': (
+        'rest_framework.permissions.IsAuthenticated',
+    ),
+    'DEFAULT_AUTHENTICATION_CLASSES': (
+        'rest_framework_simplejwt.authentication.JWTAuthentication',
+    ),
+}
+
+SIMPLE_JWT = {
+    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
+    "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
+    "ROTATE_REFRESH_TOKENS": True,
+    "BLACKLIST_AFTER_ROTATION": True,
+    "SIGNING_KEY": SECRET_KEY,
+    "ALGORITHM": "HS256",
+    "AUTH_HEADER_TYPES": ("Bearer",),
+}
+
+WSGI_APPLICATION = 'projectx_backend.wsgi.application'
+
+# Database
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': 'growthvalue',
+        'USER': 'postgres',
+        'PASSWORD': '1234',
+        'HOST': 'localhost',
+        'PORT': '5432',
+    }
+}
+
+# Lightspeed config
+LIGHTSPEED = {
+    "CLIENT_ID": os.getenv("LIGHTSPEED_CLIENT_ID"),
+    "CLIENT_SECRET": os.getenv("LIGHTSPEED_CLIENT_SECRET"),
+    "REDIRECT_URI": os.getenv("LIGHTSPEED_REDIRECT_URI"),
+    "AUTHORIZE_URL": os.getenv("LIGHTSPEED_AUTHORIZE_URL"),
+    "TOKEN_URL": os.getenv("LIGHTSPEED_TOKEN_URL"),
+    "BASE_API_URL": os.getenv("LIGHTSPEED_BASE_API_URL"),
+    "CODE_CHALLENGE_METHOD": "S256",
+    "LOGIN_ID": os.getenv("LIGHTSPEED_LOGIN_ID"),
+    "PASSWORD": os.getenv("LIGHTSPEED_LOGIN_PASSWORD"),
+    "LOGIN_CREDENTIALS": json.loads(os.getenv("LIGHTSPEED_LOGIN_CREDENTIALS")),
+    # API quota per location token (requests/second and burst) and order detail fetch concurrency
+    "RATE_LIMIT_PER_SECOND": float(os.getenv("LIGHTSPEED_RATE_LIMIT_PER_SECOND", 5)),
+    "RATE_LIMIT_BURST": int(os.getenv("LIGHTSPEED_RATE_LIMIT_BURST", 5)),
+    "DETAIL_WORKERS": int(os.getenv("LIGHTSPEED_DETAIL_WORKERS", 4)),
+}
+
+AUTH_PASSWORD_VALIDATORS = [
+    {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
+    {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
+    {'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator'},
+    {'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator'},
+]
+
+LANGUAGE_CODE = 'en-us'
+TIME_ZONE = 'UTC'
+USE_I18N = True
+USE_TZ = True
+
+STATIC_URL = 'static/'
+STATIC_ROOT = os.path.join(BASE_DIR, 'static/')
+
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+AUTH_USER_MODEL = 'backend.UserData'
+AUTHENTICATION_BACKENDS = [
+    'django.contrib.auth.backends.ModelBackend',
+]
+LOGIN_REDIRECT_URL = '/'
+LOGOUT_REDIRECT_URL = '/'
+
+CUTOFF_DATE = datetime(2024, 7, 22, 23, 59, 59)
+
+# Email configuration
+EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+EMAIL_HOST = os.getenv("EMAIL_HOST", "smtp.gmail.com")
+EMAIL_PORT = int(os.getenv("EMAIL_PORT", 587))
+EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
+EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
+EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", "True").lower() == "true"
+EMAIL_USE_SSL = os.getenv("EMAIL_USE_SSL", "False").lower() == "true"
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = BASE_DIR / 'uploads'
+
+SHYFTER_LOGIN_ID=os.getenv("SHYFTER_LOGIN_ID")
+SHYFTER_LOGIN_PASSWORD=os.getenv("SHYFTER_LOGIN_PASSWORD")
+SHYFTER_API_URL=os.getenv("SHYFTER_API_URL")
+SHYFTER_AUTHORIZATION_TOKEN=os.getenv("SHYFTER_AUTHORIZATION_TOKEN")
+SHYFTER_AUTHORIZATION_CREDENTIALS= json.loads(os.getenv("SHYFTER_AUTHORIZATION_CREDENTIALS"))
+# Page chains fetched at once by the Shyfter clockings/shifts sync (backend/services/shyfter_ingest.py)
+SHYFTER_SYNC_CONCURRENCY = int(os.getenv("SHYFTER_SYNC_CONCURRENCY", 8))
+
+SHIPDAY_API_URL = os.getenv("SHIPDAY_API_URL")
+SHIPDAY_AUTH_HEADER = os.getenv("SHIPDAY_AUTH_HEADER")
+SHIPDAY_AUTH_HEADER_CREDENTIALS=json.loads(os.getenv("SHIPDAY_AUTH_HEADER_CREDENTIAL"))
+
+SHOPIFY_STORE_NAME = os.getenv("SHOPIFY_STORE_NAME")
+SHOPIFY_ACCESS_TOKEN = os.getenv("SHOPIFY_ACCESS_TOKEN")
+SHOPIFY_API_VERSION = os.getenv("SHOPIFY_API_VERSION")
+SHOPIFY_AUTHORIZATION_CREDENTIALS=json.loads(os.getenv("SHOPIFY_AUTHORIZATION_CREDENTIALS"))
+
+# Locations the daily 2am Lightspeed sync runs at once (tasks.daily_2am_task)
+DAILY_TASK_MAX_WORKERS = int(os.getenv("DAILY_TASK_MAX_WORKERS", 3))
+
+# In-process cache of built /reports/lightspeed/* responses (backend/services/report_cache.py)
+REPORT_CACHE = {
+    "MAX_ENTRIES": int(os.getenv("REPORT_CACHE_MAX_ENTRIES", 256)),
+    "OPEN_PERIOD_TTL": int(os.getenv("REPORT_CACHE_OPEN_PERIOD_TTL", 300)),
+    "CLOSED_PERIOD_TTL": int(os.getenv("REPORT_CACHE_CLOSED_PERIOD_TTL", 86400)),
+    "INVALIDATION_POLL_INTERVAL": int(os.getenv("REPORT_CACHE_INVALIDATION_POLL_INTERVAL", 5)),
+}
+
+# Build the report responses with the NumPy builders (backend/services/monthly_stats_columnar.py).
+# Ignored when NumPy isn't installed.
+REPORT_COLUMNAR_BUILDERS = os.getenv("REPORT_COLUMNAR_BUILDERS", "False").lower() == "true"
+
+# Worker threads per process computing ?async=true report requests (backend/services/report_jobs.py)
+REPORT_JOB_WORKERS = int(os.getenv("REPORT_JOB_WORKERS", 2))
+# Seconds before a running or still queued report job is considered lost with its worker process
+REPORT_JOB_TIMEOUT = int(os.getenv("REPORT_JOB_TIMEOUT", 1800))
+
+# Shared upstream HTTP client (backend/services/http_client.py): pooled sessions,
+# token bucket, retry/backoff on 429/5xx. Lightspeed buckets are per location token.
+HTTP_CLIENTS = {
+    "lightspeed": {
+        "RATE_LIMIT_PER_SECOND": LIGHTSPEED["RATE_LIMIT_PER_SECOND"],
+        "RATE_LIMIT_BURST": LIGHTSPEED["RATE_LIMIT_BURST"],
+    },
+    "shopify": {
+        "RATE_LIMIT_PER_SECOND": float(os.getenv("SHOPIFY_RATE_LIMIT_PER_SECOND", 2)),
+        "RATE_LIMIT_BURST": int(os.getenv("SHOPIFY_RATE_LIMIT_BURST", 40)),
+    },
+    "shyfter": {
+        "RATE_LIMIT_PER_SECOND": float(os.getenv("SHYFTER_RATE_LIMIT_PER_SECOND", 2)),
+        "RATE_LIMIT_BURST": int(os.getenv("SHYFTER_RATE_LIMIT_BURST", 2)),
+    },
+    "shipday": {
+        "RATE_LIMIT_PER_SECOND": float(os.getenv("SHIPDAY_RATE_LIMIT_PER_SECOND", 5)),
+        "RATE_LIMIT_BURST": int(os.getenv("SHIPDAY_RATE_LIMIT_BURST", 5)),
+    },
+}
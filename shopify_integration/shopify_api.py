@@ -1,7 +1,8 @@
 # shopify_api.py
-import requests
 from django.conf import settings
 
+from backend.services.http_client import get_http_client
+
 def _get_shopify_credentials(location="Frietchalet"):
     """
     Get Shopify credentials (store_name, access_token) for a specific location.
@@ -59,21 +60,28 @@ def _get_base_url(location="Frietchalet"):
     store_name, _ = _get_shopify_credentials(location)
     return f"https://{store_name}/admin/api/{settings.SHOPIFY_API_VERSION}"
 
+def _shopify_get(url, location="Frietchalet"):
+    """
+    GET through the shared Shopify client (pooled connection, per-store rate
+    limit, retries on 429/5xx honouring Retry-After).
+    """
+    return get_http_client("shopify").get(url, headers=_get_shopify_headers(location), limiter_key=location)
+
 def get_products(location="Frietchalet"):
     """Get products from Shopify for a specific location."""
     url = f"{_get_base_url(location)}/products.json"
-    r = requests.get(url, headers=_get_shopify_headers(location))
+    r = _shopify_get(url, location)
     return r.json()
 
 def get_reports(location="Frietchalet"):
     """Get shop reports from Shopify for a specific location."""
     url = f"{_get_base_url(location)}/shop.json"
-    r = requests.get(url, headers=_get_shopify_headers(location))
+    r = _shopify_get(url, location)
     return r.json()
 
 def get_orders(url,location="Frietchalet"):
     """Get orders from Shopify for a specific location."""
-    data = requests.get(url, headers=_get_shopify_headers(location))
+    data = _shopify_get(url, location)
     
     # Get JSON data from response
     response_data = data.json()
@@ -92,24 +100,24 @@ def get_orders(url,location="Frietchalet"):
 def get_customers(location="Frietchalet"):
     """Get customers from Shopify for a specific location."""
     url = f"{_get_base_url(location)}/customers.json"
-    r = requests.get(url, headers=_get_shopify_headers(location))
+    r = _shopify_get(url, location)
     return r.json()
 
 def get_single_product(product_id, location="Frietchalet"):
     """Get a single product from Shopify for a specific location."""
     url = f"{_get_base_url(location)}/products/{product_id}.json"
-    r = requests.get(url, headers=_get_shopify_headers(location))
+    r = _shopify_get(url, location)
     return r.json()
 
 def get_routes(location="Frietchalet"):
     """Get OAuth access scopes from Shopify for a specific location."""
     store_name, _ = _get_shopify_credentials(location)
     url = f"https://{store_name}/admin/oauth/access_scopes.json"
-    r = requests.get(url, headers=_get_shopify_headers(location))
+    r = _shopify_get(url, location)
     return r.json()
 
 def get_inventory(location="Frietchalet"):
     """Get inventory from Shopify for a specific location."""
     url = f"{_get_base_url(location)}/read_inventory.json"
-    r = requests.get(url, headers=_get_shopify_headers(location))
+    r = _shopify_get(url, location)
     return r.json()
\ No newline at end of file
@@ -3,35 +3,13 @@ import logging
 from django.http import JsonResponse
 from django.utils.dateparse import parse_datetime
 from typing import Any, Dict
+from backend.services.dimensions import map_location_to_value
 from .shopify_api import _get_base_url, get_products, get_orders, get_customers, get_single_product, get_routes, get_reports, get_inventory
 from .models import ShopifyOrder
 from .serializers import ShopifyOrderSerializer
 
 logger = logging.getLogger(__name__)
 
-def _map_location_to_value(location):
-    """
-    Map location parameter to actual location value.
-    
-    Mapping:
-    - Frietbooster -> Berlare
-    - Frietchalet -> Dendermonde
-    - Tipzakske -> Aalst
-    - Default -> Dendermonde
-    
-    Args:
-        location: Location string from request
-        
-    Returns:
-        str: Mapped location value
-    """
-    location_mapping = {
-        "Frietbooster": "Berlare",
-        "Frietchalet": "Dendermonde",
-        "Tipzakske": "Aalst",
-    }
-    return location_mapping.get(location, "Dendermonde")
-
 def products_view(request):
     """Get products from Shopify. Supports location query parameter."""
     location = request.GET.get("location") or "Frietchalet"
@@ -127,7 +105,7 @@ def _map_shopify_order_to_model_fields(order_data: Dict[str, Any], location: str
         "created_at": parse_datetime_safe(order_data.get("created_at")),
         "updated_at": parse_datetime_safe(order_data.get("updated_at")),
         "raw_data": order_data,
-        "location": _map_location_to_value(location),
+        "location": map_location_to_value(location),
     }
 
 
@@ -1,4 +1,11 @@
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.db import connections
+
+from lightspeed_integration.partitions import ensure_partitions
 from lightspeed_integration.services import fetch_and_store_orders
 
 logger = logging.getLogger(__name__)
@@ -6,25 +13,104 @@ logger = logging.getLogger(__name__)
 LOCATIONS = ["Frietchalet", "Frietbooster", "Tipzakske"]
 
 
-def daily_2am_task():
-    logger.info("🚀 Daily Lightspeed cron started")
-
-    for location in LOCATIONS:
-        try:
-            result = fetch_and_store_orders(location)
-            logger.info(
-                "✅ Location %s | fetched=%s saved=%s skipped=%s duration=%.2fs",
-                location,
-                result["total_fetched"],
-                result["total_saved"],
-                result["skipped"],
-                result["duration"],
-            )
-        except Exception as e:
-            logger.exception(
-                "❌ Cron failed for location %s: %s",
-                location,
-                str(e)
-            )
-
-    logger.info("🏁 Daily Lightspeed cron finished")
+def _run_location(location):
+    """
+    Ingest one location. Runs in its own worker thread with its own token,
+    rate limiter and DB connection, so a failing or slow location never
+    affects the others.
+    """
+    started = time.time()
+    try:
+        result = fetch_and_store_orders(location)
+        logger.info(
+            "✅ Location %s | fetched=%s saved=%s skipped=%s duration=%.2fs",
+            location,
+            result["total_fetched"],
+            result["total_saved"],
+            result["skipped"],
+            result["duration"],
+        )
+        return {
+            "location": location,
+            "ok": True,
+            "fetched": result["total_fetched"],
+            "saved": result["total_saved"],
+            "skipped": result["skipped"],
+            "detail_failures": result["detail_failures"],
+            "duration": result["duration"],
+        }
+    except Exception as e:
+        logger.exception(
+            "❌ Cron failed for location %s: %s",
+            location,
+            str(e)
+        )
+        return {
+            "location": location,
+            "ok": False,
+            "error": str(e),
+            "duration": time.time() - started,
+        }
+    finally:
+        # Worker threads open their own connections; don't leave them to the server timeout
+        connections.close_all()
+
+
+def daily_2am_task(locations=None, max_workers=None):
+    """
+    Run the Lightspeed order ingest for every location concurrently.
+
+    Args:
+        locations: Locations to sync (default: LOCATIONS)
+        max_workers: Global cap on locations running at once
+                     (default: settings.DAILY_TASK_MAX_WORKERS, else one per location)
+
+    Returns:
+        dict: Aggregated stats: wall time, summed location time, slowest
+              location, totals and the per-location results
+    """
+    locations = list(locations or LOCATIONS)
+    max_workers = max_workers or getattr(settings, "DAILY_TASK_MAX_WORKERS", None) or len(locations)
+
+    logger.info("🚀 Daily Lightspeed cron started (%s locations, %s workers)", len(locations), max_workers)
+    started = time.time()
+
+    # Keep the monthly order/receipt partitions ahead of the data being synced
+    try:
+        created = ensure_partitions()
+        if created:
+            logger.info("📦 Created partitions: %s", ", ".join(created))
+    except Exception:
+        logger.exception("❌ Partition maintenance failed; new rows go to the default partition")
+
+    results = []
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="daily-2am") as pool:
+        futures = [pool.submit(_run_location, location) for location in locations]
+        for future in as_completed(futures):
+            results.append(future.result())
+
+    results.sort(key=lambda r: locations.index(r["location"]))
+    slowest = max(results, key=lambda r: r["duration"], default=None)
+
+    summary = {
+        "wall_time": round(time.time() - started, 2),
+        "location_time_total": round(sum(r["duration"] for r in results), 2),
+        "slowest_location": slowest["location"] if slowest else None,
+        "slowest_duration": round(slowest["duration"], 2) if slowest else 0,
+        "fetched": sum(r.get("fetched", 0) for r in results),
+        "saved": sum(r.get("saved", 0) for r in results),
+        "skipped": sum(r.get("skipped", 0) for r in results),
+        "failed_locations": [r["location"] for r in results if not r["ok"]],
+        "locations": results,
+    }
+
+    logger.info(
+        "🏁 Daily Lightspeed cron finished | wall=%.2fs sum=%.2fs slowest=%s (%.2fs) saved=%s failed=%s",
+        summary["wall_time"],
+        summary["location_time_total"],
+        summary["slowest_location"],
+        summary["slowest_duration"],
+        summary["saved"],
+        summary["failed_locations"] or "none",
+    )
+    return summary